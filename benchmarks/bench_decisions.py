@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: DECISION-block parsing - whole-file regex vs streaming scanner
+===============================================================================
+Parses synthetic Arbiter transcripts (make_decision_transcript: valid,
+Markdown-decorated, numbered and malformed blocks with "decision" prose
+in between) of growing size, checks the block counts, and times:
+
+    legacy  - the old lazy DECISION regex over the whole text
+              (reproduced here for comparison)
+    stream  - mr_market_decisions.scan_decision_file over one file
+    dir     - the same transcript split across a directory of files
+
+With --fuzz N the scanner is also run over N randomly mangled
+transcripts (lines dropped, duplicated, swapped, truncated, stray
+headers and colons) and must never raise or emit an ill-typed decision.
+
+Usage:
+    python benchmarks/bench_decisions.py
+    python benchmarks/bench_decisions.py --blocks 1000 10000 50000 --fuzz 500
+===============================================================================
+"""
+
+import argparse
+import io
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_decisions import parse_decision_text, scan_decision_file, scan_decisions
+
+from synthetic import make_decision_transcript, synthetic_tickers
+
+LEGACY_PATTERN = re.compile(r'DECISION(?:\s*\d*)?:\s*\n((?:.*?\n)*?)(?=DECISION|\Z)', re.IGNORECASE)
+
+
+def legacy_parse(text):
+    """The old parser's scan: normalize, findall, split each match into fields"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    decisions = []
+    for match in LEGACY_PATTERN.findall(text):
+        decision = {}
+        for line in match.strip().split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                decision[key.strip().lower()] = value.strip()
+        if decision.get('action') and decision.get('ticker'):
+            decisions.append(decision)
+    return decisions
+
+
+def timed(fn):
+    """(result, seconds)"""
+    begin = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - begin
+
+
+def scan_directory(path):
+    """(valid, invalid) over every file in a directory"""
+    valid = invalid = 0
+    for name in sorted(os.listdir(path)):
+        for _, _, errors in scan_decision_file(os.path.join(path, name)):
+            if errors:
+                invalid += 1
+            else:
+                valid += 1
+    return valid, invalid
+
+
+def mangle(lines, rng):
+    """One random edit to a transcript's lines"""
+    i = rng.randrange(len(lines))
+    edit = rng.randrange(7)
+    if edit == 0:
+        del lines[i]
+    elif edit == 1:
+        lines.insert(i, lines[i])
+    elif edit == 2:
+        j = rng.randrange(len(lines))
+        lines[i], lines[j] = lines[j], lines[i]
+    elif edit == 3:
+        lines[i] = lines[i][:rng.randrange(len(lines[i]) + 1)]
+    elif edit == 4:
+        lines.insert(i, rng.choice(["DECISION:", "decision 7:", "## **Decision:**", "DECISION: BUY"]))
+    elif edit == 5:
+        lines[i] = lines[i].replace(':', rng.choice(['', '::', ': :', ':\r']), 1)
+    else:
+        lines[i] = lines[i] + rng.choice(['$', ',', ' shares', '\x00', ' ', '*'])
+
+
+def fuzz(tickers, runs, seed=0):
+    """Scanner over mangled transcripts; returns blocks checked"""
+    rng = random.Random(seed)
+    checked = 0
+    for run in range(runs):
+        text, _, _ = make_decision_transcript(tickers, 20, seed=run, crlf=run % 2 == 1)
+        lines = text.split("\n")
+        for _ in range(rng.randint(1, 40)):
+            mangle(lines, rng)
+        for line_no, decision, errors in scan_decisions(io.StringIO("\n".join(lines), newline=None)):
+            checked += 1
+            assert isinstance(line_no, int) and line_no >= 1
+            assert all(isinstance(e_line, int) and message for e_line, message in errors)
+            if not errors:
+                assert decision['action'] and decision['ticker']
+                assert isinstance(decision.get('limit', 0.0), float)
+                assert isinstance(decision.get('shares', 0), int)
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DECISION-block parsing')
+    parser.add_argument('--blocks', type=int, nargs='+', default=[1000, 10000, 40000])
+    parser.add_argument('--blocks-per-file', type=int, default=50)
+    parser.add_argument('--fuzz', type=int, default=200)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(25)
+    print("Decision parsing benchmark (seconds)")
+    print(f"    {'blocks':>7} {'MB':>6} {'legacy':>8} {'stream':>8} {'dir':>8}  found")
+
+    for n in args.blocks:
+        text, valid, invalid = make_decision_transcript(tickers, n, crlf=True)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "transcript.txt")
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+
+            split_dir = os.path.join(tmp, "decisions")
+            os.makedirs(split_dir)
+            for k in range(0, n, args.blocks_per_file):
+                chunk, _, _ = make_decision_transcript(
+                    tickers, min(args.blocks_per_file, n - k), seed=k + 1)
+                with open(os.path.join(split_dir, f"{k:08d}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(chunk)
+
+            legacy, legacy_s = timed(lambda: legacy_parse(text))
+            stream, stream_s = timed(lambda: list(scan_decision_file(path)))
+            _, dir_s = timed(lambda: scan_directory(split_dir))
+
+        found = sum(1 for _, _, errors in stream if not errors)
+        reported = len(stream) - found
+        assert (found, reported) == (valid, invalid), \
+            f"expected {valid} valid/{invalid} invalid, got {found}/{reported}"
+        assert len(parse_decision_text(text)) == valid
+        print(f"    {n:>7} {len(text) / 1e6:>6.1f} {legacy_s:>8.3f} {stream_s:>8.3f} {dir_s:>8.3f}  "
+              f"{found} valid, {reported} invalid (legacy kept {len(legacy)})")
+
+    if args.fuzz:
+        checked, fuzz_s = timed(lambda: fuzz(tickers, args.fuzz))
+        print(f"\n    Fuzz: {args.fuzz} mangled transcripts, {checked} blocks, no errors ({fuzz_s:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
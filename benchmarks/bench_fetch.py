@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Market-data fetch engine vs the original per-ticker loop
+===============================================================================
+Runs both code paths against FakeProvider (no network) with a simulated
+per-request latency and reports wall time and request counts.
+
+Usage:
+    python benchmarks/bench_fetch.py
+    python benchmarks/bench_fetch.py --tickers 100 --latency 0.2
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_fetch import FakeProvider, fetch_market_data, fetch_market_data_sequential
+
+
+def run(label, fn, tickers, latency):
+    """Time one fetch path against a fresh fake provider"""
+    provider = FakeProvider(latency=latency)
+    start = time.perf_counter()
+    market_data = fn(tickers, provider)
+    elapsed = time.perf_counter() - start
+    fetched = len([k for k in market_data if not k.startswith('_')])
+    calls = sum(provider.calls.values())
+    print(f"    {label:<12} {elapsed:8.3f}s  fetched {fetched:>4}  requests {calls:>4}")
+    return market_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the fetch engine')
+    parser.add_argument('--tickers', type=int, default=25, help='Number of synthetic tickers')
+    parser.add_argument('--latency', type=float, default=0.1, help='Seconds per fake request')
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    print(f"Fetch benchmark: {args.tickers} tickers, {args.latency:.3f}s latency per request")
+
+    old = run("sequential", fetch_market_data_sequential, tickers, args.latency)
+    new = run("engine", lambda t, p: fetch_market_data(t, p, verbose=False), tickers, args.latency)
+
+    # Same inputs must give the same market_data
+    assert old.keys() == new.keys(), "engine returned a different ticker set"
+    for ticker in tickers:
+        assert old[ticker] == new[ticker], f"mismatch for {ticker}"
+    print("    Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
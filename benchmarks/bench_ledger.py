@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Tracker I/O - openpyxl cell loops vs the in-memory ledger
+===============================================================================
+Times one daily tracker cycle (price update, reconcile, snapshot, decision
+ingest, save) on synthetic workbooks whose Action_Log and Benchmark sheets
+grow to years of rows.
+
+    legacy  - full load_workbook, ws.cell() scans, save, then reload
+              (the pre-ledger behavior, reproduced here for comparison)
+    ledger  - Ledger.load (read-only), in-memory mutations, one save
+
+Usage:
+    python benchmarks/bench_ledger.py
+    python benchmarks/bench_ledger.py --rows 250 2500 25000
+===============================================================================
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+
+import mr_market_roundtable as mr
+
+from synthetic import make_decision_text, make_market_data, make_tracker
+
+
+def legacy_cycle(path, market_data, decisions):
+    """The old cell-at-a-time cycle: load, scan, mutate, save, reload"""
+    wb = load_workbook(path)
+    ws_pos = wb['Positions']
+    for row in range(2, ws_pos.max_row + 1):
+        ticker = ws_pos.cell(row=row, column=1).value
+        if ticker in market_data:
+            ws_pos.cell(row=row, column=5, value=market_data[ticker]['close'])
+
+    def cash():
+        for row in range(2, ws_pos.max_row + 1):
+            if ws_pos.cell(row=row, column=1).value == "CASH":
+                return ws_pos.cell(row=row, column=6).value or 0
+        return 0
+
+    ws_pending = wb['Pending_Orders']
+    for row in range(2, ws_pending.max_row + 1):
+        ticker = ws_pending.cell(row=row, column=2).value
+        limit_price = ws_pending.cell(row=row, column=3).value
+        if ticker in market_data and market_data[ticker]['low'] <= (limit_price or 0):
+            cash()
+
+    ws_bench = wb['Benchmark']
+    new_row = ws_bench.max_row + 1
+    ws_bench.cell(row=new_row, column=1, value=market_data['_trade_date'])
+
+    ws_log = wb['Action_Log']
+    for decision in decisions:
+        key = mr.get_pending_order_key(decision)
+        for ws, cols in ((ws_pending, (1, 2, 5, 3, 4)), (ws_log, (1, 2, 3, 6, 5))):
+            for row in range(2, ws.max_row + 1):
+                existing = dict(zip(['date', 'ticker', 'track', 'limit', 'shares'],
+                                    (ws.cell(row=row, column=c).value for c in cols)))
+                if mr.get_pending_order_key(existing) == key:
+                    break
+        cash()
+
+    wb.save(path)
+    load_workbook(path)
+
+
+def ledger_cycle(path, market_data, decision_file):
+    """The ledger cycle via the real Block 3/7 functions"""
+    ledger = mr.Ledger.load(path)
+    mr.update_positions_prices(ledger, market_data)
+    mr.reconcile_pending_orders(ledger, market_data)
+    mr.append_daily_snapshot(ledger, market_data)
+    mr.ingest_decisions(ledger, decision_file)
+    ledger.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tracker I/O')
+    parser.add_argument('--rows', type=int, nargs='+', default=[250, 2500, 10000],
+                        help='Action_Log / Benchmark row counts (250 ~ one trading year)')
+    parser.add_argument('--decisions', type=int, default=25)
+    args = parser.parse_args()
+    mr.load_watchlist()
+
+    print(f"{'rows':>8} {'legacy':>10} {'ledger':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = os.path.join(tmp, f"tracker_{n}.xlsx")
+            tickers = make_tracker(path, n_log_rows=n, n_benchmark_rows=n)
+            mr.TICKERS = tickers
+            market_data = make_market_data(tickers)
+            text = make_decision_text(tickers, args.decisions)
+            decision_file = os.path.join(tmp, "decisions.txt")
+            with open(decision_file, 'w') as f:
+                f.write(text)
+            decisions = mr.parse_decision_blocks(text)
+
+            legacy_path = path + ".legacy.xlsx"
+            with open(path, 'rb') as src, open(legacy_path, 'wb') as dst:
+                dst.write(src.read())
+
+            start = time.perf_counter()
+            legacy_cycle(legacy_path, market_data, decisions)
+            legacy = time.perf_counter() - start
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ledger_cycle(path, market_data, decision_file)
+            ledger = time.perf_counter() - start
+
+            print(f"{n:>8} {legacy:>9.2f}s {ledger:>9.2f}s {legacy / ledger:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
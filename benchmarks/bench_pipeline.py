@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Daily pipeline - every stage, from small to large trackers
+===============================================================================
+Runs the real Block 2-7 functions of the main script, one timer per
+function, against synthetic trackers of increasing size and recorded
+market data (no network):
+
+    fetch_cold        fetch_all_market_data into an empty history store
+    fetch             fetch_all_market_data, one new bar (the daily case)
+    load_tracker      workbook (or SQLite) -> ledger
+    update_prices     update_positions_prices
+    reconcile         reconcile_pending_orders
+    snapshot          append_daily_snapshot
+    detect_alerts     detect_alerts
+    update_regime     update_regime (record plus backfill from the store)
+    ingest            ingest_decisions (an Arbiter-shaped transcript)
+    save_tracker      save_tracker
+    prompt            build_roundtable_prompt
+    parse_decisions   parse_decision_blocks (same transcript)
+
+Sizes are TICKERSxROWS: watchlist tickers x Action_Log rows. Trackers
+and market-data fixtures are generated once into --fixtures and reused;
+--record yahoo records the live watchlist from Yahoo instead of the
+fake feed (its 25 tickers then replay for every synthetic ticker).
+
+Every run appends one JSON line (commit, settings, best and median
+seconds per function and size) to --results, and is compared with the
+last recorded run of the same settings; --check exits 1 when a function
+got slower than --threshold percent (and --min-delta ms).
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes 25x100 2000x100000 --repeat 5 --check
+    python benchmarks/bench_pipeline.py --backend sqlite --no-save
+===============================================================================
+"""
+
+import argparse
+import contextlib
+from datetime import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_DIR, "benchmarks")
+sys.path.insert(0, REPO_DIR)
+
+import mr_market_roundtable as mr
+from mr_market_fetch import FakeProvider
+from mr_market_history import HistoryStore
+
+from recorded import ReplayProvider, load_manifest, record_fixtures
+from synthetic import make_decision_transcript, make_tracker, make_watchlist_entries, synthetic_tickers
+
+DEFAULT_SIZES = ['25x100', '250x10000', '2000x100000']
+FIXTURE_END_DATE = "2026-01-27"
+BENCHMARK_ROWS = 2520                # Benchmark sheet: one row per trading day, 10 years max
+
+STAGES = ['fetch_cold', 'fetch', 'load_tracker', 'update_prices', 'reconcile', 'snapshot',
+          'detect_alerts', 'update_regime', 'ingest', 'save_tracker', 'prompt', 'parse_decisions']
+
+
+def parse_size(size):
+    """'2000x100000' -> (2000, 100000)"""
+    tickers, rows = size.lower().split('x')
+    return int(tickers), int(rows)
+
+
+def git_revision():
+    """(short commit, dirty) of the working tree, (None, False) outside git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                cwd=REPO_DIR, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(status.strip())
+
+
+def market_fixtures(path, source, n_tickers):
+    """Recorded responses under path/source, (re)recorded when too small"""
+    fixture_dir = os.path.join(path, source)
+    manifest = load_manifest(fixture_dir)
+    if source == 'yahoo':
+        if manifest is None:
+            from mr_market_fetch import YahooProvider
+            mr.load_watchlist()
+            print(f"    Recording {len(mr.TICKERS)} watchlist tickers from Yahoo...")
+            record_fixtures(YahooProvider(), list(mr.TICKERS), fixture_dir, source='yahoo')
+    elif manifest is None or len(manifest['tickers']) < n_tickers:
+        print(f"    Recording {n_tickers} fake tickers...")
+        record_fixtures(FakeProvider(end_date=FIXTURE_END_DATE), synthetic_tickers(n_tickers),
+                        fixture_dir, source='fake')
+    return ReplayProvider(fixture_dir)
+
+
+def tracker_fixture(path, n_tickers, n_rows, end_date):
+    """Cached synthetic workbook for one size (generated on first use)"""
+    name = f"tracker_{n_tickers}x{n_rows}_{end_date}.xlsx"
+    tracker = os.path.join(path, name)
+    if not os.path.exists(tracker):
+        print(f"    Generating {name}...")
+        make_tracker(tracker + ".tmp.xlsx", n_tickers=n_tickers, n_log_rows=n_rows,
+                     n_benchmark_rows=min(n_rows, BENCHMARK_ROWS),
+                     n_pending=max(20, n_tickers // 10), end=end_date)
+        os.replace(tracker + ".tmp.xlsx", tracker)
+    return tracker
+
+
+def pipeline(provider, tracker, decision_file, decision_text, scratch, backend):
+    """One pass through every stage in daily-run order; {stage: seconds}"""
+    times = {}
+
+    @contextlib.contextmanager
+    def timed(name):
+        begin = time.perf_counter()
+        yield
+        times[name] = time.perf_counter() - begin
+
+    # Scratch copies: the run writes the tracker, regime record and stores
+    # (price history and the fundamentals cache share HISTORY_DB_FILE)
+    mr.TRACKER_FILE = os.path.join(scratch, "mr_market_tracker.xlsx")
+    mr.TRACKER_DB_FILE = os.path.join(scratch, "mr_market_tracker.db")
+    mr.REGIME_FILE = os.path.join(scratch, "regime_history.json")
+    mr.HISTORY_DB_FILE = os.path.join(scratch, "price_history.db")
+    for name in os.listdir(scratch):
+        os.remove(os.path.join(scratch, name))
+    shutil.copyfile(tracker, mr.TRACKER_FILE)
+    if backend == 'sqlite':
+        mr.import_workbook(mr.TRACKER_FILE, mr.TRACKER_DB_FILE)
+
+    dates = provider.dates()
+    trade_date = dates[-1]
+    store = HistoryStore(mr.HISTORY_DB_FILE)
+    try:
+        provider.end_date = dates[-2]
+        with timed('fetch_cold'):
+            mr.fetch_all_market_data(provider, store)
+        provider.end_date = trade_date
+        with timed('fetch'):
+            market_data = mr.fetch_all_market_data(provider, store)
+
+        with timed('load_tracker'):
+            ledger = mr.load_tracker()
+        with timed('update_prices'):
+            mr.update_positions_prices(ledger, market_data)
+        with timed('reconcile'):
+            mr.reconcile_pending_orders(ledger, market_data)
+        with timed('snapshot'):
+            portfolio_stats = mr.append_daily_snapshot(ledger, market_data)
+        with timed('detect_alerts'):
+            alerts = mr.detect_alerts(market_data)
+        with timed('update_regime'):
+            regime = mr.update_regime(market_data, alerts, store=store)
+        with timed('ingest'):
+            mr.ingest_decisions(ledger, decision_file)
+        with timed('save_tracker'):
+            mr.save_tracker(ledger)
+    finally:
+        store.close()
+
+    positions = mr.get_current_positions(ledger)
+    pending_orders = mr.get_pending_orders(ledger)
+    with timed('prompt'):
+        mr.build_roundtable_prompt(alerts, market_data, portfolio_stats, positions,
+                                   pending_orders, regime)
+    with timed('parse_decisions'):
+        mr.parse_decision_blocks(decision_text)
+    return times, len(alerts)
+
+
+def run_size(size, args, provider):
+    """{stage: {'best', 'median'}} for one size, plus the alert count"""
+    n_tickers, n_rows = parse_size(size)
+    trade_date = provider.manifest['end_date']
+    tracker = tracker_fixture(args.fixtures, n_tickers, n_rows, trade_date)
+    tickers = synthetic_tickers(n_tickers)
+
+    # The synthetic watchlist replaces watchlist.json (views update in place)
+    closes = {t: float(provider.history(t, period="10d")['Close'].iloc[-1]) for t in tickers}
+    mr.WATCHLIST_CONFIG.compile(make_watchlist_entries(tickers, closes))
+
+    with tempfile.TemporaryDirectory() as scratch:
+        decision_file = os.path.join(scratch, "decisions.txt")
+        decision_text, _, _ = make_decision_transcript(tickers, args.decisions, trade_date)
+        with open(decision_file, 'w') as f:
+            f.write(decision_text)
+        run_dir = os.path.join(scratch, "run")
+        os.makedirs(run_dir)
+
+        samples = {stage: [] for stage in STAGES}
+        for _ in range(args.repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                times, alerts = pipeline(provider, tracker, decision_file, decision_text,
+                                         run_dir, args.backend)
+            for stage, seconds in times.items():
+                samples[stage].append(seconds)
+
+    return {stage: {'best': round(min(s), 6), 'median': round(statistics.median(s), 6)}
+            for stage, s in samples.items()}, alerts
+
+
+def previous_run(path, record):
+    """Most recent stored run with the same settings, or None"""
+    if not os.path.exists(path):
+        return None
+    keys = ('source', 'backend', 'decisions')
+    previous = None
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if all(entry.get(k) == record[k] for k in keys):
+                previous = entry
+    return previous
+
+
+def compare(record, previous, threshold, min_delta):
+    """Print best-time changes against a previous run; returns the regressions"""
+    label = previous['commit'] or "?"
+    print(f"\n    Compared with {label} ({previous['started']}), best times:")
+    print(f"    {'size':<13} {'stage':<16} {'before':>9} {'now':>9} {'change':>8}")
+    regressions = []
+    for size, stages in record['results'].items():
+        before_stages = previous['results'].get(size)
+        if not before_stages:
+            continue
+        for stage, entry in stages.items():
+            if stage not in before_stages:
+                continue
+            before, now = before_stages[stage]['best'], entry['best']
+            change = (now - before) / before * 100 if before else 0.0
+            flag = ""
+            if change > threshold and (now - before) * 1000 > min_delta:
+                flag = "  REGRESSION"
+                regressions.append(f"{size} {stage}: {before * 1000:.1f} -> {now * 1000:.1f} ms "
+                                   f"({change:+.0f}%)")
+            print(f"    {size:<13} {stage:<16} {before * 1000:>7.1f}ms {now * 1000:>7.1f}ms "
+                  f"{change:>+7.0f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every daily pipeline stage')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help='TICKERSxACTION_LOG_ROWS (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--decisions', type=int, default=50,
+                        help='DECISION blocks in the ingested transcript')
+    parser.add_argument('--backend', choices=['xlsx', 'sqlite'], default='xlsx')
+    parser.add_argument('--record', choices=['fake', 'yahoo'], default='fake',
+                        help='Market-data fixture source (yahoo records once, needs network)')
+    parser.add_argument('--fixtures', default=os.path.join(BENCH_DIR, "fixtures"))
+    parser.add_argument('--results', default=os.path.join(BENCH_DIR, "results", "pipeline.jsonl"))
+    parser.add_argument('--no-save', action='store_true', help='Do not append this run to --results')
+    parser.add_argument('--threshold', type=float, default=20.0,
+                        help='Percent slowdown that counts as a regression')
+    parser.add_argument('--min-delta', type=float, default=5.0,
+                        help='Ignore slowdowns smaller than this many ms')
+    parser.add_argument('--check', action='store_true')
+    args = parser.parse_args()
+
+    sizes = sorted(args.sizes, key=parse_size)
+    os.makedirs(args.fixtures, exist_ok=True)
+    provider = market_fixtures(args.fixtures, args.record, max(parse_size(s)[0] for s in sizes))
+    for size in sizes:
+        tracker_fixture(args.fixtures, *parse_size(size), provider.manifest['end_date'])
+    commit, dirty = git_revision()
+
+    record = {
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'dirty': dirty,
+        'python': platform.python_version(),
+        'machine': f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        'source': args.record,
+        'backend': args.backend,
+        'decisions': args.decisions,
+        'repeat': args.repeat,
+        'results': {},
+    }
+
+    print(f"Pipeline benchmark ({args.record} market data, {args.backend} tracker, "
+          f"best of {args.repeat}, ms)")
+    print(f"    {'stage':<16}" + "".join(f"{s:>13}" for s in sizes))
+    alerts = {}
+    for size in sizes:
+        record['results'][size], alerts[size] = run_size(size, args, provider)
+    for stage in STAGES:
+        print(f"    {stage:<16}" + "".join(f"{record['results'][s][stage]['best'] * 1000:>13.1f}"
+                                           for s in sizes))
+    print(f"    {'(alerts)':<16}" + "".join(f"{alerts[s]:>13}" for s in sizes))
+    print(f"    {'total':<16}" + "".join(
+        f"{sum(e['best'] for e in record['results'][s].values()) * 1000:>13.1f}" for s in sizes))
+
+    regressions = []
+    previous = previous_run(args.results, record)
+    if previous:
+        regressions = compare(record, previous, args.threshold, args.min_delta)
+    if not args.no_save:
+        os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + "\n")
+        print(f"\n    Results appended to {os.path.relpath(args.results, REPO_DIR)}")
+
+    if regressions:
+        print("\n    " + "\n    ".join(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
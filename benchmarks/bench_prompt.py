@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Roundtable prompt rendering - cold, cached, and all variants
+===============================================================================
+Renders the prompt for a wide synthetic watchlist (one candidate per
+ticker) with an empty candidate cache, again with a warm cache, and then
+the combined prompt plus the three analyst variants in one pass, and
+finally compacted to the default token budget.
+
+Usage:
+    python benchmarks/bench_prompt.py
+    python benchmarks/bench_prompt.py --candidates 2000
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_prompt import (DEFAULT_TOKEN_BUDGET, estimate_tokens, render_candidate,
+                              render_prompt, render_variants)
+
+from synthetic import make_alerts, make_market_data, synthetic_tickers
+
+
+def best_of(fn, repeat):
+    """Fastest of `repeat` runs, in ms"""
+    times = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - begin)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark prompt rendering')
+    parser.add_argument('--candidates', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.candidates)
+    market_data = make_market_data(tickers)
+    alerts = make_alerts(market_data)
+    positions = {t: {'shares': 5, 'avg_cost': market_data[t]['close']} for t in tickers[::7]}
+    orders = {t: {'shares': 3, 'limit': market_data[t]['close'] * 0.9} for t in tickers[::5]}
+    regime = {'label': "SUSPENDED", 'suspended': True, 'trigger_count': 6, 'trigger_days': 3,
+              'threshold': 5, 'window': 10, 'breadth': 35.0, 'decliners': 70.0,
+              'dispersion': 2.4, 'voo_drawdown': 8.5}
+    args_ = (alerts, market_data, (40000.0, 0.01, -0.02, -0.03), positions, orders, regime)
+
+    print(f"Prompt benchmark: {len(alerts)} candidates")
+
+    def cold():
+        render_candidate.cache_clear()
+        return render_prompt(*args_)
+
+    print(f"    cold cache     {best_of(cold, args.repeat):8.2f} ms")
+    print(f"    warm cache     {best_of(lambda: render_prompt(*args_), args.repeat):8.2f} ms")
+    print(f"    4 variants     {best_of(lambda: render_variants(*args_), args.repeat):8.2f} ms")
+    compact = lambda: render_prompt(*args_, budget=DEFAULT_TOKEN_BUDGET)
+    print(f"    compact        {best_of(compact, args.repeat):8.2f} ms  "
+          f"({estimate_tokens(compact()):,} of {DEFAULT_TOKEN_BUDGET:,} tokens)")
+
+    # The combined variant is the single-prompt output
+    variants = render_variants(*args_)
+    assert variants[None] == render_prompt(*args_), "combined variant differs"
+    print(f"    Prompt size    {len(variants[None]) / 1024:8.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
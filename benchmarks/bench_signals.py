@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Alert-signal engine - cost per rule across a wide watchlist
+===============================================================================
+Times evaluate_signals() on synthetic market_data with the four original
+rules and with every registered rule, then the full per-ticker labelling
+detect_alerts does for tickers that fired. Inputs are built once per run,
+so an extra rule adds one vectorized comparison, not a loop over tickers.
+
+Usage:
+    python benchmarks/bench_signals.py
+    python benchmarks/bench_signals.py --tickers 25 500 5000
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_signals import SIGNALS, evaluate_signals, signal_labels
+
+from synthetic import make_market_data, synthetic_tickers
+
+ORIGINAL_RULES = ['single_day_drop', 'near_target', 'near_52_week_low', 'below_50_day_ma']
+PARAMS = {
+    'drop_threshold': 5.0, 'target_threshold': 10.0, 'near_low_threshold': 15.0,
+    'below_ma_threshold': 3.0, 'rsi_threshold': 30.0, 'volume_spike_ratio': 2.0,
+    'gap_threshold': 3.0, 'drawdown_threshold': 30.0,
+}
+
+
+def best_of(fn, repeat):
+    """Fastest of `repeat` runs, in ms"""
+    times = []
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - begin)
+    return min(times) * 1000
+
+
+def evaluate_and_label(market_data, targets, names):
+    """evaluate_signals plus the labels detect_alerts builds per fired ticker"""
+    result = evaluate_signals(market_data, targets, PARAMS, names)
+    for i in result['any'].nonzero()[0]:
+        ticker = result['tickers'][i]
+        signal_labels(result, i, market_data[ticker], targets[ticker]['target'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the alert-signal engine')
+    parser.add_argument('--tickers', type=int, nargs='+', default=[25, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"Signal engine benchmark (ms, best of {args.repeat})")
+    print(f"    {'tickers':>7} {'4 rules':>9} {f'{len(SIGNALS)} rules':>9} "
+          f"{'+labels':>9}  fired")
+    for n in args.tickers:
+        tickers = synthetic_tickers(n)
+        market_data = make_market_data(tickers)
+        # Every fourth ticker within Track 3 range of its target
+        targets = {t: {'target': round(market_data[t]['close'] * (0.95 if k % 4 == 0 else 0.7))}
+                   for k, t in enumerate(tickers)}
+
+        four = best_of(lambda: evaluate_signals(market_data, targets, PARAMS, ORIGINAL_RULES),
+                       args.repeat)
+        every = best_of(lambda: evaluate_signals(market_data, targets, PARAMS), args.repeat)
+        labelled = best_of(lambda: evaluate_and_label(market_data, targets, None), args.repeat)
+        fired = int(evaluate_signals(market_data, targets, PARAMS)['any'].sum())
+        print(f"    {n:>7} {four:>9.2f} {every:>9.2f} {labelled:>9.2f}  {fired}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Startup - import cost and light subcommands
+===============================================================================
+Runs the main script in fresh interpreters under `python -X importtime`
+and reports, per case, the best wall time, the import time, and which
+heavy libraries (numpy, pandas, yfinance, openpyxl, asyncio) got loaded:
+
+    import      - `import mr_market_roundtable` (must load none of them)
+    help        - --help
+    ingest-only - --ingest-only on a one-decision file (the workbook
+                  load/save needs openpyxl; nothing else heavy)
+    build-site  - --build-site (report-only: tracker in, pages out)
+
+Each subcommand runs against a scratch copy of the script, tracker and
+site files, so the real tracker is never touched. --check exits 1 when
+an import pulls in a heavy library or a light subcommand takes longer
+than --budget seconds.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 5 --top 15 --check
+===============================================================================
+"""
+
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = "mr_market_roundtable.py"
+
+HEAVY = ('numpy', 'pandas', 'yfinance', 'openpyxl', 'asyncio')
+
+# Files a scratch copy needs (site pages are rebuilt into the copy)
+RUNTIME_FILES = ("mr_market_*.py", "watchlist.json", "regime_history.json",
+                 "mr_market_tracker.xlsx")
+RUNTIME_DIRS = ("site_templates", "uploads_to_cloudflare")
+
+DECISION = """DECISION:
+Date: 2026-02-03
+Action: BUY
+Ticker: MSFT
+Limit: 400.00
+Shares: 2
+Track: 3
+Signal: Target Hit
+Thesis: Intact
+Notes: startup benchmark
+"""
+
+
+def scratch_copy(path):
+    """Runtime files of the repo copied under path"""
+    for pattern in RUNTIME_FILES:
+        for name in glob.glob(os.path.join(REPO_DIR, pattern)):
+            shutil.copy2(name, path)
+    for name in RUNTIME_DIRS:
+        if os.path.isdir(os.path.join(REPO_DIR, name)):
+            shutil.copytree(os.path.join(REPO_DIR, name), os.path.join(path, name))
+    decision_path = os.path.join(path, "decision.txt")
+    with open(decision_path, 'w') as f:
+        f.write(DECISION)
+    return decision_path
+
+
+def parse_importtime(stderr):
+    """{module: cumulative microseconds} and the top-level total"""
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return modules, total
+
+
+def run_case(args, cwd, repeat):
+    """(best wall seconds, import seconds, heavy modules loaded, top imports)"""
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + args, cwd=cwd,
+                              capture_output=True, text=True)
+        elapsed = time.perf_counter() - begin
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+        best = elapsed if best is None else min(best, elapsed)
+    modules, total = parse_importtime(proc.stderr)
+    heavy = [m for m in HEAVY if m in modules]
+    top = sorted(modules.items(), key=lambda kv: -kv[1])
+    return best, total / 1e6, heavy, top
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark script startup')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--top', type=int, default=10,
+                        help='Slowest imports to list for the bare import')
+    parser.add_argument('--budget', type=float, default=1.0,
+                        help='Seconds a light subcommand may take with --check')
+    parser.add_argument('--check', action='store_true')
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        decision_path = scratch_copy(tmp)
+        cases = [
+            ('import', ["-c", "import mr_market_roundtable"]),
+            ('help', [SCRIPT, "--help"]),
+            ('ingest-only', [SCRIPT, "--ingest-only", "--decision", decision_path]),
+            ('build-site', [SCRIPT, "--build-site"]),
+        ]
+
+        print(f"Startup benchmark (best of {args.repeat}, seconds)")
+        print(f"    {'case':<12} {'wall':>7} {'imports':>8}  heavy modules loaded")
+        for label, case in cases:
+            wall, imports, heavy, top = run_case(case, tmp, args.repeat)
+            print(f"    {label:<12} {wall:>7.3f} {imports:>8.3f}  {', '.join(heavy) or '-'}")
+            if label == 'import':
+                slowest = top
+                if heavy:
+                    failures.append(f"import loads {', '.join(heavy)}")
+            elif wall > args.budget:
+                failures.append(f"{label} took {wall:.2f}s (budget {args.budget:g}s)")
+
+    print("\n    Slowest imports for `import mr_market_roundtable` (cumulative ms):")
+    for name, micros in slowest[:args.top]:
+        print(f"    {micros / 1000:>8.1f}  {name.strip()}")
+
+    if failures:
+        print("\n    " + "\n    ".join(failures))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
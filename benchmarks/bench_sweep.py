@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Parameter sweep - serial replays vs the shared-memory process pool
+===============================================================================
+Backfills a temporary price-history store from FakeProvider (no network),
+then runs the default grid once serially and once on the pool and checks
+that both give the same stats for every parameter set.
+
+Usage:
+    python benchmarks/bench_sweep.py
+    python benchmarks/bench_sweep.py --years 10 --workers 8
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_backtest import default_params, load_replay_panel, replay_indicators, run_replay
+from mr_market_fetch import FakeProvider
+from mr_market_history import HistoryStore
+from mr_market_sweep import DEFAULT_GRID, expand_grid, run_sweep
+
+from synthetic import synthetic_tickers
+
+END_DATE = "2026-01-30"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the parameter sweep')
+    parser.add_argument('--tickers', type=int, default=25)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    start = f"{int(END_DATE[:4]) - args.years}-01-02"
+    targets = {t: {'target': 100.0, 'add_target': 90.0} for t in tickers}
+    params = default_params(5.0, 10.0, 15.0, 3.0, 5, 10)
+    combos = expand_grid(DEFAULT_GRID, params)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.db"))
+        store.backfill(tickers, FakeProvider(end_date=END_DATE), start="2015-01-01",
+                       verbose=False)
+        panel = load_replay_panel(store, tickers, start)
+        store.close()
+
+    begin = time.perf_counter()
+    ind = replay_indicators(panel, targets)
+    indicators = time.perf_counter() - begin
+    print(f"Sweep benchmark: {len(tickers)} tickers, {len(panel['dates']) - panel['first']} "
+          f"days, {len(combos)} parameter sets")
+    print(f"    indicators   {indicators:8.3f}s  (once per sweep)")
+
+    begin = time.perf_counter()
+    serial = [{**run_replay(panel, ind, p)['stats'], **p} for p in combos]
+    elapsed = time.perf_counter() - begin
+    print(f"    serial       {elapsed:8.3f}s  ({elapsed / len(combos) * 1000:.1f} ms per set)")
+
+    begin = time.perf_counter()
+    pooled = run_sweep(panel, ind, params, max_workers=args.workers, verbose=False)
+    print(f"    pool         {time.perf_counter() - begin:8.3f}s  ({os.cpu_count()} cores)")
+
+    # Same parameter set must give the same stats either way
+    key = lambda r: tuple(r[k] for k in params)
+    assert sorted(serial, key=key) == sorted(pooled, key=key), "pool results differ"
+    print("    Outputs identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK: Quarterly-statements warehouse refresh and data packs
+===============================================================================
+Runs the warehouse against FakeProvider (no network) in a scratch directory:
+    1. cold      - every ticker's statements requested (simulated latency)
+    2. warm      - nothing due, statements read back from statements.npz
+    3. packs     - compute_metrics + data_packs over the stored quarters,
+                   at each --sizes ticker count (tickers beyond the fetched
+                   ones reuse their quarters)
+
+Usage:
+    python benchmarks/bench_warehouse.py
+    python benchmarks/bench_warehouse.py --tickers 100 --latency 0.2 --sizes 25,500,2000
+===============================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mr_market_fetch import FakeProvider
+from mr_market_warehouse import Warehouse, data_packs
+
+
+def scaled_table(table, size):
+    """The stored quarters repeated under size synthetic tickers"""
+    import pandas as pd
+
+    sources = table.index.get_level_values('ticker').unique()
+    frames = []
+    for i in range(size):
+        frame = table.xs(sources[i % len(sources)], level='ticker', drop_level=False).copy()
+        frame.index = pd.MultiIndex.from_arrays(
+            [[f"T{i:04d}"] * len(frame), frame.index.get_level_values('period_end')],
+            names=table.index.names)
+        frames.append(frame)
+    return pd.concat(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the statements warehouse')
+    parser.add_argument('--tickers', type=int, default=25, help='Tickers fetched from the fake')
+    parser.add_argument('--latency', type=float, default=0.1, help='Seconds per fake request')
+    parser.add_argument('--sizes', default='25,2000', help='Ticker counts for the packs step')
+    args = parser.parse_args()
+
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    print(f"Warehouse benchmark: {args.tickers} tickers, "
+          f"{args.latency:.3f}s latency per request")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        provider = FakeProvider(latency=args.latency)
+        start = time.perf_counter()
+        errors = Warehouse(scratch).refresh(tickers, provider, verbose=False)
+        print(f"    cold       {time.perf_counter() - start:8.3f}s  "
+              f"requests {provider.calls['statements']:>4}  failed {len(errors)}")
+
+        provider = FakeProvider(latency=args.latency)
+        start = time.perf_counter()
+        warehouse = Warehouse(scratch)
+        warehouse.refresh(tickers, provider, verbose=False)
+        print(f"    warm       {time.perf_counter() - start:8.3f}s  "
+              f"requests {provider.calls['statements']:>4}  quarters {len(warehouse.table)}")
+
+        closes = provider.download_history(tickers[:1], period="5d")[tickers[0]]['Close']
+        for size in [int(s) for s in args.sizes.split(',')]:
+            table = scaled_table(warehouse.table, size)
+            prices = {f"T{i:04d}": float(closes.iloc[-1]) for i in range(size)}
+            start = time.perf_counter()
+            packs = data_packs(table, prices)
+            print(f"    packs {size:>5} {time.perf_counter() - start:8.3f}s  "
+                  f"packs {len(packs):>4}")
+
+
+if __name__ == "__main__":
+    main()
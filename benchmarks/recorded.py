@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK FIXTURES: Recorded market-data responses and their replay
+===============================================================================
+Records what a provider (YahooProvider or FakeProvider) returns for
+download_history() and info() into a fixture directory, and replays it
+through the same provider interface, so pipeline benchmarks time the
+script's own code against fixed, offline inputs:
+
+    <dir>/manifest.json   - source, recording time, last bar date, tickers
+    <dir>/history.csv.gz  - daily bars, one row per (ticker, date)
+    <dir>/info.json       - {ticker: info dict} as returned by the provider
+
+ReplayProvider serves bars up to its end_date (default: the last recorded
+bar), so moving end_date forward by one day replays a daily incremental
+run. A ticker that was not recorded replays a recorded ticker's series
+(picked by a stable hash), which lets a 25-ticker Yahoo recording feed a
+2,000-ticker synthetic watchlist.
+
+Usage:
+    provider = FakeProvider(end_date="2026-01-27")
+    record_fixtures(provider, tickers, "benchmarks/fixtures/fake")
+    replay = ReplayProvider("benchmarks/fixtures/fake")
+===============================================================================
+"""
+
+from collections import Counter
+from datetime import datetime
+import json
+import os
+import zlib
+
+MANIFEST = "manifest.json"
+HISTORY = "history.csv.gz"
+INFO = "info.json"
+
+# A little more than HISTORY_PERIOD, so a cold fetch one day before the
+# last bar still finds a full window
+RECORD_PERIOD = "410d"
+
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def record_fixtures(provider, tickers, path, period=RECORD_PERIOD, source=None):
+    """Record histories and info dicts for tickers under path; returns the manifest"""
+    import pandas as pd
+
+    os.makedirs(path, exist_ok=True)
+    frames = provider.download_history(tickers, period=period)
+    for ticker in tickers:
+        if frames.get(ticker) is None or frames[ticker].empty:
+            try:
+                frames[ticker] = provider.history(ticker, period=period)
+            except Exception as e:
+                print(f"    {ticker}: no history recorded ({e})")
+    frames = {t: f for t, f in frames.items() if f is not None and not f.empty}
+
+    infos = {}
+    for ticker in frames:
+        try:
+            infos[ticker] = provider.info(ticker)
+        except Exception as e:
+            print(f"    {ticker}: no info recorded ({e})")
+
+    rows = []
+    for ticker, frame in frames.items():
+        frame = frame[BAR_COLUMNS].copy()
+        frame.index = pd.DatetimeIndex(frame.index).tz_localize(None).strftime("%Y-%m-%d")
+        frame.index.name = 'Date'
+        rows.append(frame.assign(Ticker=ticker).reset_index())
+    table = pd.concat(rows, ignore_index=True)[['Ticker', 'Date'] + BAR_COLUMNS]
+    table.to_csv(os.path.join(path, HISTORY), index=False)
+
+    with open(os.path.join(path, INFO), 'w') as f:
+        json.dump(infos, f, default=str, sort_keys=True)
+
+    manifest = {
+        'source': source or type(provider).__name__,
+        'recorded': datetime.now().isoformat(timespec='seconds'),
+        'end_date': table['Date'].max(),
+        'period': period,
+        'tickers': sorted(frames),
+    }
+    with open(os.path.join(path, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+def load_manifest(path):
+    """The fixture manifest, or None when nothing is recorded under path"""
+    manifest_path = os.path.join(path, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+class ReplayProvider:
+    """
+    Provider that serves recorded bars and info dicts
+
+    All fixtures are parsed up front, so a timed fetch measures the
+    engine and the history store, not CSV parsing. Requests are counted
+    in `calls` like FakeProvider.
+    """
+
+    def __init__(self, path, end_date=None):
+        import pandas as pd
+
+        self.manifest = load_manifest(path)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No recorded fixtures under {path}")
+        table = pd.read_csv(os.path.join(path, HISTORY), float_precision='round_trip')
+        self.frames = {}
+        for ticker, rows in table.groupby('Ticker', sort=False):
+            frame = rows.set_index(pd.DatetimeIndex(rows['Date'], name='Date'))[BAR_COLUMNS]
+            self.frames[ticker] = frame.astype(float)
+        with open(os.path.join(path, INFO), 'r') as f:
+            self.infos = json.load(f)
+        self.pool = sorted(self.frames)
+        self.end_date = end_date or self.manifest['end_date']
+        self.calls = Counter()
+
+    def source(self, ticker):
+        """The recorded ticker whose responses replay for ticker"""
+        if ticker in self.frames:
+            return ticker
+        return self.pool[zlib.crc32(ticker.encode()) % len(self.pool)]
+
+    def dates(self):
+        """Recorded trading dates up to the last bar, oldest first"""
+        frame = self.frames.get('VOO', self.frames[self.pool[0]])
+        return [d.strftime("%Y-%m-%d") for d in frame.index]
+
+    def _window(self, ticker, period, start):
+        """Slice the recording the way yfinance applies period/start, up to end_date"""
+        import pandas as pd
+
+        frame = self.frames[self.source(ticker)]
+        end = pd.Timestamp(self.end_date)
+        frame = frame[frame.index <= end]
+        if start:
+            return frame[frame.index >= pd.Timestamp(start)].copy()
+        days = int(str(period).rstrip('d'))
+        return frame[frame.index > end - pd.Timedelta(days=days)].copy()
+
+    def download_history(self, tickers, period=RECORD_PERIOD, start=None):
+        self.calls['download_history'] += 1
+        return {t: self._window(t, period, start) for t in tickers}
+
+    def history(self, ticker, period=RECORD_PERIOD, start=None):
+        self.calls['history'] += 1
+        return self._window(ticker, period, start)
+
+    def info(self, ticker):
+        self.calls['info'] += 1
+        return dict(self.infos.get(self.source(ticker), {}))
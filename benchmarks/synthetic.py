@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+BENCHMARK FIXTURES: Synthetic tracker workbooks and market data
+===============================================================================
+Builds mr_market_tracker.xlsx-shaped workbooks (same sheets, headers and
+Positions formulas) at arbitrary sizes, plus matching market_data dicts,
+so benchmarks never touch the real tracker or the network.
+===============================================================================
+"""
+
+from datetime import datetime, timedelta
+import random
+
+from openpyxl import Workbook
+
+# Same header rows as the real tracker
+HEADERS = {
+    'Static': ['Ticker', 'Company', 'Tier', 'Strategy', 'Target_Start', 'Target_Add', 'Exit_Criteria'],
+    'Positions': ['Ticker', 'Shares', 'Avg_Cost', 'Total_Invested', 'Current_Price', 'Market_Value',
+                  'Unrealized_PnL', 'Unrealized_Pct', 'Portfolio_Wt', 'First_Buy_Date', 'Days_Held'],
+    'Action_Log': ['Date', 'Ticker', 'Track', 'Action', 'Shares', 'Price', 'Signal', 'Thesis', 'Notes'],
+    'Pending_Orders': ['Date', 'Ticker', 'Limit', 'Shares', 'Track', 'Signal', 'Thesis', 'Notes', 'Status'],
+    'Target_History': ['Date', 'Ticker', 'Old_Target', 'New_Target', 'Reason'],
+    'Benchmark': ['Date', 'VOO_Price', 'Portfolio_Value', 'VOO_Return', 'Portfolio_Return', 'Alpha'],
+    'Lessons_Log': ['Date', 'Ticker', 'Category', 'Lesson', 'Outcome', 'Roundtable_Link'],
+}
+
+
+def synthetic_tickers(n):
+    """VOO first (the benchmark needs it), then T0001, T0002, ..."""
+    return ["VOO"] + [f"T{i:04d}" for i in range(1, n)]
+
+
+def trading_dates(n, end="2026-01-27"):
+    """n weekday dates ending at `end`, oldest first, as YYYY-MM-DD"""
+    day = datetime.strptime(end, "%Y-%m-%d")
+    dates = []
+    while len(dates) < n:
+        if day.weekday() < 5:
+            dates.append(day.strftime("%Y-%m-%d"))
+        day -= timedelta(days=1)
+    return dates[::-1]
+
+
+def make_tracker(path, n_tickers=25, n_log_rows=100, n_benchmark_rows=100,
+                 n_pending=20, seed=0, end="2026-01-27"):
+    """
+    Write a synthetic tracker workbook; returns the ticker list
+
+    Action_Log and Benchmark rows end on `end`; pending orders were
+    placed up to the trading day before it.
+    """
+    rng = random.Random(seed)
+    tickers = synthetic_tickers(n_tickers)
+    prices = {t: rng.uniform(30, 900) for t in tickers}
+
+    wb = Workbook()
+    wb.remove(wb.active)
+    sheets = {name: wb.create_sheet(name) for name in HEADERS}
+    for name, ws in sheets.items():
+        ws.append(HEADERS[name])
+
+    for t in tickers:
+        sheets['Static'].append([t, f"Company {t}", "1", "CORE",
+                                 round(prices[t] * 0.9, 2), round(prices[t] * 0.85, 2), "N/A"])
+
+    # Positions: data columns plus the same formula columns as the real sheet
+    ws = sheets['Positions']
+    total_row = len(tickers) + 2
+    for i, t in enumerate(tickers, start=2):
+        shares = rng.choice([0, 0, 0, 5, 10])
+        ws.append([t, shares, round(prices[t], 2) if shares else 0, f"=B{i}*C{i}", prices[t],
+                   f"=B{i}*E{i}", f"=F{i}-D{i}", f"=IF(D{i}=0,0,G{i}/D{i})",
+                   f"=IF($F${total_row}=0,0,F{i}/$F${total_row})", None,
+                   f'=IF(J{i}="",0,TODAY()-J{i})'])
+    ws.append(["TOTAL", None, None, f"=SUM(D2:D{total_row - 1})", None,
+               f"=SUM(F2:F{total_row - 1})", f"=SUM(G2:G{total_row - 1})", None, None, None, None])
+    ws.append(["CASH", None, None, None, None, 1_000_000_000, None, None, None, None, None])
+    ws.append(["PORTFOLIO", None, None, None, None,
+               f"=F{total_row}+F{total_row + 1}", None, None, None, None, None])
+
+    for date in trading_dates(n_log_rows, end):
+        t = rng.choice(tickers)
+        sheets['Action_Log'].append([date, t, rng.choice(['1', '2', '3']), "BUY",
+                                     rng.randint(1, 20), round(prices[t], 2),
+                                     "Target Hit", "Intact", "synthetic"])
+
+    for date in trading_dates(n_pending, trading_dates(2, end)[0]):
+        t = rng.choice(tickers)
+        sheets['Pending_Orders'].append([date, t, round(prices[t] * rng.uniform(0.9, 1.0), 2),
+                                         rng.randint(1, 20), rng.choice(['2', '3']),
+                                         "Target Hit", "Intact", "synthetic", "PENDING"])
+
+    for i, date in enumerate(trading_dates(n_benchmark_rows, end)):
+        sheets['Benchmark'].append([date, 600 + i * 0.1, 40000 + i * 10, 0.0, 0.0, 0.0])
+
+    wb.save(path)
+    return tickers
+
+
+def make_watchlist_entries(tickers, closes, seed=0):
+    """watchlist.json entries for tickers, targets near each ticker's close"""
+    rng = random.Random(seed)
+    entries = []
+    for t in tickers:
+        target = round(closes[t] * rng.uniform(0.85, 1.1), 2)
+        entries.append({
+            'ticker': t, 'name': f"Company {t}", 'strategy': rng.choice(['CORE', 'HUNT', 'DCA']),
+            'tier': rng.choice(['1', '2', '3']), 'target': target,
+            'add_target': round(target * 0.9, 2), 'exit_criteria': "synthetic exit criteria",
+        })
+    return entries
+
+
+def make_market_data(tickers, trade_date="2026-01-27", seed=0):
+    """market_data dict in the fetch_all_market_data shape"""
+    rng = random.Random(seed)
+    extra = random.Random(seed + 1)      # Volume/RSI fields; keeps the rest as before
+    market_data = {'_trade_date': trade_date}
+    for t in tickers:
+        close = rng.uniform(30, 900)
+        prev = close / (1 + rng.gauss(0, 0.025))
+        market_data[t] = {
+            'close': close,
+            'low': close * rng.uniform(0.97, 1.0),
+            'prev_close': prev,
+            'change_pct': (close - prev) / prev * 100,
+            'ma_50': close * rng.uniform(0.9, 1.1),
+            'week_52_low': close * rng.uniform(0.6, 1.0),
+            'week_52_high': close * rng.uniform(1.0, 1.5),
+            'trailing_pe': rng.uniform(10, 60),
+            'forward_pe': rng.uniform(8, 45),
+        }
+        volume_avg = extra.uniform(2e5, 5e6)
+        market_data[t].update({
+            'open': prev * (1 + extra.gauss(0, 0.015)),
+            'volume': volume_avg * extra.lognormvariate(0, 0.5),
+            'volume_avg': volume_avg,
+            'rsi_14': extra.uniform(15, 85),
+        })
+    return market_data
+
+
+def make_decision_text(tickers, n, date="2026-01-27", seed=0):
+    """n DECISION blocks in the Arbiter output format"""
+    rng = random.Random(seed)
+    blocks = []
+    for _ in range(n):
+        blocks.append(
+            "DECISION:\n"
+            f"Date: {date}\n"
+            f"Action: {rng.choice(['BUY', 'ADD', 'NONE'])}\n"
+            f"Ticker: {rng.choice(tickers)}\n"
+            f"Limit: {rng.uniform(30, 900):.2f}\n"
+            f"Shares: {rng.randint(1, 20)}\n"
+            f"Track: {rng.choice(['2', '3'])}\n"
+            "Signal: Target Hit\n"
+            "Thesis: Intact\n"
+            "Notes: synthetic decision\n"
+        )
+    return "\n".join(blocks)
+
+
+def make_alerts(market_data, seed=0):
+    """One detect_alerts-shaped alert per ticker in market_data"""
+    rng = random.Random(seed)
+    alerts = []
+    for t, data in market_data.items():
+        if t.startswith('_'):
+            continue
+        target = round(data['close'] * rng.uniform(0.8, 1.0))
+        is_track2 = data['change_pct'] <= -5
+        is_track3 = rng.random() < 0.5
+        alerts.append({
+            'ticker': t, 'company': f"Company {t}", 'strategy': "CORE", 'tier': "1",
+            'price': data['close'], 'prev_close': data['prev_close'],
+            'change_pct': data['change_pct'], 'ma_50': data['ma_50'],
+            'week_52_low': data['week_52_low'], 'week_52_high': data['week_52_high'],
+            'trailing_pe': data['trailing_pe'], 'forward_pe': data['forward_pe'],
+            'pe_avg': data.get('pe_avg'), 'pe_avg_years': data.get('pe_avg_years'),
+            'fundamentals': data.get('fundamentals'),
+            'target': target, 'add_target': round(target * 0.9),
+            'target_distance_pct': (data['close'] - target) / target * 100,
+            'exit_criteria': "synthetic exit criteria",
+            'signals': [f"SINGLE-DAY DROP: {data['change_pct']:.1f}%"] if is_track2 else
+                       [f"BELOW 50-DAY MA: {rng.uniform(3, 10):.1f}% below ${data['ma_50']:.2f}"],
+            'is_track2': is_track2,
+            'is_track3': is_track3,
+        })
+    return alerts
+
+
+# Prose an Arbiter wraps around its DECISION blocks; mentions "decision"
+# the way real transcripts do, but never as a block header
+DECISION_PROSE = [
+    "ARBITER FINAL DECISION:",
+    "After weighing both analyses, my decision rests on valuation discipline.",
+    "The Auditor's decision framework flags the forward P/E; the Narrator disagrees.",
+    "Decision: the thesis holds, but the entry is not there yet.",
+    "Note: DECISION blocks below follow the required format.",
+    "",
+    "---",
+]
+
+# Malformed blocks: (kind, block text) - each must be reported, not ingested
+MALFORMED_DECISIONS = [
+    ('missing ticker', "DECISION:\nDate: {date}\nAction: BUY\nLimit: 100.00\nShares: 5\nTrack: 3\n"),
+    ('bad limit', "DECISION:\nDate: {date}\nAction: BUY\nTicker: {ticker}\nLimit: around $400\nShares: 5\n"),
+    ('bad shares', "DECISION:\nDate: {date}\nAction: ADD\nTicker: {ticker}\nLimit: 50\nShares: ten\n"),
+    ('duplicate', "DECISION:\nAction: BUY\nTicker: {ticker}\nTicker: {ticker}\nLimit: 10\nShares: 1\n"),
+    ('empty header', "DECISION:\n\nThe Arbiter declined to decide today.\n"),
+]
+
+
+def make_decision_transcript(tickers, n, date="2026-01-27", seed=0, crlf=False):
+    """
+    n blocks in Arbiter-transcript shape: make_decision_text blocks,
+    Markdown-decorated and numbered variants, malformed blocks, and prose
+    in between. Returns (text, valid_count, invalid_count). The last
+    block has no trailing newline.
+    """
+    rng = random.Random(seed)
+    parts = []
+    valid = invalid = 0
+    for i in range(n):
+        parts.append("\n".join(rng.sample(DECISION_PROSE, 3)) + "\n\n")
+        roll = rng.random()
+        if roll < 0.15:
+            _, block = rng.choice(MALFORMED_DECISIONS)
+            parts.append(block.format(date=date, ticker=rng.choice(tickers)))
+            invalid += 1
+            continue
+        block = make_decision_text(tickers, 1, date, seed=seed * 100003 + i)
+        if roll < 0.3:
+            fields = block.splitlines()[1:]
+            block = f"**DECISION {i + 1}:**\n" + "".join(
+                f"- **{line.replace(':', ':**', 1)}\n" for line in fields)
+        parts.append(block)
+        valid += 1
+    text = "\n".join(parts).rstrip("\n")
+    if crlf:
+        text = text.replace("\n", "\r\n")
+    return text, valid, invalid
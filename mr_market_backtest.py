@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET REPLAY - Historical replay / backtest of the Track 2 and 3 rules
+===============================================================================
+Purpose: Run the detect_alerts conditions and reconcile_pending_orders fill
+logic over years of stored daily bars, so the Block 1.7/1.8 thresholds can be
+judged on history instead of waiting for live days.
+
+    1. Panel   - date-aligned (ticker x date) arrays from the history store
+    2. Signals - every alert condition and the regime count for every day
+                 in one vectorized pass (same alert_masks() as the live run)
+    3. Replay  - day loop over pending orders, fills and positions
+    4. Output  - equity curve vs VOO in the Benchmark sheet's shape
+
+The roundtable's judgment cannot be replayed, so the replay follows the
+mechanical defaults the prompt spells out:
+    - Track 2: DAY limit at the prior close, placed the session after the
+      drop, skipped while the regime warning is on; reassessed after
+      TRACK2_REASSESS_DAYS sessions (TRIM if +TRACK2_TRIM_PCT, else CONVERT
+      to a long-term hold)
+    - Track 3: GTC limit at the START target once within the threshold,
+      then a second GTC tranche at the ADD target after the first fills
+    - Fills: day low <= limit fills at the limit, cash permitting
+
+Usage:
+    python mr_market_roundtable.py --replay 2016-01-01 --replay-out replay.csv
+===============================================================================
+"""
+
+from datetime import datetime, timedelta
+import csv
+
+import numpy as np
+
+from mr_market_indicators import alert_masks, rolling_indicators, target_distances, target_levels
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Portfolio assumptions
+INITIAL_CASH = 40000.0               # Same starting value as the Benchmark sheet
+TRANCHE_DOLLARS = 2000.0             # Dollars per order (shares = floor(tranche / limit))
+
+# 1.2 - Track 2 reassessment (prompt: "~2 weeks ... TRIM if +4%, CONVERT or CUT")
+TRACK2_REASSESS_DAYS = 10
+TRACK2_TRIM_PCT = 4.0
+
+# 1.3 - Warm-up history loaded before the replay start (for MA / 52-week range)
+WARMUP_DAYS = 400
+
+# 1.4 - Benchmark sheet columns
+BENCHMARK_COLUMNS = ['Date', 'VOO_Price', 'Portfolio_Value', 'VOO_Return',
+                     'Portfolio_Return', 'Alpha']
+
+
+def default_params(drop_threshold, target_threshold, near_low_threshold,
+                   below_ma_threshold, regime_threshold, regime_window_days):
+    """1.5 - Rule parameters as one dict (pass the Block 1.7/1.8 constants)"""
+    return {
+        'drop_threshold': drop_threshold,
+        'target_threshold': target_threshold,
+        'near_low_threshold': near_low_threshold,
+        'below_ma_threshold': below_ma_threshold,
+        'regime_threshold': regime_threshold,
+        'regime_window_days': regime_window_days,
+    }
+
+
+# =============================================================================
+# BLOCK 2: PANEL
+# =============================================================================
+
+def load_replay_panel(store, tickers, start, end=None):
+    """
+    2.1 - Date-aligned (ticker x date) OHLC arrays from the history store
+
+    Loads WARMUP_DAYS of extra history before `start` so indicators are
+    warm on the first replay day. 'first' is the index of the first date
+    >= start. Tickers with no stored bars are dropped.
+    """
+    warm_start = (datetime.strptime(start, "%Y-%m-%d")
+                  - timedelta(days=WARMUP_DAYS)).strftime("%Y-%m-%d")
+    frames = store.load_many(tickers, start=warm_start)
+    if end:
+        frames = {t: f[f.index <= end] for t, f in frames.items()}
+        frames = {t: f for t, f in frames.items() if not f.empty}
+    return frames_to_panel(frames, [t for t in tickers if t in frames], start)
+
+
+def frames_to_panel(frames, tickers, start):
+    """2.2 - Align {ticker: history DataFrame} on the union of their dates"""
+    import pandas as pd
+
+    index = pd.DatetimeIndex(sorted(set().union(*(f.index for f in frames.values()))))
+    panel = {'tickers': list(tickers),
+             'dates': np.array([d.strftime("%Y-%m-%d") for d in index])}
+    for field in ['Open', 'High', 'Low', 'Close']:
+        panel[field] = np.vstack([
+            frames[t][field].reindex(index).to_numpy(dtype=float) for t in tickers
+        ]) if tickers else np.empty((0, len(index)))
+    panel['first'] = int(np.searchsorted(panel['dates'], start))
+    return panel
+
+
+# =============================================================================
+# BLOCK 3: SIGNALS
+# =============================================================================
+
+def replay_indicators(panel, targets):
+    """
+    3.1 - Parameter-independent inputs for every (ticker, date)
+
+    Computed once per panel; a parameter sweep reuses them for every
+    parameter set.
+    """
+    ind = rolling_indicators(panel['Close'], panel['Low'], panel['High'])
+    start_levels, add_levels = target_levels(targets, panel['tickers'])
+    ind['target'] = start_levels
+    ind['add_target'] = add_levels
+    ind['target_distance_pct'] = target_distances(panel['Close'], start_levels)
+    ind['date_ordinals'] = np.array([
+        datetime.strptime(d, "%Y-%m-%d").toordinal() for d in panel['dates']
+    ])
+    return ind
+
+
+def replay_signals(ind, params):
+    """
+    3.2 - Alert masks plus the Track 2 regime state for every day
+
+    The regime count mirrors the live record (mr_market_regime): Track 2
+    triggers (one per ticker per day) within the last regime_window_days
+    calendar days, including today, compared against regime_threshold.
+    """
+    masks = alert_masks(
+        ind,
+        params['drop_threshold'],
+        params['target_threshold'],
+        params['near_low_threshold'],
+        params['below_ma_threshold'],
+    )
+
+    # 3.2.1 - Rolling calendar-day trigger count via cumulative sums
+    triggers = masks['track2'].sum(axis=0)
+    cum = np.cumsum(triggers)
+    ordinals = ind['date_ordinals']
+    left = np.searchsorted(ordinals, ordinals - params['regime_window_days'], side='right')
+    before = np.where(left > 0, cum[np.maximum(left - 1, 0)], 0)
+    masks['regime_count'] = cum - before
+    masks['regime_suspended'] = masks['regime_count'] >= params['regime_threshold']
+    return masks
+
+
+# =============================================================================
+# BLOCK 4: REPLAY
+# =============================================================================
+
+def run_replay(panel, ind, params, initial_cash=INITIAL_CASH, tranche=TRANCHE_DOLLARS):
+    """
+    4.1 - Replay the rules day by day from panel['first']
+
+    Signals are precomputed (Block 3); the loop only walks pending orders
+    and open lots. Returns a dict with 'benchmark' (rows in the Benchmark
+    sheet's shape), 'fills', and summary 'stats'.
+    """
+    masks = replay_signals(ind, params)
+    tickers = panel['tickers']
+    close, low = panel['Close'], panel['Low']
+    dates = panel['dates'].tolist()
+    voo = tickers.index('VOO') if 'VOO' in tickers else None
+
+    cash = initial_cash
+    shares = np.zeros(len(tickers))
+    pending = []          # dicts: ticker index, limit, shares, track
+    lots = []             # open Track 2 lots awaiting reassessment
+    t3_stage = np.zeros(len(tickers), dtype=int)   # 0 none, 1 START GTC, 2 ADD GTC, 3 done
+    fills = []
+    benchmark = []
+    peak = 0.0
+    max_drawdown = 0.0
+    baseline_voo = None
+
+    for day in range(panel['first'], len(dates)):
+        # 4.1.1 - Reconcile pending orders against today's low
+        still_pending = []
+        for order in pending:
+            i = order['i']
+            day_low = low[i, day]
+            cost = order['shares'] * order['limit']
+            if day_low == day_low and day_low <= order['limit'] and cost <= cash:
+                cash -= cost
+                shares[i] += order['shares']
+                fills.append({'date': dates[day], 'ticker': tickers[i], 'track': order['track'],
+                              'shares': order['shares'], 'price': float(order['limit'])})
+                if order['track'] == '2':
+                    lots.append({'i': i, 'shares': order['shares'], 'cost': order['limit'],
+                                 'day': day})
+                elif order['track'] == '3':
+                    t3_stage[i] = 2 if t3_stage[i] == 1 else 3
+            elif order['track'] == '3':
+                still_pending.append(order)          # GTC keeps working
+        pending = still_pending
+
+        # 4.1.2 - Track 2 reassessment (TRIM winners, CONVERT the rest)
+        open_lots = []
+        for lot in lots:
+            if day - lot['day'] < TRACK2_REASSESS_DAYS:
+                open_lots.append(lot)
+                continue
+            price = close[lot['i'], day]
+            if price == price and price >= lot['cost'] * (1 + TRACK2_TRIM_PCT / 100):
+                cash += lot['shares'] * price
+                shares[lot['i']] -= lot['shares']
+                fills.append({'date': dates[day], 'ticker': tickers[lot['i']], 'track': '2',
+                              'shares': -lot['shares'], 'price': float(price)})
+        lots = open_lots
+
+        # 4.1.3 - Daily snapshot (carry the last close across missing bars)
+        prices = close[:, day]
+        if np.isnan(prices).any():
+            prices = np.where(np.isnan(prices), _last_valid(close, day), prices)
+        portfolio_value = cash + float(np.nansum(shares * prices))
+        voo_price = float(prices[voo]) if voo is not None else 0.0
+        if baseline_voo is None:
+            baseline_voo = voo_price
+        voo_return = (voo_price - baseline_voo) / baseline_voo if baseline_voo else 0.0
+        portfolio_return = (portfolio_value - initial_cash) / initial_cash
+        benchmark.append({
+            'Date': dates[day],
+            'VOO_Price': voo_price,
+            'Portfolio_Value': portfolio_value,
+            'VOO_Return': voo_return,
+            'Portfolio_Return': portfolio_return,
+            'Alpha': portfolio_return - voo_return,
+        })
+        peak = max(peak, portfolio_value)
+        max_drawdown = max(max_drawdown, (peak - portfolio_value) / peak if peak else 0.0)
+
+        # 4.1.4 - Today's alerts become tomorrow's orders
+        if not masks['regime_suspended'][day]:
+            for i in np.nonzero(masks['track2'][:, day])[0]:
+                limit = close[i, day]            # next session's prior close
+                qty = int(tranche // limit) if limit == limit and limit > 0 else 0
+                if qty >= 1:
+                    pending.append({'i': i, 'limit': limit, 'shares': qty, 'track': '2'})
+        for i in np.nonzero(masks['track3'][:, day] & (t3_stage == 0))[0]:
+            limit = ind['target'][i]
+            pending.append({'i': i, 'limit': limit, 'shares': max(1, int(tranche // limit)),
+                            'track': '3'})
+            t3_stage[i] = 1
+        for i in np.nonzero(t3_stage == 2)[0]:
+            limit = ind['add_target'][i]
+            if limit > 0 and not any(o['i'] == i and o['track'] == '3' for o in pending):
+                pending.append({'i': i, 'limit': limit, 'shares': max(1, int(tranche // limit)),
+                                'track': '3'})
+
+    return {
+        'benchmark': benchmark,
+        'fills': fills,
+        'stats': replay_stats(panel, benchmark, fills, max_drawdown),
+    }
+
+
+def _last_valid(values, day):
+    """4.2 - Most recent non-NaN value per row at or before `day`"""
+    window = values[:, :day + 1]
+    valid = ~np.isnan(window)
+    last = np.where(valid.any(axis=1), valid.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1), 0)
+    return window[np.arange(window.shape[0]), last]
+
+
+def replay_stats(panel, benchmark, fills, max_drawdown):
+    """
+    4.3 - Summary numbers for one replay
+
+    hit_rate is the share of buys whose ticker closed above the fill
+    price on the last replay day.
+    """
+    buys = [f for f in fills if f['shares'] > 0]
+    if not benchmark:
+        return {'alpha': 0.0, 'portfolio_return': 0.0, 'voo_return': 0.0,
+                'max_drawdown': 0.0, 'trades': 0, 'hit_rate': 0.0}
+
+    last_close = dict(zip(panel['tickers'],
+                          _last_valid(panel['Close'], len(panel['dates']) - 1)))
+    wins = sum(1 for f in buys if last_close[f['ticker']] > f['price'])
+    last = benchmark[-1]
+    return {
+        'alpha': last['Alpha'],
+        'portfolio_return': last['Portfolio_Return'],
+        'voo_return': last['VOO_Return'],
+        'max_drawdown': max_drawdown,
+        'trades': len(buys),
+        'hit_rate': wins / len(buys) if buys else 0.0,
+    }
+
+
+# =============================================================================
+# BLOCK 5: OUTPUT
+# =============================================================================
+
+def write_benchmark_csv(rows, path):
+    """5.1 - Equity curve in the Benchmark sheet's column layout"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=BENCHMARK_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET CACHE - Record/replay cache under the market-data requests
+===============================================================================
+Purpose: Make runs fast, reproducible and possible without a network by
+recording every market-data response the first time it is fetched:
+    1. Store   - responses are pickled into a content-addressed object store
+                 (objects/ab/<sha256 of the payload>); one small entry per
+                 request (requests/<sha256 of the request>.json) points at
+                 its object, so identical payloads are stored once
+    2. TTLs    - a recording is served while younger than its endpoint's
+                 TTL (daily bars an hour, info a day, quotes a minute);
+                 after that the request goes live and is re-recorded. A
+                 live request that fails falls back to the stale recording
+    3. Offline - --offline serves recordings of any age and never opens a
+                 connection (yfinance is not even imported). Daily bars for
+                 a request that was never recorded - the history store asks
+                 for a different start date than last time - are cut from
+                 the newest recorded bars of that ticker
+    4. Dedupe  - identical requests within a run are fetched once; a
+                 thread-pool request waits for the identical one in flight
+
+The cache wraps the provider methods that call yf.download and
+yf.Ticker(...).history / .info. It records their parsed responses
+(DataFrames, info dicts) rather than HTTP bodies: yfinance refuses
+caching HTTP sessions, and its cookie/crumb handshake cannot be replayed.
+
+Usage:
+    provider = CachedProvider(MarketCache(MARKET_CACHE_DIR), live=YahooProvider)
+    provider = CachedProvider(MarketCache(MARKET_CACHE_DIR), offline=True)
+    market_data = fetch_market_data(TICKERS, provider, store=store)
+===============================================================================
+"""
+
+from collections import Counter
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+
+from mr_market_fetch import YahooProvider
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Seconds a recording is served before the request goes live again
+ENDPOINT_TTLS = {
+    'download_history': 3600,         # Daily bars: today's bar settles after the close
+    'history': 3600,
+    'info': 86400,                    # P/E fields: once a day is plenty
+    'quotes': 60,                     # Intraday polls (--watch)
+    'minute_bars': 86400,             # Kept for good in the minute-bar store anyway
+    'earnings': 7 * 86400,            # Reported EPS (P/E history backfill)
+    'statements': 7 * 86400,          # Quarterly statements (fundamentals warehouse)
+}
+
+# 1.2 - Endpoints whose offline misses are cut from recorded bars
+HISTORY_ENDPOINTS = ('download_history', 'history')
+
+
+class CacheMiss(LookupError):
+    """1.3 - An offline request that was never recorded"""
+
+
+# =============================================================================
+# BLOCK 2: CONTENT-ADDRESSED STORE
+# =============================================================================
+
+def _write_atomic(path, data):
+    """2.1 - Temp file + rename, so a crash never leaves a truncated file"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class MarketCache:
+    """
+    2.2 - Request entries pointing at pickled payloads, on disk
+
+    requests/<key>.json is {'endpoint', 'params', 'created' (Unix time),
+    'object', 'bytes'}; objects/<ab>/<hash> is the pickled response.
+    Directories are created on the first write.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.requests_dir = os.path.join(path, "requests")
+        self.objects_dir = os.path.join(path, "objects")
+
+    @staticmethod
+    def request_key(endpoint, params):
+        """2.2.1 - sha256 of the endpoint and its canonical parameters"""
+        text = json.dumps([endpoint, params], sort_keys=True, default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def get(self, key):
+        """2.2.2 - (entry, payload bytes), or None when not recorded"""
+        try:
+            with open(os.path.join(self.requests_dir, f"{key}.json"), 'r') as f:
+                entry = json.load(f)
+            with open(self._object_path(entry['object']), 'rb') as f:
+                return entry, f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, endpoint, params, payload):
+        """2.2.3 - Record one response (the object is written once per content)"""
+        digest = hashlib.sha256(payload).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            _write_atomic(object_path, payload)
+        os.makedirs(self.requests_dir, exist_ok=True)
+        entry = {'endpoint': endpoint, 'params': params, 'created': time.time(),
+                 'object': digest, 'bytes': len(payload)}
+        _write_atomic(os.path.join(self.requests_dir, f"{key}.json"),
+                      json.dumps(entry, default=str).encode('utf-8'))
+
+    def entries(self, endpoints):
+        """2.2.4 - [(entry, payload)] for the given endpoints, oldest first"""
+        if not os.path.isdir(self.requests_dir):
+            return []
+        found = []
+        for name in os.listdir(self.requests_dir):
+            if not name.endswith(".json"):
+                continue
+            recorded = self.get(name[:-len(".json")])
+            if recorded and recorded[0]['endpoint'] in endpoints:
+                found.append(recorded)
+        return sorted(found, key=lambda r: r[0]['created'])
+
+
+# =============================================================================
+# BLOCK 3: CACHED PROVIDER
+# =============================================================================
+
+def canonical_params(endpoint, args, kwargs):
+    """
+    3.1 - The request as {parameter: value} with defaults filled in
+
+    Bound against the YahooProvider signature, so history('MSFT') and
+    history('MSFT', period='400d') are one request; ticker lists are
+    sorted (a batch returns {ticker: frame} either way).
+    """
+    bound = inspect.signature(getattr(YahooProvider, endpoint)).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    params = dict(bound.arguments)
+    params.pop('self')
+    return {k: sorted(v) if isinstance(v, (list, tuple, set)) else v for k, v in params.items()}
+
+
+def window(frame, period=None, start=None):
+    """
+    3.2 - Recorded bars cut the way yfinance applies start / period
+
+    The period counts back from the last recorded bar (the recording's
+    "today").
+    """
+    import pandas as pd
+
+    if start:
+        return frame[frame.index >= pd.Timestamp(start)].copy()
+    days = int(str(period).rstrip('d'))
+    return frame[frame.index > frame.index[-1] - pd.Timedelta(days=days)].copy()
+
+
+class CachedProvider:
+    """
+    3.3 - Provider that serves recordings and records live responses
+
+    live is a zero-argument factory for the live provider (e.g. the
+    YahooProvider class); it is only called on the first request that
+    has to go live. counts tallies hits, recorded, stale, replayed
+    (offline bars cut from other recordings) and deduped requests.
+    """
+
+    def __init__(self, cache, live=None, offline=False, ttls=None):
+        self.cache = cache
+        self.live = live
+        self.offline = offline or live is None
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.counts = Counter()
+        self._provider = None
+        self._bars = None
+        self._memo = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in ENDPOINT_TTLS and self.offline:
+            raise AttributeError(name)
+        if name not in ENDPOINT_TTLS:
+            return getattr(self._live(), name)
+
+        def cached(*args, **kwargs):
+            return self._request(name, args, kwargs)
+
+        return cached
+
+    def _live(self):
+        """3.3.1 - The live provider, created on first use"""
+        if self.offline:
+            raise CacheMiss("offline: no live provider")
+        with self._lock:
+            if self._provider is None:
+                self._provider = self.live()
+            return self._provider
+
+    def _request(self, endpoint, args, kwargs):
+        """3.3.2 - One request, deduplicated within the run"""
+        params = canonical_params(endpoint, args, kwargs)
+        key = self.cache.request_key(endpoint, params)
+
+        # 3.3.2.1 - Answered earlier in this run, or wait for the identical request
+        with self._lock:
+            payload = self._memo.get(key)
+            waiting = self._inflight.get(key)
+            if payload is None and waiting is None:
+                self._inflight[key] = threading.Event()
+        if waiting is not None:
+            waiting.wait()
+            with self._lock:
+                payload = self._memo.get(key)
+        if payload is not None:
+            with self._lock:
+                self.counts['deduped'] += 1
+            return pickle.loads(payload)
+
+        # 3.3.2.2 - First in the run (a failed request is not memoized, so a
+        # retry or a waiting thread asks again)
+        try:
+            payload = self._fetch(endpoint, params, key, args, kwargs)
+            with self._lock:
+                self._memo[key] = payload
+            return pickle.loads(payload)
+        finally:
+            with self._lock:
+                event = self._inflight.pop(key, None)
+            if event is not None:
+                event.set()
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _fetch(self, endpoint, params, key, args, kwargs):
+        """3.3.3 - Fresh recording, offline replay, or live request + record"""
+        recorded = self.cache.get(key)
+        if recorded and (self.offline or time.time() - recorded[0]['created'] < self.ttls[endpoint]):
+            self._count('hits')
+            return recorded[1]
+        if self.offline:
+            self._count('replayed')
+            return pickle.dumps(self._replay(endpoint, params), protocol=pickle.HIGHEST_PROTOCOL)
+
+        try:
+            value = getattr(self._live(), endpoint)(*args, **kwargs)
+        except Exception:
+            if recorded is None:
+                raise
+            self._count('stale')
+            return recorded[1]
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.cache.put(key, endpoint, params, payload)
+        self._count('recorded')
+        return payload
+
+    def _recorded_bars(self):
+        """
+        3.3.4 - {ticker: newest recorded daily bars}, built once per run
+
+        Every recorded history response is merged per ticker, newer
+        recordings winning on overlapping dates; indexes are made
+        timezone-naive (Ticker.history returns exchange time).
+        """
+        with self._lock:
+            if self._bars is not None:
+                return self._bars
+            bars = {}
+            for entry, payload in self.cache.entries(HISTORY_ENDPOINTS):
+                value = pickle.loads(payload)
+                frames = value if isinstance(value, dict) else {entry['params']['ticker']: value}
+                for ticker, frame in frames.items():
+                    if frame is None or frame.empty:
+                        continue
+                    frame = frame.copy()
+                    if frame.index.tz is not None:
+                        frame.index = frame.index.tz_localize(None)
+                    bars[ticker] = frame.combine_first(bars[ticker]) if ticker in bars else frame
+            self._bars = bars
+            return bars
+
+    def _replay(self, endpoint, params):
+        """3.3.5 - Offline answer for a request that was never recorded"""
+        if endpoint not in HISTORY_ENDPOINTS:
+            raise CacheMiss(f"offline: {endpoint} {params} was never recorded")
+        bars = self._recorded_bars()
+        if endpoint == 'history':
+            if params['ticker'] not in bars:
+                raise CacheMiss(f"offline: no recorded bars for {params['ticker']}")
+            return window(bars[params['ticker']], params['period'], params['start'])
+        found = {t: window(bars[t], params['period'], params['start'])
+                 for t in params['tickers'] if t in bars}
+        if not found:
+            raise CacheMiss("offline: no recorded bars for " + ", ".join(params['tickers']))
+        return found
+
+    def summary(self):
+        """3.3.6 - '25 hits, 3 deduped' for the run output"""
+        parts = [f"{n} {name}" for name, n in sorted(self.counts.items()) if n]
+        mode = " (offline)" if self.offline else ""
+        return (", ".join(parts) or "no requests") + mode
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET TRACKER DB - SQLite (WAL) system of record for the tracker
+===============================================================================
+Purpose: Move Positions, Pending_Orders, Action_Log and Benchmark out of the
+workbook into SQLite so concurrent runs (e.g. --ingest-only while the daily
+run is going) cannot clobber each other:
+    1. SqliteLedger  - same Table API as the workbook Ledger, persisted to
+                       mr_market_tracker.db with WAL journaling
+    2. transaction() - BEGIN IMMEDIATE, re-read fresh state, mutate, COMMIT
+    3. import_workbook() - one-time import from mr_market_tracker.xlsx
+    4. export() writes mr_market_tracker.xlsx (export_workbook() in
+       mr_market_ledger) as a snapshot for humans after every run, while
+       holding the write lock
+
+Each sheet becomes one table whose columns are the sheet headers. Formula
+columns (Total_Invested, Market_Value, ... in Positions) are stored as NULL;
+the exported workbook keeps its formulas and computes them.
+
+Usage:
+    python mr_market_roundtable.py --import-tracker    (once)
+    python mr_market_roundtable.py --export-tracker
+===============================================================================
+"""
+
+from datetime import datetime
+import contextlib
+import sqlite3
+
+from mr_market_ledger import LEDGER_SHEETS, Ledger, Table, export_workbook
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - How long a writer waits for another run's transaction (seconds)
+BUSY_TIMEOUT_SECONDS = 30
+
+
+# =============================================================================
+# BLOCK 2: SCHEMA HELPERS
+# =============================================================================
+
+def _quote(name):
+    """2.1 - Quote a sheet header for use as a SQL identifier"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _to_db_value(value):
+    """
+    2.2 - Convert a workbook value to something SQLite stores faithfully
+
+    Formulas become NULL (the workbook computes them); dates become
+    YYYY-MM-DD strings, matching what the script itself writes.
+    """
+    if isinstance(value, str) and value.startswith('='):
+        return None
+    if isinstance(value, datetime):
+        if value.hour == value.minute == value.second == 0:
+            return value.strftime("%Y-%m-%d")
+        return value.isoformat()
+    if hasattr(value, 'strftime'):
+        return value.strftime("%Y-%m-%d")
+    if hasattr(value, 'item'):
+        return value.item()          # NumPy scalars from market_data
+    return value
+
+
+def connect(path):
+    """2.3 - Open the tracker database in WAL mode"""
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def table_columns(conn, name):
+    """2.4 - Column names of a tracker table, in sheet order ([] if missing)"""
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({_quote(name)})")]
+
+
+# =============================================================================
+# BLOCK 3: SQLITE LEDGER
+# =============================================================================
+
+class SqliteLedger(Ledger):
+    """
+    3.1 - Ledger persisted to SQLite
+
+    Tables are held in memory exactly like the workbook Ledger, but every
+    transaction() re-reads them from the database under a write lock and
+    commits the recorded changes on exit, so two processes serialize
+    instead of overwriting each other.
+    """
+
+    def __init__(self, conn, path):
+        self.conn = conn
+        super().__init__(self._read_tables(), path)
+
+    @classmethod
+    def load(cls, path):
+        """3.1.1 - Open the database and read every tracker table"""
+        return cls(connect(path), path)
+
+    def _read_tables(self):
+        """3.1.2 - Read every tracker table (rowid order = sheet order)"""
+        tables = {}
+        for name, key in LEDGER_SHEETS.items():
+            columns = table_columns(self.conn, name)
+            cursor = self.conn.execute(
+                f"SELECT rowid, * FROM {_quote(name)} ORDER BY rowid")
+            rows = []
+            row_ids = []
+            for values in cursor:
+                row_ids.append(values[0])
+                rows.append(dict(zip(columns, values[1:])))
+            tables[name] = Table(name, columns, rows, row_ids, key=key)
+        return tables
+
+    def _refresh(self):
+        """3.1.3 - Replace the in-memory tables with the database state"""
+        fresh = self._read_tables()
+        for name, table in fresh.items():
+            current = self.tables[name]
+            current.columns = table.columns
+            current.rows = table.rows
+            current.row_ids = table.row_ids
+            current.mark_clean()
+            current.reindex()
+
+    def _write_changes(self):
+        """3.1.4 - Apply recorded deletes, cell updates and appends"""
+        for name, table in self.tables.items():
+            quoted = _quote(name)
+            if table.removed_ids:
+                self.conn.executemany(
+                    f"DELETE FROM {quoted} WHERE rowid = ?",
+                    [(rid,) for rid in table.removed_ids])
+
+            by_id = dict(zip(table.row_ids, table.rows))
+            for row_id, column in table.dirty:
+                self.conn.execute(
+                    f"UPDATE {quoted} SET {_quote(column)} = ? WHERE rowid = ?",
+                    (_to_db_value(by_id[row_id][column]), row_id))
+
+            placeholders = ", ".join("?" for _ in table.columns)
+            column_list = ", ".join(_quote(c) for c in table.columns)
+            for i, row_id in enumerate(table.row_ids):
+                if row_id is None:
+                    cursor = self.conn.execute(
+                        f"INSERT INTO {quoted} ({column_list}) VALUES ({placeholders})",
+                        [_to_db_value(table.rows[i].get(c)) for c in table.columns])
+                    table.row_ids[i] = cursor.lastrowid
+
+            table.mark_clean()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        3.1.5 - One atomic read-modify-write against the database
+
+        Takes the write lock (BEGIN IMMEDIATE), flushes anything changed
+        outside a transaction, re-reads every table so the body sees
+        commits made by other runs, and commits the body's changes on
+        exit. On error everything is rolled back and the tables re-read.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_changes()
+            self._refresh()
+            yield self
+            self._write_changes()
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            self._refresh()
+            raise
+
+    def save(self, path=None):
+        """3.1.6 - Commit any outstanding changes (path is ignored)"""
+        with self.transaction():
+            pass
+
+    def export(self, xlsx_path):
+        """
+        3.1.7 - Commit outstanding changes and export the workbook under the lock
+
+        The export runs inside the transaction, from the state just
+        re-read, so concurrent runs write the workbook one at a time and
+        an older snapshot can never replace a newer one.
+        """
+        with self.transaction():
+            export_workbook(self, xlsx_path)
+
+    def close(self):
+        self.conn.close()
+
+
+# =============================================================================
+# BLOCK 4: IMPORT
+# =============================================================================
+
+def import_workbook(xlsx_path, db_path, force=False):
+    """
+    4.1 - One-time import of the tracker workbook into SQLite
+
+    Refuses to overwrite a database that already has tracker rows unless
+    force=True. Returns {sheet name: rows imported}.
+    """
+    source = Ledger.load(xlsx_path)
+    conn = connect(db_path)
+    counts = {}
+    try:
+        existing = [name for name in LEDGER_SHEETS if table_columns(conn, name)]
+        if existing and not force:
+            has_rows = any(
+                conn.execute(f"SELECT COUNT(*) FROM {_quote(name)}").fetchone()[0]
+                for name in existing)
+            if has_rows:
+                raise RuntimeError(f"{db_path} already has tracker data (use force=True)")
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, table in source.tables.items():
+                quoted = _quote(name)
+                conn.execute(f"DROP TABLE IF EXISTS {quoted}")
+                conn.execute(f"CREATE TABLE {quoted} ("
+                             + ", ".join(_quote(c) for c in table.columns) + ")")
+                placeholders = ", ".join("?" for _ in table.columns)
+                conn.executemany(
+                    f"INSERT INTO {quoted} VALUES ({placeholders})",
+                    [[_to_db_value(row.get(c)) for c in table.columns] for row in table.rows])
+                counts[name] = len(table.rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return counts
+
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET DECISIONS - Streaming DECISION-block parser
+===============================================================================
+Purpose: Read the Arbiter's DECISION blocks out of decision files of any
+size, one line at a time:
+    1. Headers  - a line that is only "DECISION:" (or "DECISION 2:",
+                  "**DECISION:**", "## Decision #3:") opens a block;
+                  "decision" anywhere else in the prose is ignored
+    2. Fields   - "Key: value" lines under the header (Markdown bullets
+                  and bold keys are tolerated, blank lines are skipped);
+                  the block ends at the first prose line or the next header
+    3. Validate - a block needs Action and Ticker, numeric Limit/Shares
+                  when present ("N/A", "none", "-" count as absent), and
+                  no repeated fields; anything else is reported with its
+                  file and line number and dropped
+
+Every line is looked at once with anchored checks, so a multi-megabyte
+transcript or a whole directory of them parses in linear time and
+constant memory per block.
+
+Usage:
+    from mr_market_decisions import parse_decision_text, scan_decision_file
+    decisions = parse_decision_text(text)
+    for line_no, decision, errors in scan_decision_file(path): ...
+===============================================================================
+"""
+
+import io
+import re
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Block header: the whole line, optional number, optional Markdown
+HEADER = re.compile(r"[#>*\s]*DECISION(?:\s*#?\d+)?\s*:[*\s]*$", re.IGNORECASE)
+
+# 1.2 - Recognized fields (lowercase keys, also the output dict keys)
+FIELDS = ('date', 'action', 'ticker', 'limit', 'shares', 'track', 'signal', 'thesis', 'notes')
+REQUIRED = ('action', 'ticker')
+
+# 1.3 - Characters stripped around a key or value ("- **Ticker:** ROP")
+KEY_DECORATION = "*-#> \t"
+VALUE_DECORATION = "* \t\r\n"
+BLANK = KEY_DECORATION + "\r\n"
+
+# 1.4 - Limit/Shares values meaning "no number" (e.g. on a NONE block)
+NOT_APPLICABLE = re.compile(r"(?:n/?a|none|nil|tbd)\b|-+(?![\d.$])|\u2014", re.IGNORECASE)
+
+# 1.5 - Other "Key: value" lines inside a block (e.g. "Confidence: 80%")
+# are skipped instead of ending the block when the key is this short
+MAX_EXTRA_KEY_LENGTH = 24
+
+
+# =============================================================================
+# BLOCK 2: FIELD VALUES
+# =============================================================================
+
+def _convert(key, value):
+    """
+    2.1 - Typed field value; raises ValueError for a malformed number
+
+    An empty or not-applicable Limit/Shares ("N/A", "none", "-") is None,
+    i.e. the field is treated as absent.
+    """
+    if key in ('limit', 'shares') and (not value or NOT_APPLICABLE.match(value)):
+        return None
+    if key in ('action', 'ticker'):
+        return value.upper()
+    if key == 'limit':
+        return float(value.replace('$', '').replace(',', ''))
+    if key == 'shares':
+        return int(float(value.replace(',', '')))
+    return value
+
+
+def _finish(line_no, fields, errors):
+    """
+    2.2 - Close a block: (line_no, decision, errors)
+
+    fields maps key -> (line_no, raw value). decision holds only the
+    fields that converted; errors is empty for a well-formed block.
+    """
+    if not fields and not errors:
+        return line_no, {}, [(line_no, "no fields under DECISION header")]
+    decision = {}
+    for key, (field_line, value) in fields.items():
+        try:
+            converted = _convert(key, value)
+        except ValueError:
+            errors.append((field_line, f"{key.capitalize()} is not a number: {value!r}"))
+            continue
+        if converted is not None:
+            decision[key] = converted
+    for key in REQUIRED:
+        if not decision.get(key):
+            errors.append((line_no, f"missing {key.capitalize()}"))
+    return line_no, decision, sorted(errors)
+
+
+# =============================================================================
+# BLOCK 3: STREAMING PARSER
+# =============================================================================
+
+def scan_decisions(lines):
+    """
+    3.1 - Yield (line_no, decision, errors) for every DECISION header
+
+    lines is any iterable of text lines (an open file, a StringIO);
+    line_no is the header's 1-based line. Blocks with errors are still
+    yielded so the caller can report them.
+    """
+    open_line = None
+    fields = {}
+    errors = []
+
+    for line_no, line in enumerate(lines, 1):
+        # 3.1.1 - Lines without a colon: blank lines are skipped, prose ends the block
+        if ':' not in line:
+            if open_line is not None and line.strip(BLANK):
+                yield _finish(open_line, fields, errors)
+                open_line = None
+            continue
+
+        # 3.1.2 - Field lines (most lines of a decision file) first
+        key, _, value = line.partition(':')
+        key = key.strip(KEY_DECORATION).lower()
+        if key in FIELDS:
+            if open_line is None:
+                continue
+            if key in fields:
+                errors.append((line_no, f"duplicate {key.capitalize()} (first on line {fields[key][0]})"))
+            else:
+                fields[key] = (line_no, value.strip(VALUE_DECORATION))
+
+        # 3.1.3 - A new header closes the open block
+        elif key.startswith('decision') and HEADER.match(line):
+            if open_line is not None:
+                yield _finish(open_line, fields, errors)
+            open_line, fields, errors = line_no, {}, []
+
+        # 3.1.4 - Extra short "Key: value" lines are skipped; prose ends the block
+        elif open_line is not None and (not key or len(key) > MAX_EXTRA_KEY_LENGTH):
+            yield _finish(open_line, fields, errors)
+            open_line = None
+
+    # 3.1.5 - Last block, with or without a trailing newline
+    if open_line is not None:
+        yield _finish(open_line, fields, errors)
+
+
+def scan_decision_file(path):
+    """3.2 - scan_decisions() over a file, read incrementally"""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        yield from scan_decisions(f)
+
+
+def parse_decision_text(text):
+    """3.3 - Well-formed decisions in a string (CR, LF or CRLF line endings)"""
+    return [decision for _, decision, errors in scan_decisions(io.StringIO(text, newline=None))
+            if not errors]
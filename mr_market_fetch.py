@@ -0,0 +1,656 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET FETCH ENGINE - Batched, concurrent market-data fetching
+===============================================================================
+Purpose: Replace the one-ticker-at-a-time loop in fetch_all_market_data with:
+    1. One batched multi-ticker price-history download
+    2. P/E fields (stock.info) loaded on a bounded thread pool
+    3. Per-ticker timeouts and retries
+    4. A pluggable provider so the engine can run against a fake feed
+
+The engine returns the exact same market_data dict as the original loop,
+including the '_trade_date' mode of all per-ticker trade dates.
+
+Usage:
+    from mr_market_fetch import YahooProvider, fetch_market_data
+    market_data = fetch_market_data(TICKERS, YahooProvider())
+
+Benchmark (offline, fake provider):
+    python benchmarks/bench_fetch.py
+===============================================================================
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from collections import Counter
+from datetime import datetime, timedelta
+import time
+import zlib
+
+import numpy as np
+
+from mr_market_indicators import RSI_WINDOW, VOLUME_WINDOW, summarize_panel
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - History window (enough bars for the 252-day range and 50-day MA)
+HISTORY_PERIOD = "400d"
+HISTORY_DAYS = 400                    # Calendar days, same as HISTORY_PERIOD
+
+# 1.2 - Concurrency and robustness
+INFO_MAX_WORKERS = 8                 # Bounded pool for stock.info calls
+INFO_TIMEOUT_SECONDS = 10.0          # Per-ticker timeout for stock.info
+HISTORY_TIMEOUT_SECONDS = 30.0       # Per-ticker timeout for fallback history
+MAX_RETRIES = 2                      # Retries after the first attempt
+RETRY_BACKOFF_SECONDS = 0.5          # Doubled on every retry
+
+# 1.3 - Earnings reports requested per ticker (quarterly: ~10 years)
+EARNINGS_LIMIT = 40
+
+# 1.4 - Quarters in a FakeProvider statements() response (Yahoo serves 5-6)
+FAKE_STATEMENT_QUARTERS = 6
+
+
+# =============================================================================
+# BLOCK 2: PROVIDERS
+# =============================================================================
+
+class YahooProvider:
+    """
+    2.1 - Live provider backed by yfinance
+
+    download_history() pulls all tickers in one batched request;
+    history() and info() are the single-ticker calls used as fallbacks
+    and for the P/E fields; quotes() is the intraday poll for --watch;
+    earnings() feeds the P/E history backfill and statements() the
+    fundamentals warehouse.
+    """
+
+    def __init__(self):
+        import yfinance as yf
+        self.yf = yf
+
+    def download_history(self, tickers, period=HISTORY_PERIOD, start=None):
+        """2.1.1 - One multi-ticker download, returns {ticker: DataFrame}"""
+        df = self.yf.download(
+            list(tickers),
+            period=None if start else period,
+            start=start,
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        return split_batch_frame(df, tickers)
+
+    def history(self, ticker, period=HISTORY_PERIOD, start=None):
+        """2.1.2 - Single-ticker history (same call as the original loop)"""
+        if start:
+            return self.yf.Ticker(ticker).history(start=start)
+        return self.yf.Ticker(ticker).history(period=period)
+
+    def info(self, ticker):
+        """2.1.3 - Single-ticker info dict (P/E fields live here)"""
+        return self.yf.Ticker(ticker).info
+
+    def quotes(self, tickers):
+        """2.1.4 - Latest intraday price per ticker (last 1-minute bar close)"""
+        df = self.yf.download(
+            list(tickers),
+            period='1d',
+            interval='1m',
+            group_by='ticker',
+            auto_adjust=True,
+            threads=True,
+            progress=False,
+        )
+        frames = split_batch_frame(df, tickers)
+        return {t: float(f['Close'].dropna().iloc[-1]) for t, f in frames.items()
+                if not f['Close'].dropna().empty}
+
+    def minute_bars(self, tickers, date):
+        """
+        2.1.5 - Regular-session 1-minute bars for one date, {ticker: DataFrame}
+
+        Yahoo only serves 1-minute bars for roughly the last 30 days.
+        """
+        end = (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        df = self.yf.download(
+            list(tickers),
+            start=date,
+            end=end,
+            interval='1m',
+            group_by='ticker',
+            auto_adjust=True,
+            prepost=False,
+            threads=True,
+            progress=False,
+        )
+        return split_batch_frame(df, tickers)
+
+    def earnings(self, ticker):
+        """2.1.6 - Reported quarterly EPS, {YYYY-MM-DD: eps} (scheduled reports skipped)"""
+        import pandas as pd
+
+        df = self.yf.Ticker(ticker).get_earnings_dates(limit=EARNINGS_LIMIT)
+        if df is None or df.empty or 'Reported EPS' not in df.columns:
+            return {}
+        reported = pd.to_numeric(df['Reported EPS'], errors='coerce').dropna()
+        return {ts.strftime("%Y-%m-%d"): float(eps) for ts, eps in reported.items()}
+
+    def statements(self, ticker):
+        """
+        2.1.7 - Quarterly statements, {'income' | 'balance' | 'cashflow': DataFrame}
+
+        Each frame has Yahoo's line items (TotalRevenue, ...) as rows and
+        one column per quarter end, newest first.
+        """
+        stock = self.yf.Ticker(ticker)
+        return {
+            'income': stock.get_income_stmt(freq='quarterly'),
+            'balance': stock.get_balance_sheet(freq='quarterly'),
+            'cashflow': stock.get_cash_flow(freq='quarterly'),
+        }
+
+
+class FakeProvider:
+    """
+    2.2 - Deterministic offline provider for benchmarks and dry runs
+
+    Generates a seeded random-walk OHLCV history per ticker and sleeps
+    `latency` seconds per request to emulate a network round-trip.
+    A batched download counts as a single request.
+
+    Every series starts at the fixed `origin` date, so moving `end_date`
+    forward appends new bars without changing the old ones (like a real
+    feed between two daily runs).
+    """
+
+    def __init__(self, latency=0.0, seed=0, end_date=None, origin="2016-01-04",
+                 fail_tickers=None):
+        self.latency = latency
+        self.seed = seed
+        self.end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+        self.origin = origin
+        self.fail_tickers = set(fail_tickers or [])
+        self.calls = Counter()
+        self._cache = {}
+        self._index = None
+
+    def _frame(self, ticker):
+        """2.2.1 - Build the full synthetic history for one ticker"""
+        import pandas as pd
+
+        if ticker in self._cache:
+            return self._cache[ticker]
+
+        # One independent stream per field so a longer series (later
+        # end_date) extends every field without changing earlier bars.
+        rng = [np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, k])
+               for k in range(4)]
+        if self._index is None:
+            self._index = pd.bdate_range(start=self.origin, end=self.end_date)
+        index = self._index
+        n = len(index)
+        start_price = np.random.default_rng(zlib.crc32(ticker.encode())).uniform(30, 900)
+        close = start_price * np.cumprod(1 + rng[0].normal(0.0003, 0.018, n))
+        open_ = np.concatenate([[start_price], close[:-1]])
+        high = np.maximum(open_, close) * (1 + np.abs(rng[1].normal(0, 0.006, n)))
+        low = np.minimum(open_, close) * (1 - np.abs(rng[2].normal(0, 0.006, n)))
+        volume = rng[3].integers(200_000, 5_000_000, n).astype(float)
+        frame = pd.DataFrame({'Open': open_, 'High': high, 'Low': low,
+                              'Close': close, 'Volume': volume}, index=index)
+        self._cache[ticker] = frame
+        return frame
+
+    def _window(self, ticker, period, start):
+        """2.2.2 - Slice the series the way yfinance applies period/start"""
+        import pandas as pd
+
+        frame = self._frame(ticker)
+        if start:
+            return frame[frame.index >= pd.Timestamp(start)]
+        days = int(str(period).rstrip('d'))
+        return frame[frame.index > pd.Timestamp(self.end_date) - pd.Timedelta(days=days)]
+
+    def download_history(self, tickers, period=HISTORY_PERIOD, start=None):
+        self.calls['download_history'] += 1
+        time.sleep(self.latency)
+        return {t: self._window(t, period, start) for t in tickers
+                if t not in self.fail_tickers}
+
+    def history(self, ticker, period=HISTORY_PERIOD, start=None):
+        self.calls['history'] += 1
+        time.sleep(self.latency)
+        if ticker in self.fail_tickers:
+            raise RuntimeError(f"fake failure for {ticker}")
+        return self._window(ticker, period, start)
+
+    def _info(self, ticker):
+        """2.2.5 - Seeded P/E fields, with the EPS consistent with the last close"""
+        rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, 99])
+        trailing_pe, forward_pe = float(rng.uniform(10, 60)), float(rng.uniform(8, 45))
+        close = float(self._frame(ticker)['Close'].iloc[-1])
+        return {'trailingPE': trailing_pe, 'forwardPE': forward_pe,
+                'trailingEps': close / trailing_pe, 'forwardEps': close / forward_pe}
+
+    def info(self, ticker):
+        self.calls['info'] += 1
+        time.sleep(self.latency)
+        if ticker in self.fail_tickers:
+            raise RuntimeError(f"fake failure for {ticker}")
+        return self._info(ticker)
+
+    def earnings(self, ticker):
+        """
+        2.2.6 - Quarterly EPS every 13 weeks up to end_date, {YYYY-MM-DD: eps}
+
+        Grows back to the trailing EPS that info() reports, with noise, so
+        the rebuilt P/E history ends near today's trailing P/E.
+        """
+        import pandas as pd
+
+        self.calls['earnings'] += 1
+        time.sleep(self.latency)
+        if ticker in self.fail_tickers:
+            raise RuntimeError(f"fake failure for {ticker}")
+        trailing_eps = self._info(ticker)['trailingEps']
+        dates = pd.date_range(end=self.end_date, periods=EARNINGS_LIMIT, freq='13W')
+        rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, 102])
+        growth = rng.uniform(0.0, 0.04)
+        steps = np.arange(len(dates) - 1, -1, -1)
+        eps = trailing_eps / 4 / (1 + growth) ** steps * rng.normal(1, 0.05, len(dates))
+        return {d.strftime("%Y-%m-%d"): float(v) for d, v in zip(dates, eps)}
+
+    def statements(self, ticker):
+        """
+        2.2.7 - Quarterly statements shaped like YahooProvider.statements()
+
+        Quarters run from `origin` like the price series, so a later
+        end_date adds quarters without restating old ones; the newest is
+        the last quarter ending 45+ days before end_date (the filing lag).
+        Shares are scaled to a 15-40x P/E at the first close.
+        """
+        import pandas as pd
+
+        self.calls['statements'] += 1
+        time.sleep(self.latency)
+        if ticker in self.fail_tickers:
+            raise RuntimeError(f"fake failure for {ticker}")
+        periods = pd.date_range(start=self.origin, freq='QE',
+                                end=pd.Timestamp(self.end_date) - pd.Timedelta(days=45))
+        n = len(periods)
+        key = zlib.crc32(ticker.encode())
+        rng = np.random.default_rng([key, self.seed, 103])
+        noise = [np.random.default_rng([key, self.seed, 104, k]).normal(0, 1, n) for k in range(3)]
+        revenue = rng.uniform(2e8, 2e10) * np.cumprod(1 + rng.uniform(0, 0.04) + 0.02 * noise[0])
+        gross_margin, net_margin = rng.uniform(0.4, 0.85), rng.uniform(0.08, 0.35)
+        net_income = revenue * net_margin * (1 + 0.05 * noise[1])
+        operating = revenue * net_margin * rng.uniform(1.2, 1.4)
+        first_close = np.random.default_rng(key).uniform(30, 900)
+        shares = (net_income[0] * 4 * rng.uniform(15, 40) / first_close
+                  * (1 - rng.uniform(0, 0.01)) ** np.arange(n))
+        operating_cash = net_income * (1.2 + 0.1 * noise[2])
+        debt = revenue * 4 * rng.uniform(0.2, 1.5)
+        payout = rng.uniform(0.0, 0.6), rng.uniform(0.0, 0.3)
+        periods, count = periods[-FAKE_STATEMENT_QUARTERS:], min(n, FAKE_STATEMENT_QUARTERS)
+
+        def frame(rows):
+            # Yahoo order: newest quarter first
+            return pd.DataFrame({k: v[-count:][::-1] for k, v in rows.items()},
+                                index=periods[::-1]).T
+
+        return {
+            'income': frame({
+                'TotalRevenue': revenue,
+                'GrossProfit': revenue * gross_margin,
+                'OperatingIncome': operating,
+                'NetIncomeCommonStockholders': net_income,
+                'EBITDA': operating * 1.15,
+                'DilutedEPS': net_income / shares,
+                'DilutedAverageShares': shares,
+            }),
+            'balance': frame({
+                'TotalDebt': debt,
+                'CashCashEquivalentsAndShortTermInvestments': revenue * 0.5,
+                'StockholdersEquity': debt * 0.8,
+            }),
+            'cashflow': frame({
+                'OperatingCashFlow': operating_cash,
+                'CapitalExpenditure': -revenue * 0.05,
+                'RepurchaseOfCapitalStock': -operating_cash * payout[0],
+                'CashDividendsPaid': -operating_cash * payout[1],
+            }),
+        }
+
+    def quotes(self, tickers):
+        """2.2.3 - Intraday random walk from the last close (one step per call)"""
+        self.calls['quotes'] += 1
+        time.sleep(self.latency)
+        step = self.calls['quotes']
+        prices = {}
+        for ticker in tickers:
+            if ticker in self.fail_tickers:
+                continue
+            rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, 100])
+            path = np.cumprod(1 + rng.normal(0, 0.004, step))
+            prices[ticker] = float(self._frame(ticker)['Close'].iloc[-1] * path[-1])
+        return prices
+
+    def minute_bars(self, tickers, date):
+        """
+        2.2.4 - 390 synthetic 1-minute bars consistent with the daily bar
+
+        The path runs from the day's open to its close and touches the
+        day's high and low, so minute and daily bars agree.
+        """
+        import pandas as pd
+
+        self.calls['minute_bars'] += 1
+        time.sleep(self.latency)
+        index = pd.date_range(f"{date} 09:30", periods=390, freq="min")
+        bars = {}
+        for ticker in tickers:
+            if ticker in self.fail_tickers:
+                continue
+            frame = self._frame(ticker)
+            day = frame[frame.index == pd.Timestamp(date)]
+            if day.empty:
+                continue
+            o, h, l, c, v = (float(day[f].iloc[0]) for f in ['Open', 'High', 'Low', 'Close', 'Volume'])
+            rng = np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, 101,
+                                         int(pd.Timestamp(date).strftime("%Y%m%d"))])
+            walk = np.concatenate([[0.0], np.cumsum(rng.normal(0, 1, 390))])
+            bridge = walk - np.linspace(0, 1, 391) * walk[-1]
+            span = bridge.max() - bridge.min()
+            path = o + (c - o) * np.linspace(0, 1, 391) + bridge * ((h - l) / span if span else 0)
+            path = np.clip(path, l, h)
+            path[1 + np.argmin(path[1:-1])] = l
+            path[1 + np.argmax(path[1:-1])] = h
+            opens, closes = path[:-1], path[1:]
+            volume = v * rng.dirichlet(np.ones(390))
+            bars[ticker] = pd.DataFrame({
+                'Open': opens, 'High': np.maximum(opens, closes), 'Low': np.minimum(opens, closes),
+                'Close': closes, 'Volume': np.round(volume),
+            }, index=index)
+        return bars
+
+
+def split_batch_frame(df, tickers):
+    """
+    2.3 - Split a yf.download(group_by='ticker') frame into per-ticker frames
+
+    Dates where a ticker has no bar (e.g. before it listed) are dropped so
+    every returned frame looks like a Ticker.history() result.
+    """
+    frames = {}
+    if df is None or df.empty:
+        return frames
+
+    multi = hasattr(df.columns, 'levels')
+    for ticker in tickers:
+        if multi:
+            if ticker not in df.columns.get_level_values(0):
+                continue
+            hist = df[ticker]
+        else:
+            hist = df
+        hist = hist.dropna(how='all')
+        if not hist.empty:
+            frames[ticker] = hist
+    return frames
+
+
+# =============================================================================
+# BLOCK 3: PER-TICKER SUMMARY
+# =============================================================================
+
+def summarize_history(hist):
+    """
+    3.1 - Reduce one price history to the market_data fields
+
+    Returns None if there are fewer than 2 bars, otherwise
+    (trade_date, fields) where fields has no P/E values yet.
+    """
+    if hist is None or hist.empty or len(hist) < 2:
+        return None
+
+    # 3.1.1 - Basic price data
+    today = hist.iloc[-1]
+    yesterday = hist.iloc[-2]
+    close = today['Close']
+    low = today['Low']
+    prev_close = yesterday['Close']
+    change_pct = ((close - prev_close) / prev_close) * 100
+
+    # 3.1.2 - 50-day moving average
+    ma_50 = hist['Close'].tail(50).mean() if len(hist) >= 50 else hist['Close'].mean()
+
+    # 3.1.3 - 52-week high/low
+    window_52w = hist.tail(252) if len(hist) >= 252 else hist
+    week_52_low = window_52w['Low'].min()
+    week_52_high = window_52w['High'].max()
+
+    # 3.1.4 - Volume vs the 20 bars before today, 14-day simple-average RSI
+    volume_avg = hist['Volume'].iloc[-VOLUME_WINDOW - 1:-1].mean()
+    changes = hist['Close'].diff().tail(RSI_WINDOW)
+    gain = changes.clip(lower=0).mean()
+    loss = (-changes).clip(lower=0).mean()
+    rsi_14 = 100 - 100 / (1 + gain / loss) if loss > 0 else 100.0
+
+    trade_date = hist.index[-1].strftime("%Y-%m-%d")
+
+    return trade_date, {
+        'close': close,
+        'low': low,
+        'prev_close': prev_close,
+        'change_pct': change_pct,
+        'ma_50': ma_50,
+        'week_52_low': week_52_low,
+        'week_52_high': week_52_high,
+        'open': today['Open'],
+        'volume': today['Volume'],
+        'volume_avg': volume_avg,
+        'rsi_14': rsi_14,
+        'trailing_pe': None,
+        'forward_pe': None,
+    }
+
+
+def trade_date_mode(trade_dates):
+    """3.2 - Most common trade date across tickers (None if empty)"""
+    if not trade_dates:
+        return None
+    return Counter(trade_dates).most_common(1)[0][0]
+
+
+# =============================================================================
+# BLOCK 4: FETCH ENGINE
+# =============================================================================
+
+def call_with_retries(fn, *args, retries=MAX_RETRIES, backoff=RETRY_BACKOFF_SECONDS, **kwargs):
+    """4.1 - Call fn(*args, **kwargs), retrying with exponential backoff on any error"""
+    attempt = 0
+    while True:
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            if attempt >= retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+
+def _collect(futures, timeout, deadline_start):
+    """4.2 - Gather {ticker: result} from futures, honoring one timeout each"""
+    results = {}
+    errors = {}
+    for ticker, future in futures.items():
+        # Each ticker gets `timeout` seconds measured from submission, so a
+        # slow pool never stretches one ticker's budget past its own timeout.
+        remaining = max(0.0, timeout - (time.monotonic() - deadline_start))
+        try:
+            results[ticker] = future.result(timeout=remaining)
+        except FutureTimeout:
+            future.cancel()
+            errors[ticker] = f"timeout after {timeout:.0f}s"
+        except Exception as e:
+            errors[ticker] = str(e)
+    return results, errors
+
+
+def fetch_histories(tickers, provider, pool, period=HISTORY_PERIOD, start=None,
+                    history_timeout=HISTORY_TIMEOUT_SECONDS, retries=MAX_RETRIES,
+                    verbose=True):
+    """
+    4.3 - Batched history download with per-ticker fallback
+
+    Returns ({ticker: DataFrame}, {ticker: error}). Tickers the batch did
+    not return (or returned with < 2 bars) are retried one at a time on
+    the pool, each with its own timeout.
+    """
+    tickers = list(tickers)
+    histories = {}
+
+    # 4.3.1 - Batched history download
+    try:
+        histories = call_with_retries(provider.download_history, tickers,
+                                      period=period, start=start, retries=retries)
+    except Exception as e:
+        if verbose:
+            print(f"    Batch download failed ({e}); falling back to per-ticker")
+
+    # 4.3.2 - Per-ticker fallback for anything the batch did not return.
+    # An incremental request (start=...) may legitimately return 0-1 bars,
+    # so only a missing ticker triggers the fallback in that case.
+    min_bars = 1 if start else 2
+    missing = [t for t in tickers if histories.get(t) is None or len(histories[t]) < min_bars]
+    errors = {}
+    if missing:
+        started = time.monotonic()
+        futures = {t: pool.submit(call_with_retries, provider.history, t,
+                                  period=period, start=start, retries=retries)
+                   for t in missing}
+        fallback, errors = _collect(futures, history_timeout, started)
+        histories.update(fallback)
+
+    return histories, errors
+
+
+def fetch_market_data(tickers, provider, store=None, max_workers=INFO_MAX_WORKERS,
+                      info_timeout=INFO_TIMEOUT_SECONDS,
+                      history_timeout=HISTORY_TIMEOUT_SECONDS,
+                      retries=MAX_RETRIES, verbose=True, fundamentals=None):
+    """
+    4.4 - Batched, concurrent replacement for the per-ticker fetch loop
+
+    1. One batched history download for every ticker, or, with a
+       HistoryStore, an incremental download of only the new bars
+    2. Per-ticker history fallback (thread pool) for any ticker the batch missed
+    3. stock.info for P/E on a bounded thread pool with timeouts and retries,
+       or, with a FundamentalsStore, from its TTL cache (refreshing in the
+       background)
+
+    Returns the same market_data dict as the original loop.
+    """
+    tickers = list(tickers)
+
+    # The pool is shut down without waiting so a hung request cannot hold
+    # the run past its timeout; its thread is simply abandoned.
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        # 4.4.1 - Price histories (full download, or new bars into the store)
+        if store is not None:
+            history_errors = store.update(tickers, provider, pool=pool,
+                                          history_timeout=history_timeout,
+                                          retries=retries, verbose=verbose)
+            ok = [t for t in tickers if t not in history_errors]
+            histories = store.load_many(ok)
+        else:
+            histories, history_errors = fetch_histories(
+                tickers, provider, pool, history_timeout=history_timeout,
+                retries=retries, verbose=verbose)
+
+        # 4.4.1.1 - Rolling stats for all tickers in one vectorized pass
+        summaries = summarize_panel(histories, tickers)
+
+        # 4.4.2 - P/E fields from the fundamentals cache, or on the bounded pool
+        info_errors = {}
+        if fundamentals is not None:
+            ratios = fundamentals.pe_ratios({t: s[1]['close'] for t, s in summaries.items()},
+                                            provider, timeout=info_timeout, retries=retries,
+                                            verbose=verbose)
+            infos = {t: {'trailingPE': pe[0], 'forwardPE': pe[1]} for t, pe in ratios.items()}
+        else:
+            started = time.monotonic()
+            futures = {t: pool.submit(call_with_retries, provider.info, t, retries=retries)
+                       for t in summaries}
+            infos, info_errors = _collect(futures, info_timeout, started)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    # 4.4.3 - Assemble in TICKERS order so output matches the original loop
+    market_data = {}
+    trade_dates = []
+    for ticker in tickers:
+        if ticker not in summaries:
+            if verbose:
+                reason = history_errors.get(ticker)
+                print(f"    {ticker}... {'ERROR: ' + reason if reason else 'NO DATA'}")
+            continue
+
+        ticker_date, fields = summaries[ticker]
+        info = infos.get(ticker) or {}
+        fields['trailing_pe'] = info.get('trailingPE')
+        fields['forward_pe'] = info.get('forwardPE')
+
+        trade_dates.append(ticker_date)
+        market_data[ticker] = fields
+        if verbose:
+            if ticker in info_errors:
+                print(f"    {ticker}: P/E unavailable ({info_errors[ticker]})")
+            print(f"    {ticker}... ${fields['close']:.2f} ({fields['change_pct']:+.1f}%)")
+
+    # 4.4.4 - Determine trade date (mode of all dates)
+    trade_date = trade_date_mode(trade_dates)
+    if trade_date:
+        market_data['_trade_date'] = trade_date
+
+    return market_data
+
+
+def fetch_market_data_sequential(tickers, provider, verbose=False):
+    """
+    4.5 - Reference implementation of the original one-ticker-at-a-time loop
+
+    Kept so benchmarks can compare the engine against the old behavior
+    using the same provider.
+    """
+    market_data = {}
+    trade_dates = []
+
+    for ticker in tickers:
+        try:
+            summary = summarize_history(provider.history(ticker))
+            if summary is None:
+                continue
+            ticker_date, fields = summary
+            try:
+                info = provider.info(ticker)
+                fields['trailing_pe'] = info.get('trailingPE')
+                fields['forward_pe'] = info.get('forwardPE')
+            except Exception:
+                pass
+            trade_dates.append(ticker_date)
+            market_data[ticker] = fields
+        except Exception as e:
+            if verbose:
+                print(f"    {ticker}... ERROR: {e}")
+
+    trade_date = trade_date_mode(trade_dates)
+    if trade_date:
+        market_data['_trade_date'] = trade_date
+
+    return market_data
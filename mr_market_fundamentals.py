@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET FUNDAMENTALS - TTL cache for stock.info and local P/E history
+===============================================================================
+Purpose: Stop blocking the daily run on stock.info (the slowest and most
+throttled Yahoo endpoint) for two numbers that barely move:
+    1. Cache    - the info fields the script reads are kept per ticker in
+                  the price-history database, each with its own TTL (P/E a
+                  day, EPS a week)
+    2. Refresh  - expired tickers are served their cached values at once
+                  and refreshed on a background thread pool
+                  (stale-while-revalidate); only a ticker with nothing
+                  cached waits for its request. Failures are reported with
+                  the age of the values served instead
+    3. P/E      - a stale P/E is re-derived from today's close and the
+                  cached EPS (which changes once a quarter), so serving
+                  stale info never shows yesterday's multiple
+    4. History  - the P/E used each trade date is stored per ticker, and
+                  backfill_pe_history() rebuilds past daily trailing P/E
+                  from reported quarterly EPS and the stored closes, so a
+                  5-year average P/E is a local query
+
+Usage:
+    fundamentals = FundamentalsStore(HISTORY_DB_FILE)
+    pe = fundamentals.pe_ratios(closes, provider)        # {ticker: (trailing, forward)}
+    fundamentals.record_pe(trade_date, pe)
+    averages = fundamentals.pe_averages(tickers, trade_date)
+    fundamentals.finish()                                # wait for refreshes, close
+===============================================================================
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+import sqlite3
+import threading
+import time
+
+from mr_market_fetch import INFO_TIMEOUT_SECONDS, MAX_RETRIES, call_with_retries
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+DAY = 86400
+
+# 1.1 - stock.info fields kept, and how long each stays fresh (seconds)
+FIELD_TTLS = {
+    'trailingPE': DAY,                # Moves with the price every day
+    'forwardPE': DAY,
+    'trailingEps': 7 * DAY,           # Change once a quarter (earnings, estimates)
+    'forwardEps': 7 * DAY,
+}
+
+# 1.2 - P/E field -> the EPS field it is re-derived from when stale
+PE_FROM_EPS = {'trailingPE': 'trailingEps', 'forwardPE': 'forwardEps'}
+
+# 1.3 - Values older than this are not served at all
+MAX_STALE_SECONDS = 30 * DAY
+
+# 1.4 - Background refresh
+REFRESH_WORKERS = 4
+FINISH_TIMEOUT_SECONDS = 30.0        # How long the end of a run waits for refreshes
+
+# 1.5 - Average P/E
+PE_AVERAGE_YEARS = 5
+MIN_PE_OBSERVATIONS = 20             # Fewer stored days: no average shown
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    ticker  TEXT NOT NULL,
+    field   TEXT NOT NULL,
+    value   REAL,
+    fetched REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS pe_history (
+    ticker      TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    trailing_pe REAL,
+    forward_pe  REAL,
+    source      TEXT NOT NULL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+"""
+
+
+def _number(value):
+    """1.6 - A usable info value as float (None for missing, text or NaN)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != value:
+        return None
+    return float(value)
+
+
+# =============================================================================
+# BLOCK 2: FUNDAMENTALS STORE
+# =============================================================================
+
+class FundamentalsStore:
+    """
+    2.1 - Per-field TTL cache of stock.info plus the P/E history
+
+    One connection shared with the refresh threads behind a lock (the
+    writes are a handful of rows per ticker).
+    """
+
+    def __init__(self, path, ttls=None, workers=REFRESH_WORKERS):
+        self.path = path
+        self.ttls = dict(FIELD_TTLS, **(ttls or {}))
+        self.workers = workers
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._pool = None
+        self.refreshing = {}
+        self.errors = {}
+        self.reported = set()
+
+    def close(self):
+        self.conn.close()
+
+    # -------------------------------------------------------------------------
+    # 2.2 - Cache
+    # -------------------------------------------------------------------------
+
+    def cached(self, tickers):
+        """2.2.1 - {ticker: {field: (value, fetched)}} for servable values"""
+        oldest = time.time() - MAX_STALE_SECONDS
+        values = {}
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT ticker, field, value, fetched FROM fundamentals WHERE fetched >= ?",
+                (oldest,)).fetchall()
+        wanted = set(tickers)
+        for ticker, field, value, fetched in rows:
+            if ticker in wanted and field in self.ttls:
+                values.setdefault(ticker, {})[field] = (value, fetched)
+        return values
+
+    def is_fresh(self, entry, field, now=None):
+        """2.2.2 - Is the cached (value, fetched) of field within its TTL?"""
+        return entry is not None and (now or time.time()) - entry[1] < self.ttls[field]
+
+    def store(self, ticker, info):
+        """2.2.3 - Keep the TTL fields of one info dict (missing ones as NULL)"""
+        now = time.time()
+        rows = [(ticker, field, _number(info.get(field)), now) for field in self.ttls]
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?)", rows)
+
+    def _refresh(self, ticker, provider, retries):
+        """2.2.4 - One stock.info request into the cache (runs on the pool)"""
+        info = call_with_retries(provider.info, ticker, retries=retries)
+        self.store(ticker, info or {})
+        return info
+
+    def refresh(self, tickers, provider, retries=MAX_RETRIES):
+        """2.2.5 - Queue background refreshes; {ticker: future}"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers)
+            for ticker in tickers:
+                if ticker not in self.refreshing:
+                    self.refreshing[ticker] = self._pool.submit(self._refresh, ticker,
+                                                                provider, retries)
+            return {t: self.refreshing[t] for t in tickers}
+
+    def lookup(self, tickers, provider, timeout=INFO_TIMEOUT_SECONDS, retries=MAX_RETRIES,
+               verbose=True):
+        """
+        2.2.6 - {ticker: {field: (value, fetched)}}, never waiting on stale tickers
+
+        Tickers with any expired field are refreshed in the background
+        and served what is cached; tickers with nothing cached wait up to
+        `timeout` for their request. Failures are printed, not swallowed.
+        """
+        cached = self.cached(tickers)
+        now = time.time()
+        expired = [t for t in tickers
+                   if any(not self.is_fresh(cached.get(t, {}).get(f), f, now) for f in self.ttls)]
+        futures = self.refresh(expired, provider, retries)
+
+        started = time.monotonic()
+        for ticker in expired:
+            if ticker in cached:
+                continue
+            remaining = max(0.0, timeout - (time.monotonic() - started))
+            try:
+                futures[ticker].result(timeout=remaining)
+            except FutureTimeout:
+                self.errors[ticker] = f"timeout after {timeout:.0f}s"
+            except Exception as e:
+                self.errors[ticker] = str(e) or type(e).__name__
+            if ticker in self.errors and verbose:
+                print(f"    {ticker}: P/E unavailable ({self.errors[ticker]})")
+                self.reported.add(ticker)
+
+        if expired and verbose:
+            stale = len([t for t in expired if t in cached])
+            print(f"    Fundamentals: {len(tickers) - len(expired)} fresh, {stale} stale "
+                  f"(refreshing in background), {len(expired) - stale} fetched")
+        return dict(cached, **self.cached([t for t in expired if t not in cached]))
+
+    def pe_ratios(self, closes, provider, **lookup_kwargs):
+        """
+        2.2.7 - {ticker: (trailing_pe, forward_pe)} for today's closes
+
+        A P/E within its TTL is used as stored. A stale one is today's
+        close over the cached EPS when that is positive, else the stale
+        value itself.
+        """
+        cached = self.lookup(list(closes), provider, **lookup_kwargs)
+        now = time.time()
+        ratios = {}
+        for ticker, close in closes.items():
+            entry = cached.get(ticker, {})
+            pair = []
+            for pe_field, eps_field in PE_FROM_EPS.items():
+                pe = entry.get(pe_field)
+                eps = entry.get(eps_field)
+                if self.is_fresh(pe, pe_field, now) or not eps or not eps[0] or eps[0] <= 0:
+                    pair.append(pe[0] if pe else None)
+                else:
+                    pair.append(close / eps[0])
+            ratios[ticker] = tuple(pair)
+        return ratios
+
+    def finish(self, timeout=FINISH_TIMEOUT_SECONDS, verbose=True):
+        """2.2.8 - Let background refreshes land (bounded), report failures, close"""
+        with self._lock:
+            pending = dict(self.refreshing)
+            pool = self._pool
+        deadline = time.monotonic() + timeout
+        for ticker, future in pending.items():
+            try:
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                self.errors.setdefault(ticker, f"refresh still running after {timeout:.0f}s")
+            except Exception as e:
+                self.errors.setdefault(ticker, str(e) or type(e).__name__)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        failed = {t: e for t, e in self.errors.items() if t not in self.reported}
+        if verbose and failed:
+            cached = self.cached(list(failed))
+            for ticker, error in sorted(failed.items()):
+                fetched = max((e[1] for e in cached.get(ticker, {}).values()), default=None)
+                served = (f"serving values from {datetime.fromtimestamp(fetched):%Y-%m-%d}"
+                          if fetched else "no values cached")
+                print(f"    Fundamentals refresh failed: {ticker} - {error} ({served})")
+        self.close()
+        return self.errors
+
+    # -------------------------------------------------------------------------
+    # 2.3 - P/E history
+    # -------------------------------------------------------------------------
+
+    def record_pe(self, trade_date, ratios, source='daily'):
+        """2.3.1 - Store the (trailing, forward) P/E each ticker used on trade_date"""
+        rows = [(t, trade_date, pe[0], pe[1], source) for t, pe in ratios.items()
+                if pe[0] is not None or pe[1] is not None]
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO pe_history VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def backfill_pe(self, ticker, dates, ratios):
+        """2.3.2 - Add rebuilt trailing P/E days; days already stored are kept"""
+        rows = [(ticker, d, pe, None, 'eps') for d, pe in zip(dates, ratios) if pe is not None]
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO pe_history VALUES (?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def pe_averages(self, tickers, trade_date, years=PE_AVERAGE_YEARS,
+                    min_observations=MIN_PE_OBSERVATIONS):
+        """
+        2.3.3 - {ticker: (average trailing P/E, years covered)} up to trade_date
+
+        Only positive P/Es count (a loss year has no meaningful multiple);
+        tickers with fewer than min_observations stored days are left out.
+        """
+        end = datetime.strptime(trade_date, "%Y-%m-%d")
+        start = (end - timedelta(days=round(365.25 * years))).strftime("%Y-%m-%d")
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT ticker, AVG(trailing_pe), MIN(date), COUNT(*) FROM pe_history "
+                "WHERE date > ? AND date <= ? AND trailing_pe > 0 GROUP BY ticker",
+                (start, trade_date)).fetchall()
+        wanted = set(tickers)
+        return {t: (avg, (end - datetime.strptime(first, "%Y-%m-%d")).days / 365.25)
+                for t, avg, first, n in rows if t in wanted and n >= min_observations}
+
+
+# =============================================================================
+# BLOCK 3: P/E BACKFILL
+# =============================================================================
+
+def trailing_pe_series(dates, closes, eps):
+    """
+    3.1 - Daily trailing P/E from closes and reported quarterly EPS
+
+    eps is {report date: EPS}; trailing-twelve-month EPS is the sum of
+    the last four reports on or before each day. Days before the fourth
+    report, or with TTM EPS <= 0, get None.
+    """
+    import numpy as np
+
+    report_dates = sorted(eps)
+    if len(report_dates) < 4:
+        return [None] * len(dates)
+    quarterly = np.array([eps[d] for d in report_dates], dtype=float)
+    ttm = np.convolve(quarterly, np.ones(4), mode='valid')      # ttm[k] ends at report k + 3
+    last_report = np.searchsorted(np.array(report_dates[3:]), np.array(dates), side='right') - 1
+    valid = last_report >= 0
+    ttm_per_day = np.where(valid, ttm[np.maximum(last_report, 0)], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pe = np.asarray(closes, dtype=float) / ttm_per_day
+    return [float(v) if ok and v > 0 else None for v, ok in zip(pe, valid & (ttm_per_day > 0))]
+
+
+def backfill_pe_history(fundamentals, history, tickers, provider, years=PE_AVERAGE_YEARS,
+                        verbose=True):
+    """
+    3.2 - Rebuild past daily trailing P/E from reported EPS and stored closes
+
+    Days already in the P/E history (observed by a daily run) are kept.
+    Returns {ticker: error}.
+    """
+    start = (datetime.now() - timedelta(days=round(365.25 * years) + 7)).strftime("%Y-%m-%d")
+    errors = {}
+    for ticker in tickers:
+        try:
+            eps = provider.earnings(ticker)
+        except Exception as e:
+            errors[ticker] = str(e) or type(e).__name__
+            continue
+        closes = history.closes_since(ticker, start)
+        dates = sorted(closes)
+        added = fundamentals.backfill_pe(
+            ticker, dates, trailing_pe_series(dates, [closes[d] for d in dates], eps or {}))
+        if verbose:
+            print(f"    {ticker}: {added} days of P/E from {len(eps or {})} EPS reports")
+        if not added:
+            errors[ticker] = "no P/E days (need four EPS reports and stored closes)"
+    return errors
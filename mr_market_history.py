@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET HISTORY STORE - Incremental local price-history store
+===============================================================================
+Purpose: Keep daily OHLCV bars on disk (SQLite, keyed by ticker + date) so a
+daily run only downloads the bars after the last stored date instead of
+re-downloading 400 days for every ticker.
+
+    1. update()   - fetch only new bars (one batch per distinct last date)
+    2. load_many() - read the rolling window the indicators need
+    3. repair()   - detect gaps and split/dividend re-adjustments and
+                    re-backfill the affected tickers
+    4. backfill() - extend stored history further back (for replays)
+    5. MinuteBarStore - 1-minute bars per trade date, fetched once and
+                    kept (Yahoo only serves ~30 days of them)
+
+Prices are stored as yfinance returns them (auto-adjusted). When a split or
+dividend re-adjusts old bars, the overlap check in update() notices the
+stored closes no longer match and re-downloads that ticker's full span.
+
+Usage:
+    python mr_market_roundtable.py --repair-history
+===============================================================================
+"""
+
+from datetime import datetime, timedelta
+import sqlite3
+
+from mr_market_fetch import HISTORY_DAYS, HISTORY_PERIOD, fetch_histories
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Incremental fetch
+OVERLAP_DAYS = 7                     # Re-fetch this many calendar days before the last bar
+ADJUSTMENT_TOLERANCE = 0.001         # >0.1% drift on overlapping closes = re-adjusted history
+
+# 1.2 - Reference trading calendar (VOO trades every US session)
+CALENDAR_TICKER = "VOO"
+
+# 1.3 - Schema
+BAR_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker  TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    open    REAL,
+    high    REAL,
+    low     REAL,
+    close   REAL,
+    volume  REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS minute_bars (
+    ticker  TEXT NOT NULL,
+    date    TEXT NOT NULL,
+    time    TEXT NOT NULL,
+    open    REAL,
+    high    REAL,
+    low     REAL,
+    close   REAL,
+    volume  REAL,
+    PRIMARY KEY (ticker, date, time)
+) WITHOUT ROWID;
+"""
+
+
+# =============================================================================
+# BLOCK 2: HISTORY STORE
+# =============================================================================
+
+class HistoryStore:
+    """
+    2.1 - SQLite-backed daily bar store
+
+    One row per (ticker, date). Dates are YYYY-MM-DD strings so they sort
+    and compare like the trade dates used everywhere else in the script.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def in_memory_copy(self):
+        """
+        2.1.1 - Throwaway copy of the store in memory
+
+        Updates to the copy never reach the file, e.g. the watch mode's
+        partial bar for a session that is still trading.
+        """
+        copy = HistoryStore(":memory:")
+        self.conn.backup(copy.conn)
+        return copy
+
+    # -------------------------------------------------------------------------
+    # 2.2 - Reads
+    # -------------------------------------------------------------------------
+
+    def last_dates(self):
+        """2.2.1 - {ticker: last stored date}"""
+        rows = self.conn.execute("SELECT ticker, MAX(date) FROM bars GROUP BY ticker")
+        return dict(rows.fetchall())
+
+    def spans(self):
+        """2.2.2 - {ticker: (first date, last date, bar count)}"""
+        rows = self.conn.execute(
+            "SELECT ticker, MIN(date), MAX(date), COUNT(*) FROM bars GROUP BY ticker")
+        return {t: (first, last, n) for t, first, last, n in rows.fetchall()}
+
+    def load(self, ticker, days=HISTORY_DAYS, start=None):
+        """
+        2.2.3 - Load one ticker as a Ticker.history()-shaped DataFrame
+
+        By default returns the last `days` calendar days before the last
+        stored bar (the same window the live 400d download covers).
+        """
+        import pandas as pd
+
+        if start is None:
+            last = self.conn.execute(
+                "SELECT MAX(date) FROM bars WHERE ticker = ?", (ticker,)).fetchone()[0]
+            if last is None:
+                return pd.DataFrame(columns=BAR_COLUMNS)
+            last_dt = datetime.strptime(last, "%Y-%m-%d")
+            start = (last_dt - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+        rows = self.conn.execute(
+            "SELECT date, open, high, low, close, volume FROM bars "
+            "WHERE ticker = ? AND date >= ? ORDER BY date",
+            (ticker, start)).fetchall()
+        index = pd.DatetimeIndex([r[0] for r in rows])
+        return pd.DataFrame([r[1:] for r in rows], index=index, columns=BAR_COLUMNS)
+
+    def load_many(self, tickers, days=HISTORY_DAYS, start=None):
+        """2.2.4 - {ticker: DataFrame} for every ticker with stored bars"""
+        frames = {}
+        for ticker in tickers:
+            frame = self.load(ticker, days=days, start=start)
+            if not frame.empty:
+                frames[ticker] = frame
+        return frames
+
+    # -------------------------------------------------------------------------
+    # 2.3 - Writes
+    # -------------------------------------------------------------------------
+
+    def upsert(self, ticker, frame):
+        """2.3.1 - Insert or replace bars from a history DataFrame"""
+        if frame is None or frame.empty:
+            return 0
+        frame = frame.dropna(subset=['Close'])
+        rows = [
+            (ticker, ts.strftime("%Y-%m-%d"), *(float(v) for v in values))
+            for ts, values in zip(frame.index, frame[BAR_COLUMNS].itertuples(index=False))
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def replace(self, ticker, frame):
+        """2.3.2 - Drop every stored bar for ticker, then store frame"""
+        with self.conn:
+            self.conn.execute("DELETE FROM bars WHERE ticker = ?", (ticker,))
+        return self.upsert(ticker, frame)
+
+    def closes_since(self, ticker, start):
+        """2.3.3 - {date: close} for stored bars on or after start"""
+        rows = self.conn.execute(
+            "SELECT date, close FROM bars WHERE ticker = ? AND date >= ?", (ticker, start))
+        return dict(rows.fetchall())
+
+    def is_readjusted(self, ticker, frame):
+        """
+        2.3.4 - True if fetched closes disagree with stored closes
+
+        Auto-adjusted prices are rewritten on every split and ex-dividend
+        date, so any drift on the overlapping bars means the stored history
+        is stale and must be re-downloaded in full.
+        """
+        if frame is None or frame.empty:
+            return False
+        stored = self.closes_since(ticker, frame.index[0].strftime("%Y-%m-%d"))
+        for ts, close in zip(frame.index, frame['Close']):
+            old = stored.get(ts.strftime("%Y-%m-%d"))
+            if old and abs(float(close) - old) / old > ADJUSTMENT_TOLERANCE:
+                return True
+        return False
+
+    # -------------------------------------------------------------------------
+    # 2.4 - Sync with a provider
+    # -------------------------------------------------------------------------
+
+    def update(self, tickers, provider, pool=None, verbose=True, **fetch_kwargs):
+        """
+        2.4.1 - Bring the store up to date, downloading only new bars
+
+        Tickers with no stored bars get the full HISTORY_PERIOD window.
+        Known tickers are grouped by last stored date and each group is one
+        batched request starting OVERLAP_DAYS before that date.
+
+        Returns {ticker: error} for tickers that could not be updated.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        own_pool = pool is None
+        if own_pool:
+            pool = ThreadPoolExecutor(max_workers=8)
+
+        last = self.last_dates()
+        groups = {}
+        for ticker in tickers:
+            groups.setdefault(last.get(ticker), []).append(ticker)
+
+        errors = {}
+        added = 0
+        refetched = []
+        try:
+            for last_date, group in groups.items():
+                if last_date is None:
+                    # 2.4.1.1 - New tickers: full window
+                    frames, errs = fetch_histories(group, provider, pool,
+                                                   period=HISTORY_PERIOD,
+                                                   verbose=verbose, **fetch_kwargs)
+                    for ticker, frame in frames.items():
+                        added += self.upsert(ticker, frame)
+                else:
+                    # 2.4.1.2 - Known tickers: only bars since the last stored date
+                    start = (datetime.strptime(last_date, "%Y-%m-%d")
+                             - timedelta(days=OVERLAP_DAYS)).strftime("%Y-%m-%d")
+                    frames, errs = fetch_histories(group, provider, pool, start=start,
+                                                   verbose=verbose, **fetch_kwargs)
+                    for ticker, frame in frames.items():
+                        if self.is_readjusted(ticker, frame):
+                            refetched.append(ticker)
+                            continue
+                        added += sum(1 for ts in frame.index
+                                     if ts.strftime("%Y-%m-%d") > last_date)
+                        self.upsert(ticker, frame)
+                errors.update(errs)
+                for ticker in group:
+                    if ticker not in frames and ticker not in errors:
+                        errors[ticker] = "no data"
+
+            # 2.4.1.3 - Split/dividend re-adjustments: re-download full span
+            if refetched:
+                errors.update(self.backfill(refetched, provider, pool=pool,
+                                            verbose=verbose, **fetch_kwargs))
+        finally:
+            if own_pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        if verbose:
+            print(f"    History store: +{added} bars", end="")
+            if refetched:
+                print(f", re-adjusted {', '.join(refetched)}", end="")
+            print()
+        return errors
+
+    def backfill(self, tickers, provider, start=None, pool=None, verbose=True, **fetch_kwargs):
+        """
+        2.4.2 - Re-download tickers from `start` and replace what is stored
+
+        With no start, each ticker's current first stored date is used
+        (or the HISTORY_PERIOD window if nothing is stored).
+        Returns {ticker: error}.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        own_pool = pool is None
+        if own_pool:
+            pool = ThreadPoolExecutor(max_workers=8)
+
+        spans = self.spans()
+        groups = {}
+        for ticker in tickers:
+            first = start or spans.get(ticker, (None,))[0]
+            groups.setdefault(first, []).append(ticker)
+
+        errors = {}
+        try:
+            for first, group in groups.items():
+                if first is None:
+                    frames, errs = fetch_histories(group, provider, pool, period=HISTORY_PERIOD,
+                                                   verbose=verbose, **fetch_kwargs)
+                else:
+                    frames, errs = fetch_histories(group, provider, pool, start=first,
+                                                   verbose=verbose, **fetch_kwargs)
+                for ticker, frame in frames.items():
+                    if frame is not None and not frame.empty:
+                        self.replace(ticker, frame)
+                errors.update(errs)
+        finally:
+            if own_pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+        return errors
+
+    # -------------------------------------------------------------------------
+    # 2.5 - Integrity checks
+    # -------------------------------------------------------------------------
+
+    def find_gaps(self, tickers, calendar_ticker=CALENDAR_TICKER):
+        """
+        2.5.1 - {ticker: [missing dates]} against a reference trading calendar
+
+        The calendar is the calendar_ticker's stored dates (VOO trades every
+        US session). A date counts as missing only inside the ticker's own
+        first..last span, so recent IPOs like GEV are not flagged.
+        """
+        calendar = [r[0] for r in self.conn.execute(
+            "SELECT date FROM bars WHERE ticker = ? ORDER BY date", (calendar_ticker,))]
+        if not calendar:
+            return {}
+
+        spans = self.spans()
+        gaps = {}
+        for ticker in tickers:
+            if ticker == calendar_ticker or ticker not in spans:
+                continue
+            first, last, _ = spans[ticker]
+            stored = {r[0] for r in self.conn.execute(
+                "SELECT date FROM bars WHERE ticker = ?", (ticker,))}
+            missing = [d for d in calendar if first <= d <= last and d not in stored]
+            if missing:
+                gaps[ticker] = missing
+        return gaps
+
+    def repair(self, tickers, provider, verbose=True):
+        """
+        2.5.2 - Re-backfill tickers with gaps or re-adjusted history
+
+        Returns (repaired tickers, {ticker: error}).
+        """
+        gaps = self.find_gaps(tickers)
+        for ticker, missing in gaps.items():
+            if verbose:
+                print(f"    GAP: {ticker} missing {len(missing)} bar(s) "
+                      f"({missing[0]} .. {missing[-1]})")
+
+        # 2.5.2.1 - Compare the last OVERLAP_DAYS of every ticker with the feed
+        last = self.last_dates()
+        stale = []
+        for ticker in tickers:
+            if ticker not in last or ticker in gaps:
+                continue
+            start = (datetime.strptime(last[ticker], "%Y-%m-%d")
+                     - timedelta(days=OVERLAP_DAYS)).strftime("%Y-%m-%d")
+            try:
+                frame = provider.history(ticker, start=start)
+            except Exception as e:
+                if verbose:
+                    print(f"    ERROR: {ticker} - {e}")
+                continue
+            if self.is_readjusted(ticker, frame):
+                stale.append(ticker)
+                if verbose:
+                    print(f"    ADJUSTED: {ticker} - split/dividend changed stored prices")
+
+        missing_entirely = [t for t in tickers if t not in last]
+        to_fix = sorted(set(gaps) | set(stale) | set(missing_entirely))
+        errors = self.backfill(to_fix, provider, verbose=verbose) if to_fix else {}
+        repaired = [t for t in to_fix if t not in errors]
+        return repaired, errors
+
+    def trades_on(self, date, calendar_ticker=CALENDAR_TICKER):
+        """2.5.3 - True if the calendar ticker has a stored bar on date (YYYY-MM-DD)"""
+        return self.conn.execute("SELECT 1 FROM bars WHERE ticker = ? AND date = ?",
+                                 (calendar_ticker, date)).fetchone() is not None
+
+
+# =============================================================================
+# BLOCK 3: MINUTE BARS
+# =============================================================================
+
+class MinuteBarStore:
+    """
+    3.1 - 1-minute bars per (ticker, trade date), same database file
+
+    Times are HH:MM on the exchange clock. Only sessions that have closed
+    are fetched, so a (ticker, date) that has any stored bars is complete
+    and never fetched again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def stored_tickers(self, date):
+        """3.1.1 - Tickers with minute bars stored for date"""
+        rows = self.conn.execute(
+            "SELECT DISTINCT ticker FROM minute_bars WHERE date = ?", (date,))
+        return {r[0] for r in rows}
+
+    def upsert(self, ticker, date, frame):
+        """3.1.2 - Store one ticker's minute bars for date"""
+        if frame is None or frame.empty:
+            return 0
+        frame = frame.dropna(subset=['Close'])
+        rows = [
+            (ticker, date, ts.strftime("%H:%M"), *(float(v) for v in values))
+            for ts, values in zip(frame.index, frame[BAR_COLUMNS].itertuples(index=False))
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO minute_bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def ensure(self, tickers, date, provider, verbose=True, clock=None):
+        """
+        3.1.3 - Fetch minute bars for tickers not yet stored for date
+
+        One batched provider call for everything missing. Returns
+        {ticker: error} (a ticker the provider did not return is an error).
+        Nothing is fetched for a session that has not closed yet on the
+        exchange clock: its bars would be partial and never refetched.
+        """
+        from mr_market_watch import MARKET_CLOSE, market_now
+
+        missing = [t for t in tickers if t not in self.stored_tickers(date)]
+        if not missing:
+            return {}
+        now = (clock or market_now)()
+        today = now.strftime("%Y-%m-%d")
+        if date > today or (date == today and now.time() < MARKET_CLOSE):
+            if verbose:
+                print(f"    Session {date} has not closed; minute bars not stored")
+            return {t: RuntimeError("session not closed") for t in missing}
+        try:
+            frames = provider.minute_bars(missing, date)
+        except Exception as e:
+            if verbose:
+                print(f"    Minute-bar download failed: {e}")
+            return {t: e for t in missing}
+        for ticker, frame in frames.items():
+            self.upsert(ticker, date, frame)
+        stored = self.stored_tickers(date)
+        return {t: RuntimeError("no minute bars") for t in missing if t not in stored}
+
+    def load_panel(self, tickers, date):
+        """
+        3.1.4 - Minute bars for date as (ticker x minute) arrays
+
+        Returns {'tickers', 'times', 'Open'..'Volume'}; minutes a ticker did
+        not trade are NaN (Volume 0). Tickers with no bars are left out.
+        """
+        import numpy as np
+
+        rows = self.conn.execute(
+            "SELECT ticker, time, open, high, low, close, volume FROM minute_bars "
+            "WHERE date = ? ORDER BY time", (date,)).fetchall()
+        wanted = set(tickers)
+        rows = [r for r in rows if r[0] in wanted]
+        present = {r[0] for r in rows}
+        names = [t for t in tickers if t in present]
+        times = sorted({r[1] for r in rows})
+        row_of = {t: i for i, t in enumerate(names)}
+        col_of = {t: j for j, t in enumerate(times)}
+
+        panel = {'tickers': names, 'times': times}
+        for field in BAR_COLUMNS:
+            panel[field] = np.full((len(names), len(times)), np.nan)
+        panel['Volume'][:] = 0.0
+        for ticker, hhmm, *values in rows:
+            i, j = row_of[ticker], col_of[hhmm]
+            for field, value in zip(BAR_COLUMNS, values):
+                panel[field][i, j] = value
+        return panel
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET INDICATORS - Vectorized indicator computation across all tickers
+===============================================================================
+Purpose: Lay every ticker out as one row of a 2-D (ticker x bar) array and
+compute all rolling statistics and alert distances in a single NumPy pass:
+    1. Price panel  - per-ticker histories right-aligned on their last bar
+    2. Indicators   - close, prev close, change %, 50-day MA, 52-week range,
+                       open, volume vs its 20-day average, 14-day RSI
+    3. Alert metrics - drawdown from high, distance to TARGETS / add_target,
+                       distance from 52-week low, % below 50-day MA
+    4. Rolling series - the same indicators for every date of a date-aligned
+                       panel at once (used by the historical replay)
+
+Right-aligning each ticker on its own last bar (instead of on a shared date
+axis) keeps the exact semantics of the old per-ticker pandas code: tail(50)
+and tail(252) are column slices, and shorter histories are NaN-padded on
+the left so nanmean/nanmin/nanmax behave like mean/min/max of what exists.
+===============================================================================
+"""
+
+import warnings
+
+import numpy as np
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Rolling windows (in bars)
+MA_WINDOW = 50
+RANGE_WINDOW = 252
+VOLUME_WINDOW = 20      # Average volume of the bars before today
+RSI_WINDOW = 14         # Simple-average RSI over the last 14 changes
+
+# 1.2 - Panel fields pulled from each history DataFrame
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# =============================================================================
+# BLOCK 2: PRICE PANEL
+# =============================================================================
+
+def build_panel(histories, tickers, width=None):
+    """
+    2.1 - Stack per-ticker histories into right-aligned 2-D arrays
+
+    Returns a dict:
+        'tickers'  - list of tickers with >= 2 bars (row order)
+        'dates'    - last bar date per row (YYYY-MM-DD)
+        'lengths'  - bar count per row
+        'Open'..'Volume' - float arrays (rows x width), NaN-padded on the left
+
+    width defaults to the longest history; pass RANGE_WINDOW to keep only
+    what the indicators need.
+    """
+    rows = [t for t in tickers
+            if histories.get(t) is not None and len(histories[t]) >= 2]
+    lengths = np.array([len(histories[t]) for t in rows], dtype=np.int64)
+    if width is None:
+        width = int(lengths.max()) if len(rows) else 0
+
+    panel = {'tickers': rows, 'lengths': np.minimum(lengths, width) if len(rows) else lengths}
+    for field in PANEL_FIELDS:
+        panel[field] = np.full((len(rows), width), np.nan)
+
+    dates = []
+    for i, ticker in enumerate(rows):
+        hist = histories[ticker]
+        n = min(len(hist), width)
+        for field in PANEL_FIELDS:
+            if field in hist:
+                panel[field][i, width - n:] = hist[field].to_numpy(dtype=float)[-n:]
+        dates.append(hist.index[-1].strftime("%Y-%m-%d"))
+    panel['dates'] = dates
+    return panel
+
+
+# =============================================================================
+# BLOCK 3: INDICATORS
+# =============================================================================
+
+def compute_indicators(panel):
+    """
+    3.1 - One vectorized pass over the panel
+
+    Returns a dict of 1-D arrays aligned with panel['tickers'].
+    """
+    close = panel['Close']
+    if close.shape[0] == 0:
+        empty = np.array([])
+        return {k: empty for k in ['close', 'low', 'prev_close', 'change_pct', 'ma_50',
+                                   'week_52_low', 'week_52_high', 'open', 'volume',
+                                   'volume_avg', 'rsi_14']}
+
+    last_close = close[:, -1]
+    prev_close = close[:, -2]
+
+    # Shorter-than-window histories are NaN on the left, so nan-reductions
+    # over the last N columns equal the reductions over all available bars.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change_pct = (last_close - prev_close) / prev_close * 100
+    ma_50 = np.nanmean(close[:, -MA_WINDOW:], axis=1)
+    week_52_low = np.nanmin(panel['Low'][:, -RANGE_WINDOW:], axis=1)
+    week_52_high = np.nanmax(panel['High'][:, -RANGE_WINDOW:], axis=1)
+
+    # 3.1.1 - Volume vs the bars before today, simple-average RSI (warnings
+    # for windows that are all left-padding are silenced; those stay NaN)
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        volume_avg = np.nanmean(panel['Volume'][:, -VOLUME_WINDOW - 1:-1], axis=1)
+        changes = np.diff(close[:, -RSI_WINDOW - 1:], axis=1)
+        gain = np.nanmean(np.clip(changes, 0, None), axis=1)
+        loss = np.nanmean(np.clip(-changes, 0, None), axis=1)
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / loss), 100.0)
+
+    return {
+        'close': last_close,
+        'low': panel['Low'][:, -1],
+        'prev_close': prev_close,
+        'change_pct': change_pct,
+        'ma_50': ma_50,
+        'week_52_low': week_52_low,
+        'week_52_high': week_52_high,
+        'open': panel['Open'][:, -1],
+        'volume': panel['Volume'][:, -1],
+        'volume_avg': volume_avg,
+        'rsi_14': rsi,
+    }
+
+
+def summarize_panel(histories, tickers):
+    """
+    3.2 - Vectorized replacement for summarize_history over many tickers
+
+    Returns {ticker: (trade_date, fields)} in the same shape as
+    mr_market_fetch.summarize_history, P/E fields left as None.
+    """
+    panel = build_panel(histories, tickers, width=RANGE_WINDOW)
+    ind = compute_indicators(panel)
+
+    summaries = {}
+    for i, ticker in enumerate(panel['tickers']):
+        fields = {k: ind[k][i] for k in ind}
+        fields['trailing_pe'] = None
+        fields['forward_pe'] = None
+        summaries[ticker] = (panel['dates'][i], fields)
+    return summaries
+
+
+# =============================================================================
+# BLOCK 4: ALERT METRICS
+# =============================================================================
+
+def _column(market_data, tickers, key):
+    """4.1 - Pull one market_data field for all tickers as a float array"""
+    return np.array([market_data[t][key] for t in tickers], dtype=float)
+
+
+def target_levels(targets, tickers):
+    """
+    4.1.1 - (target, add_target) float arrays aligned with tickers
+
+    targets is a TARGETS-shaped dict or a Watchlist (read straight from
+    its record array); unlisted tickers get 0 (no target).
+    """
+    if hasattr(targets, 'levels'):
+        return targets.levels(tickers)
+    return (np.array([targets.get(t, {}).get('target', 0) for t in tickers], dtype=float),
+            np.array([targets.get(t, {}).get('add_target', 0) for t in tickers], dtype=float))
+
+
+def alert_metrics(market_data, targets, tickers=None):
+    """
+    4.2 - Every alert distance for every ticker in one vectorized pass
+
+    Returns a dict of 1-D arrays aligned with the returned 'tickers' list.
+    Target distances are NaN where the ticker has no (positive) target.
+    """
+    if tickers is None:
+        tickers = [t for t in market_data if not t.startswith('_')]
+
+    close = _column(market_data, tickers, 'close')
+    ma_50 = _column(market_data, tickers, 'ma_50')
+    week_52_low = _column(market_data, tickers, 'week_52_low')
+    week_52_high = _column(market_data, tickers, 'week_52_high')
+    target, add_target = target_levels(targets, tickers)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        target_distance = np.where(target > 0, (close - target) / target * 100, np.nan)
+        add_distance = np.where(add_target > 0, (close - add_target) / add_target * 100, np.nan)
+        distance_from_low = (close - week_52_low) / week_52_low * 100
+        pct_below_ma = (ma_50 - close) / ma_50 * 100
+        drawdown_from_high = (week_52_high - close) / week_52_high * 100
+
+    return {
+        'tickers': list(tickers),
+        'change_pct': _column(market_data, tickers, 'change_pct'),
+        'target': target,
+        'add_target': add_target,
+        'target_distance_pct': target_distance,
+        'add_target_distance_pct': add_distance,
+        'distance_from_low_pct': distance_from_low,
+        'pct_below_ma': pct_below_ma,
+        'drawdown_from_high_pct': drawdown_from_high,
+    }
+
+
+def alert_masks(metrics, drop_threshold, target_threshold, near_low_threshold,
+                below_ma_threshold):
+    """
+    4.3 - Boolean masks for the four detect_alerts conditions
+
+    NaN comparisons are False, so tickers with no target never trip Track 3.
+    """
+    with np.errstate(invalid='ignore'):
+        return {
+            'track2': metrics['change_pct'] <= -drop_threshold,
+            'track3': metrics['target_distance_pct'] <= target_threshold,
+            'near_low': metrics['distance_from_low_pct'] <= near_low_threshold,
+            'below_ma': metrics['pct_below_ma'] >= below_ma_threshold,
+        }
+
+
+# =============================================================================
+# BLOCK 5: ROLLING SERIES (DATE-ALIGNED PANELS)
+# =============================================================================
+
+def rolling_indicators(close, low, high):
+    """
+    5.1 - Indicators for every (ticker, date) of a date-aligned panel
+
+    Inputs are (tickers x dates) arrays. Each value uses only bars up to
+    and including that date, with the same short-history rule as the live
+    run (fewer than N bars -> use what exists). Returns a dict of 2-D
+    arrays with the alert_metrics() field names plus ma_50 / 52-week range.
+    """
+    import pandas as pd
+
+    # pandas' rolling min/max/mean are O(n) per series and skip NaNs;
+    # the frames are (dates x tickers) so each column is one ticker.
+    close_df = pd.DataFrame(close.T)
+    ma_50 = close_df.rolling(MA_WINDOW, min_periods=1).mean().to_numpy().T
+    week_52_low = pd.DataFrame(low.T).rolling(RANGE_WINDOW, min_periods=1).min().to_numpy().T
+    week_52_high = pd.DataFrame(high.T).rolling(RANGE_WINDOW, min_periods=1).max().to_numpy().T
+
+    prev_close = np.full_like(close, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'prev_close': prev_close,
+            'change_pct': (close - prev_close) / prev_close * 100,
+            'ma_50': ma_50,
+            'week_52_low': week_52_low,
+            'week_52_high': week_52_high,
+            'distance_from_low_pct': (close - week_52_low) / week_52_low * 100,
+            'pct_below_ma': (ma_50 - close) / ma_50 * 100,
+            'drawdown_from_high_pct': (week_52_high - close) / week_52_high * 100,
+        }
+
+
+def target_distances(close, target):
+    """5.2 - % distance of every close to a per-ticker level (NaN where level <= 0)"""
+    level = np.asarray(target, dtype=float)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(level > 0, (close - level) / level * 100, np.nan)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET LEDGER - In-memory model of the tracker workbook
+===============================================================================
+Purpose: Load mr_market_tracker.xlsx once (read-only, values only), run every
+tracker mutation against indexed in-memory tables, and write the changes back
+to the workbook in a single pass.
+
+Tables (one per sheet, rows are dicts keyed by the sheet's header names):
+    - Positions       indexed by Ticker (includes the CASH/TOTAL/PORTFOLIO rows)
+    - Pending_Orders  rewritten in full when rows are removed
+    - Action_Log      append-only
+    - Benchmark       append-only
+
+Only cells that actually changed are written back, so the formula columns
+in Positions (Total_Invested, Market_Value, ...) and every other sheet are
+left untouched.
+
+Usage:
+    ledger = Ledger.load(TRACKER_FILE)
+    ledger.positions.find('MSFT')['Shares']
+    ledger.save(TRACKER_FILE)
+===============================================================================
+"""
+
+import contextlib
+import os
+import tempfile
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Sheets the ledger manages, with their index column (None = no index)
+LEDGER_SHEETS = {
+    'Positions': 'Ticker',
+    'Pending_Orders': None,
+    'Action_Log': None,
+    'Benchmark': None,
+}
+
+# 1.2 - Number formats applied to cells the ledger writes
+NUMBER_FORMATS = {
+    'Benchmark': {'VOO_Return': '0.0%', 'Portfolio_Return': '0.0%', 'Alpha': '0.0%'},
+}
+
+
+# =============================================================================
+# BLOCK 2: TABLE
+# =============================================================================
+
+class Table:
+    """
+    2.1 - One sheet as a list of row dicts plus change tracking
+
+    row_ids[i] identifies where rows[i] was loaded from (worksheet row
+    number for the workbook, rowid for SQLite; None for rows appended in
+    this run). Cell edits must go through set() so save() knows what to
+    write back.
+    """
+
+    def __init__(self, name, columns, rows, row_ids, key=None):
+        self.name = name
+        self.columns = columns
+        self.rows = rows
+        self.row_ids = row_ids
+        self.key = key
+        self.dirty = set()           # (row id, column name)
+        self.removed_ids = []
+        self.index = {}
+        self.reindex()
+
+    @property
+    def rows_removed(self):
+        return bool(self.removed_ids)
+
+    def reindex(self):
+        """2.1.1 - Rebuild the key -> row index (first occurrence wins)"""
+        self.index = {}
+        if self.key:
+            for i, row in enumerate(self.rows):
+                value = row.get(self.key)
+                if value is not None and value not in self.index:
+                    self.index[value] = i
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def find(self, key_value):
+        """2.1.2 - Row dict for key_value, or None (O(1))"""
+        i = self.index.get(key_value)
+        return None if i is None else self.rows[i]
+
+    def set(self, row, column, value):
+        """2.1.3 - Update one cell of a row dict and mark it dirty"""
+        row[column] = value
+        row_id = self.row_ids[self._position(row)]
+        if row_id is not None:
+            self.dirty.add((row_id, column))
+
+    def append(self, values):
+        """2.1.4 - Append a row (dict keyed by column name)"""
+        row = {c: values.get(c) for c in self.columns}
+        self.rows.append(row)
+        self.row_ids.append(None)
+        if self.key and row.get(self.key) is not None:
+            self.index.setdefault(row[self.key], len(self.rows) - 1)
+        return row
+
+    def remove(self, rows_to_remove):
+        """2.1.5 - Remove the given row dicts (by identity)"""
+        drop = {id(r) for r in rows_to_remove}
+        if not drop:
+            return
+        keep = []
+        for i, r in enumerate(self.rows):
+            if id(r) not in drop:
+                keep.append(i)
+            elif self.row_ids[i] is not None:
+                self.removed_ids.append(self.row_ids[i])
+        removed = set(self.removed_ids)
+        self.rows = [self.rows[i] for i in keep]
+        self.row_ids = [self.row_ids[i] for i in keep]
+        self.dirty = {(rid, c) for rid, c in self.dirty if rid not in removed}
+        self.reindex()
+
+    def mark_clean(self):
+        """2.1.6 - Forget recorded changes (after they were persisted)"""
+        self.dirty = set()
+        self.removed_ids = []
+
+    def _position(self, row):
+        """2.1.7 - Index of a row dict in self.rows (keyed rows use the index)"""
+        if self.key:
+            i = self.index.get(row.get(self.key))
+            if i is not None and self.rows[i] is row:
+                return i
+        for i, r in enumerate(self.rows):
+            if r is row:
+                return i
+        raise ValueError(f"row not in {self.name}")
+
+
+# =============================================================================
+# BLOCK 3: LEDGER
+# =============================================================================
+
+class Ledger:
+    """
+    3.1 - The four tracker tables loaded from one workbook
+
+    Attributes mirror the sheet names: positions, pending_orders,
+    action_log, benchmark. tables maps sheet name -> Table.
+    """
+
+    def __init__(self, tables, path=None):
+        self.tables = tables
+        self.path = path
+        self.positions = tables['Positions']
+        self.pending_orders = tables['Pending_Orders']
+        self.action_log = tables['Action_Log']
+        self.benchmark = tables['Benchmark']
+
+    @classmethod
+    def load(cls, path):
+        """3.1.1 - Read every ledger sheet in one read-only, values-only pass"""
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True)
+        tables = {}
+        try:
+            for name, key in LEDGER_SHEETS.items():
+                rows_iter = wb[name].iter_rows(values_only=True)
+                header = next(rows_iter, ())
+                columns = [c for c in header if c is not None]
+                rows = []
+                row_ids = []
+                for sheet_row, values in enumerate(rows_iter, start=2):
+                    if values is None or all(v is None for v in values):
+                        continue
+                    rows.append({c: (values[i] if i < len(values) else None)
+                                 for i, c in enumerate(columns)})
+                    row_ids.append(sheet_row)
+                tables[name] = Table(name, columns, rows, row_ids, key=key)
+        finally:
+            wb.close()
+        return cls(tables, path)
+
+    def save(self, path=None):
+        """
+        3.1.2 - Write all changes back to the workbook in one pass
+
+        Rows removed from a table rewrite that table's body; otherwise only
+        dirty cells and appended rows are written.
+        """
+        from openpyxl import load_workbook
+        path = path or self.path
+        wb = load_workbook(path)
+
+        for name, table in self.tables.items():
+            ws = wb[name]
+            col_num = {c: i + 1 for i, c in enumerate(table.columns)}
+            formats = NUMBER_FORMATS.get(name, {})
+
+            def write(sheet_row, row, columns):
+                for c in columns:
+                    cell = ws.cell(row=sheet_row, column=col_num[c], value=row.get(c))
+                    if c in formats:
+                        cell.number_format = formats[c]
+
+            if table.rows_removed:
+                # 3.1.2.1 - Rewrite the body and clear leftover rows
+                old_max = ws.max_row
+                for i, row in enumerate(table.rows):
+                    write(i + 2, row, table.columns)
+                if old_max > len(table.rows) + 1:
+                    ws.delete_rows(len(table.rows) + 2, old_max - len(table.rows) - 1)
+                table.row_ids = list(range(2, len(table.rows) + 2))
+            else:
+                # 3.1.2.2 - Dirty cells on loaded rows, then appended rows
+                by_id = dict(zip(table.row_ids, table.rows))
+                for row_id, column in table.dirty:
+                    write(row_id, by_id[row_id], [column])
+                next_row = ws.max_row + 1
+                for i, row_id in enumerate(table.row_ids):
+                    if row_id is None:
+                        write(next_row, table.rows[i], table.columns)
+                        table.row_ids[i] = next_row
+                        next_row += 1
+
+            table.mark_clean()
+
+        wb.save(path)
+
+    def transaction(self):
+        """
+        3.1.3 - Scope for one atomic group of mutations
+
+        The workbook has no transactions (it is written once by save()),
+        so this is a no-op here; the SQLite ledger commits on exit.
+        """
+        return contextlib.nullcontext(self)
+
+
+# =============================================================================
+# BLOCK 4: WORKBOOK EXPORT
+# =============================================================================
+
+def export_workbook(ledger, path):
+    """
+    4.1 - Write a full snapshot of every ledger table into the workbook
+
+    Used when the ledger's system of record is not the workbook itself
+    (see mr_market_db). Each sheet body is rewritten from the table rows;
+    cells holding a formula in the existing workbook (the Positions
+    Total_Invested / Market_Value / ... columns) are kept as they are, so
+    the workbook still computes them. The file is replaced atomically so
+    a reader never sees a half-written workbook; the temp file has a
+    unique name, so concurrent exports never share it.
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(path)
+
+    for name, table in ledger.tables.items():
+        ws = wb[name]
+        col_num = {c: i + 1 for i, c in enumerate(table.columns)}
+        formats = NUMBER_FORMATS.get(name, {})
+
+        for i, row in enumerate(table.rows):
+            for c in table.columns:
+                cell = ws.cell(row=i + 2, column=col_num[c])
+                if isinstance(cell.value, str) and cell.value.startswith('='):
+                    continue
+                cell.value = row.get(c)
+                if c in formats:
+                    cell.number_format = formats[c]
+
+        extra = ws.max_row - (len(table.rows) + 1)
+        if extra > 0:
+            ws.delete_rows(len(table.rows) + 2, extra)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        wb.save(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET METRICS - Per-stage timing, run log and Prometheus textfile
+===============================================================================
+Purpose: Show where a slow daily run spent its time (Yahoo, the workbook
+save, the site build) without reading print output:
+    1. Stages   - `with metrics.stage('fetch'):` records wall time and a
+                  call count per pipeline stage; a stage may add the bytes
+                  it read or wrote
+    2. Fetches  - MeteredProvider wraps any provider and records every
+                  request per method and per ticker: time, calls, errors
+                  and payload size (in-memory size of the returned frames
+                  or info dict; yfinance does not expose wire bytes)
+    3. Run log  - one JSON line per run appended to run_log.jsonl
+    4. Textfile - optional Prometheus textfile (node_exporter textfile
+                  collector), replaced atomically on every run
+
+--profile in the main script additionally dumps a cProfile (pstats) file
+of the whole run, readable with `python -m pstats`, snakeviz, or
+flameprof/gprof2dot for a flame graph.
+
+Recording is a perf_counter() pair and a dict update under a lock, so it
+stays on for every run; thread-pool fetches are safe to meter.
+
+Usage:
+    metrics = RunMetrics('daily')
+    with metrics.stage('save') as stage:
+        save_tracker(ledger)
+        stage['bytes'] = os.path.getsize(TRACKER_FILE)
+    provider = MeteredProvider(YahooProvider(), metrics)
+    append_run_log(RUN_LOG_FILE, metrics.finish('ok'))
+===============================================================================
+"""
+
+from datetime import datetime
+import contextlib
+import json
+import os
+import threading
+import time
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Provider methods that are metered; single-ticker ones also per ticker
+METERED_METHODS = ('download_history', 'history', 'info', 'quotes', 'minute_bars', 'earnings',
+                   'statements')
+PER_TICKER_METHODS = ('history', 'info', 'earnings', 'statements')
+
+# 1.2 - Prometheus metric name prefix
+METRIC_PREFIX = "mr_market"
+
+
+# =============================================================================
+# BLOCK 2: RUN METRICS
+# =============================================================================
+
+def _counter():
+    return {'seconds': 0.0, 'calls': 0, 'bytes': 0, 'errors': 0}
+
+
+class RunMetrics:
+    """
+    2.1 - Stage, provider and per-ticker counters for one invocation
+
+    stages / provider / tickers are insertion-ordered dicts of
+    {'seconds', 'calls', 'bytes', 'errors'}; tickers is keyed
+    ticker -> method -> counter. record is the finish() record, once
+    the run has been finished.
+    """
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = datetime.now()
+        self._begin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.provider = {}
+        self.tickers = {}
+        self.fields = {}
+        self.record = None
+
+    def _add(self, table, key, seconds, nbytes=0, error=False):
+        with self._lock:
+            entry = table.setdefault(key, _counter())
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            entry['bytes'] += nbytes
+            entry['errors'] += int(error)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """2.1.1 - Time one stage; the yielded dict takes 'bytes'"""
+        extra = {'bytes': 0}
+        begin = time.perf_counter()
+        error = False
+        try:
+            yield extra
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self._add(self.stages, name, time.perf_counter() - begin, extra['bytes'], error)
+
+    def record_request(self, method, tickers, seconds, payload, error=False):
+        """
+        2.1.2 - One provider request
+
+        payload is {ticker: bytes}. Single-ticker requests count their
+        time per ticker; a batched request's time is only on its method
+        (it cannot be split), its bytes are still per ticker.
+        """
+        self._add(self.provider, method, seconds, sum(payload.values()), error)
+        with self._lock:
+            for ticker in tickers:
+                entry = self.tickers.setdefault(ticker, {}).setdefault(method, _counter())
+                entry['calls'] += 1
+                entry['bytes'] += payload.get(ticker, 0)
+                if method in PER_TICKER_METHODS:
+                    entry['seconds'] += seconds
+                    entry['errors'] += int(error)
+
+    def set(self, **fields):
+        """2.1.3 - Run-level fields for the log line (trade_date, alerts, ...)"""
+        self.fields.update(fields)
+
+    def finish(self, status):
+        """2.1.4 - The run-log record (seconds rounded to the microsecond)"""
+        def rounded(table):
+            return {k: dict(v, seconds=round(v['seconds'], 6)) for k, v in table.items()}
+
+        self.record = {
+            'started': self.started.isoformat(timespec='seconds'),
+            'mode': self.mode,
+            'status': status,
+            'seconds': round(time.perf_counter() - self._begin, 6),
+            **self.fields,
+            'stages': rounded(self.stages),
+            'provider': rounded(self.provider),
+            'tickers': {t: rounded(methods) for t, methods in self.tickers.items()},
+        }
+        return self.record
+
+
+def file_bytes(paths):
+    """2.2 - Total size of the files that exist (a stage's bytes read/written)"""
+    return sum(os.path.getsize(p) for p in paths if p and os.path.isfile(p))
+
+
+def slowest_stages(record, n=3):
+    """2.3 - 'fetch 1.92s, save 0.41s, ...' for the run summary"""
+    stages = sorted(record['stages'].items(), key=lambda kv: -kv[1]['seconds'])
+    return ", ".join(f"{name} {entry['seconds']:.2f}s" for name, entry in stages[:n])
+
+
+# =============================================================================
+# BLOCK 3: METERED PROVIDER
+# =============================================================================
+
+def payload_bytes(value):
+    """3.1 - Size of one payload: a DataFrame's memory, anything else as JSON"""
+    if value is None:
+        return 0
+    if hasattr(value, 'memory_usage'):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, dict) and any(hasattr(v, 'memory_usage') for v in value.values()):
+        return sum(payload_bytes(v) for v in value.values())
+    return len(json.dumps(value, default=str))
+
+
+class MeteredProvider:
+    """
+    3.2 - Provider proxy that records every request in a RunMetrics
+
+    Unmetered attributes (calls, latency, ...) pass through, so it can
+    stand in for YahooProvider or FakeProvider anywhere.
+    """
+
+    def __init__(self, provider, metrics):
+        self.provider = provider
+        self.metrics = metrics
+
+    def __getattr__(self, name):
+        attr = getattr(self.provider, name)
+        if name not in METERED_METHODS:
+            return attr
+
+        def metered(*args, **kwargs):
+            first = args[0] if args else None
+            tickers = [first] if isinstance(first, str) else list(first or [])
+            begin = time.perf_counter()
+            try:
+                result = attr(*args, **kwargs)
+            except Exception:
+                self.metrics.record_request(name, tickers, time.perf_counter() - begin, {},
+                                            error=True)
+                raise
+            seconds = time.perf_counter() - begin
+            # Batched calls return {ticker: payload}; single-ticker calls one payload
+            if len(tickers) > 1 or isinstance(result, dict) and set(result) <= set(tickers):
+                payload = {t: payload_bytes(v) for t, v in (result or {}).items()}
+            else:
+                payload = {t: payload_bytes(result) for t in tickers}
+            self.metrics.record_request(name, tickers, seconds, payload)
+            return result
+
+        return metered
+
+
+# =============================================================================
+# BLOCK 4: OUTPUTS
+# =============================================================================
+
+def append_run_log(path, record):
+    """4.1 - Append one JSON line per run"""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + "\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _value(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def prometheus_text(record, prefix=METRIC_PREFIX):
+    """4.2 - Prometheus text exposition of a run-log record"""
+    lines = []
+
+    def family(name, help_text, samples):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} gauge")
+        lines.extend(f"{prefix}_{name}{labels} {_value(value)}" for labels, value in samples)
+
+    mode = record['mode']
+    family('run_seconds', "Wall time of the last run.",
+           [(_labels(mode=mode, status=record['status']), record['seconds'])])
+    family('run_timestamp_seconds', "Start time of the last run (Unix time).",
+           [(_labels(mode=mode), datetime.fromisoformat(record['started']).timestamp())])
+    for field, help_text in (('seconds', "Wall time"), ('calls', "Calls"),
+                             ('bytes', "Bytes read or written"), ('errors', "Failed calls")):
+        family(f"stage_{field}", f"{help_text} per pipeline stage in the last run.",
+               [(_labels(stage=s), e[field]) for s, e in record['stages'].items()])
+    for field, help_text in (('seconds', "Wall time"), ('calls', "Requests"),
+                             ('bytes', "Payload bytes"), ('errors', "Failed requests")):
+        family(f"provider_{field}", f"{help_text} per market-data method in the last run.",
+               [(_labels(method=m), e[field]) for m, e in record['provider'].items()])
+    family('ticker_fetch_seconds', "Single-ticker request time per ticker in the last run.",
+           [(_labels(ticker=t, method=m), e['seconds'])
+            for t, methods in record['tickers'].items() for m, e in methods.items()
+            if m in PER_TICKER_METHODS])
+    family('ticker_fetch_bytes', "Payload bytes per ticker in the last run.",
+           [(_labels(ticker=t, method=m), e['bytes'])
+            for t, methods in record['tickers'].items() for m, e in methods.items()])
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(path, record):
+    """4.3 - Write the textfile atomically (the collector may read any time)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(prometheus_text(record))
+    os.replace(tmp_path, path)
+
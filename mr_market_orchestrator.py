@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET ORCHESTRATOR - Run the three-analyst roundtable end to end
+===============================================================================
+Purpose: Replace attaching the prompt to three chats by hand and pasting the
+Arbiter's DECISION blocks into decisions/:
+    1. Analysts - the Auditor and Narrator variants of today's prompt are
+                  sent concurrently (asyncio) through pluggable clients
+    2. Arbiter  - the Arbiter variant plus both analyses goes to the Arbiter
+    3. Cache    - every response is stored under a hash of (client, role,
+                  prompt); a rerun with the same prompt costs nothing, and
+                  a changed analysis gives the Arbiter a new key
+    4. Output   - analyses go to prompts/, the Arbiter's reply to
+                  decisions/YYYY_MM_DD_decision_roundtable.txt, which the
+                  main script ingests like a hand-pasted decision file
+
+Clients only need a `name` and `async complete(prompt)`. The live clients
+import their SDK on construction (openai, google-genai, anthropic); the
+StubClient answers offline so the whole pipeline runs without keys or
+network.
+
+Usage:
+    python mr_market_roundtable.py --roundtable            (live clients)
+    python mr_market_roundtable.py --roundtable stub       (offline)
+    python mr_market_roundtable.py --roundtable --roundtable-models arbiter=claude-opus-4-1
+===============================================================================
+"""
+
+from datetime import datetime
+import asyncio
+import hashlib
+import json
+import os
+import re
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESPONSE_CACHE_DIR = os.path.join(SCRIPT_DIR, "responses")
+
+# 1.2 - Live models per role (API keys come from each SDK's usual env var).
+# MR_MARKET_AUDITOR_MODEL etc. or --roundtable-models override a role.
+DEFAULT_MODELS = {
+    'auditor': "gpt-5",
+    'narrator': "gemini-2.5-pro",
+    'arbiter': "claude-sonnet-4-5",
+}
+MODELS = {role: os.environ.get(f"MR_MARKET_{role.upper()}_MODEL") or model
+          for role, model in DEFAULT_MODELS.items()}
+MAX_OUTPUT_TOKENS = 8000
+
+# 1.3 - Robustness
+REQUEST_TIMEOUT_SECONDS = 600.0
+MAX_RETRIES = 2                      # Retries after the first attempt
+RETRY_BACKOFF_SECONDS = 5.0          # Doubled on every retry
+
+# 1.4 - Role order: analysts first (concurrently), then the Arbiter
+ANALYSTS = ('auditor', 'narrator')
+ARBITER = 'arbiter'
+
+
+# =============================================================================
+# BLOCK 2: CLIENTS
+# =============================================================================
+
+class OpenAIClient:
+    """2.1 - Auditor backend (OpenAI chat completions)"""
+
+    def __init__(self, model=MODELS['auditor']):
+        import openai
+        self.client = openai.AsyncOpenAI()
+        self.model = model
+        self.name = f"openai:{model}"
+
+    async def complete(self, prompt):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{'role': 'user', 'content': prompt}],
+            max_tokens=MAX_OUTPUT_TOKENS,
+        )
+        return response.choices[0].message.content
+
+
+class GeminiClient:
+    """2.2 - Narrator backend (Google GenAI)"""
+
+    def __init__(self, model=MODELS['narrator']):
+        from google import genai
+        self.client = genai.Client()
+        self.model = model
+        self.name = f"gemini:{model}"
+
+    async def complete(self, prompt):
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=prompt,
+        )
+        return response.text
+
+
+class AnthropicClient:
+    """2.3 - Arbiter backend (Anthropic messages)"""
+
+    def __init__(self, model=MODELS['arbiter']):
+        import anthropic
+        self.client = anthropic.AsyncAnthropic()
+        self.model = model
+        self.name = f"anthropic:{model}"
+
+    async def complete(self, prompt):
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=MAX_OUTPUT_TOKENS,
+            messages=[{'role': 'user', 'content': prompt}],
+        )
+        return "".join(block.text for block in response.content if block.type == 'text')
+
+
+class StubClient:
+    """
+    2.4 - Offline stand-in for any role
+
+    Analysts return a canned verdict per candidate. The Arbiter returns one
+    DECISION block per candidate: BUY at the START target for the first
+    Track 3 candidate without a working GTC (sized to ~$2,000), NONE for
+    the rest - enough to exercise ingestion end to end.
+    """
+
+    def __init__(self, role, latency=0.0):
+        self.role = role
+        self.latency = latency
+        self.name = f"stub:{role}"
+        self.calls = 0
+
+    async def complete(self, prompt):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        candidates = parse_candidates(prompt)
+        if self.role != ARBITER:
+            verdict = f"{self.role.upper()} VERDICT"
+            return "\n".join(f"{c['ticker']}: {verdict}: WATCH (50%)" for c in candidates) \
+                or f"{verdict}: NONE (no candidates)"
+
+        date = re.search(r"MR\. MARKET AI ROUNDTABLE - (\S+)", prompt)
+        date = date.group(1) if date else datetime.now().strftime("%Y-%m-%d")
+        blocks = []
+        bought = False
+        for c in candidates:
+            buy = not bought and c['target'] and c['track3'] and not c['gtc']
+            bought = bought or buy
+            blocks.append("\n".join([
+                "DECISION:",
+                f"Date: {date}",
+                f"Action: {'BUY' if buy else 'NONE'}",
+                f"Ticker: {c['ticker']}",
+                f"Limit: {c['target']:.2f}" if buy else "Limit: 0",
+                f"Shares: {max(1, int(2000 // c['target']))}" if buy else "Shares: 0",
+                f"Track: {'2' if c['track2'] and not c['track3'] else '3'}",
+                "Signal: Target Hit" if buy else "Signal: N/A",
+                "Thesis: Intact",
+                "Notes: stub arbiter",
+            ]))
+        return "ARBITER FINAL DECISION:\n\n" + "\n\n".join(blocks)
+
+
+def parse_candidates(prompt):
+    """2.5 - Ticker, tracks, START target and GTC flag per candidate block"""
+    candidates = []
+    for block in re.split(r"\nCANDIDATE \d+: ", prompt)[1:]:
+        title = block.split("\n", 1)[0]
+        target = (re.search(r"Target:? \$([\d.]+)", block) or [None, 0])[1]
+        candidates.append({
+            'ticker': title.split()[0],
+            'track2': "TRACK 2" in title,
+            'track3': "TRACK 3" in title,
+            'target': float(target),
+            'gtc': "GTC ORDER:" in block or "| GTC " in block,
+        })
+    return candidates
+
+
+def live_clients(models=None):
+    """2.6 - {role: client} for the live backends; models overrides MODELS per role"""
+    models = {**MODELS, **(models or {})}
+    return {'auditor': OpenAIClient(models['auditor']),
+            'narrator': GeminiClient(models['narrator']),
+            'arbiter': AnthropicClient(models['arbiter'])}
+
+
+def stub_clients(latency=0.0):
+    """2.7 - {role: StubClient} for offline runs and tests"""
+    return {role: StubClient(role, latency) for role in ANALYSTS + (ARBITER,)}
+
+
+def parse_models(spec):
+    """
+    2.8 - {role: model} from "auditor=gpt-5,arbiter=claude-sonnet-4-5"
+
+    Raises ValueError on an unknown role or a missing model name.
+    """
+    models = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        role, _, model = item.partition('=')
+        role, model = role.strip().lower(), model.strip()
+        if role not in MODELS or not model:
+            raise ValueError(f"expected ROLE=MODEL with ROLE one of "
+                             f"{', '.join(MODELS)}, got {item!r}")
+        models[role] = model
+    return models
+
+
+# =============================================================================
+# BLOCK 3: RESPONSE CACHE
+# =============================================================================
+
+class ResponseCache:
+    """
+    3.1 - One JSON file per response, keyed by sha256(client, role, prompt)
+
+    Files are written to a temp name and renamed, so a crash mid-write
+    never leaves a truncated response that a rerun would trust.
+    """
+
+    def __init__(self, path=RESPONSE_CACHE_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(client_name, role, prompt):
+        h = hashlib.sha256()
+        for part in (client_name, role, prompt):
+            h.update(part.encode('utf-8'))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key):
+        path = os.path.join(self.path, f"{key}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)['response']
+
+    def put(self, key, client_name, role, response):
+        path = os.path.join(self.path, f"{key}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'client': client_name, 'role': role,
+                       'created': datetime.now().isoformat(timespec='seconds'),
+                       'response': response}, f)
+        os.replace(tmp_path, path)
+
+
+# =============================================================================
+# BLOCK 4: ORCHESTRATION
+# =============================================================================
+
+async def ask(client, role, prompt, cache=None, timeout=REQUEST_TIMEOUT_SECONDS,
+              retries=MAX_RETRIES, backoff=RETRY_BACKOFF_SECONDS):
+    """
+    4.1 - One role's response: (text, from_cache)
+
+    Cache hit first; otherwise the client call with a timeout and
+    exponential-backoff retries. Only successful responses are cached.
+    """
+    key = ResponseCache.key(client.name, role, prompt)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached, True
+
+    for attempt in range(retries + 1):
+        try:
+            text = await asyncio.wait_for(client.complete(prompt), timeout)
+            break
+        except Exception:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * (2 ** attempt))
+
+    if cache is not None:
+        cache.put(key, client.name, role, text)
+    return text, False
+
+
+def arbiter_prompt(prompt, analyses):
+    """4.2 - Arbiter variant followed by both analysts' write-ups"""
+    parts = [prompt, ""]
+    for role in ANALYSTS:
+        parts.append("=" * 80)
+        parts.append(f"THE {role.upper()}'S ANALYSIS")
+        parts.append("=" * 80)
+        parts.append(analyses[role].strip())
+        parts.append("")
+    parts.append("Synthesize the analyses above and output the DECISION blocks.")
+    return "\n".join(parts)
+
+
+async def run_roundtable(prompts, clients, cache=None, verbose=True):
+    """
+    4.3 - Analysts concurrently, then the Arbiter
+
+    prompts is render_variants() output ({role: prompt}); clients maps
+    role -> client. Returns {'responses': {role: text},
+    'cached': {role: bool}}.
+    """
+    results = await asyncio.gather(*(ask(clients[role], role, prompts[role], cache)
+                                     for role in ANALYSTS))
+    responses = {role: text for role, (text, _) in zip(ANALYSTS, results)}
+    cached = {role: hit for role, (_, hit) in zip(ANALYSTS, results)}
+    if verbose:
+        for role in ANALYSTS:
+            print(f"    {role.capitalize():<9} {clients[role].name:<32} "
+                  f"{'cached' if cached[role] else 'answered'}")
+
+    final = arbiter_prompt(prompts[ARBITER], responses)
+    responses[ARBITER], cached[ARBITER] = await ask(clients[ARBITER], ARBITER, final, cache)
+    if verbose:
+        print(f"    {'Arbiter':<9} {clients[ARBITER].name:<32} "
+              f"{'cached' if cached[ARBITER] else 'answered'}")
+    return {'responses': responses, 'cached': cached}
+
+
+def orchestrate(prompts, clients, trade_date, prompts_dir, decisions_dir,
+                cache=None, verbose=True):
+    """
+    4.4 - Run the roundtable and write its files; returns the decision path
+
+    The analyses are saved next to the prompt for the audit trail; the
+    Arbiter's reply becomes a decision file for ingest_decisions().
+    """
+    result = asyncio.run(run_roundtable(prompts, clients, cache, verbose))
+    stem = trade_date.replace('-', '_')
+    for role in ANALYSTS:
+        path = os.path.join(prompts_dir, f"{stem}_{role}_response.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(result['responses'][role].rstrip("\n") + "\n")
+
+    # 4.4.1 - Decision file, newline-terminated like a hand-saved one
+    os.makedirs(decisions_dir, exist_ok=True)
+    decision_path = os.path.join(decisions_dir, f"{stem}_decision_roundtable.txt")
+    with open(decision_path, 'w', encoding='utf-8') as f:
+        f.write(result['responses'][ARBITER].rstrip("\n") + "\n")
+    return decision_path
@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET PROMPT - Templated roundtable prompt engine
+===============================================================================
+Purpose: Build the daily AI Roundtable prompt from precompiled sections
+instead of one long run of string concatenation:
+    1. Static sections - role briefs, deliverables, decision format and the
+                         calm-day notice are assembled once at import
+    2. Templates       - header, status, market regime and candidate blocks
+                         are str.format-syntax templates, filled in by
+                         keyword (TITLE(trade_date=...))
+    3. Candidate cache - each candidate block is cached by the data it
+                         shows (alert, position, GTC), so a re-render, or
+                         a ticker that alerts with the same data, is free
+    4. Variants        - the shared body is rendered once and prefixed with
+                         the combined role brief or a single analyst's brief
+                         (Auditor / Narrator / Arbiter)
+    5. Compact mode    - with a token budget, the Track 2/3 rule text moves
+                         into one legend, Track candidates get condensed
+                         blocks in detect_alerts priority order while they
+                         fit, and WATCH-only candidates (and any overflow)
+                         become one line each in a summary table
+
+Parts are collected in a list and joined once. The combined variant is the
+prompt the main script has always produced. Token counts are estimates
+(characters / CHARS_PER_TOKEN); token_report() gives them per section.
+
+Usage:
+    from mr_market_prompt import render_prompt, render_variants
+    prompt = render_prompt(alerts, market_data, portfolio_stats, positions,
+                           pending_orders, regime)
+===============================================================================
+"""
+
+from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Analyst variants (None = combined prompt with all three briefs)
+ROLES = ('auditor', 'narrator', 'arbiter')
+
+# 1.2 - Candidate blocks kept in the render cache
+CANDIDATE_CACHE_SIZE = 4096
+
+# 1.3 - P/E levels that add the extra-skepticism flag
+HIGH_TRAILING_PE = 55
+HIGH_FORWARD_PE = 35
+
+# 1.4 - Alert fields shown in a candidate block (cache key order)
+CANDIDATE_FIELDS = ('ticker', 'company', 'strategy', 'tier', 'price', 'prev_close',
+                    'change_pct', 'ma_50', 'week_52_low', 'week_52_high', 'trailing_pe',
+                    'forward_pe', 'pe_avg', 'pe_avg_years', 'fundamentals', 'target',
+                    'add_target', 'target_distance_pct', 'exit_criteria', 'is_track2',
+                    'is_track3')
+
+_candidate_values = itemgetter(*CANDIDATE_FIELDS)
+
+# 1.5 - Compact mode: default budget and the chars-per-token estimate
+DEFAULT_TOKEN_BUDGET = 12000
+CHARS_PER_TOKEN = 4
+
+RULE = "=" * 80
+THIN_RULE = "-" * 80
+
+
+def _banner(title):
+    """1.5 - Section title between full-width rules"""
+    return f"{RULE}\n{title}\n{RULE}\n"
+
+
+# =============================================================================
+# BLOCK 2: STATIC SECTIONS (assembled once at import)
+# =============================================================================
+
+# 2.1 - Analyst briefs
+ROLE_BRIEFS = {
+    'auditor': """**IF YOU ARE CHATGPT (GPT-4, GPT-4o, etc.):**
+You are THE AUDITOR. Your job is rules, valuation, and strict methodology.
+- Focus on: P/E ratios vs historical averages, distance to target prices,
+  whether entry rules are satisfied, exit criteria status
+- Your bias: Skeptical. Numbers must justify the trade.
+- Ask: "Do the valuations support this?" and "Are we following our own rules?"
+- Flag any rule violations or methodology drift
+- End your analysis for each stock with: "AUDITOR VERDICT: [DECISION] ([CONFIDENCE]%)"
+""",
+    'narrator': """**IF YOU ARE GEMINI (Google):**
+You are THE NARRATOR. Your job is macro context, narrative, and sentiment.
+- Focus on: What story is the market telling? What's the catalyst?
+  What are institutions doing? What's the sentiment shift?
+- Your bias: Context matters. The "why" behind the move.
+- Ask: "What narrative is driving this?" and "Is sentiment overshooting?"
+- Identify narrative tailwinds/headwinds that the numbers might miss
+- End your analysis for each stock with: "NARRATOR VERDICT: [DECISION] ([CONFIDENCE]%)"
+""",
+    'arbiter': """**IF YOU ARE CLAUDE (Anthropic):**
+You are THE ARBITER. Your job is synthesis and final decisions.
+- Focus on: Where do Auditor and Narrator agree/disagree?
+  Resolve conflicts with explicit reasoning.
+- Your bias: Decisive. Must commit to a final call.
+- Ask: "Given both perspectives, what's the right action?"
+- Force a decision even when uncertain - NONE is a valid decision
+- Output the final DECISION blocks in the required format for ingestion
+- End your synthesis with: "ARBITER FINAL DECISION: [DECISION]"
+""",
+}
+
+# 2.2 - Role section per variant
+ROLE_SECTIONS = {
+    None: (_banner("YOUR ROLE (read the section that applies to you)") + "\n"
+           + "\n".join(ROLE_BRIEFS[role] for role in ROLES)),
+    **{role: _banner("YOUR ROLE") + "\n" + ROLE_BRIEFS[role] for role in ROLES},
+}
+
+INTRO = """
+You are participating in the "Tantrums & Targets" AI Roundtable. Three analysts
+debate each stock to determine: Is Mr. Market overreacting (opportunity) or
+correctly repricing long-term earnings power (avoid)?
+
+"""
+
+DEFAULT_BIAS = """
+DEFAULT BIAS: If no consensus, the decision is NONE. Not trading is valid.
+
+"""
+
+# 2.3 - Calm day
+NO_ALERTS = "\n" + _banner("NO ALERTS TRIGGERED") + """Mr. Market is calm today. No Track 2 or Track 3 candidates.
+Review any existing positions and pending orders only.
+"""
+
+# 2.4 - Deliverables, synthesis and the DECISION block format
+DELIVERABLES = "\n" + _banner("DELIVERABLES FOR EACH CANDIDATE") + """For each candidate above, provide:
+
+1) CATALYST: Most likely reason for the recent move (with dates if known)
+
+2) VALUATION: Forward P/E, trailing P/E, comparison to 5-year average
+   - Cite sources or mark as "uncited"
+
+3) RISK TYPE: cyclical / execution / structural / legal-reg / tech narrative / balance sheet
+
+4) BEAR CASE: Steelman the strongest bearish argument
+
+5) BULL REBUTTAL: Steelman the strongest bullish counter
+
+6) IMPAIRMENT TEST: What must be true for long-term earnings power to be permanently damaged?
+
+7) CHECKPOINTS: 3 falsifiable items to monitor over next 1-2 quarters
+
+8) NEXT READ: Specific 10-K sections, earnings call topics, or filings to review
+
+9) DECISION: For each analyst, state one of:
+   - IGNORE (not worth attention)
+   - WATCH (interesting but not actionable)
+   - START SMALL (initiate position at target)
+   - ADD (increase existing position)
+   - HOLD (maintain current position, no action)
+
+   Include:
+   - Confidence level (%)
+   - Upgrade/downgrade triggers
+   - Suggested position size if applicable
+
+""" + _banner("FINAL SYNTHESIS (The Arbiter)") + """After all three analysts have weighed in on each candidate:
+
+1) Identify where analysts AGREE vs DISAGREE
+2) Resolve conflicts with explicit reasoning
+3) State FINAL DECISION for each candidate
+4) List any CALENDAR FLAGS (earnings dates, catalysts to watch)
+
+Rules:
+- Be explicit about uncertainty
+- Cite sources; label uncited statements as such
+- Default to NONE if no clear consensus
+
+""" + _banner("DECISION OUTPUT FORMAT (Required for ingestion)") + """For each actionable decision (BUY/ADD), output a block in this EXACT format:
+
+DECISION:
+Date: {today's date, YYYY-MM-DD}
+Action: BUY
+Ticker: {TICKER}
+Limit: {limit price, numbers only}
+Shares: {number of shares}
+Track: {1, 2, or 3}
+Signal: {brief signal description}
+Thesis: {Intact/Weakening/Broken}
+Notes: {one-line rationale}
+
+Example:
+DECISION:
+Date: 2026-01-26
+Action: BUY
+Ticker: ROP
+Limit: 400.00
+Shares: 10
+Track: 3
+Signal: Target Hit
+Thesis: Intact
+Notes: Quality compounder at valuation floor, organic growth intact
+
+For NONE/HOLD/WATCH decisions, still output a block but with Action: NONE
+(no order created - the decision file itself serves as the audit trail)
+
+DECISION:
+Date: 2026-01-26
+Action: NONE
+Ticker: MSFT
+Limit: 0
+Shares: 0
+Track: 3
+Signal: N/A
+Thesis: Intact
+Notes: Already own 10 shares, wait for ADD target at $445
+""" + RULE + "\n"
+
+
+# =============================================================================
+# BLOCK 3: TEMPLATES (str.format syntax)
+# =============================================================================
+
+def compile_template(text):
+    """3.0 - A template as a function of its field names (keyword arguments)"""
+    return text.format
+
+
+# 3.1 - Title and portfolio status
+TITLE = compile_template("\n" + _banner("MR. MARKET AI ROUNDTABLE - {trade_date}"))
+
+STATUS = compile_template(_banner("PORTFOLIO STATUS") + """Portfolio Value: ${portfolio_value:,.2f}
+VOO Return: {voo_return:+.1%}
+Portfolio Return: {portfolio_return:+.1%}
+Alpha vs VOO: {alpha:+.1%}
+""")
+
+POSITION_LINE = compile_template(
+    "  {ticker}: {shares} shares @ ${avg_cost:.2f} (now ${price:.2f}, {gain_pct:+.1f}%)\n")
+ORDER_LINE = compile_template(
+    "  {ticker}: {shares} shares @ ${limit:.2f} (current ${price:.2f}, {distance:+.1f}% away)\n")
+
+# 3.2 - Market regime (mr_market_regime.regime_state) and the suspension warning
+REGIME_STATUS = compile_template("\n" + _banner("MARKET REGIME") + """Regime: {label}
+Breadth: {breadth:.0f}% of stocks above their 50-day MA, {decliners:.0f}% down today
+Dispersion: {dispersion:.1f}% (std of today's moves across the watchlist)
+VOO Drawdown: {voo_drawdown:.1f}% below its 52-week high
+Track 2 Triggers: {trigger_count} on {trigger_days} of the last {window} days (threshold: {threshold})
+""")
+REGIME_FIELDS = ('label', 'breadth', 'decliners', 'dispersion', 'voo_drawdown',
+                 'trigger_count', 'trigger_days', 'window', 'threshold')
+
+REGIME_WARNING = compile_template("\n" + _banner("!! REGIME WARNING !!") + """{count} Track 2 triggers in last {window} days (threshold: {threshold})
+This suggests a broad market selloff, not stock-specific opportunities.
+DEFAULT: Skip Track 2 entries. Focus on Track 3 targets only.
+""" + RULE + "\n")
+
+# 3.3 - Candidates
+CANDIDATES_HEADER = compile_template(
+    "\n" + _banner("TODAY'S CANDIDATES ({count} stocks triggered alerts)"))
+
+CANDIDATE_TITLE = compile_template("\n" + THIN_RULE + "\nCANDIDATE {number}: {title}\n" + THIN_RULE + "\n")
+
+CANDIDATE_SNAPSHOT = compile_template("""
+SNAPSHOT:
+  - Price: ${price:.2f} (prev close: ${prev_close:.2f}, change: {change_pct:+.1f}%)
+  - 52-week range: ${week_52_low:.2f} - ${week_52_high:.2f}
+  - 50-day MA: ${ma_50:.2f}
+  - P/E: {pe}{pe_warning}{fundamentals}
+  - Target: ${target} (START) / ${add_target} (ADD)
+  - Distance to target: {distance}{position_status}
+
+EXIT CRITERIA (what breaks the thesis):
+  {exit_criteria}
+""")
+
+TRACK2_RULES = compile_template("""
+TRACK 2 ENTRY RULES:
+  - Entry limit: ${prev_close:.2f} (prior close, exact)
+  - Order type: DAY order - if not filled by close, mark as MISSED
+  - Reassessment: ~2 weeks after entry (TRIM if +4%, CONVERT or CUT)
+""")
+
+TRACK3_RULES = compile_template("""
+TRACK 3 ENTRY RULES:
+  - GTC limit order at ${target:.2f}
+  - If already have GTC working, maintain it
+  - ADD target at ${add_target:.2f} for second tranche
+""")
+
+# 3.4 - Compact mode: rules stated once, overflow as a table
+LEGEND = "\n" + _banner("ENTRY RULES LEGEND (applies to every candidate below)") + """T2 = TRACK 2 ENTRY RULES:
+  - Entry limit: the candidate's prior close (exact)
+  - Order type: DAY order - if not filled by close, mark as MISSED
+  - Reassessment: ~2 weeks after entry (TRIM if +4%, CONVERT or CUT)
+T3 = TRACK 3 ENTRY RULES:
+  - GTC limit order at the START target
+  - If already have GTC working, maintain it
+  - ADD target for second tranche
+[P/E HIGH] = trailing >= """ + str(HIGH_TRAILING_PE) + " or forward >= " + str(HIGH_FORWARD_PE) + """: extra skepticism warranted
+"""
+
+SUMMARY_HEADER = compile_template("\n" + _banner(
+    "SUMMARIZED CANDIDATES ({count}) - same priority order, one line each") + (
+    f"{'#':>3} {'TICKER':<6} {'TRACK':<5} {'PRICE':>10} {'CHG':>7} {'TO TGT':>7}  SIGNALS\n"))
+
+
+# =============================================================================
+# BLOCK 4: SECTION RENDERERS
+# =============================================================================
+
+def _track_label(is_track2, is_track3):
+    if is_track2 and is_track3:
+        return "TRACK 2 + TRACK 3"
+    return "TRACK 2" if is_track2 else "TRACK 3" if is_track3 else "WATCH"
+
+
+def candidate_key(alert, position=None, order=None):
+    """4.1 - Hashable cache key: everything a candidate block shows"""
+    return (_candidate_values(alert), tuple(alert['signals']),
+            (position['shares'], position['avg_cost']) if position else None,
+            (order['shares'], order['limit']) if order else None)
+
+
+@lru_cache(maxsize=CANDIDATE_CACHE_SIZE)
+def render_candidate(key):
+    """
+    4.2 - (title, body) of one candidate block, cached by candidate_key()
+
+    The candidate number is not part of the block, so a cached block is
+    reusable wherever the ticker lands in today's ordering.
+    """
+    values, signals, position, order = key
+    (ticker, company, strategy, tier, price, prev_close, change_pct, ma_50, week_52_low,
+     week_52_high, trailing_pe, forward_pe, pe_avg, pe_avg_years, fundamentals, target,
+     add_target, distance, exit_criteria, is_track2, is_track3) = values
+
+    title = f"{ticker} ({company}) [{_track_label(is_track2, is_track3)}]"
+
+    pe_parts = []
+    if trailing_pe:
+        pe_parts.append(f"T:{trailing_pe:.1f}")
+    if forward_pe:
+        pe_parts.append(f"F:{forward_pe:.1f}")
+    if pe_avg:
+        pe_parts.append(f"{pe_avg_years:.1f}y avg T:{pe_avg:.1f}")
+    high_pe = ((trailing_pe and trailing_pe >= HIGH_TRAILING_PE)
+               or (forward_pe and forward_pe >= HIGH_FORWARD_PE))
+
+    position_status = ""
+    if position:
+        position_status = f"\n    OWNED: {position[0]} shares @ ${position[1]:.2f}"
+    if order:
+        position_status += f"\n    GTC ORDER: {order[0]} shares @ ${order[1]:.2f}"
+
+    parts = [f"Strategy: {strategy} | Tier: {tier}\n\nSIGNALS:\n"]
+    parts.extend(f"  - {signal}\n" for signal in signals)
+    parts.append(CANDIDATE_SNAPSHOT(
+        price=price, prev_close=prev_close, change_pct=change_pct,
+        week_52_low=week_52_low, week_52_high=week_52_high, ma_50=ma_50,
+        pe=" / ".join(pe_parts) or "N/A",
+        pe_warning=" ** P/E HIGH: Extra skepticism warranted **" if high_pe else "",
+        fundamentals=f"\n  - Fundamentals: {fundamentals}" if fundamentals else "",
+        target=target, add_target=add_target,
+        distance="N/A" if distance is None else f"{distance:+.1f}%",
+        position_status=position_status, exit_criteria=exit_criteria,
+    ))
+    if is_track2:
+        parts.append(TRACK2_RULES(prev_close=prev_close))
+    if is_track3:
+        parts.append(TRACK3_RULES(target=target, add_target=add_target))
+    return title, "".join(parts)
+
+
+def render_holdings(market_data, positions, pending_orders):
+    """4.3 - Current positions and pending GTC orders"""
+    parts = []
+    if positions:
+        parts.append("\nCURRENT POSITIONS:\n")
+        for ticker, pos in positions.items():
+            price = market_data.get(ticker, {}).get('close', 0)
+            gain_pct = (price - pos['avg_cost']) / pos['avg_cost'] * 100 if pos['avg_cost'] > 0 else 0
+            parts.append(POSITION_LINE(ticker=ticker, shares=pos['shares'],
+                                       avg_cost=pos['avg_cost'], price=price,
+                                       gain_pct=gain_pct))
+    else:
+        parts.append("\nCURRENT POSITIONS: None\n")
+
+    if pending_orders:
+        parts.append("\nPENDING GTC ORDERS:\n")
+        for ticker, order in pending_orders.items():
+            price = market_data.get(ticker, {}).get('close', 0)
+            distance = (price - order['limit']) / order['limit'] * 100 if order['limit'] > 0 else 0
+            parts.append(ORDER_LINE(ticker=ticker, shares=order['shares'],
+                                    limit=order['limit'], price=price,
+                                    distance=distance))
+    return parts
+
+
+def render_candidates(alerts, positions, pending_orders):
+    """4.4 - Numbered candidate blocks (or the calm-day notice)"""
+    if not alerts:
+        return [NO_ALERTS]
+    parts = [CANDIDATES_HEADER(count=len(alerts))]
+    for number, alert in enumerate(alerts, 1):
+        ticker = alert['ticker']
+        title, body = render_candidate(candidate_key(
+            alert, positions.get(ticker), pending_orders.get(ticker)))
+        parts.append(CANDIDATE_TITLE(number=number, title=title))
+        parts.append(body)
+    return parts
+
+
+# =============================================================================
+# BLOCK 5: COMPACT MODE (token budget)
+# =============================================================================
+
+def estimate_tokens(text):
+    """
+    5.1 - Approximate token count
+
+    The three chats use different tokenizers; CHARS_PER_TOKEN is a
+    conservative average for this prompt's mix of English and numbers.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@lru_cache(maxsize=CANDIDATE_CACHE_SIZE)
+def render_compact_candidate(key):
+    """
+    5.2 - (title, body) of a condensed candidate block
+
+    Same data as render_candidate() on four to six lines; the Track 2/3
+    rule text and the P/E warning sentence live in the legend.
+    """
+    values, signals, position, order = key
+    (ticker, company, strategy, tier, price, prev_close, change_pct, ma_50, week_52_low,
+     week_52_high, trailing_pe, forward_pe, pe_avg, pe_avg_years, fundamentals, target,
+     add_target, distance, exit_criteria, is_track2, is_track3) = values
+
+    title = f"{ticker} ({company}) [{_track_label(is_track2, is_track3)}] {strategy} | Tier {tier}"
+    pe_parts = []
+    if trailing_pe:
+        pe_parts.append(f"T:{trailing_pe:.1f}")
+    if forward_pe:
+        pe_parts.append(f"F:{forward_pe:.1f}")
+    if pe_avg:
+        pe_parts.append(f"{pe_avg_years:.1f}y avg T:{pe_avg:.1f}")
+    high_pe = ((trailing_pe and trailing_pe >= HIGH_TRAILING_PE)
+               or (forward_pe and forward_pe >= HIGH_FORWARD_PE))
+
+    lines = [f"Signals: {'; '.join(signals) or 'none'}",
+             f"Price ${price:.2f} (prev ${prev_close:.2f}, {change_pct:+.1f}%) | "
+             f"52w ${week_52_low:.2f}-${week_52_high:.2f} | MA50 ${ma_50:.2f} | "
+             f"P/E {' / '.join(pe_parts) or 'N/A'}{' [P/E HIGH]' if high_pe else ''}"]
+    if fundamentals:
+        lines.append(f"Fundamentals: {fundamentals}")
+    holding = f"Target ${target} START / ${add_target} ADD "
+    holding += "(N/A)" if distance is None else f"({distance:+.1f}%)"
+    if position:
+        holding += f" | OWNED {position[0]} @ ${position[1]:.2f}"
+    if order:
+        holding += f" | GTC {order[0]} @ ${order[1]:.2f}"
+    lines.append(holding)
+    lines.append(f"Exit: {exit_criteria}")
+    rules = []
+    if is_track2:
+        rules.append(f"T2 DAY limit ${prev_close:.2f}")
+    if is_track3:
+        rules.append(f"T3 GTC ${target:.2f}, ADD ${add_target:.2f}")
+    if rules:
+        lines.append(f"Rules: {', '.join(rules)} (see legend)")
+    return title, "\n".join(lines) + "\n"
+
+
+def _summary_row(number, alert):
+    """5.3 - One row of the summary table"""
+    tracks = "/".join(label for label, on in (("T2", alert['is_track2']),
+                                              ("T3", alert['is_track3'])) if on) or "WATCH"
+    distance = alert['target_distance_pct']
+    return (f"{number:>3} {alert['ticker']:<6} {tracks:<5} {'$' + format(alert['price'], '.2f'):>10} "
+            f"{alert['change_pct']:>+6.1f}% "
+            f"{'N/A' if distance is None else format(distance, '+.1f') + '%':>7}  "
+            f"{'; '.join(alert['signals'])}\n")
+
+
+def compact_candidates(alerts, positions, pending_orders, available):
+    """
+    5.4 - Candidate sections within `available` tokens
+
+    Alerts arrive in detect_alerts priority order (Track 2, Track 3, then
+    distance to target). Track candidates get a condensed block while the
+    blocks still leave room for a table row for everyone after them;
+    WATCH-only candidates and any overflow go to the summary table. If the
+    table itself does not fit, the lowest-priority WATCH-only rows are
+    dropped and counted. Returns [(section name, text), ...].
+    """
+    if not alerts:
+        return [('candidates', NO_ALERTS)]
+
+    rows = [_summary_row(n, a) for n, a in enumerate(alerts, 1)]
+    row_tokens = [estimate_tokens(r) for r in rows]
+    rows_after = [0] * (len(rows) + 1)
+    for i in range(len(rows) - 1, -1, -1):
+        rows_after[i] = rows_after[i + 1] + row_tokens[i]
+
+    header = CANDIDATES_HEADER(count=len(alerts))
+    available -= estimate_tokens(header) + estimate_tokens(SUMMARY_HEADER(count=len(alerts)))
+    blocks = []
+    table = []
+    for i, alert in enumerate(alerts):
+        if alert['is_track2'] or alert['is_track3']:
+            ticker = alert['ticker']
+            title, body = render_compact_candidate(candidate_key(
+                alert, positions.get(ticker), pending_orders.get(ticker)))
+            block = CANDIDATE_TITLE(number=i + 1, title=title) + body
+            cost = estimate_tokens(block)
+            if cost + rows_after[i + 1] <= available:
+                blocks.append(block)
+                available -= cost
+                continue
+        table.append(i)
+        available -= row_tokens[i]
+
+    # Drop WATCH-only rows from the bottom until the table fits
+    omitted = []
+    while available < 0 and table:
+        i = next((k for k in reversed(table)
+                  if not (alerts[k]['is_track2'] or alerts[k]['is_track3'])), None)
+        if i is None:
+            break
+        table.remove(i)
+        omitted.append(alerts[i]['ticker'])
+        available += row_tokens[i]
+
+    sections = [('candidates', header + "".join(blocks))]
+    if table:
+        text = SUMMARY_HEADER(count=len(table)) + "".join(rows[i] for i in table)
+        if omitted:
+            text += f"    ... {len(omitted)} lower-priority WATCH candidates omitted: " \
+                    f"{', '.join(reversed(omitted))}\n"
+        sections.append(('summary table', text))
+    return sections
+
+
+# =============================================================================
+# BLOCK 6: PROMPTS
+# =============================================================================
+
+def render_sections(alerts, market_data, portfolio_stats, positions, pending_orders,
+                    regime, budget=None):
+    """
+    6.1 - The shared body as [(section name, text), ...]
+
+    regime is mr_market_regime.regime_state() output. budget=None, or a
+    budget the full prompt already fits, gives the full prompt. Otherwise
+    the rule text moves into a legend and candidates are condensed /
+    tabulated to fit (the role section is budgeted at its largest, the
+    combined briefs).
+    """
+    portfolio_value, voo_return, portfolio_return, alpha = portfolio_stats
+
+    status = [DEFAULT_BIAS,
+              STATUS(portfolio_value=portfolio_value, voo_return=voo_return,
+                     portfolio_return=portfolio_return, alpha=alpha)]
+    status.extend(render_holdings(market_data, positions, pending_orders))
+    sections = [('status', "".join(status))]
+    regime_text = REGIME_STATUS(**{k: regime[k] for k in REGIME_FIELDS})
+    if regime['suspended']:
+        regime_text += REGIME_WARNING(count=regime['trigger_count'], window=regime['window'],
+                                      threshold=regime['threshold'])
+    sections.append(('regime', regime_text))
+
+    full = ('candidates', "".join(render_candidates(alerts, positions, pending_orders)))
+    fixed = (estimate_tokens(TITLE(trade_date="YYYY-MM-DD") + INTRO + ROLE_SECTIONS[None])
+             + sum(estimate_tokens(text) for _, text in sections)
+             + estimate_tokens(DELIVERABLES))
+    if budget is None or fixed + estimate_tokens(full[1]) <= budget:
+        sections.append(full)
+    else:
+        if alerts:
+            sections.append(('legend', LEGEND))
+            fixed += estimate_tokens(LEGEND)
+        sections.extend(compact_candidates(alerts, positions, pending_orders, budget - fixed))
+    sections.append(('deliverables', DELIVERABLES))
+    return sections
+
+
+def assemble(trade_date, role, body):
+    """6.2 - Title + intro + role section + shared body"""
+    return "".join((TITLE(trade_date=trade_date), INTRO, ROLE_SECTIONS[role],
+                    body)).strip()
+
+
+def render_prompt(alerts, market_data, portfolio_stats, positions, pending_orders,
+                  regime, role=None, budget=None):
+    """
+    6.3 - One roundtable prompt
+
+    role=None gives the combined prompt (all three briefs); 'auditor',
+    'narrator' or 'arbiter' gives that analyst's variant. budget (tokens)
+    switches on compact mode.
+    """
+    return render_variants(alerts, market_data, portfolio_stats, positions, pending_orders,
+                           regime, roles=(role,), budget=budget)[role]
+
+
+def render_variants(alerts, market_data, portfolio_stats, positions, pending_orders,
+                    regime, roles=(None,) + ROLES, budget=None):
+    """6.4 - {role: prompt} for several variants; the body is rendered once"""
+    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
+    body = "".join(text for _, text in render_sections(
+        alerts, market_data, portfolio_stats, positions, pending_orders, regime, budget))
+    return {role: assemble(trade_date, role, body) for role in roles}
+
+
+def token_report(alerts, market_data, portfolio_stats, positions, pending_orders,
+                 regime, role=None, budget=None):
+    """6.5 - [(section name, estimated tokens), ...] for one variant, header first"""
+    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
+    sections = render_sections(alerts, market_data, portfolio_stats, positions, pending_orders,
+                               regime, budget)
+    header = TITLE(trade_date=trade_date) + INTRO + ROLE_SECTIONS[role]
+    return [('header', estimate_tokens(header))] + [
+        (name, estimate_tokens(text)) for name, text in sections]
+
+
+def format_token_report(report, budget=None):
+    """6.6 - Token report as indented lines"""
+    total = sum(tokens for _, tokens in report)
+    lines = [f"    {name:<14} {tokens:>7,} tokens" for name, tokens in report]
+    limit = f" of {budget:,} budget" if budget else ""
+    flag = "  ** OVER BUDGET **" if budget and total > budget else ""
+    lines.append(f"    {'total':<14} {total:>7,} tokens{limit}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET REGIME - Cross-sectional market-regime detector
+===============================================================================
+Purpose: Tell a broad selloff from stock-specific opportunities using the
+whole watchlist each day, instead of counting timestamps in a JSON list:
+    1. Cross-section - per trade date: Track 2 triggers, breadth (% of
+                       stocks above their 50-day MA), decliners, dispersion
+                       (std of the day's % moves across stocks) and the VOO
+                       drawdown from its 52-week high
+    2. Record        - one compact entry per trade date in
+                       regime_history.json; a rerun replaces its day
+                       instead of adding to it, and entries older than the
+                       window are pruned, so an update is O(1)
+    3. Backfill      - window days missing from the record (first run,
+                       skipped days) are rebuilt from the stored price
+                       panel in one vectorized pass
+    4. State         - a dict for the prompt: label (NORMAL / STRESSED /
+                       SUSPENDED), trigger count and days in the window,
+                       and today's breadth, dispersion and VOO drawdown
+
+The trigger window matches the historical replay: trade dates within the
+last window_days calendar days, today included.
+
+Usage:
+    record = RegimeRecord(REGIME_FILE, window_days=10)
+    record.update(trade_date, cross_section_entry(market_data, triggers))
+    state = regime_state(record, trade_date, threshold=5)
+===============================================================================
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+
+import numpy as np
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Benchmark (excluded from breadth and dispersion, source of drawdown)
+BENCHMARK_TICKER = "VOO"
+
+# 1.2 - STRESSED when either holds (SUSPENDED = Track 2 trigger threshold hit)
+STRESS_DRAWDOWN_PCT = 10.0           # VOO >= 10% below its 52-week high
+WEAK_BREADTH_PCT = 30.0              # <= 30% of stocks above their 50-day MA
+
+
+# =============================================================================
+# BLOCK 2: CROSS-SECTION
+# =============================================================================
+
+def cross_section(change_pct, pct_below_ma):
+    """
+    2.1 - Breadth, decliners and dispersion for every column
+
+    Inputs are (stocks x dates) arrays (or 1-D for a single day) with the
+    benchmark already removed; NaN rows (no data that day) are ignored.
+    """
+    change_pct = np.atleast_2d(np.asarray(change_pct, dtype=float).T).T
+    pct_below_ma = np.atleast_2d(np.asarray(pct_below_ma, dtype=float).T).T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        valid = (~np.isnan(change_pct)).sum(axis=0)
+        above = (pct_below_ma < 0).sum(axis=0)
+        down = (change_pct < 0).sum(axis=0)
+        ma_valid = (~np.isnan(pct_below_ma)).sum(axis=0)
+        return {
+            'breadth': np.where(ma_valid > 0, above / ma_valid * 100, np.nan),
+            'decliners': np.where(valid > 0, down / valid * 100, np.nan),
+            'dispersion': np.array([np.std(c[~np.isnan(c)]) if n else np.nan
+                                    for c, n in zip(change_pct.T, valid)]),
+        }
+
+
+def _round(value):
+    """2.2 - JSON-friendly metric: 2 decimals, None for NaN"""
+    value = float(value)
+    return None if value != value else round(value, 2)
+
+
+def _entry(triggers, section, k, voo_drawdown):
+    """2.3 - One record entry"""
+    return {
+        'triggers': len(triggers),
+        'tickers': sorted(triggers),
+        'breadth': _round(section['breadth'][k]),
+        'decliners': _round(section['decliners'][k]),
+        'dispersion': _round(section['dispersion'][k]),
+        'voo_drawdown': _round(voo_drawdown),
+    }
+
+
+def cross_section_entry(market_data, triggers, benchmark=BENCHMARK_TICKER):
+    """
+    2.4 - Today's entry from market_data (the stored panel's last bar)
+
+    triggers is the list of Track 2 tickers detect_alerts found today.
+    """
+    stocks = [t for t in market_data if not t.startswith('_') and t != benchmark]
+    change = [market_data[t]['change_pct'] for t in stocks]
+    below_ma = [(market_data[t]['ma_50'] - market_data[t]['close']) / market_data[t]['ma_50'] * 100
+                for t in stocks]
+    voo = market_data.get(benchmark)
+    voo_drawdown = ((voo['week_52_high'] - voo['close']) / voo['week_52_high'] * 100
+                    if voo else np.nan)
+    return _entry(triggers, cross_section(change, below_ma), 0, voo_drawdown)
+
+
+def panel_entries(panel, ind, dates, drop_threshold, benchmark=BENCHMARK_TICKER):
+    """
+    2.5 - {date: entry} for the given dates of a date-aligned panel
+
+    ind is rolling_indicators() output for the panel; Track 2 triggers
+    use the same single-day-drop rule as the live run.
+    """
+    columns = [int(np.searchsorted(panel['dates'], d)) for d in dates]
+    stock_rows = np.array([t != benchmark for t in panel['tickers']], dtype=bool)
+    change = ind['change_pct'][:, columns]
+    section = cross_section(change[stock_rows], ind['pct_below_ma'][:, columns][stock_rows])
+    voo_rows = np.flatnonzero(~stock_rows)
+    voo_drawdown = (ind['drawdown_from_high_pct'][voo_rows[0], columns] if len(voo_rows)
+                    else np.full(len(columns), np.nan))
+
+    with np.errstate(invalid='ignore'):
+        hits = change <= -drop_threshold
+    return {d: _entry([t for t, hit in zip(panel['tickers'], hits[:, k]) if hit],
+                      section, k, voo_drawdown[k])
+            for k, d in enumerate(dates)}
+
+
+# =============================================================================
+# BLOCK 3: RECORD
+# =============================================================================
+
+class RegimeRecord:
+    """
+    3.1 - Per-trade-date entries for the current window, kept on disk
+
+    {'window_days': N, 'days': {date: entry}}. Written to a temp file and
+    renamed, like the response cache.
+    """
+
+    def __init__(self, path, window_days):
+        self.path = path
+        self.window_days = window_days
+        self.days = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.days = json.load(f).get('days', {})
+            except (ValueError, AttributeError):
+                self.days = {}
+
+    def cutoff(self, trade_date):
+        """3.1.1 - Dates on or before this fall outside the window"""
+        day = datetime.strptime(trade_date, "%Y-%m-%d") - timedelta(days=self.window_days)
+        return day.strftime("%Y-%m-%d")
+
+    def update(self, trade_date, entry):
+        """3.1.2 - Replace trade_date's entry and drop days outside the window"""
+        self.days[trade_date] = entry
+        cutoff = self.cutoff(max(self.days))
+        for date in [d for d in self.days if d <= cutoff]:
+            del self.days[date]
+
+    def window(self, trade_date):
+        """3.1.3 - [(date, entry)] within the window ending at trade_date"""
+        cutoff = self.cutoff(trade_date)
+        return sorted((d, e) for d, e in self.days.items() if cutoff < d <= trade_date)
+
+    def save(self):
+        """3.1.4 - Write the window (temp file + rename)"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'window_days': self.window_days, 'days': dict(sorted(self.days.items()))},
+                      f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def backfill(record, store, tickers, trade_date, drop_threshold, benchmark=BENCHMARK_TICKER):
+    """
+    3.2 - Rebuild window days the record is missing from stored bars
+
+    The benchmark's stored dates are the trading calendar. Nothing is
+    loaded when the record already covers the window. Returns the dates
+    added.
+    """
+    from mr_market_backtest import frames_to_panel
+    from mr_market_indicators import rolling_indicators
+
+    calendar = store.closes_since(benchmark, record.cutoff(trade_date))
+    missing = sorted(d for d in calendar
+                     if d not in record.days and record.cutoff(trade_date) < d < trade_date)
+    if not missing:
+        return []
+
+    frames = store.load_many(tickers)
+    frames = {t: f[f.index <= trade_date] for t, f in frames.items()}
+    frames = {t: f for t, f in frames.items() if len(f)}
+    if not frames:
+        return []
+    panel = frames_to_panel(frames, [t for t in tickers if t in frames], missing[0])
+    ind = rolling_indicators(panel['Close'], panel['Low'], panel['High'])
+    dates = [d for d in missing if d in set(panel['dates'])]
+    for date, entry in panel_entries(panel, ind, dates, drop_threshold, benchmark).items():
+        record.days[date] = entry
+    return dates
+
+
+# =============================================================================
+# BLOCK 4: STATE
+# =============================================================================
+
+def regime_state(record, trade_date, threshold):
+    """
+    4.1 - Regime dict for the prompt and watch mode
+
+    Keys: trade_date, label, suspended, trigger_count, trigger_days,
+    threshold, window, breadth, decliners, dispersion, voo_drawdown
+    (today's values; NaN when there is no entry for trade_date).
+    """
+    days = record.window(trade_date)
+    count = sum(e['triggers'] for _, e in days)
+    today = record.days.get(trade_date, {})
+    state = {
+        'trade_date': trade_date,
+        'trigger_count': count,
+        'trigger_days': sum(1 for _, e in days if e['triggers']),
+        'threshold': threshold,
+        'window': record.window_days,
+        'suspended': count >= threshold,
+    }
+    for key in ('breadth', 'decliners', 'dispersion', 'voo_drawdown'):
+        value = today.get(key)
+        state[key] = float('nan') if value is None else value
+
+    if state['suspended']:
+        state['label'] = "SUSPENDED"
+    elif state['voo_drawdown'] >= STRESS_DRAWDOWN_PCT or state['breadth'] <= WEAK_BREADTH_PCT:
+        state['label'] = "STRESSED"
+    else:
+        state['label'] = "NORMAL"
+    return state
@@ -4,7 +4,7 @@
 MR. MARKET ROUNDTABLE - Combined Daily Script
 ===============================================================================
 Purpose: One script to rule them all. Run after market close to:
-    1. Fetch market data for all 25 stocks
+    1. Fetch market data for every stock in watchlist.json
     2. Update tracker (positions, pending orders, daily snapshot)
     3. Detect Track 2/3 alert candidates
     4. Generate a single AI Roundtable prompt file
@@ -12,10 +12,21 @@ Purpose: One script to rule them all. Run after market close to:
 
 Usage:
     python mr_market_roundtable.py
+    python mr_market_roundtable.py --import-tracker     (once, switch to SQLite)
+    python mr_market_roundtable.py --backfill-history 2016-01-01
+    python mr_market_roundtable.py --refresh-fundamentals (statements warehouse, data packs)
+    python mr_market_roundtable.py --replay 2016-01-01 --replay-out replay.csv
+    python mr_market_roundtable.py --sweep 2016-01-01 --sweep-out sweep.csv
+    python mr_market_roundtable.py --watch              (during market hours)
+    python mr_market_roundtable.py --build-site         (re-render the site pages only)
+    python mr_market_roundtable.py --roundtable         (send to the three models, ingest)
+    python mr_market_roundtable.py --offline            (replay recorded market data, no network)
 
 Output:
-    - Updates mr_market_tracker.xlsx
-    - Creates prompts/YYYY_MM_DD_roundtable_prompt.txt
+    - Updates mr_market_tracker.db (system of record) and exports
+      mr_market_tracker.xlsx; without the database, updates the xlsx directly
+    - Creates prompts/YYYY_MM_DD_roundtable_prompt.txt (with --prompt-variants,
+      also one _auditor/_narrator/_arbiter prompt per analyst)
 
 Author:  Built with Claude, ChatGPT, and Gemini
 Version: 1.0
@@ -23,139 +34,93 @@ Date:    January 2026
 ===============================================================================
 """
 
-import yfinance as yf
-from openpyxl import load_workbook
 from datetime import datetime, timedelta
 import os
-import json
 import argparse
-import re
+import glob
+
+# Only stdlib-backed modules are imported here. numpy (fetch, alerts,
+# regime, replay, watch), pandas/yfinance (fetch), openpyxl (workbook
+# load/save) and asyncio (roundtable, watch) are imported by the functions
+# that need them, so importing this module has no side effects and
+# --ingest-only starts fast.
+from mr_market_ledger import Ledger
+from mr_market_db import SqliteLedger, import_workbook
+from mr_market_site import build_site, SITE_DIR
+from mr_market_prompt import (render_prompt, render_variants, token_report, format_token_report,
+                              ROLES, DEFAULT_TOKEN_BUDGET)
+from mr_market_decisions import parse_decision_text, scan_decision_file
+from mr_market_watchlist import Watchlist
+from mr_market_metrics import (RunMetrics, MeteredProvider, append_run_log, file_bytes,
+                               slowest_stages, write_prometheus_textfile)
 
 # =============================================================================
 # BLOCK 1: CONFIGURATION
 # =============================================================================
-print("=" * 70)
-print("MR. MARKET ROUNDTABLE - Combined Daily Script v1.0")
-print(f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-print("=" * 70)
 
 # 1.1 - File paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TRACKER_FILE = os.path.join(SCRIPT_DIR, "mr_market_tracker.xlsx")
-TRACK2_HISTORY_FILE = os.path.join(SCRIPT_DIR, "track2_trigger_history.json")
+REGIME_FILE = os.path.join(SCRIPT_DIR, "regime_history.json")
 PROMPTS_DIR = os.path.join(SCRIPT_DIR, "prompts")
+HISTORY_DB_FILE = os.path.join(SCRIPT_DIR, "price_history.db")
+TRACKER_DB_FILE = os.path.join(SCRIPT_DIR, "mr_market_tracker.db")
+WATCHLIST_FILE = os.path.join(SCRIPT_DIR, "watchlist.json")
+RUN_LOG_FILE = os.path.join(SCRIPT_DIR, "run_log.jsonl")
+PROFILE_FILE = os.path.join(SCRIPT_DIR, "run_profile.prof")
+DECISIONS_DIR = os.path.join(SCRIPT_DIR, "decisions")
+MARKET_CACHE_DIR = os.path.join(SCRIPT_DIR, "market_cache")
+FUNDAMENTALS_DIR = os.path.join(SCRIPT_DIR, "fundamentals_warehouse")
 
-# 1.2 - Create directories if they don't exist
-if not os.path.exists(PROMPTS_DIR):
-    os.makedirs(PROMPTS_DIR)
-    print(f"    Created prompts directory: {PROMPTS_DIR}")
 
-DECISIONS_DIR = os.path.join(SCRIPT_DIR, "decisions")
-if not os.path.exists(DECISIONS_DIR):
-    os.makedirs(DECISIONS_DIR)
-    print(f"    Created decisions directory: {DECISIONS_DIR}")
-
-# 1.3 - All 25 tickers
-TICKERS = [
-    "VOO", "MSFT", "AAPL", "NVDA", "ASML", "BAC", "CB", "V", "MCO",
-    "JNJ", "NVO", "CVX", "GEV", "GE", "WM",
-    "ODFL", "TYL", "FICO", "CPRT", "IDXX", "VRSN", "ROP", "RSG", "JKHY", "PWR"
-]
+# 1.2 - Create directories if they don't exist (called by main(), not on import)
+def ensure_directories():
+    for label, path in (("prompts", PROMPTS_DIR), ("decisions", DECISIONS_DIR)):
+        if not os.path.exists(path):
+            os.makedirs(path)
+            print(f"    Created {label} directory: {path}")
+
+
+# 1.3 - Watchlist config (tickers, names, strategy tags, targets, exit
+# criteria; validated on load, see mr_market_watchlist). Nothing is read
+# on import: load_watchlist() fills it and the 1.4-1.6 views in place.
+WATCHLIST_CONFIG = Watchlist(WATCHLIST_FILE, load=False)
+
 
-# 1.4 - Watchlist with company names and strategy tags
-WATCHLIST = {
-    "VOO":  {"name": "S&P 500 Index", "strategy": "CORE", "tier": "1"},
-    "MSFT": {"name": "Microsoft", "strategy": "CORE", "tier": "1"},
-    "AAPL": {"name": "Apple", "strategy": "CORE", "tier": "1"},
-    "NVDA": {"name": "NVIDIA", "strategy": "CORE", "tier": "1"},
-    "ASML": {"name": "ASML", "strategy": "CORE", "tier": "1"},
-    "BAC":  {"name": "Bank of America", "strategy": "CORE", "tier": "1"},
-    "CB":   {"name": "Chubb", "strategy": "CORE", "tier": "1"},
-    "V":    {"name": "Visa", "strategy": "CORE", "tier": "1"},
-    "MCO":  {"name": "Moody's", "strategy": "CORE", "tier": "1"},
-    "JNJ":  {"name": "Johnson & Johnson", "strategy": "CORE", "tier": "1"},
-    "NVO":  {"name": "Novo Nordisk", "strategy": "CORE", "tier": "1"},
-    "CVX":  {"name": "Chevron", "strategy": "CORE", "tier": "1"},
-    "GEV":  {"name": "GE Vernova", "strategy": "CORE", "tier": "1"},
-    "GE":   {"name": "GE Aerospace", "strategy": "CORE", "tier": "1"},
-    "WM":   {"name": "Waste Management", "strategy": "CORE", "tier": "1"},
-    "ODFL": {"name": "Old Dominion Freight", "strategy": "HUNT", "tier": "1B"},
-    "TYL":  {"name": "Tyler Technologies", "strategy": "DCA", "tier": "1B"},
-    "FICO": {"name": "Fair Isaac", "strategy": "DCA", "tier": "1B"},
-    "CPRT": {"name": "Copart", "strategy": "HUNT", "tier": "1B"},
-    "IDXX": {"name": "IDEXX Labs", "strategy": "DCA", "tier": "1B"},
-    "VRSN": {"name": "Verisign", "strategy": "HUNT", "tier": "1B"},
-    "ROP":  {"name": "Roper Technologies", "strategy": "HUNT", "tier": "1B"},
-    "RSG":  {"name": "Republic Services", "strategy": "DCA", "tier": "1B"},
-    "JKHY": {"name": "Jack Henry", "strategy": "DCA", "tier": "1B"},
-    "PWR":  {"name": "Quanta Services", "strategy": "HUNT", "tier": "1B"},
-}
+def load_watchlist():
+    """1.3.1 - Read and validate watchlist.json once (run() calls this first)"""
+    if not WATCHLIST_CONFIG.loaded:
+        WATCHLIST_CONFIG.load()
+    return WATCHLIST_CONFIG
+
+
+# 1.4 - All tickers and the watchlist with company names and strategy tags
+TICKERS = WATCHLIST_CONFIG.tickers
+WATCHLIST = WATCHLIST_CONFIG.info
 
 # 1.5 - Tri-Anchor Target Prices (Track 3)
-TARGETS = {
-    "VOO":  {"target": 570, "add_target": 540},
-    "MSFT": {"target": 450, "add_target": 445},
-    "AAPL": {"target": 230, "add_target": 220},
-    "NVDA": {"target": 150, "add_target": 140},
-    "ASML": {"target": 900, "add_target": 850},
-    "BAC":  {"target": 48, "add_target": 45},
-    "CB":   {"target": 280, "add_target": 270},
-    "V":    {"target": 310, "add_target": 300},
-    "MCO":  {"target": 450, "add_target": 430},
-    "JNJ":  {"target": 180, "add_target": 170},
-    "NVO":  {"target": 50, "add_target": 45},
-    "CVX":  {"target": 150, "add_target": 145},
-    "GEV":  {"target": 550, "add_target": 500},
-    "GE":   {"target": 280, "add_target": 270},
-    "WM":   {"target": 210, "add_target": 200},
-    "ODFL": {"target": 140, "add_target": 125},
-    "TYL":  {"target": 400, "add_target": 380},
-    "FICO": {"target": 1400, "add_target": 1300},
-    "CPRT": {"target": 35, "add_target": 32},
-    "IDXX": {"target": 550, "add_target": 500},
-    "VRSN": {"target": 220, "add_target": 200},
-    "ROP":  {"target": 400, "add_target": 380},
-    "RSG":  {"target": 190, "add_target": 180},
-    "JKHY": {"target": 160, "add_target": 150},
-    "PWR":  {"target": 350, "add_target": 320},
-}
+TARGETS = WATCHLIST_CONFIG.targets
 
 # 1.6 - Exit Criteria (what would break the thesis)
-EXIT_CRITERIA = {
-    "VOO":  "N/A - index, always hold",
-    "MSFT": "Azure growth <15% for 3+ quarters; loses enterprise cloud share to AWS/GCP",
-    "AAPL": "iPhone unit decline >15% YoY for 2+ years; Services growth stalls <10%",
-    "NVDA": "Loses GPU AI training dominance to AMD/custom silicon; data center growth <20%",
-    "ASML": "EUV technology leapfrogged; China restrictions permanently impair >30% revenue",
-    "BAC":  "Net interest margin compression <2% sustained; major credit losses in recession",
-    "CB":   "Combined ratio >100% for 2+ years; catastrophic reserve deficiency",
-    "V":    "Payment volume growth <5% sustained; regulatory cap on interchange fees",
-    "MCO":  "Credit rating market share loss >10pts to S&P/Fitch; regulatory action on conflicts",
-    "JNJ":  "Talc litigation exceeds $50B; pharma pipeline fails to offset LOEs",
-    "NVO":  "GLP-1 competition erodes pricing power >30%; safety signal emerges",
-    "CVX":  "Oil prices <$50 sustained 2+ years; fails energy transition pivot",
-    "GEV":  "Wind turbine quality issues persist; grid equipment margins <10%",
-    "GE":   "Commercial aerospace orders decline 2+ years; LEAP engine issues",
-    "WM":   "FCF margins compress <12% sustained; Stericycle integration fails",
-    "ODFL": "LTL market share loss >3pts; pricing discipline breaks industry-wide",
-    "TYL":  "Cloud bookings growth <10%; government budget cuts impair pipeline",
-    "FICO": "VantageScore gains >30% GSE market share; CFPB regulatory action on pricing",
-    "CPRT": "Insurance carriers vertically integrate salvage; total loss rates decline structurally",
-    "IDXX": "Vet visit frequency declines sustained; loses reference lab share to Zoetis",
-    "VRSN": ".com/.net registry contract not renewed; ICANN policy change",
-    "ROP":  "Organic growth <4% for 2+ years; acquisition integration failures",
-    "RSG":  "FCF margins compress <12% sustained; loses municipal contracts to WM",
-    "JKHY": "Core banking share loss to FIS/Fiserv; credit union consolidation accelerates",
-    "PWR":  "Utility CapEx cycle reverses; grid buildout delays >2 years",
-}
+EXIT_CRITERIA = WATCHLIST_CONFIG.exit_criteria
 
 # 1.7 - Alert Thresholds
 SINGLE_DAY_DROP_THRESHOLD = 5.0      # Track 2 trigger: >= 5% drop
 NEAR_52_WEEK_LOW_THRESHOLD = 15.0    # Alert if within 15% of 52-week low
 BELOW_50_DAY_MA_THRESHOLD = 3.0      # Only alert if >= 3% below 50-day MA
 TRACK3_DISTANCE_THRESHOLD = 10.0     # Track 3: within 10% of target
+RSI_OVERSOLD_THRESHOLD = 30.0        # Alert if 14-day RSI <= 30
+VOLUME_SPIKE_RATIO = 2.0             # Alert if volume >= 2x 20-day average on a down day
+GAP_DOWN_THRESHOLD = 3.0             # Alert if opened >= 3% below previous close
+DRAWDOWN_FROM_HIGH_THRESHOLD = 30.0  # Alert if >= 30% below 52-week high
+
+# 1.7.1 - Alert rules to run (see mr_market_signals; listed in this order)
+ALERT_SIGNALS = [
+    'single_day_drop', 'near_target', 'near_52_week_low', 'below_50_day_ma',
+    'rsi_oversold', 'volume_spike', 'gap_down', 'drawdown_from_high',
+]
 
-# 1.8 - Track 2 Regime Detection
+# 1.8 - Track 2 Regime Detection (breadth / drawdown levels: mr_market_regime)
 TRACK2_REGIME_THRESHOLD = 5          # If >= 5 triggers in 10 days, warn
 TRACK2_REGIME_WINDOW_DAYS = 10
 
@@ -164,85 +129,138 @@ TRACK2_REGIME_WINDOW_DAYS = 10
 # BLOCK 2: DATA FETCHING
 # =============================================================================
 
-def fetch_all_market_data():
+def fetch_all_market_data(provider=None, store=None, metrics=None, fundamentals=None):
     """
     2.1 - Fetch comprehensive market data for all tickers
     Returns dict with price, change, 52-week range, 50-day MA, P/E ratios
+    and the local average trailing P/E (pe_avg over pe_avg_years)
+
+    Only bars after the last date in the local history store are downloaded
+    (one batched request); rolling stats are computed from the store and
+    P/E fields come from the fundamentals TTL cache, expired ones being
+    refreshed in the background (see mr_market_fundamentals). A caller
+    that passes its own FundamentalsStore finishes it; otherwise the
+    refreshes are waited for here.
+    The default provider is Yahoo behind the record/replay cache (2.2);
+    pass a provider (e.g. FakeProvider) to run without hitting Yahoo;
+    with a RunMetrics every provider request is timed per ticker.
     """
+    from mr_market_fetch import fetch_market_data
+    from mr_market_fundamentals import FundamentalsStore
+    from mr_market_history import HistoryStore
+    
     print("\n[1] FETCHING MARKET DATA")
     print("-" * 50)
     
-    market_data = {}
-    trade_dates = []
+    if provider is None:
+        provider = market_provider()
+    if metrics is not None:
+        provider = MeteredProvider(provider, metrics)
+    if store is None:
+        store = HistoryStore(HISTORY_DB_FILE)
+    own_fundamentals = fundamentals is None
+    if own_fundamentals:
+        fundamentals = FundamentalsStore(HISTORY_DB_FILE)
+    
+    market_data = fetch_market_data(TICKERS, provider, store=store, fundamentals=fundamentals)
+    tickers = [k for k in market_data if not k.startswith('_')]
+    
+    # 2.1.1 - Report trade date (mode of all per-ticker dates)
+    if '_trade_date' in market_data:
+        print(f"\n    Trade date: {market_data['_trade_date']}")
+        
+        # 2.1.1.1 - Today's P/E into the history, local average P/E per ticker
+        trade_date = market_data['_trade_date']
+        fundamentals.record_pe(trade_date, {t: (market_data[t]['trailing_pe'],
+                                                market_data[t]['forward_pe']) for t in tickers})
+        averages = fundamentals.pe_averages(tickers, trade_date)
+        for ticker in tickers:
+            market_data[ticker]['pe_avg'], market_data[ticker]['pe_avg_years'] = \
+                averages.get(ticker, (None, None))
+    if own_fundamentals:
+        fundamentals.finish()
+    
+    print(f"    Fetched: {len(tickers)} of {len(TICKERS)} tickers")
+    if hasattr(provider, 'summary'):
+        print(f"    Market cache: {provider.summary()}")
     
-    for ticker in TICKERS:
-        try:
-            print(f"    {ticker}...", end=" ")
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="400d")
-            
-            if hist.empty or len(hist) < 2:
-                print("NO DATA")
-                continue
-            
-            # 2.1.1 - Basic price data
-            today = hist.iloc[-1]
-            yesterday = hist.iloc[-2]
-            close = today['Close']
-            low = today['Low']
-            prev_close = yesterday['Close']
-            change_pct = ((close - prev_close) / prev_close) * 100
-            
-            # 2.1.2 - 50-day moving average
-            ma_50 = hist['Close'].tail(50).mean() if len(hist) >= 50 else hist['Close'].mean()
-            
-            # 2.1.3 - 52-week high/low
-            window_52w = hist.tail(252) if len(hist) >= 252 else hist
-            week_52_low = window_52w['Low'].min()
-            week_52_high = window_52w['High'].max()
-            
-            # 2.1.4 - P/E ratios
-            trailing_pe = None
-            forward_pe = None
-            try:
-                info = stock.info
-                trailing_pe = info.get('trailingPE')
-                forward_pe = info.get('forwardPE')
-            except:
-                pass
-            
-            # 2.1.5 - Collect trade date
-            ticker_date = hist.index[-1].strftime("%Y-%m-%d")
-            trade_dates.append(ticker_date)
-            
-            market_data[ticker] = {
-                'close': close,
-                'low': low,
-                'prev_close': prev_close,
-                'change_pct': change_pct,
-                'ma_50': ma_50,
-                'week_52_low': week_52_low,
-                'week_52_high': week_52_high,
-                'trailing_pe': trailing_pe,
-                'forward_pe': forward_pe,
-            }
-            
-            print(f"${close:.2f} ({change_pct:+.1f}%)")
-            
-        except Exception as e:
-            print(f"ERROR: {e}")
+    return market_data
+
+
+def market_provider(mode='record'):
+    """
+    2.2 - Yahoo provider for this run (see mr_market_cache)
+
+    'record' serves recordings younger than their TTL and records every
+    live response; 'offline' replays recordings only and never touches
+    the network; 'live' is the bare provider, nothing recorded.
+    """
+    from mr_market_cache import CachedProvider, MarketCache
+    from mr_market_fetch import YahooProvider
     
-    # 2.1.6 - Determine trade date (mode of all dates)
-    if trade_dates:
-        from collections import Counter
-        date_counts = Counter(trade_dates)
-        trade_date = date_counts.most_common(1)[0][0]
-        market_data['_trade_date'] = trade_date
-        print(f"\n    Trade date: {trade_date}")
+    if mode == 'live':
+        return YahooProvider()
+    return CachedProvider(MarketCache(MARKET_CACHE_DIR), live=YahooProvider,
+                          offline=(mode == 'offline'))
+
+
+def refresh_warehouse(provider=None, market_data=None, metrics=None, force=False,
+                      fallback=False):
+    """
+    2.3 - Refresh the quarterly-statements warehouse and rebuild the data packs
+    
+    Statements last requested more than a week ago (all of them with
+    force) are requested again; everything else is read from the local
+    archive. Metrics for every ticker are recomputed in one pass at
+    today's closes (market_data) or the last stored closes, saved to
+    packs.json for the site, and each ticker's one-line summary is added
+    to market_data as 'fundamentals' for the prompt (see
+    mr_market_warehouse). Returns {ticker: data pack}.
+    
+    With fallback (the daily run) a failed refresh is reported and the
+    packs saved by the last good refresh are used instead.
+    """
+    from mr_market_fetch import trade_date_mode
+    from mr_market_history import HistoryStore
+    from mr_market_warehouse import Warehouse, data_packs, load_packs, pack_summary, save_packs
     
-    print(f"    Fetched: {len([k for k in market_data if not k.startswith('_')])} of {len(TICKERS)} tickers")
+    print("\n[FUNDAMENTALS] QUARTERLY STATEMENTS WAREHOUSE")
+    print("-" * 50)
     
-    return market_data
+    if provider is None:
+        provider = market_provider()
+    if metrics is not None:
+        provider = MeteredProvider(provider, metrics)
+    try:
+        warehouse = Warehouse(FUNDAMENTALS_DIR)
+        warehouse.refresh(TICKERS, provider, force=force)
+        
+        # 2.3.1 - Prices for the multiples: today's closes, else the last stored ones
+        if market_data:
+            trade_date = market_data.get('_trade_date')
+            prices = {t: d['close'] for t, d in market_data.items() if not t.startswith('_')}
+        else:
+            store = HistoryStore(HISTORY_DB_FILE)
+            last = store.last_dates()
+            prices = {t: store.closes_since(t, last[t])[last[t]] for t in TICKERS if t in last}
+            trade_date = trade_date_mode(list(last.values()))
+            store.close()
+        
+        packs = data_packs(warehouse.table, prices, TICKERS)
+        save_packs(FUNDAMENTALS_DIR, packs, trade_date)
+    except Exception as e:
+        if not fallback:
+            raise
+        trade_date, packs = load_packs(FUNDAMENTALS_DIR)
+        print(f"    Warehouse refresh failed ({type(e).__name__}: {e}); "
+              f"using the archived data packs")
+    
+    for ticker, pack in packs.items():
+        if market_data and ticker in market_data:
+            market_data[ticker]['fundamentals'] = pack_summary(pack)
+    print(f"    Data packs: {len(packs)} of {len(TICKERS)} tickers "
+          f"(prices {trade_date or 'N/A'})")
+    return packs
 
 
 # =============================================================================
@@ -250,11 +268,39 @@ def fetch_all_market_data():
 # =============================================================================
 
 def load_tracker():
-    """3.1 - Load the tracker workbook"""
+    """
+    3.1 - Load the tracker into an in-memory ledger
+
+    The SQLite database (TRACKER_DB_FILE) is the system of record once it
+    has been created with --import-tracker; the workbook is then only an
+    export. Until then the workbook is read once (read-only, values only)
+    and written back in one pass by ledger.save(). Every Block 3/5/7
+    function works against the returned ledger either way.
+    """
+    if os.path.exists(TRACKER_DB_FILE):
+        return SqliteLedger.load(TRACKER_DB_FILE)
     if not os.path.exists(TRACKER_FILE):
         print(f"    ERROR: Tracker not found: {TRACKER_FILE}")
         return None
-    return load_workbook(TRACKER_FILE)
+    print(f"    NOTE: Using {os.path.basename(TRACKER_FILE)} directly "
+          f"(run --import-tracker to switch to SQLite)")
+    return Ledger.load(TRACKER_FILE)
+
+
+def save_tracker(ledger):
+    """3.1.1 - Persist the ledger; with SQLite also refresh the xlsx export"""
+    if isinstance(ledger, SqliteLedger):
+        ledger.export(TRACKER_FILE)
+        print(f"\n    Saved: {ledger.path}")
+        print(f"    Exported: {TRACKER_FILE}")
+        return
+    ledger.save(TRACKER_FILE)
+    print(f"\n    Saved: {ledger.path}")
+
+
+def tracker_files():
+    """3.1.2 - Files a tracker save writes (database and/or workbook)"""
+    return [TRACKER_DB_FILE, TRACKER_FILE]
 
 
 def normalize_date(date_val):
@@ -271,62 +317,53 @@ def normalize_date(date_val):
     return str(date_val)
 
 
-def update_positions_prices(wb, market_data):
+def update_positions_prices(ledger, market_data):
     """3.3 - Update Current_Price column in Positions sheet"""
     print("\n[2] UPDATING POSITION PRICES")
     print("-" * 50)
     
-    ws = wb['Positions']
+    positions = ledger.positions
     updated = 0
     
-    for row in range(2, ws.max_row + 1):
-        ticker = ws.cell(row=row, column=1).value
+    for row in positions:
+        ticker = row['Ticker']
         if ticker and ticker in market_data:
-            price = market_data[ticker]['close']
-            ws.cell(row=row, column=5, value=price)
+            positions.set(row, 'Current_Price', market_data[ticker]['close'])
             updated += 1
     
     print(f"    Updated {updated} position prices")
     return updated
 
 
-def get_cash_balance(wb):
+def get_cash_balance(ledger):
     """3.4 - Get current cash balance from Positions sheet"""
-    ws = wb['Positions']
-    for row in range(2, ws.max_row + 1):
-        if ws.cell(row=row, column=1).value == "CASH":
-            return ws.cell(row=row, column=6).value or 0
-    return 0
+    row = ledger.positions.find("CASH")
+    if row is None:
+        return 0
+    return row['Market_Value'] or 0
 
 
-def update_cash_balance(wb, new_balance):
+def update_cash_balance(ledger, new_balance):
     """3.5 - Update cash balance in Positions sheet"""
-    ws = wb['Positions']
-    for row in range(2, ws.max_row + 1):
-        if ws.cell(row=row, column=1).value == "CASH":
-            ws.cell(row=row, column=6, value=new_balance)
-            return True
-    return False
+    row = ledger.positions.find("CASH")
+    if row is None:
+        return False
+    ledger.positions.set(row, 'Market_Value', new_balance)
+    return True
 
 
-def update_position(wb, ticker, shares_to_add, price, buy_date):
+def update_position(ledger, ticker, shares_to_add, price, buy_date):
     """3.6 - Update a position after a fill"""
-    ws = wb['Positions']
-    
-    # Find ticker row
-    row = None
-    for r in range(2, ws.max_row + 1):
-        if ws.cell(row=r, column=1).value == ticker:
-            row = r
-            break
+    positions = ledger.positions
+    row = positions.find(ticker)
     
     if row is None:
         print(f"    ERROR: {ticker} not found in Positions")
         return False
     
     # Calculate new average cost
-    current_shares = ws.cell(row=row, column=2).value or 0
-    current_avg_cost = ws.cell(row=row, column=3).value or 0
+    current_shares = row['Shares'] or 0
+    current_avg_cost = row['Avg_Cost'] or 0
     current_invested = current_shares * current_avg_cost
     
     new_invested = shares_to_add * price
@@ -334,128 +371,160 @@ def update_position(wb, ticker, shares_to_add, price, buy_date):
     total_invested = current_invested + new_invested
     new_avg_cost = total_invested / total_shares if total_shares > 0 else 0
     
-    ws.cell(row=row, column=2, value=total_shares)
-    ws.cell(row=row, column=3, value=new_avg_cost)
+    positions.set(row, 'Shares', total_shares)
+    positions.set(row, 'Avg_Cost', new_avg_cost)
     
     # Set first buy date if not set
-    if not ws.cell(row=row, column=10).value:
-        ws.cell(row=row, column=10, value=buy_date)
+    if not row['First_Buy_Date']:
+        positions.set(row, 'First_Buy_Date', buy_date)
     
     return True
 
 
-def reconcile_pending_orders(wb, market_data):
-    """3.7 - Check pending orders against day's low for fills"""
+def reconcile_pending_orders(ledger, market_data, minute_panel=None):
+    """
+    3.7 - Check pending orders against day's low for fills
+
+    With a minute_panel (3.9, --intraday-fills), orders on tickers that
+    have minute bars fill only when enough volume traded at/below the
+    limit; the fill time, price and slippage go into the Action_Log
+    notes. The Action_Log Price stays the order's limit either way.
+    """
     print("\n[3] RECONCILING PENDING ORDERS")
     print("-" * 50)
     
-    ws_pending = wb['Pending_Orders']
-    ws_log = wb['Action_Log']
-    
-    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
-    
-    fills = []
-    expirations = []
-    kept = []
-    rows_to_delete = []
-    
-    cash = get_cash_balance(wb)
-    
-    for row in range(2, ws_pending.max_row + 1):
-        order_date_raw = ws_pending.cell(row=row, column=1).value
-        ticker = ws_pending.cell(row=row, column=2).value
-        limit_price = ws_pending.cell(row=row, column=3).value
-        shares = ws_pending.cell(row=row, column=4).value
-        track = ws_pending.cell(row=row, column=5).value
-        signal = ws_pending.cell(row=row, column=6).value
-        thesis = ws_pending.cell(row=row, column=7).value
-        notes = ws_pending.cell(row=row, column=8).value
-        status = ws_pending.cell(row=row, column=9).value
+    # One transaction: with the SQLite backend a concurrent run waits
+    # instead of filling the same order twice
+    with ledger.transaction():
+        trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
         
-        if status and status not in ['PENDING', '']:
-            continue
-        if not ticker or not shares or not limit_price:
-            continue
+        fills = []
+        expirations = []
+        kept = []
+        rows_to_delete = []
         
-        order_date = normalize_date(order_date_raw)
+        cash = get_cash_balance(ledger)
         
-        # Skip orders with missing dates (malformed data)
-        if not order_date:
-            print(f"    SKIPPED: {ticker} - Missing order date")
-            continue
+        # Intraday-path fills for every order in one vectorized pass
+        simulated = {}
+        if minute_panel is not None:
+            from mr_market_fills import simulate_fills
+            candidates = [row for row in ledger.pending_orders
+                          if row['Ticker'] and row['Shares'] and row['Limit']]
+            results = simulate_fills(minute_panel, [
+                {'ticker': row['Ticker'], 'limit': row['Limit'], 'shares': row['Shares']}
+                for row in candidates
+            ])
+            simulated = {id(row): result for row, result in zip(candidates, results)}
         
-        # Skip future-dated orders
-        if order_date and trade_date and order_date > trade_date:
-            continue
-        
-        # Check if filled
-        if ticker in market_data:
-            day_low = market_data[ticker]['low']
-            fill_cost = shares * limit_price
+        for row in ledger.pending_orders:
+            ticker = row['Ticker']
+            limit_price = row['Limit']
+            shares = row['Shares']
+            track = row['Track']
+            status = row['Status']
+            
+            if status and status not in ['PENDING', '']:
+                continue
+            if not ticker or not shares or not limit_price:
+                continue
+            
+            order_date = normalize_date(row['Date'])
             
-            if day_low <= limit_price:
-                if fill_cost > cash:
-                    print(f"    BLOCKED: {ticker} - Insufficient cash")
-                    continue
+            # Skip orders with missing dates (malformed data)
+            if not order_date:
+                print(f"    SKIPPED: {ticker} - Missing order date")
+                continue
+            
+            # Skip future-dated orders
+            if order_date and trade_date and order_date > trade_date:
+                continue
+            
+            # Check if filled
+            if ticker in market_data:
+                day_low = market_data[ticker]['low']
+                sim = simulated.get(id(row))
+                if sim is None:
+                    is_filled = day_low <= limit_price
+                    fill_price = limit_price
+                    notes = row['Notes']
+                else:
+                    is_filled = sim['filled']
+                    fill_price = sim['price'] if is_filled else limit_price
+                    notes = row['Notes']
+                    if is_filled:
+                        detail = (f"Filled {sim['time']} ET @ ${fill_price:.2f}, "
+                                  f"slippage {sim['slippage_pct']:+.2f}%")
+                        notes = f"{notes} | {detail}" if notes else detail
+                fill_cost = shares * fill_price
+                
+                if is_filled:
+                    if fill_cost > cash:
+                        print(f"    BLOCKED: {ticker} - Insufficient cash")
+                        continue
+                    fills.append({
+                        'ticker': ticker,
+                        'shares': int(shares),
+                        'price': fill_price,
+                        'limit': limit_price,
+                        'track': track,
+                        'signal': row['Signal'],
+                        'thesis': row['Thesis'],
+                        'notes': notes,
+                        'time': sim['time'] if sim else None,
+                        'slippage_pct': sim['slippage_pct'] if sim else None,
+                    })
+                    rows_to_delete.append(row)
+                    cash -= fill_cost
+                    when = f", {sim['time']} ET" if sim else ""
+                    print(f"    FILLED: {ticker} @ ${fill_price:.2f} (low: ${day_low:.2f}{when})")
                 
-                fills.append({
-                    'ticker': ticker,
-                    'shares': int(shares),
-                    'price': limit_price,
-                    'track': track,
-                    'signal': signal,
-                    'thesis': thesis,
-                    'notes': notes
-                })
-                rows_to_delete.append(row)
-                cash -= fill_cost
-                print(f"    FILLED: {ticker} @ ${limit_price:.2f} (low: ${day_low:.2f})")
+                elif str(track) in ['1', '2']:
+                    # Track 1/2 are DAY orders: expire if trade_date >= order_date and not filled
+                    # By this point, we know order_date <= trade_date (future orders skipped earlier)
+                    # So this order had its chance and missed - expire it
+                    expirations.append({'ticker': ticker, 'limit': limit_price})
+                    rows_to_delete.append(row)
+                    print(f"    EXPIRED: {ticker} DAY order @ ${limit_price:.2f} (order date: {order_date})")
+                else:
+                    kept.append({'ticker': ticker, 'limit': limit_price})
+                    print(f"    KEPT: {ticker} GTC @ ${limit_price:.2f}")
+        
+        # Process fills. Action_Log Price is the order's limit, so the
+        # idempotency key (7.3) still matches the decision that placed it;
+        # a simulated fill price is in Notes and in the position's cost
+        for fill in fills:
+            ledger.action_log.append({
+                'Date': trade_date,
+                'Ticker': fill['ticker'],
+                'Track': fill['track'],
+                'Action': "BUY",
+                'Shares': fill['shares'],
+                'Price': fill['limit'],
+                'Signal': fill['signal'],
+                'Thesis': fill['thesis'],
+                'Notes': fill['notes'],
+            })
             
-            elif str(track) in ['1', '2']:
-                # Track 1/2 are DAY orders: expire if trade_date >= order_date and not filled
-                # By this point, we know order_date <= trade_date (future orders skipped earlier)
-                # So this order had its chance and missed - expire it
-                expirations.append({'ticker': ticker, 'limit': limit_price})
-                rows_to_delete.append(row)
-                print(f"    EXPIRED: {ticker} DAY order @ ${limit_price:.2f} (order date: {order_date})")
-            else:
-                kept.append({'ticker': ticker, 'limit': limit_price})
-                print(f"    KEPT: {ticker} GTC @ ${limit_price:.2f}")
-    
-    # Process fills
-    for fill in fills:
-        log_row = ws_log.max_row + 1
-        ws_log.cell(row=log_row, column=1, value=trade_date)
-        ws_log.cell(row=log_row, column=2, value=fill['ticker'])
-        ws_log.cell(row=log_row, column=3, value=fill['track'])
-        ws_log.cell(row=log_row, column=4, value="BUY")
-        ws_log.cell(row=log_row, column=5, value=fill['shares'])
-        ws_log.cell(row=log_row, column=6, value=fill['price'])
-        ws_log.cell(row=log_row, column=7, value=fill['signal'])
-        ws_log.cell(row=log_row, column=8, value=fill['thesis'])
-        ws_log.cell(row=log_row, column=9, value=fill['notes'])
+            update_position(ledger, fill['ticker'], fill['shares'], fill['price'], trade_date)
         
-        update_position(wb, fill['ticker'], fill['shares'], fill['price'], trade_date)
-    
-    update_cash_balance(wb, cash)
-    
-    # Delete processed rows
-    for row in sorted(rows_to_delete, reverse=True):
-        ws_pending.delete_rows(row)
-    
-    print(f"\n    Fills: {len(fills)}, Expirations: {len(expirations)}, Kept: {len(kept)}")
-    print(f"    Cash balance: ${cash:,.2f}")
+        update_cash_balance(ledger, cash)
+        
+        # Delete processed rows
+        ledger.pending_orders.remove(rows_to_delete)
+        
+        print(f"\n    Fills: {len(fills)}, Expirations: {len(expirations)}, Kept: {len(kept)}")
+        print(f"    Cash balance: ${cash:,.2f}")
     
     return fills, expirations, kept
 
 
-def append_daily_snapshot(wb, market_data):
+def append_daily_snapshot(ledger, market_data):
     """3.8 - Append a row to Benchmark sheet"""
     print("\n[4] APPENDING DAILY SNAPSHOT")
     print("-" * 50)
     
-    ws = wb['Benchmark']
-    ws_pos = wb['Positions']
+    benchmark = ledger.benchmark
     
     trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
     voo_price = market_data.get('VOO', {}).get('close', 0)
@@ -463,37 +532,35 @@ def append_daily_snapshot(wb, market_data):
     # Calculate portfolio value
     total_market_value = 0
     cash = 0
-    for row in range(2, ws_pos.max_row + 1):
-        label = ws_pos.cell(row=row, column=1).value
+    for row in ledger.positions:
+        label = row['Ticker']
         if label == "CASH":
-            cash = ws_pos.cell(row=row, column=6).value or 0
+            cash = row['Market_Value'] or 0
         elif label not in ["TOTAL", "PORTFOLIO"]:
-            shares = ws_pos.cell(row=row, column=2).value or 0
-            price = ws_pos.cell(row=row, column=5).value or 0
+            shares = row['Shares'] or 0
+            price = row['Current_Price'] or 0
             total_market_value += shares * price
     
     portfolio_value = total_market_value + cash
     
     # Calculate returns
-    baseline_voo = ws.cell(row=2, column=2).value or voo_price
-    baseline_portfolio = ws.cell(row=2, column=3).value or portfolio_value
+    baseline = benchmark.rows[0] if len(benchmark) else {}
+    baseline_voo = baseline.get('VOO_Price') or voo_price
+    baseline_portfolio = baseline.get('Portfolio_Value') or portfolio_value
     
     voo_return = ((voo_price - baseline_voo) / baseline_voo) if baseline_voo else 0
     portfolio_return = ((portfolio_value - baseline_portfolio) / baseline_portfolio) if baseline_portfolio else 0
     alpha = portfolio_return - voo_return
     
-    # Append row
-    new_row = ws.max_row + 1
-    ws.cell(row=new_row, column=1, value=trade_date)
-    ws.cell(row=new_row, column=2, value=voo_price)
-    ws.cell(row=new_row, column=3, value=portfolio_value)
-    ws.cell(row=new_row, column=4, value=voo_return)
-    ws.cell(row=new_row, column=5, value=portfolio_return)
-    ws.cell(row=new_row, column=6, value=alpha)
-    
-    # Format percentages
-    for col in [4, 5, 6]:
-        ws.cell(row=new_row, column=col).number_format = '0.0%'
+    # Append row (percentage formats are applied by the ledger on save)
+    benchmark.append({
+        'Date': trade_date,
+        'VOO_Price': voo_price,
+        'Portfolio_Value': portfolio_value,
+        'VOO_Return': voo_return,
+        'Portfolio_Return': portfolio_return,
+        'Alpha': alpha,
+    })
     
     print(f"    Date: {trade_date}")
     print(f"    VOO: ${voo_price:.2f} ({voo_return:+.1%})")
@@ -503,38 +570,81 @@ def append_daily_snapshot(wb, market_data):
     return portfolio_value, voo_return, portfolio_return, alpha
 
 
+def load_minute_panel(ledger, trade_date, provider=None):
+    """
+    3.9 - Minute bars for every ticker with a pending order (--intraday-fills)
+
+    Fetched once per trade date into the price-history database.
+    """
+    from mr_market_history import MinuteBarStore
+    
+    tickers = sorted({row['Ticker'] for row in ledger.pending_orders if row['Ticker']})
+    store = MinuteBarStore(HISTORY_DB_FILE)
+    try:
+        errors = store.ensure(tickers, trade_date, provider or market_provider())
+        for ticker in errors:
+            print(f"    No minute bars: {ticker} (day-low check)")
+        return store.load_panel(tickers, trade_date)
+    finally:
+        store.close()
+
+
 # =============================================================================
 # BLOCK 4: ALERT DETECTION
 # =============================================================================
 
-def load_track2_history():
-    """4.1 - Load Track 2 trigger history"""
-    if os.path.exists(TRACK2_HISTORY_FILE):
-        try:
-            with open(TRACK2_HISTORY_FILE, 'r') as f:
-                data = json.load(f)
-                return [datetime.fromisoformat(d) for d in data]
-        except:
-            return []
-    return []
+def regime_record():
+    """4.1 - The per-trade-date regime record for the Track 2 window"""
+    from mr_market_regime import RegimeRecord
+    return RegimeRecord(REGIME_FILE, TRACK2_REGIME_WINDOW_DAYS)
 
 
-def save_track2_history(history):
-    """4.2 - Save Track 2 trigger history"""
-    data = [d.isoformat() for d in history]
-    with open(TRACK2_HISTORY_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def update_regime(market_data, alerts, store=None):
+    """
+    4.2 - Record today's cross-section and return the regime state
+    
+    A rerun on the same trade date replaces that day's entry, so Track 2
+    triggers are counted once per ticker per day. Window days missing
+    from the record are rebuilt from the history store.
+    """
+    from mr_market_history import HistoryStore
+    from mr_market_regime import backfill, cross_section_entry, regime_state
+    
+    print("\n[6] MARKET REGIME")
+    print("-" * 50)
+    
+    trade_date = market_data.get('_trade_date', datetime.now().strftime('%Y-%m-%d'))
+    triggers = [a['ticker'] for a in alerts if a['is_track2']]
+    record = regime_record()
+    record.update(trade_date, cross_section_entry(market_data, triggers))
+    
+    # 4.2.1 - Backfill the window from stored bars (first run, skipped days)
+    own_store = store is None
+    store = store or HistoryStore(HISTORY_DB_FILE)
+    try:
+        added = backfill(record, store, TICKERS, trade_date, SINGLE_DAY_DROP_THRESHOLD)
+    finally:
+        if own_store:
+            store.close()
+    if added:
+        print(f"    Rebuilt {len(added)} day(s) from stored bars: {added[0]} to {added[-1]}")
+    record.save()
+    
+    state = regime_state(record, trade_date, TRACK2_REGIME_THRESHOLD)
+    print(f"    Regime: {state['label']}")
+    print(f"    Breadth: {state['breadth']:.0f}% above 50-day MA, {state['decliners']:.0f}% down today")
+    print(f"    Dispersion: {state['dispersion']:.1f}%   VOO drawdown: {state['voo_drawdown']:.1f}%")
+    print(f"    Track 2 triggers: {state['trigger_count']} in {TRACK2_REGIME_WINDOW_DAYS} days "
+          f"(threshold {TRACK2_REGIME_THRESHOLD})")
+    return state
 
 
 def check_regime_status():
-    """4.3 - Check if Track 2 should be suspended"""
-    history = load_track2_history()
-    cutoff = datetime.now() - timedelta(days=TRACK2_REGIME_WINDOW_DAYS)
-    recent = [d for d in history if d > cutoff]
-    
-    if len(recent) >= TRACK2_REGIME_THRESHOLD:
-        return True, len(recent)
-    return False, len(recent)
+    """4.3 - Regime state at the newest recorded trade date (read-only)"""
+    from mr_market_regime import regime_state
+    record = regime_record()
+    trade_date = max(record.days, default=datetime.now().strftime('%Y-%m-%d'))
+    return regime_state(record, trade_date, TRACK2_REGIME_THRESHOLD)
 
 
 def detect_alerts(market_data):
@@ -542,87 +652,65 @@ def detect_alerts(market_data):
     4.4 - Detect all Track 2 and Track 3 alert candidates
     Returns list of alert dictionaries with all relevant data
     """
+    from mr_market_signals import evaluate_signals, signal_labels
+    
     print("\n[5] DETECTING ALERTS")
     print("-" * 50)
     
     alerts = []
-    track2_triggers = 0
     
-    for ticker, data in market_data.items():
-        if ticker.startswith('_'):
-            continue
-        
+    # 4.4.0 - Every input and rule for all tickers in one vectorized pass
+    result = evaluate_signals(market_data, WATCHLIST_CONFIG, signal_params(), ALERT_SIGNALS)
+    
+    # Only tickers with at least one signal need a Python-level alert record
+    for i in result['any'].nonzero()[0]:
+        ticker = result['tickers'][i]
+        data = market_data[ticker]
         info = WATCHLIST.get(ticker, {})
         targets = TARGETS.get(ticker, {})
         
-        alert_signals = []
-        is_track2 = False
-        is_track3 = False
-        
-        # 4.4.1 - Check for Track 2 (5%+ single-day drop)
-        if data['change_pct'] <= -SINGLE_DAY_DROP_THRESHOLD:
-            alert_signals.append(f"SINGLE-DAY DROP: {data['change_pct']:.1f}%")
-            is_track2 = True
-            track2_triggers += 1
-        
-        # 4.4.2 - Check for Track 3 (within 10% of target)
+        # 4.4.1 - Tracks come from the rules that fired (Track 2 drop, Track 3 target)
+        is_track2 = bool(result['track2'][i])
+        is_track3 = bool(result['track3'][i])
         target = targets.get('target', 0)
-        if target > 0:
-            distance_pct = ((data['close'] - target) / target) * 100
-            if distance_pct <= TRACK3_DISTANCE_THRESHOLD:
-                alert_signals.append(f"NEAR TARGET: {distance_pct:+.1f}% from ${target}")
-                is_track3 = True
-        else:
-            distance_pct = None
+        distance_pct = result['metrics']['target_distance_pct'][i]
+        distance_pct = None if distance_pct != distance_pct else float(distance_pct)
         
-        # 4.4.3 - Check for near 52-week low
-        distance_from_low = ((data['close'] - data['week_52_low']) / data['week_52_low']) * 100
-        if distance_from_low <= NEAR_52_WEEK_LOW_THRESHOLD:
-            alert_signals.append(f"NEAR 52-WEEK LOW: {distance_from_low:.1f}% above ${data['week_52_low']:.2f}")
+        # 4.4.2 - One label per rule that fired, in ALERT_SIGNALS order
+        alert_signals = signal_labels(result, i, data, target)
         
-        # 4.4.4 - Check for below 50-day MA
-        if data['close'] < data['ma_50']:
-            pct_below = ((data['ma_50'] - data['close']) / data['ma_50']) * 100
-            if pct_below >= BELOW_50_DAY_MA_THRESHOLD:
-                alert_signals.append(f"BELOW 50-DAY MA: {pct_below:.1f}% below ${data['ma_50']:.2f}")
+        # 4.4.3 - Add to list
+        alerts.append({
+            'ticker': ticker,
+            'company': info.get('name', ticker),
+            'strategy': info.get('strategy', 'N/A'),
+            'tier': info.get('tier', 'N/A'),
+            'price': data['close'],
+            'prev_close': data['prev_close'],
+            'change_pct': data['change_pct'],
+            'ma_50': data['ma_50'],
+            'week_52_low': data['week_52_low'],
+            'week_52_high': data['week_52_high'],
+            'trailing_pe': data['trailing_pe'],
+            'forward_pe': data['forward_pe'],
+            'pe_avg': data.get('pe_avg'),
+            'pe_avg_years': data.get('pe_avg_years'),
+            'fundamentals': data.get('fundamentals'),
+            'target': target,
+            'add_target': targets.get('add_target', 0),
+            'target_distance_pct': distance_pct,
+            'exit_criteria': EXIT_CRITERIA.get(ticker, 'N/A'),
+            'signals': alert_signals,
+            'is_track2': is_track2,
+            'is_track3': is_track3,
+        })
         
-        # 4.4.5 - If any alerts triggered, add to list
-        if alert_signals:
-            alerts.append({
-                'ticker': ticker,
-                'company': info.get('name', ticker),
-                'strategy': info.get('strategy', 'N/A'),
-                'tier': info.get('tier', 'N/A'),
-                'price': data['close'],
-                'prev_close': data['prev_close'],
-                'change_pct': data['change_pct'],
-                'ma_50': data['ma_50'],
-                'week_52_low': data['week_52_low'],
-                'week_52_high': data['week_52_high'],
-                'trailing_pe': data['trailing_pe'],
-                'forward_pe': data['forward_pe'],
-                'target': target,
-                'add_target': targets.get('add_target', 0),
-                'target_distance_pct': distance_pct,
-                'exit_criteria': EXIT_CRITERIA.get(ticker, 'N/A'),
-                'signals': alert_signals,
-                'is_track2': is_track2,
-                'is_track3': is_track3,
-            })
-            
-            track_label = []
-            if is_track2:
-                track_label.append("T2")
-            if is_track3:
-                track_label.append("T3")
-            print(f"    {ticker}: [{'/'.join(track_label) or 'WATCH'}] {', '.join(alert_signals)}")
-    
-    # Update Track 2 history
-    if track2_triggers > 0:
-        history = load_track2_history()
-        for _ in range(track2_triggers):
-            history.append(datetime.now())
-        save_track2_history(history)
+        track_label = []
+        if is_track2:
+            track_label.append("T2")
+        if is_track3:
+            track_label.append("T3")
+        print(f"    {ticker}: [{'/'.join(track_label) or 'WATCH'}] {', '.join(alert_signals)}")
     
     # Sort by priority (Track 2 first, then Track 3, then by distance to target)
     alerts.sort(key=lambda x: (
@@ -641,19 +729,39 @@ def detect_alerts(market_data):
     return alerts
 
 
+def alert_params():
+    """4.5 - The Block 1.7/1.8 rules as one params dict (replay, sweep, watch)"""
+    from mr_market_backtest import default_params
+    return default_params(
+        SINGLE_DAY_DROP_THRESHOLD, TRACK3_DISTANCE_THRESHOLD,
+        NEAR_52_WEEK_LOW_THRESHOLD, BELOW_50_DAY_MA_THRESHOLD,
+        TRACK2_REGIME_THRESHOLD, TRACK2_REGIME_WINDOW_DAYS,
+    )
+
+
+def signal_params():
+    """4.6 - alert_params() plus the thresholds of the extra alert rules"""
+    return dict(
+        alert_params(),
+        rsi_threshold=RSI_OVERSOLD_THRESHOLD,
+        volume_spike_ratio=VOLUME_SPIKE_RATIO,
+        gap_threshold=GAP_DOWN_THRESHOLD,
+        drawdown_threshold=DRAWDOWN_FROM_HIGH_THRESHOLD,
+    )
+
+
 # =============================================================================
 # BLOCK 5: PROMPT GENERATION
 # =============================================================================
 
-def get_current_positions(wb):
+def get_current_positions(ledger):
     """5.1 - Get current positions from tracker"""
-    ws = wb['Positions']
     positions = {}
     
-    for row in range(2, ws.max_row + 1):
-        ticker = ws.cell(row=row, column=1).value
-        shares = ws.cell(row=row, column=2).value or 0
-        avg_cost = ws.cell(row=row, column=3).value or 0
+    for row in ledger.positions:
+        ticker = row['Ticker']
+        shares = row['Shares'] or 0
+        avg_cost = row['Avg_Cost'] or 0
         
         if ticker and shares > 0 and ticker not in ['CASH', 'TOTAL', 'PORTFOLIO']:
             positions[ticker] = {
@@ -664,317 +772,224 @@ def get_current_positions(wb):
     return positions
 
 
-def get_pending_orders(wb):
+def get_pending_orders(ledger):
     """5.2 - Get pending GTC orders from tracker"""
-    ws = wb['Pending_Orders']
     orders = {}
     
-    for row in range(2, ws.max_row + 1):
-        ticker = ws.cell(row=row, column=2).value
-        limit_price = ws.cell(row=row, column=3).value
-        shares = ws.cell(row=row, column=4).value
-        status = ws.cell(row=row, column=9).value
+    for row in ledger.pending_orders:
+        ticker = row['Ticker']
+        status = row['Status']
         
         if ticker and status in ['PENDING', '', None]:
             orders[ticker] = {
-                'limit': limit_price,
-                'shares': shares,
+                'limit': row['Limit'],
+                'shares': row['Shares'],
             }
     
     return orders
 
 
-def build_roundtable_prompt(alerts, market_data, portfolio_stats, positions, pending_orders, regime_status):
+def build_roundtable_prompt(alerts, market_data, portfolio_stats, positions, pending_orders,
+                            regime, role=None, budget=None):
     """
-    5.3 - Build the complete AI Roundtable prompt
+    5.3 - Build the complete AI Roundtable prompt (see mr_market_prompt)
+
+    role=None is the combined prompt; 'auditor', 'narrator' or 'arbiter'
+    gives a single analyst's variant. budget (tokens) turns on compact mode.
     """
-    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
-    regime_suspended, regime_count = regime_status
-    portfolio_value, voo_return, portfolio_return, alpha = portfolio_stats
-    
-    # 5.3.1 - Header with role-specific instructions
-    prompt = f"""
-================================================================================
-MR. MARKET AI ROUNDTABLE - {trade_date}
-================================================================================
-
-You are participating in the "Tantrums & Targets" AI Roundtable. Three analysts
-debate each stock to determine: Is Mr. Market overreacting (opportunity) or
-correctly repricing long-term earnings power (avoid)?
-
-================================================================================
-YOUR ROLE (read the section that applies to you)
-================================================================================
-
-**IF YOU ARE CHATGPT (GPT-4, GPT-4o, etc.):**
-You are THE AUDITOR. Your job is rules, valuation, and strict methodology.
-- Focus on: P/E ratios vs historical averages, distance to target prices,
-  whether entry rules are satisfied, exit criteria status
-- Your bias: Skeptical. Numbers must justify the trade.
-- Ask: "Do the valuations support this?" and "Are we following our own rules?"
-- Flag any rule violations or methodology drift
-- End your analysis for each stock with: "AUDITOR VERDICT: [DECISION] ([CONFIDENCE]%)"
-
-**IF YOU ARE GEMINI (Google):**
-You are THE NARRATOR. Your job is macro context, narrative, and sentiment.
-- Focus on: What story is the market telling? What's the catalyst? 
-  What are institutions doing? What's the sentiment shift?
-- Your bias: Context matters. The "why" behind the move.
-- Ask: "What narrative is driving this?" and "Is sentiment overshooting?"
-- Identify narrative tailwinds/headwinds that the numbers might miss
-- End your analysis for each stock with: "NARRATOR VERDICT: [DECISION] ([CONFIDENCE]%)"
-
-**IF YOU ARE CLAUDE (Anthropic):**
-You are THE ARBITER. Your job is synthesis and final decisions.
-- Focus on: Where do Auditor and Narrator agree/disagree? 
-  Resolve conflicts with explicit reasoning.
-- Your bias: Decisive. Must commit to a final call.
-- Ask: "Given both perspectives, what's the right action?"
-- Force a decision even when uncertain - NONE is a valid decision
-- Output the final DECISION blocks in the required format for ingestion
-- End your synthesis with: "ARBITER FINAL DECISION: [DECISION]"
-
-DEFAULT BIAS: If no consensus, the decision is NONE. Not trading is valid.
-
-================================================================================
-PORTFOLIO STATUS
-================================================================================
-Portfolio Value: ${portfolio_value:,.2f}
-VOO Return: {voo_return:+.1%}
-Portfolio Return: {portfolio_return:+.1%}
-Alpha vs VOO: {alpha:+.1%}
-"""
+    return render_prompt(alerts, market_data, portfolio_stats, positions, pending_orders,
+                         regime, role=role, budget=budget)
 
-    # 5.3.2 - Current positions
-    if positions:
-        prompt += "\nCURRENT POSITIONS:\n"
-        for ticker, pos in positions.items():
-            current_price = market_data.get(ticker, {}).get('close', 0)
-            gain_pct = ((current_price - pos['avg_cost']) / pos['avg_cost'] * 100) if pos['avg_cost'] > 0 else 0
-            prompt += f"  {ticker}: {pos['shares']} shares @ ${pos['avg_cost']:.2f} (now ${current_price:.2f}, {gain_pct:+.1f}%)\n"
-    else:
-        prompt += "\nCURRENT POSITIONS: None\n"
-    
-    # 5.3.3 - Pending GTC orders
-    if pending_orders:
-        prompt += "\nPENDING GTC ORDERS:\n"
-        for ticker, order in pending_orders.items():
-            current_price = market_data.get(ticker, {}).get('close', 0)
-            distance = ((current_price - order['limit']) / order['limit'] * 100) if order['limit'] > 0 else 0
-            prompt += f"  {ticker}: {order['shares']} shares @ ${order['limit']:.2f} (current ${current_price:.2f}, {distance:+.1f}% away)\n"
-    
-    # 5.3.4 - Regime warning
-    if regime_suspended:
-        prompt += f"""
-================================================================================
-!! REGIME WARNING !!
-================================================================================
-{regime_count} Track 2 triggers in last 10 days (threshold: {TRACK2_REGIME_THRESHOLD})
-This suggests a broad market selloff, not stock-specific opportunities.
-DEFAULT: Skip Track 2 entries. Focus on Track 3 targets only.
-================================================================================
-"""
+
+def save_prompt_to_file(prompt, trade_date, role=None):
+    """5.4 - Save prompt to daily file (per-analyst variants get a suffix)"""
+    suffix = f"_{role}" if role else ""
+    filename = f"{trade_date.replace('-', '_')}_roundtable_prompt{suffix}.txt"
+    filepath = os.path.join(PROMPTS_DIR, filename)
     
-    # 5.3.5 - Alert candidates
-    if alerts:
-        prompt += f"""
-================================================================================
-TODAY'S CANDIDATES ({len(alerts)} stocks triggered alerts)
-================================================================================
-"""
-        for i, alert in enumerate(alerts, 1):
-            track_labels = []
-            if alert['is_track2']:
-                track_labels.append("TRACK 2")
-            if alert['is_track3']:
-                track_labels.append("TRACK 3")
-            track_str = " + ".join(track_labels) if track_labels else "WATCH"
-            
-            # P/E info
-            pe_parts = []
-            if alert['trailing_pe']:
-                pe_parts.append(f"T:{alert['trailing_pe']:.1f}")
-            if alert['forward_pe']:
-                pe_parts.append(f"F:{alert['forward_pe']:.1f}")
-            pe_str = " / ".join(pe_parts) if pe_parts else "N/A"
-            
-            # P/E warning
-            pe_warning = ""
-            if (alert['trailing_pe'] and alert['trailing_pe'] >= 55) or (alert['forward_pe'] and alert['forward_pe'] >= 35):
-                pe_warning = " ** P/E HIGH: Extra skepticism warranted **"
-            
-            # Position status
-            position_status = ""
-            if alert['ticker'] in positions:
-                pos = positions[alert['ticker']]
-                position_status = f"\n    OWNED: {pos['shares']} shares @ ${pos['avg_cost']:.2f}"
-            if alert['ticker'] in pending_orders:
-                order = pending_orders[alert['ticker']]
-                position_status += f"\n    GTC ORDER: {order['shares']} shares @ ${order['limit']:.2f}"
-            
-            prompt += f"""
---------------------------------------------------------------------------------
-CANDIDATE {i}: {alert['ticker']} ({alert['company']}) [{track_str}]
---------------------------------------------------------------------------------
-Strategy: {alert['strategy']} | Tier: {alert['tier']}
+    with open(filepath, 'w') as f:
+        f.write(prompt)
+    
+    return filepath
 
-SIGNALS:
-"""
-            for signal in alert['signals']:
-                prompt += f"  - {signal}\n"
-            
-            prompt += f"""
-SNAPSHOT:
-  - Price: ${alert['price']:.2f} (prev close: ${alert['prev_close']:.2f}, change: {alert['change_pct']:+.1f}%)
-  - 52-week range: ${alert['week_52_low']:.2f} - ${alert['week_52_high']:.2f}
-  - 50-day MA: ${alert['ma_50']:.2f}
-  - P/E: {pe_str}{pe_warning}
-  - Target: ${alert['target']} (START) / ${alert['add_target']} (ADD)
-  - Distance to target: {alert['target_distance_pct']:+.1f}%{position_status}
-
-EXIT CRITERIA (what breaks the thesis):
-  {alert['exit_criteria']}
-"""
-            # Track 2 specific
-            if alert['is_track2']:
-                prompt += f"""
-TRACK 2 ENTRY RULES:
-  - Entry limit: ${alert['prev_close']:.2f} (prior close, exact)
-  - Order type: DAY order - if not filled by close, mark as MISSED
-  - Reassessment: ~2 weeks after entry (TRIM if +4%, CONVERT or CUT)
-"""
-            
-            # Track 3 specific
-            if alert['is_track3']:
-                prompt += f"""
-TRACK 3 ENTRY RULES:
-  - GTC limit order at ${alert['target']:.2f}
-  - If already have GTC working, maintain it
-  - ADD target at ${alert['add_target']:.2f} for second tranche
-"""
 
-    else:
-        prompt += """
-================================================================================
-NO ALERTS TRIGGERED
-================================================================================
-Mr. Market is calm today. No Track 2 or Track 3 candidates.
-Review any existing positions and pending orders only.
-"""
+def load_replay_inputs(start, end=None):
+    """5.5 - Replay panel, indicators and the current Block 1.7/1.8 rules"""
+    from mr_market_backtest import load_replay_panel, replay_indicators
+    from mr_market_history import HistoryStore
     
-    # 5.3.6 - Deliverables template
-    prompt += """
-================================================================================
-DELIVERABLES FOR EACH CANDIDATE
-================================================================================
-For each candidate above, provide:
-
-1) CATALYST: Most likely reason for the recent move (with dates if known)
-
-2) VALUATION: Forward P/E, trailing P/E, comparison to 5-year average
-   - Cite sources or mark as "uncited"
-
-3) RISK TYPE: cyclical / execution / structural / legal-reg / tech narrative / balance sheet
-
-4) BEAR CASE: Steelman the strongest bearish argument
-
-5) BULL REBUTTAL: Steelman the strongest bullish counter
-
-6) IMPAIRMENT TEST: What must be true for long-term earnings power to be permanently damaged?
-
-7) CHECKPOINTS: 3 falsifiable items to monitor over next 1-2 quarters
-
-8) NEXT READ: Specific 10-K sections, earnings call topics, or filings to review
-
-9) DECISION: For each analyst, state one of:
-   - IGNORE (not worth attention)
-   - WATCH (interesting but not actionable)
-   - START SMALL (initiate position at target)
-   - ADD (increase existing position)
-   - HOLD (maintain current position, no action)
-   
-   Include:
-   - Confidence level (%)
-   - Upgrade/downgrade triggers
-   - Suggested position size if applicable
-
-================================================================================
-FINAL SYNTHESIS (The Arbiter)
-================================================================================
-After all three analysts have weighed in on each candidate:
-
-1) Identify where analysts AGREE vs DISAGREE
-2) Resolve conflicts with explicit reasoning
-3) State FINAL DECISION for each candidate
-4) List any CALENDAR FLAGS (earnings dates, catalysts to watch)
-
-Rules:
-- Be explicit about uncertainty
-- Cite sources; label uncited statements as such
-- Default to NONE if no clear consensus
-
-================================================================================
-DECISION OUTPUT FORMAT (Required for ingestion)
-================================================================================
-For each actionable decision (BUY/ADD), output a block in this EXACT format:
-
-DECISION:
-Date: {today's date, YYYY-MM-DD}
-Action: BUY
-Ticker: {TICKER}
-Limit: {limit price, numbers only}
-Shares: {number of shares}
-Track: {1, 2, or 3}
-Signal: {brief signal description}
-Thesis: {Intact/Weakening/Broken}
-Notes: {one-line rationale}
-
-Example:
-DECISION:
-Date: 2026-01-26
-Action: BUY
-Ticker: ROP
-Limit: 400.00
-Shares: 10
-Track: 3
-Signal: Target Hit
-Thesis: Intact
-Notes: Quality compounder at valuation floor, organic growth intact
-
-For NONE/HOLD/WATCH decisions, still output a block but with Action: NONE
-(no order created - the decision file itself serves as the audit trail)
-
-DECISION:
-Date: 2026-01-26
-Action: NONE
-Ticker: MSFT
-Limit: 0
-Shares: 0
-Track: 3
-Signal: N/A
-Thesis: Intact
-Notes: Already own 10 shares, wait for ADD target at $445
-================================================================================
-"""
+    store = HistoryStore(HISTORY_DB_FILE)
+    panel = load_replay_panel(store, TICKERS, start, end)
+    missing = [t for t in TICKERS if t not in panel['tickers']]
+    if missing:
+        print(f"    No stored history: {', '.join(missing)} (try --backfill-history)")
+    if panel['first'] >= len(panel['dates']):
+        print("    ERROR: No stored bars in the replay window")
+        return None, None, None
     
-    return prompt.strip()
+    return panel, replay_indicators(panel, WATCHLIST_CONFIG), alert_params()
 
 
-def save_prompt_to_file(prompt, trade_date):
-    """5.4 - Save prompt to daily file"""
-    filename = f"{trade_date.replace('-', '_')}_roundtable_prompt.txt"
-    filepath = os.path.join(PROMPTS_DIR, filename)
+def run_replay_mode(start, end=None, out_path=None):
+    """
+    5.6 - Replay the Track 2/3 rules over the price-history store
+
+    Uses the Block 1.7/1.8 thresholds and TARGETS as they are today.
+    """
+    from mr_market_backtest import run_replay, write_benchmark_csv
     
-    with open(filepath, 'w') as f:
-        f.write(prompt)
+    print(f"\n[REPLAY MODE] {start} -> {end or 'last stored bar'}")
+    panel, ind, params = load_replay_inputs(start, end)
+    if panel is None:
+        return None
+    result = run_replay(panel, ind, params)
+    stats = result['stats']
+    
+    print(f"    Days:       {len(result['benchmark'])}")
+    print(f"    Buys:       {stats['trades']} (hit rate {stats['hit_rate']:.0%})")
+    print(f"    Portfolio:  {stats['portfolio_return']:+.1%}")
+    print(f"    VOO:        {stats['voo_return']:+.1%}")
+    print(f"    Alpha:      {stats['alpha']:+.1%}")
+    print(f"    Max DD:     {stats['max_drawdown']:.1%}")
+    if out_path:
+        write_benchmark_csv(result['benchmark'], out_path)
+        print(f"    Saved: {out_path}")
+    return result
+
+
+def run_sweep_mode(start, end=None, out_path=None, max_workers=None):
+    """5.7 - Rank a grid of alert thresholds by replayed alpha"""
+    from mr_market_sweep import run_sweep, format_results, write_results_csv
+    
+    print(f"\n[SWEEP MODE] {start} -> {end or 'last stored bar'}")
+    panel, ind, params = load_replay_inputs(start, end)
+    if panel is None:
+        return None
+    results = run_sweep(panel, ind, params, max_workers=max_workers)
     
-    return filepath
+    print(f"\n    Best parameter sets (current: drop {SINGLE_DAY_DROP_THRESHOLD}, "
+          f"target {TRACK3_DISTANCE_THRESHOLD}, regime "
+          f"{TRACK2_REGIME_THRESHOLD}/{TRACK2_REGIME_WINDOW_DAYS}d):")
+    print(format_results(results))
+    if out_path:
+        write_results_csv(results, out_path)
+        print(f"    Saved: {out_path}")
+    return results
+
+
+def run_watch_mode(provider=None, interval=None, replay_path=None, record_path=None):
+    """
+    5.8 - Intraday Track 2/3 monitor (see mr_market_watch)
+
+    The baseline (prior close, MA, 52-week range) comes from the normal
+    fetch into an in-memory copy of the history store, so the session's
+    partial bar never reaches price_history.db (the after-close run would
+    take it for a re-adjustment); nothing is written to the tracker or
+    the Track 2 history. The same copy answers whether today is a
+    trading day (VOO calendar).
+    interval defaults to mr_market_watch.WATCH_INTERVAL_SECONDS.
+    """
+    import asyncio
+    from mr_market_history import CALENDAR_TICKER, HistoryStore
+    from mr_market_watch import (WatchState, PollingFeed, ReplayFeed, TickRecorder, watch,
+                                 WATCH_INTERVAL_SECONDS)
+    
+    interval = interval or WATCH_INTERVAL_SECONDS
+    provider = provider or market_provider()
+    print("\n[WATCH MODE]")
+    store = HistoryStore(HISTORY_DB_FILE)
+    session = store.in_memory_copy()
+    store.close()
+    market_data = fetch_all_market_data(provider=provider, store=session)
+    state = WatchState.from_market_data(market_data, WATCHLIST_CONFIG, alert_params())
+    
+    regime = check_regime_status()
+    if regime['suspended']:
+        print(f"\n    WARNING: Track 2 regime suspended ({regime['trigger_count']} triggers in "
+              f"{TRACK2_REGIME_WINDOW_DAYS} days)")
+    
+    if replay_path:
+        feed = ReplayFeed(replay_path)
+        print(f"\n    Replaying: {replay_path}")
+    else:
+        def is_trading_day(date):
+            session.update([CALENDAR_TICKER], provider, verbose=False)
+            return session.trades_on(date)
+        
+        feed = PollingFeed(provider, state.tickers, interval, is_trading_day=is_trading_day)
+        print(f"\n    Polling {len(state.tickers)} tickers every {interval:g}s until the close")
+    recorder = TickRecorder(record_path) if record_path else None
+    
+    try:
+        alerts = asyncio.run(watch(feed, state, recorder=recorder, on_batch=reload_watchlist))
+    except KeyboardInterrupt:
+        print("\n    Stopped.")
+        return None
+    finally:
+        if recorder is not None:
+            recorder.close()
+    
+    print(f"\n    Alerts: {len(alerts)}")
+    return alerts
+
+
+def reload_watchlist(state):
+    """
+    5.8.1 - Watch-mode hook: pick up watchlist.json edits between polls
+
+    New target levels apply to the running session; tickers added or
+    removed take effect at the next run (the baseline was fetched for
+    the old set).
+    """
+    if not WATCHLIST_CONFIG.reload_if_changed():
+        return
+    state.set_levels(*WATCHLIST_CONFIG.levels(state.tickers))
+    print(f"    Watchlist reloaded: {len(TICKERS)} tickers, targets updated")
+    added = [t for t in TICKERS if t not in state.position]
+    removed = [t for t in state.tickers if t not in WATCHLIST_CONFIG]
+    if added or removed:
+        print(f"    Ticker changes take effect next run (added: {', '.join(added) or '-'}; "
+              f"removed: {', '.join(removed) or '-'})")
+
+
+def run_site_build(ledger, force=False):
+    """
+    5.9 - Re-render the tracker-driven site pages (see mr_market_site)
+
+    Only pages whose data or template changed are rendered; the manifest
+    lists the files a deploy needs to upload. The fundamentals data sheet
+    reads the packs saved by the last warehouse refresh (2.3).
+    """
+    from mr_market_warehouse import load_packs
+    
+    print("\n[SITE] REBUILDING uploads_to_cloudflare")
+    print("-" * 50)
+    packs_date, packs = load_packs(FUNDAMENTALS_DIR)
+    manifest = build_site(ledger, TICKERS, WATCHLIST, TARGETS, site_dir=SITE_DIR,
+                          decisions_dir=DECISIONS_DIR, parse_decisions=parse_decision_blocks,
+                          packs=packs, packs_date=packs_date, force=force)
+    for name in manifest['changed']:
+        print(f"    Upload: {name}")
+    return manifest
+
+
+def site_bytes(manifest):
+    """5.9.1 - Bytes of the site files a deploy needs to upload"""
+    return file_bytes([os.path.join(SITE_DIR, name) for name in manifest['changed']])
 
 
 # =============================================================================
 # BLOCK 6: MAIN EXECUTION
 # =============================================================================
 
+def print_banner():
+    """6.0 - Run banner (printed by main(), not on import)"""
+    print("=" * 70)
+    print("MR. MARKET ROUNDTABLE - Combined Daily Script v1.0")
+    print(f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 70)
+
+
 def main():
     """6.1 - Main execution"""
     
@@ -985,84 +1000,474 @@ def main():
     )
     parser.add_argument(
         '--decision', '-d',
-        help='Path to decision file to ingest into Pending_Orders'
+        help='Decision file, directory, or glob (e.g. "decisions/2026_02_*.txt") '
+             'to ingest into Pending_Orders'
     )
     parser.add_argument(
         '--ingest-only',
         action='store_true',
         help='Only ingest decisions, skip market data fetch and alerts'
     )
+    parser.add_argument(
+        '--import-tracker',
+        action='store_true',
+        help='One-time import of mr_market_tracker.xlsx into the SQLite tracker '
+             'database, and exit'
+    )
+    parser.add_argument(
+        '--export-tracker',
+        action='store_true',
+        help='Write the SQLite tracker state to mr_market_tracker.xlsx, and exit'
+    )
+    parser.add_argument(
+        '--repair-history',
+        action='store_true',
+        help='Check the local price-history store for gaps and split/dividend '
+             're-adjustments, re-backfill affected tickers, and exit'
+    )
+    parser.add_argument(
+        '--backfill-history',
+        metavar='START',
+        help='Download daily bars from START (YYYY-MM-DD) into the price-history '
+             'store for replays, rebuild the daily P/E history from reported EPS, '
+             'and exit'
+    )
+    parser.add_argument(
+        '--refresh-fundamentals',
+        action='store_true',
+        help='Request the quarterly statements of every watchlist stock into the '
+             'fundamentals warehouse (ignoring the weekly refresh), rebuild the '
+             'data packs at the last stored closes, and exit'
+    )
+    parser.add_argument(
+        '--replay',
+        metavar='START',
+        help='Replay the Track 2/3 rules over stored history from START '
+             '(YYYY-MM-DD), print the result vs VOO, and exit'
+    )
+    parser.add_argument(
+        '--replay-end',
+        metavar='END',
+        help='Last date of the replay (default: last stored bar)'
+    )
+    parser.add_argument(
+        '--replay-out',
+        metavar='CSV',
+        help='Write the replay equity curve (Benchmark sheet columns) to CSV'
+    )
+    parser.add_argument(
+        '--sweep',
+        metavar='START',
+        help='Replay a grid of alert thresholds from START (YYYY-MM-DD) on all '
+             'cores, print the best parameter sets, and exit'
+    )
+    parser.add_argument(
+        '--sweep-out',
+        metavar='CSV',
+        help='Write every sweep result, ranked by alpha, to CSV'
+    )
+    parser.add_argument(
+        '--sweep-workers',
+        type=int,
+        help='Worker processes for --sweep (default: one per core)'
+    )
+    parser.add_argument(
+        '--intraday-fills',
+        action='store_true',
+        help='Decide pending-order fills from 1-minute bars (queue volume, fill '
+             'time, slippage) instead of the day-low check'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Monitor intraday quotes until the close and alert as soon as a '
+             'Track 2/3 condition trips'
+    )
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        help='Seconds between quote polls (default: 60, WATCH_INTERVAL_SECONDS '
+             'in mr_market_watch)'
+    )
+    parser.add_argument(
+        '--watch-replay',
+        metavar='TICKS',
+        help='Play back a recorded ticks CSV instead of polling live quotes'
+    )
+    parser.add_argument(
+        '--watch-record',
+        metavar='TICKS',
+        help='Append every polled quote batch to a ticks CSV'
+    )
+    parser.add_argument(
+        '--prompt-variants',
+        action='store_true',
+        help='Also write one prompt per analyst (auditor, narrator, arbiter) '
+             'next to the combined prompt'
+    )
+    parser.add_argument(
+        '--roundtable',
+        nargs='?',
+        const='live',
+        choices=['live', 'stub'],
+        help='Send the prompt to the Auditor, Narrator and Arbiter models and '
+             'ingest the Arbiter\'s DECISION blocks ("stub" runs offline)'
+    )
+    parser.add_argument(
+        '--roundtable-models',
+        metavar='ROLE=MODEL,...',
+        help='Override the live model per role, e.g. "auditor=gpt-5,arbiter=claude-sonnet-4-5" '
+             '(default: MR_MARKET_<ROLE>_MODEL or the built-in IDs)'
+    )
+    parser.add_argument(
+        '--token-budget',
+        type=int,
+        nargs='?',
+        const=DEFAULT_TOKEN_BUDGET,
+        metavar='TOKENS',
+        help='Compact the prompt to fit a token budget: rules in one legend, '
+             'WATCH-only candidates in a summary table '
+             f'(default budget: {DEFAULT_TOKEN_BUDGET:,})'
+    )
+    parser.add_argument(
+        '--build-site',
+        action='store_true',
+        help='Re-render scoreboard/index/roundtable listing in uploads_to_cloudflare '
+             'from the tracker, and exit'
+    )
+    parser.add_argument(
+        '--force-site',
+        action='store_true',
+        help='Render every site page even if its inputs are unchanged'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Replay recorded market data (market_cache/) and never touch the '
+             'network; requests that were never recorded fail'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always fetch market data live and record nothing'
+    )
+    parser.add_argument(
+        '--profile',
+        nargs='?',
+        const=PROFILE_FILE,
+        metavar='PROF',
+        help='Write a cProfile (pstats) trace of the whole run for pstats/snakeviz/'
+             f'flame graphs (default: {os.path.basename(PROFILE_FILE)})'
+    )
+    parser.add_argument(
+        '--metrics-textfile',
+        metavar='PROM',
+        help='Also write the run\'s stage/fetch metrics as a Prometheus textfile '
+             '(node_exporter textfile collector)'
+    )
     args = parser.parse_args()
     
-    # 6.1.1 - Load tracker (needed for both modes)
-    wb = load_tracker()
-    if wb is None:
+    print_banner()
+    ensure_directories()
+    
+    # 6.1.1 - Time every stage and fetch; optionally profile the whole run
+    metrics = RunMetrics(run_mode(args))
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    status = 'error'
+    try:
+        run(args, metrics)
+        status = 'ok'
+    except KeyboardInterrupt:
+        status = 'interrupted'
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+            print(f"    Profile: {args.profile}")
+        if metrics.record is None:
+            record_run(metrics, status, args.metrics_textfile)
+
+
+def run_mode(args):
+    """6.1.2 - Name of the mode an invocation runs (for the run log)"""
+    for mode in ('repair_history', 'backfill_history', 'refresh_fundamentals', 'replay',
+                 'sweep', 'watch', 'import_tracker', 'export_tracker', 'build_site',
+                 'ingest_only'):
+        if getattr(args, mode):
+            return mode.replace('_', '-')
+    return 'daily'
+
+
+def cache_mode(args):
+    """6.1.2.1 - Market-data cache mode for market_provider()"""
+    if args.offline:
+        return 'offline'
+    return 'live' if args.no_cache else 'record'
+
+
+def record_run(metrics, status, textfile=None):
+    """
+    6.1.3 - Finish the run and append it to RUN_LOG_FILE (and the Prometheus textfile)
+
+    Returns the record; the daily summary prints its timings from the
+    same record, and main() only records runs that have not been.
+    """
+    record = metrics.finish(status)
+    append_run_log(RUN_LOG_FILE, record)
+    if textfile:
+        write_prometheus_textfile(textfile, record)
+    return record
+
+
+def run(args, metrics):
+    """
+    6.2 - One invocation: a single mode, or the daily pipeline
+
+    Every daily stage runs inside metrics.stage(); see mr_market_metrics.
+    """
+    
+    if args.offline and args.no_cache:
+        print("ERROR: --offline and --no-cache cannot be combined")
+        return
+    roundtable_models = None
+    if args.roundtable_models:
+        from mr_market_orchestrator import parse_models
+        try:
+            roundtable_models = parse_models(args.roundtable_models)
+        except ValueError as e:
+            print(f"ERROR: --roundtable-models: {e}")
+            return
+    
+    # 6.2.0 - Watchlist config, read once per invocation
+    load_watchlist()
+    
+    # 6.2.0.1 - History repair mode (no tracker needed)
+    if args.repair_history or args.backfill_history:
+        from mr_market_history import HistoryStore
+    if args.repair_history:
+        print("\n[REPAIR-HISTORY MODE]")
+        store = HistoryStore(HISTORY_DB_FILE)
+        repaired, errors = store.repair(TICKERS, market_provider(cache_mode(args)))
+        print(f"\n    Repaired: {', '.join(repaired) if repaired else 'none'}")
+        for ticker, error in errors.items():
+            print(f"    FAILED: {ticker} - {error}")
+        return
+    if args.backfill_history:
+        print(f"\n[BACKFILL-HISTORY MODE] from {args.backfill_history}")
+        store = HistoryStore(HISTORY_DB_FILE)
+        provider = market_provider(cache_mode(args))
+        errors = store.backfill(TICKERS, provider, start=args.backfill_history)
+        for ticker, error in errors.items():
+            print(f"    FAILED: {ticker} - {error}")
+        print(f"    Stored: {len(TICKERS) - len(errors)} tickers")
+        
+        # 6.2.0.1.1 - Daily trailing P/E rebuilt from reported EPS (5-year average)
+        from mr_market_fundamentals import FundamentalsStore, backfill_pe_history
+        print("\n    P/E history from reported EPS:")
+        fundamentals = FundamentalsStore(HISTORY_DB_FILE)
+        errors = backfill_pe_history(fundamentals, store, TICKERS, provider)
+        fundamentals.close()
+        for ticker, error in errors.items():
+            print(f"    NO P/E HISTORY: {ticker} - {error}")
+        return
+    if args.refresh_fundamentals:
+        refresh_warehouse(market_provider(cache_mode(args)), metrics=metrics, force=True)
+        return
+    if args.replay:
+        run_replay_mode(args.replay, args.replay_end, args.replay_out)
+        return
+    if args.sweep:
+        run_sweep_mode(args.sweep, args.replay_end, args.sweep_out, args.sweep_workers)
+        return
+    if args.watch:
+        if args.offline and not args.watch_replay:
+            print("ERROR: --watch --offline needs --watch-replay (live quotes are not replayed)")
+            return
+        run_watch_mode(provider=market_provider(cache_mode(args)), interval=args.watch_interval,
+                       replay_path=args.watch_replay, record_path=args.watch_record)
+        return
+    
+    # 6.2.0.2 - Tracker database import/export modes
+    if args.import_tracker:
+        print("\n[IMPORT-TRACKER MODE]")
+        try:
+            counts = import_workbook(TRACKER_FILE, TRACKER_DB_FILE)
+        except RuntimeError as e:
+            print(f"    ERROR: {e}")
+            return
+        for sheet, count in counts.items():
+            print(f"    {sheet}: {count} rows")
+        print(f"    Created: {TRACKER_DB_FILE}")
+        return
+    if args.export_tracker:
+        if not os.path.exists(TRACKER_DB_FILE):
+            print(f"ERROR: No tracker database: {TRACKER_DB_FILE}")
+            return
+        SqliteLedger.load(TRACKER_DB_FILE).export(TRACKER_FILE)
+        print(f"    Exported: {TRACKER_FILE}")
+        return
+    
+    # 6.2.1 - Load tracker (needed for both modes)
+    with metrics.stage('load_tracker') as stage:
+        ledger = load_tracker()
+        stage['bytes'] = file_bytes([getattr(ledger, 'path', None)])
+    if ledger is None:
         print("ERROR: Could not load tracker. Exiting.")
         return
     
-    # 6.1.2 - If ingest-only mode, just process decisions and exit
+    # 6.2.1.1 - Site-only mode
+    if args.build_site:
+        with metrics.stage('site') as stage:
+            manifest = run_site_build(ledger, force=args.force_site)
+            stage['bytes'] = site_bytes(manifest)
+        return
+    
+    # 6.2.2 - If ingest-only mode, just process decisions and exit
     if args.ingest_only:
         if not args.decision:
             print("ERROR: --ingest-only requires --decision file")
             return
         print("\n[INGEST-ONLY MODE]")
-        added, skipped, rejected = ingest_decisions(wb, args.decision)
-        wb.save(TRACKER_FILE)
-        print(f"\n    Saved: {TRACKER_FILE}")
+        with metrics.stage('ingest') as stage:
+            added, skipped, rejected = ingest_decisions(ledger, args.decision)
+            stage['bytes'] = file_bytes(resolve_decision_files(args.decision))
+        with metrics.stage('save') as stage:
+            save_tracker(ledger)
+            stage['bytes'] = file_bytes(tracker_files())
         print(f"    Added: {added}, Skipped: {skipped}, Rejected: {rejected}")
         return
     
-    # 6.1.3 - Fetch market data
-    market_data = fetch_all_market_data()
+    # 6.2.3 - Fetch market data (every provider request is metered); stale
+    # fundamentals keep refreshing in the background until 6.2.10.1
+    from mr_market_fundamentals import FundamentalsStore
+    provider = market_provider(cache_mode(args))
+    fundamentals = FundamentalsStore(HISTORY_DB_FILE)
+    with metrics.stage('fetch') as stage:
+        market_data = fetch_all_market_data(provider, metrics=metrics, fundamentals=fundamentals)
+        stage['bytes'] = sum(e['bytes'] for e in metrics.provider.values())
+    if hasattr(provider, 'counts'):
+        metrics.set(market_cache=dict(provider.counts))
     if not market_data:
+        fundamentals.finish()
         print("ERROR: No market data fetched. Exiting.")
         return
     
-    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
-    
-    # 6.1.4 - Update tracker state
-    update_positions_prices(wb, market_data)
-    fills, expirations, kept = reconcile_pending_orders(wb, market_data)
-    portfolio_stats = append_daily_snapshot(wb, market_data)
+    # 6.2.3.1 - Statements warehouse (weekly refresh) and the data packs;
+    # a failed refresh falls back to the archived packs
+    with metrics.stage('warehouse'):
+        refresh_warehouse(provider, market_data, metrics=metrics, fallback=True)
     
-    # 6.1.5 - Detect alerts
-    alerts = detect_alerts(market_data)
-    
-    # 6.1.6 - Ingest decisions if provided (AFTER state is updated)
+    trade_date = market_data.get('_trade_date', datetime.now().strftime("%Y-%m-%d"))
+    metrics.set(trade_date=trade_date,
+                ticker_count=len([t for t in market_data if not t.startswith('_')]))
+    
+    # 6.2.4 - Update tracker state
+    with metrics.stage('update_prices'):
+        update_positions_prices(ledger, market_data)
+    minute_panel = None
+    if args.intraday_fills:
+        with metrics.stage('minute_bars'):
+            minute_panel = load_minute_panel(ledger, trade_date, provider)
+    with metrics.stage('reconcile'):
+        fills, expirations, kept = reconcile_pending_orders(ledger, market_data, minute_panel)
+    with metrics.stage('snapshot'):
+        portfolio_stats = append_daily_snapshot(ledger, market_data)
+    
+    # 6.2.5 - Detect alerts, then record the day's market regime
+    with metrics.stage('alerts'):
+        alerts = detect_alerts(market_data)
+    with metrics.stage('regime') as stage:
+        regime = update_regime(market_data, alerts)
+        stage['bytes'] = file_bytes([REGIME_FILE])
+    metrics.set(alerts=len(alerts))
+    
+    # 6.2.6 - Ingest decisions if provided (AFTER state is updated)
     decisions_added = 0
     if args.decision:
         print("\n[7] INGESTING DECISIONS")
         print("-" * 50)
-        added, skipped, rejected = ingest_decisions(wb, args.decision)
+        with metrics.stage('ingest') as stage:
+            added, skipped, rejected = ingest_decisions(ledger, args.decision)
+            stage['bytes'] = file_bytes(resolve_decision_files(args.decision))
         decisions_added = added
     
-    # 6.1.7 - Save tracker
-    wb.save(TRACKER_FILE)
-    print(f"\n    Saved: {TRACKER_FILE}")
+    # 6.2.7 - Save tracker (one write; the ledger already holds the fresh state)
+    with metrics.stage('save') as stage:
+        save_tracker(ledger)
+        stage['bytes'] = file_bytes(tracker_files())
     
-    # 6.1.8 - Get current state for prompt (after all updates)
-    wb = load_tracker()  # Reload to get fresh state
-    positions = get_current_positions(wb)
-    pending_orders = get_pending_orders(wb)
-    regime_status = check_regime_status()
+    # 6.2.8 - Get current state for prompt (after all updates)
+    positions = get_current_positions(ledger)
+    pending_orders = get_pending_orders(ledger)
     
-    # 6.1.9 - Build and save prompt
+    # 6.2.9 - Build and save prompt
     print("\n[8] GENERATING ROUNDTABLE PROMPT")
     print("-" * 50)
     
-    prompt = build_roundtable_prompt(
-        alerts, 
-        market_data, 
-        portfolio_stats, 
-        positions, 
-        pending_orders, 
-        regime_status
-    )
-    
-    filepath = save_prompt_to_file(prompt, trade_date)
-    print(f"    Saved prompt: {filepath}")
-    
-    # 6.1.10 - Summary
+    with metrics.stage('prompt') as stage:
+        prompts = None
+        if args.prompt_variants or args.roundtable:
+            prompts = render_variants(
+                alerts, market_data, portfolio_stats, positions, pending_orders,
+                regime, budget=args.token_budget
+            )
+            if args.prompt_variants:
+                for role in ROLES:
+                    print(f"    Saved {role} prompt: "
+                          f"{save_prompt_to_file(prompts[role], trade_date, role)}")
+            prompt = prompts[None]
+        else:
+            prompt = build_roundtable_prompt(
+                alerts, 
+                market_data, 
+                portfolio_stats, 
+                positions, 
+                pending_orders, 
+                regime,
+                budget=args.token_budget
+            )
+        
+        filepath = save_prompt_to_file(prompt, trade_date)
+        print(f"    Saved prompt: {filepath}")
+        report = token_report(alerts, market_data, portfolio_stats, positions, pending_orders,
+                              regime, budget=args.token_budget)
+        print(format_token_report(report, args.token_budget))
+        stage['bytes'] = sum(len(p.encode('utf-8')) for p in (prompts or {None: prompt}).values())
+    
+    # 6.2.9.1 - Run the roundtable and ingest the Arbiter's decisions
+    if args.roundtable:
+        from mr_market_orchestrator import ResponseCache, live_clients, stub_clients, orchestrate
+        print(f"\n[9] RUNNING ROUNDTABLE ({args.roundtable})")
+        print("-" * 50)
+        clients = stub_clients() if args.roundtable == 'stub' else live_clients(roundtable_models)
+        with metrics.stage('roundtable') as stage:
+            decision_path = orchestrate(prompts, clients, trade_date, PROMPTS_DIR, DECISIONS_DIR,
+                                        cache=ResponseCache())
+            stage['bytes'] = file_bytes([decision_path])
+        print(f"    Saved decisions: {decision_path}")
+        with metrics.stage('ingest') as stage:
+            added, skipped, rejected = ingest_decisions(ledger, decision_path)
+            stage['bytes'] = file_bytes([decision_path])
+        decisions_added += added
+        with metrics.stage('save') as stage:
+            save_tracker(ledger)
+            stage['bytes'] = file_bytes(tracker_files())
+    
+    # 6.2.10 - Refresh the site pages from the updated tracker
+    with metrics.stage('site') as stage:
+        manifest = run_site_build(ledger, force=args.force_site)
+        stage['bytes'] = site_bytes(manifest)
+    
+    # 6.2.10.1 - Let the background fundamentals refreshes land
+    with metrics.stage('fundamentals'):
+        fundamentals.finish()
+    
+    # 6.2.11 - Summary
     print("\n" + "=" * 70)
     print("ROUNDTABLE COMPLETE")
     print("=" * 70)
@@ -1071,10 +1476,15 @@ def main():
     print(f"  Alerts triggered: {len(alerts)}")
     print(f"  Track 2 candidates: {sum(1 for a in alerts if a['is_track2'])}")
     print(f"  Track 3 candidates: {sum(1 for a in alerts if a['is_track3'])}")
-    if args.decision:
+    if args.decision or args.roundtable:
         print(f"  Decisions ingested: {decisions_added}")
     print(f"\n  PROMPT FILE: {filepath}")
-    print(f"\n  Attach this file to ChatGPT, Gemini, and Claude for today's roundtable.")
+    print(f"  Site files to upload: {len(manifest['changed'])}")
+    timing = record_run(metrics, 'ok', args.metrics_textfile)
+    print(f"  Run time: {timing['seconds']:.1f}s ({slowest_stages(timing)}; "
+          f"per-stage log: {os.path.basename(RUN_LOG_FILE)})")
+    if not args.roundtable:
+        print(f"\n  Attach this file to ChatGPT, Gemini, and Claude for today's roundtable.")
     print("=" * 70)
 
 
@@ -1097,56 +1507,12 @@ def parse_decision_blocks(text):
     Signal: Target Hit
     Thesis: Intact
     Notes: Quality compounder at valuation floor
-    """
-    decisions = []
-    
-    # 7.1.0 - Normalize line endings (handles Windows \r\n and old Mac \r)
-    text = text.replace('\r\n', '\n').replace('\r', '\n')
-    
-    # 7.1.1 - Find all DECISION blocks
-    pattern = r'DECISION(?:\s*\d*)?:\s*\n((?:.*?\n)*?)(?=DECISION|\Z)'
-    matches = re.findall(pattern, text, re.IGNORECASE)
-    
-    for match in matches:
-        decision = {}
-        lines = match.strip().split('\n')
-        
-        for line in lines:
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip().lower()
-                value = value.strip()
-                
-                if key == 'date':
-                    decision['date'] = value
-                elif key == 'action':
-                    decision['action'] = value.upper()
-                elif key == 'ticker':
-                    decision['ticker'] = value.upper()
-                elif key == 'limit':
-                    try:
-                        decision['limit'] = float(value.replace('$', '').replace(',', ''))
-                    except:
-                        decision['limit'] = 0
-                elif key == 'shares':
-                    try:
-                        decision['shares'] = int(float(value))
-                    except:
-                        decision['shares'] = 0
-                elif key == 'track':
-                    decision['track'] = str(value).strip()
-                elif key == 'signal':
-                    decision['signal'] = value
-                elif key == 'thesis':
-                    decision['thesis'] = value
-                elif key == 'notes':
-                    decision['notes'] = value
-        
-        # 7.1.2 - Only add if we have minimum required fields
-        if decision.get('action') and decision.get('ticker'):
-            decisions.append(decision)
     
-    return decisions
+    Line-oriented (see mr_market_decisions); malformed blocks are dropped.
+    ingest_decisions() streams files through scan_decision_file() instead
+    so it can report them.
+    """
+    return parse_decision_text(text)
 
 
 def get_pending_order_key(order):
@@ -1164,144 +1530,189 @@ def get_pending_order_key(order):
     return f"{date_str}|{ticker_str}|{track_str}|{limit_str}|{shares_str}"
 
 
-def order_exists(wb, order):
+def build_order_index(ledger):
+    """
+    7.3 - Build the idempotency key index for one ingestion run
+    
+    One pass over Pending_Orders and Action_Log; every later lookup is a
+    set membership test instead of a full scan of both sheets.
+    """
+    index = set()
+    
+    # 7.3.1 - Pending_Orders
+    for row in ledger.pending_orders:
+        index.add(get_pending_order_key({
+            'date': row['Date'],
+            'ticker': row['Ticker'],
+            'track': row['Track'],
+            'limit': row['Limit'],
+            'shares': row['Shares']
+        }))
+    
+    # 7.3.2 - Action_Log (already executed; Price is the order's limit, see 3.7)
+    for row in ledger.action_log:
+        index.add(get_pending_order_key({
+            'date': row['Date'],
+            'ticker': row['Ticker'],
+            'track': row['Track'],
+            'limit': row['Price'],
+            'shares': row['Shares']
+        }))
+    
+    return index
+
+
+def order_exists(ledger, order, index=None):
     """
-    7.3 - Check if order already exists in Pending_Orders or Action_Log
+    7.4 - Check if order already exists in Pending_Orders or Action_Log
+    
+    Pass the index from build_order_index() when checking many orders;
+    without it the index is built for this one call.
     """
-    key = get_pending_order_key(order)
-    
-    # 7.3.1 - Check Pending_Orders
-    ws = wb['Pending_Orders']
-    for row in range(2, ws.max_row + 1):
-        existing = {
-            'date': ws.cell(row=row, column=1).value,
-            'ticker': ws.cell(row=row, column=2).value,
-            'track': ws.cell(row=row, column=5).value,
-            'limit': ws.cell(row=row, column=3).value,
-            'shares': ws.cell(row=row, column=4).value
-        }
-        if get_pending_order_key(existing) == key:
-            return True
-    
-    # 7.3.2 - Check Action_Log (already executed)
-    ws = wb['Action_Log']
-    for row in range(2, ws.max_row + 1):
-        existing = {
-            'date': ws.cell(row=row, column=1).value,
-            'ticker': ws.cell(row=row, column=2).value,
-            'track': ws.cell(row=row, column=3).value,
-            'limit': ws.cell(row=row, column=6).value,
-            'shares': ws.cell(row=row, column=5).value
-        }
-        if get_pending_order_key(existing) == key:
-            return True
-    
-    return False
-
-
-def ingest_decisions(wb, decision_file):
+    if index is None:
+        index = build_order_index(ledger)
+    return get_pending_order_key(order) in index
+
+
+def resolve_decision_files(spec):
     """
-    7.4 - Read DECISION blocks from file and add to Pending_Orders
+    7.5 - Expand a --decision argument into a sorted list of files
+    
+    Accepts a single file, a directory (every .txt/.md file in it), or a
+    glob pattern such as 'decisions/2026_02_*.txt'.
+    """
+    if not spec:
+        return []
+    if os.path.isdir(spec):
+        return sorted(
+            os.path.join(spec, name) for name in os.listdir(spec)
+            if name.lower().endswith(('.txt', '.md'))
+        )
+    if os.path.exists(spec):
+        return [spec]
+    return sorted(p for p in glob.glob(spec) if os.path.isfile(p))
+
+
+def ingest_decisions(ledger, decision_file):
+    """
+    7.6 - Read DECISION blocks from file(s) and add to Pending_Orders
+    
+    decision_file may be a file, a directory, or a glob (see 7.5); all
+    matched files are ingested in one pass against a single key index.
     
     Returns: (added_count, skipped_count, rejected_count)
     """
-    # 7.4.1 - Check file exists
-    if not decision_file or not os.path.exists(decision_file):
+    # 7.6.1 - Check file(s) exist
+    files = resolve_decision_files(decision_file)
+    if not files:
         print(f"    ERROR: Decision file not found: {decision_file}")
         return 0, 0, 0
     
-    print(f"    Reading: {decision_file}")
-    
-    # 7.4.2 - Read and parse file
-    with open(decision_file, 'r') as f:
-        text = f.read()
-    
-    decisions = parse_decision_blocks(text)
-    print(f"    Found {len(decisions)} decision block(s)")
+    # 7.6.2 - Stream and parse file(s); malformed blocks are reported, not ingested
+    decisions = []
+    invalid = 0
+    for path in files:
+        print(f"    Reading: {path}")
+        found = 0
+        for line_no, decision, errors in scan_decision_file(path):
+            if errors:
+                invalid += 1
+                for error_line, message in errors:
+                    print(f"    INVALID: {path}:{error_line} - {message} (block at line {line_no})")
+                continue
+            found += 1
+            decisions.append(decision)
+        print(f"    Found {found} decision block(s)")
     
-    ws = wb['Pending_Orders']
     added = 0
     skipped = 0
     rejected = 0
     
-    # 7.4.3 - Get current cash for validation
-    cash = get_cash_balance(wb)
-    
-    for decision in decisions:
-        ticker = decision.get('ticker', '')
-        action = decision.get('action', '')
-        shares = decision.get('shares', 0)
-        limit = decision.get('limit', 0)
-        track = decision.get('track', '')
-        
-        # 7.4.4 - Handle non-actionable decisions (no order needed)
-        if action in ['NONE', 'HOLD', 'WATCH', 'IGNORE']:
-            print(f"    SKIP: {ticker} - Action is {action} (no order)")
-            skipped += 1
-            continue
-        
-        # 7.4.5 - Validate action is BUY or ADD (the only actionable types we support)
-        if action not in ['BUY', 'ADD']:
-            print(f"    REJECTED: {ticker} - Action must be BUY or ADD (got: {action})")
-            rejected += 1
-            continue
-        
-        # 7.4.6 - Validate ticker is in watchlist
-        if ticker not in TICKERS:
-            print(f"    REJECTED: {ticker} - Not in 25-stock watchlist")
-            rejected += 1
-            continue
-        
-        # 7.4.7 - Validate shares >= 1
-        if not shares or shares < 1:
-            print(f"    REJECTED: {ticker} - Shares must be >= 1 (got: {shares})")
-            rejected += 1
-            continue
-        
-        # 7.4.8 - Validate limit > 0
-        if not limit or limit <= 0:
-            print(f"    REJECTED: {ticker} - Limit must be > 0 (got: {limit})")
-            rejected += 1
-            continue
-        
-        # 7.4.9 - Validate track in {1, 2, 3}
-        if track not in ['1', '2', '3']:
-            print(f"    REJECTED: {ticker} - Track must be 1, 2, or 3 (got: {track})")
-            rejected += 1
-            continue
-        
-        # 7.4.10 - Idempotency check
-        if order_exists(wb, decision):
-            print(f"    SKIP: {ticker} - Order already exists (idempotency)")
-            skipped += 1
-            continue
-        
-        # 7.4.11 - Cash check
-        cost = shares * limit
-        if cost > cash:
-            print(f"    REJECTED: {ticker} - Insufficient cash (need ${cost:.2f}, have ${cash:.2f})")
-            rejected += 1
-            continue
-        
-        # 7.4.12 - Decrement cash for next decision (prevent over-subscription)
-        cash -= cost
-        
-        # 7.4.13 - Add to Pending_Orders
-        new_row = ws.max_row + 1
-        ws.cell(row=new_row, column=1, value=decision.get('date', datetime.now().strftime('%Y-%m-%d')))
-        ws.cell(row=new_row, column=2, value=ticker)
-        ws.cell(row=new_row, column=3, value=limit)
-        ws.cell(row=new_row, column=4, value=int(shares))
-        ws.cell(row=new_row, column=5, value=track)
-        ws.cell(row=new_row, column=6, value=decision.get('signal', ''))
-        ws.cell(row=new_row, column=7, value=decision.get('thesis', ''))
-        ws.cell(row=new_row, column=8, value=decision.get('notes', ''))
-        ws.cell(row=new_row, column=9, value='PENDING')
+    # 7.6.3 - Validate and add inside one transaction (SQLite backend)
+    with ledger.transaction():
+        # 7.6.3.1 - Current cash and the key index, read under the lock
+        cash = get_cash_balance(ledger)
+        order_index = build_order_index(ledger)
         
-        print(f"    ADDED: {ticker} @ ${limit:.2f} x {int(shares)} shares (Track {track})")
-        added += 1
+        for decision in decisions:
+            ticker = decision.get('ticker', '')
+            action = decision.get('action', '')
+            shares = decision.get('shares', 0)
+            limit = decision.get('limit', 0)
+            track = decision.get('track', '')
+            
+            # 7.6.4 - Handle non-actionable decisions (no order needed)
+            if action in ['NONE', 'HOLD', 'WATCH', 'IGNORE']:
+                print(f"    SKIP: {ticker} - Action is {action} (no order)")
+                skipped += 1
+                continue
+            
+            # 7.6.5 - Validate action is BUY or ADD (the only actionable types we support)
+            if action not in ['BUY', 'ADD']:
+                print(f"    REJECTED: {ticker} - Action must be BUY or ADD (got: {action})")
+                rejected += 1
+                continue
+            
+            # 7.6.6 - Validate ticker is in watchlist
+            if ticker not in WATCHLIST_CONFIG:
+                print(f"    REJECTED: {ticker} - Not in {len(TICKERS)}-stock watchlist")
+                rejected += 1
+                continue
+            
+            # 7.6.7 - Validate shares >= 1
+            if not shares or shares < 1:
+                print(f"    REJECTED: {ticker} - Shares must be >= 1 (got: {shares})")
+                rejected += 1
+                continue
+            
+            # 7.6.8 - Validate limit > 0
+            if not limit or limit <= 0:
+                print(f"    REJECTED: {ticker} - Limit must be > 0 (got: {limit})")
+                rejected += 1
+                continue
+            
+            # 7.6.9 - Validate track in {1, 2, 3}
+            if track not in ['1', '2', '3']:
+                print(f"    REJECTED: {ticker} - Track must be 1, 2, or 3 (got: {track})")
+                rejected += 1
+                continue
+            
+            # 7.6.10 - Idempotency check (O(1) against the run's key index)
+            if order_exists(ledger, decision, order_index):
+                print(f"    SKIP: {ticker} - Order already exists (idempotency)")
+                skipped += 1
+                continue
+            
+            # 7.6.11 - Cash check
+            cost = shares * limit
+            if cost > cash:
+                print(f"    REJECTED: {ticker} - Insufficient cash (need ${cost:.2f}, have ${cash:.2f})")
+                rejected += 1
+                continue
+            
+            # 7.6.12 - Decrement cash for next decision (prevent over-subscription)
+            cash -= cost
+            
+            # 7.6.13 - Add to Pending_Orders
+            order_date = decision.get('date', datetime.now().strftime('%Y-%m-%d'))
+            ledger.pending_orders.append({
+                'Date': order_date,
+                'Ticker': ticker,
+                'Limit': limit,
+                'Shares': int(shares),
+                'Track': track,
+                'Signal': decision.get('signal', ''),
+                'Thesis': decision.get('thesis', ''),
+                'Notes': decision.get('notes', ''),
+                'Status': 'PENDING',
+            })
+            order_index.add(get_pending_order_key(dict(decision, date=order_date)))
+            
+            print(f"    ADDED: {ticker} @ ${limit:.2f} x {int(shares)} shares (Track {track})")
+            added += 1
     
-    print(f"\n    Summary: Added {added}, Skipped {skipped}, Rejected {rejected}")
+    print(f"\n    Summary: Added {added}, Skipped {skipped}, Rejected {rejected}"
+          + (f", Invalid blocks {invalid}" if invalid else ""))
     return added, skipped, rejected
 
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET SIGNALS - Alert-signal plugin registry and one-pass engine
+===============================================================================
+Purpose: Let detect_alerts run any number of alert rules without a branch
+per rule:
+    1. Registry - each rule is a function registered with @signal(...),
+                  declaring the inputs it reads, its track ('2', '3' or
+                  None for watch-only), and the label shown per ticker
+    2. Inputs   - the engine builds every input the enabled rules need
+                  exactly once, as arrays over all tickers (alert_metrics
+                  plus a few derived columns; unknown names are read from
+                  market_data, NaN where missing)
+    3. Evaluate - every rule is one vectorized call returning a boolean
+                  mask; only tickers with at least one hit go on to
+                  Python-level alert records
+
+Adding a rule means writing one function in Block 3 (or registering one
+from another module before detect_alerts runs) and naming it in the main
+script's ALERT_SIGNALS; neither the alert loop nor its sort changes.
+
+Usage:
+    from mr_market_signals import evaluate_signals
+    result = evaluate_signals(market_data, TARGETS, params, ALERT_SIGNALS)
+===============================================================================
+"""
+
+import numpy as np
+
+from mr_market_indicators import alert_metrics
+
+# =============================================================================
+# BLOCK 1: REGISTRY
+# =============================================================================
+
+# 1.1 - name -> rule; registration order is the order signals are listed in
+SIGNALS = {}
+
+
+def signal(name, inputs, track=None, label=""):
+    """
+    1.2 - Register a rule: evaluate(x, params) -> boolean mask
+
+    x maps each declared input to a float array over all tickers; params
+    is the main script's signal_params() dict. label is a str.format
+    template over the inputs, the ticker's market_data fields and
+    'target' (the raw Target_Start).
+    """
+    def register(evaluate):
+        SIGNALS[name] = {
+            'name': name,
+            'inputs': tuple(inputs),
+            'track': track,
+            'label': label,
+            'evaluate': evaluate,
+        }
+        return evaluate
+    return register
+
+
+# =============================================================================
+# BLOCK 2: SHARED INPUTS
+# =============================================================================
+
+def _column(market_data, tickers, key):
+    """2.1 - One market_data field as a float array (NaN where missing)"""
+    return np.array([market_data[t].get(key) for t in tickers], dtype=float)
+
+
+# 2.2 - Inputs derived from market_data columns (column reader -> array)
+DERIVED = {
+    'gap_pct': lambda col: (col('open') - col('prev_close')) / col('prev_close') * 100,
+    'volume_ratio': lambda col: col('volume') / col('volume_avg'),
+}
+
+
+def build_inputs(market_data, targets, names, tickers=None):
+    """
+    2.3 - Every requested input once, aligned with the returned tickers
+
+    alert_metrics() supplies the target and range distances; DERIVED
+    and plain market_data columns fill in the rest. Returns (metrics,
+    {name: array}); metrics['tickers'] is the row order.
+    """
+    metrics = alert_metrics(market_data, targets, tickers)
+    tickers = metrics['tickers']
+    columns = {}
+
+    def col(key):
+        if key not in columns:
+            columns[key] = _column(market_data, tickers, key)
+        return columns[key]
+
+    inputs = {}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for name in names:
+            if name in metrics:
+                inputs[name] = metrics[name]
+            elif name in DERIVED:
+                inputs[name] = DERIVED[name](col)
+            else:
+                inputs[name] = col(name)
+    return metrics, inputs
+
+
+# =============================================================================
+# BLOCK 3: RULES
+# =============================================================================
+
+@signal('single_day_drop', ['change_pct'], track='2',
+        label="SINGLE-DAY DROP: {change_pct:.1f}%")
+def single_day_drop(x, params):
+    """3.1 - Track 2: a drop of drop_threshold % or more today"""
+    return x['change_pct'] <= -params['drop_threshold']
+
+
+@signal('near_target', ['target_distance_pct'], track='3',
+        label="NEAR TARGET: {target_distance_pct:+.1f}% from ${target}")
+def near_target(x, params):
+    """3.2 - Track 3: within target_threshold % of Target_Start (NaN = no target)"""
+    return x['target_distance_pct'] <= params['target_threshold']
+
+
+@signal('near_52_week_low', ['distance_from_low_pct'],
+        label="NEAR 52-WEEK LOW: {distance_from_low_pct:.1f}% above ${week_52_low:.2f}")
+def near_52_week_low(x, params):
+    """3.3 - Within near_low_threshold % of the 52-week low"""
+    return x['distance_from_low_pct'] <= params['near_low_threshold']
+
+
+@signal('below_50_day_ma', ['pct_below_ma'],
+        label="BELOW 50-DAY MA: {pct_below_ma:.1f}% below ${ma_50:.2f}")
+def below_50_day_ma(x, params):
+    """3.4 - At least below_ma_threshold % under the 50-day MA"""
+    return x['pct_below_ma'] >= params['below_ma_threshold']
+
+
+@signal('rsi_oversold', ['rsi_14'],
+        label="RSI OVERSOLD: RSI(14) {rsi_14:.0f}")
+def rsi_oversold(x, params):
+    """3.5 - 14-day RSI at or under rsi_threshold"""
+    return x['rsi_14'] <= params['rsi_threshold']
+
+
+@signal('volume_spike', ['volume_ratio', 'change_pct'],
+        label="VOLUME SPIKE: {volume_ratio:.1f}x 20-day average on a {change_pct:.1f}% day")
+def volume_spike(x, params):
+    """3.6 - Heavy selling: volume_ratio x average volume on a down day"""
+    return (x['volume_ratio'] >= params['volume_spike_ratio']) & (x['change_pct'] < 0)
+
+
+@signal('gap_down', ['gap_pct'],
+        label="GAP DOWN: opened {gap_pct:+.1f}% vs ${prev_close:.2f} close")
+def gap_down(x, params):
+    """3.7 - Opened gap_threshold % or more under the previous close"""
+    return x['gap_pct'] <= -params['gap_threshold']
+
+
+@signal('drawdown_from_high', ['drawdown_from_high_pct'],
+        label="DRAWDOWN FROM HIGH: {drawdown_from_high_pct:.1f}% below ${week_52_high:.2f}")
+def drawdown_from_high(x, params):
+    """3.8 - drawdown_threshold % or more under the 52-week high"""
+    return x['drawdown_from_high_pct'] >= params['drawdown_threshold']
+
+
+# =============================================================================
+# BLOCK 4: ENGINE
+# =============================================================================
+
+def evaluate_signals(market_data, targets, params, names=None, tickers=None):
+    """
+    4.1 - Run the named rules (default: all registered) in one pass
+
+    Returns a dict:
+        'tickers' - row order of every array
+        'metrics' - the alert_metrics() dict (target distances etc.)
+        'inputs'  - {input: array}, each built once for all rules
+        'masks'   - {rule: bool array}, in registration order
+        'track2' / 'track3' - OR of the masks of that track's rules
+        'any'     - OR of all masks
+    """
+    rules = [SIGNALS[n] for n in SIGNALS if names is None or n in names]
+    unknown = set(names or ()) - set(SIGNALS)
+    if unknown:
+        raise ValueError(f"Unknown alert signal(s): {', '.join(sorted(unknown))}")
+
+    needed = list(dict.fromkeys(i for rule in rules for i in rule['inputs']))
+    metrics, inputs = build_inputs(market_data, targets, needed, tickers)
+    tickers = metrics['tickers']
+
+    # NaN comparisons are False, so a missing input never trips a rule
+    none = np.zeros(len(tickers), dtype=bool)
+    result = {'tickers': tickers, 'metrics': metrics, 'inputs': inputs, 'masks': {},
+              'track2': none, 'track3': none, 'any': none}
+    with np.errstate(invalid='ignore'):
+        for rule in rules:
+            mask = np.asarray(rule['evaluate'](inputs, params), dtype=bool)
+            result['masks'][rule['name']] = mask
+            result['any'] = result['any'] | mask
+            if rule['track']:
+                key = f"track{rule['track']}"
+                result[key] = result[key] | mask
+    return result
+
+
+def signal_labels(result, i, data, target):
+    """
+    4.2 - Labels of every rule that fired for row i
+
+    data is the ticker's market_data entry; target its raw Target_Start.
+    """
+    row = None
+    labels = []
+    for name, mask in result['masks'].items():
+        if not mask[i]:
+            continue
+        if row is None:
+            row = dict(data, target=target)
+            row.update((k, float(v[i])) for k, v in result['inputs'].items())
+        labels.append(SIGNALS[name]['label'].format(**row))
+    return labels
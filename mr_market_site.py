@@ -0,0 +1,696 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET SITE - Incremental static-site build for uploads_to_cloudflare
+===============================================================================
+Purpose: Render the tracker-driven pages from the ledger instead of editing
+them by hand, and rebuild only what changed:
+    1. scoreboard.html  - summary cards, chart range, key statistics,
+                          positions, pending GTCs, watchlist distances
+    2. index.html       - scoreboard summary, positions, GTCs working
+    3. roundtable.html  - archive listing built from the hand-written
+                          YYYY_MM_DD_roundtable.html pages
+    4. fundamentals_data.html - trailing-twelve-month data sheet per
+                          watchlist ticker, from the warehouse data packs
+    5. data/chart_YYYY.<hash>.json(.gz) - the Benchmark series as one
+                          columnar chunk per year, loaded by scoreboard.html
+    6. site_manifest.json - content hash of every file in the site, plus
+                          the files that changed since the last build
+
+Each page has an input hash (its data + templates). A page whose input hash
+matches the manifest is not re-rendered; a rendered page whose bytes match
+the file on disk is not rewritten. The day pages, fundamentals deep dives,
+methodology.html and style.css stay hand-written and are only hashed.
+
+Chart chunks are named by content hash, so a closed year's chunk never
+changes name and can be cached forever (see uploads_to_cloudflare/_headers);
+only the current year's chunk is rewritten as days are added. The page
+fetches just the chunks its selected range needs, so its own weight stays
+flat as the history grows.
+
+Templates live in site_templates/ (string.Template, $name placeholders).
+site_templates/sessions.json holds per-session listing overrides (title,
+summary, decision badges) for sessions without a decisions/ file.
+
+Usage:
+    python mr_market_roundtable.py --build-site
+    python mr_market_roundtable.py --build-site --force-site
+===============================================================================
+"""
+
+from datetime import datetime
+from string import Template
+import glob
+import gzip
+import hashlib
+import html
+import json
+import os
+import re
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SITE_DIR = os.path.join(SCRIPT_DIR, "uploads_to_cloudflare")
+TEMPLATES_DIR = os.path.join(SCRIPT_DIR, "site_templates")
+MANIFEST_FILE = os.path.join(SCRIPT_DIR, "site_manifest.json")
+SESSIONS_FILE = os.path.join(TEMPLATES_DIR, "sessions.json")
+
+# 1.2 - Bump to force a full rebuild after changing the render code
+GENERATOR_VERSION = 2
+
+# 1.3 - Chart feed chunks (site-relative directory)
+CHART_DIR = "data"
+CHART_CHUNK_PATTERN = re.compile(r"^chart_\d{4}\.[0-9a-f]+\.json(\.gz)?$")
+
+# 1.4 - Day pages and decision files
+DAY_PAGE_PATTERN = re.compile(r"^(\d{4})_(\d{2})_(\d{2})_roundtable\.html$")
+DECISION_FILE_PATTERN = re.compile(r"^(\d{4})_(\d{2})_(\d{2})_decision.*\.txt$")
+
+# 1.5 - Actions shown as grey badges (everything else is a green "buy" badge)
+PASSIVE_ACTIONS = {'NONE', 'HOLD', 'WATCH', 'SKIP'}
+
+# 1.6 - Watchlist row shading by |distance to target| (%)
+NEAR_TARGET_PCT = 10.0
+APPROACHING_TARGET_PCT = 20.0
+
+# 1.7 - Page data read from the tracker (6.1 data keys; the sessions listing
+# takes its FILLED badges from Action_Log), and the pages stamped with the
+# tracker's last date ("Last updated: YYYY-MM-DD")
+TRACKER_DATA = ('portfolio', 'sessions')
+STAMPED_PAGES = ('scoreboard.html', 'index.html')
+UPDATED_PATTERN = re.compile(r"Last updated: (\d{4}-\d{2}-\d{2})")
+
+BADGE = ('<span style="background:{color};color:#fff;padding:1px 6px;'
+         'border-radius:3px;font-size:0.75em;">{label}</span>')
+
+
+# =============================================================================
+# BLOCK 2: HELPERS
+# =============================================================================
+
+def sha256_bytes(data):
+    """2.1 - Hex SHA-256 of bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path):
+    """2.2 - Hex SHA-256 of a file's contents"""
+    with open(path, 'rb') as f:
+        return sha256_bytes(f.read())
+
+
+def load_template(name):
+    """2.3 - Read a template from TEMPLATES_DIR"""
+    with open(os.path.join(TEMPLATES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _pct_value(value):
+    """2.4 - Benchmark return cell as a fraction (handles '0.0%' strings)"""
+    if isinstance(value, str):
+        value = value.strip().rstrip('%')
+        return float(value) / 100 if value else 0.0
+    return float(value or 0)
+
+
+def _money(value, decimals=2):
+    return f"${value:,.{decimals}f}"
+
+
+def _signed_pct(value, decimals=1):
+    return f"{value * 100:+.{decimals}f}%"
+
+
+def _sign_class(value):
+    return 'positive' if value > 0 else 'negative' if value < 0 else ''
+
+
+def _long_date(date):
+    """2.5 - YYYY-MM-DD -> 'January 17, 2026'"""
+    dt = datetime.strptime(str(date)[:10], "%Y-%m-%d")
+    return f"{dt.strftime('%B')} {dt.day}, {dt.year}"
+
+
+def _compact_money(value):
+    """2.6 - 1.99e9 -> '$1.99B' (None -> 'N/A')"""
+    if value is None:
+        return "N/A"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for scale, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M")):
+        if value >= scale:
+            shown = value / scale
+            return f"{sign}${shown:.{2 if shown < 10 else 1 if shown < 100 else 0}f}{suffix}"
+    return f"{sign}${value:,.0f}"
+
+
+# =============================================================================
+# BLOCK 3: PAGE DATA (everything a page shows, as plain JSON-able values)
+# =============================================================================
+
+def portfolio_data(ledger, tickers, watchlist, targets):
+    """
+    3.1 - Positions, orders, benchmark and watchlist rows from the ledger
+
+    The result is hashed to decide whether scoreboard/index need a rebuild,
+    so it holds only what the pages display.
+    """
+    positions = []
+    cash = 0.0
+    prices = {}
+    for row in ledger.positions:
+        ticker = row['Ticker']
+        if ticker == 'CASH':
+            cash = float(row.get('Market_Value') or 0)
+            continue
+        if ticker in ('TOTAL', 'PORTFOLIO') or not ticker:
+            continue
+        prices[ticker] = float(row.get('Current_Price') or 0)
+        shares = row.get('Shares') or 0
+        if shares > 0:
+            avg_cost = float(row.get('Avg_Cost') or 0)
+            positions.append({
+                'ticker': ticker,
+                'shares': shares,
+                'avg_cost': avg_cost,
+                'price': prices[ticker],
+                'value': shares * prices[ticker],
+                'pnl_pct': (prices[ticker] - avg_cost) / avg_cost if avg_cost else 0.0,
+            })
+
+    orders = [{'ticker': row['Ticker'], 'limit': float(row['Limit'] or 0),
+               'shares': row['Shares'], 'track': str(row['Track'])}
+              for row in ledger.pending_orders if row['Ticker']]
+    benchmark = [{'date': str(row['Date'])[:10],
+                  'voo': round(_pct_value(row['VOO_Return']) * 100, 2),
+                  'portfolio': round(_pct_value(row['Portfolio_Return']) * 100, 2),
+                  'value': float(row['Portfolio_Value'] or 0)}
+                 for row in ledger.benchmark if row['Date']]
+
+    owned = {p['ticker'] for p in positions}
+    gtc = {o['ticker'] for o in orders if o['track'] == '3'}
+    watch_rows = []
+    for ticker in tickers:
+        level = targets.get(ticker, {})
+        target = level.get('target', 0)
+        price = prices.get(ticker, 0.0)
+        watch_rows.append({
+            'ticker': ticker,
+            'name': watchlist.get(ticker, {}).get('name', ticker),
+            'price': price,
+            'target': target,
+            'add_target': level.get('add_target', 0),
+            'distance_pct': (price - target) / target * 100 if target and price else None,
+            'owned': ticker in owned,
+            'gtc': ticker in gtc,
+        })
+
+    return {
+        'positions': positions,
+        'orders': orders,
+        'benchmark': benchmark,
+        'cash': cash,
+        'watchlist': watch_rows,
+        'ticker_count': len(tickers),
+    }
+
+
+def session_data(site_dir, decisions_dir=None, parse_decisions=None, fills_by_date=None):
+    """
+    3.2 - One listing entry per YYYY_MM_DD_roundtable.html page
+
+    Title and summary come from the page's lead paragraph ("<strong>Title:
+    </strong> summary", or first sentence / rest). Badges come from
+    sessions.json, else that day's decision files, plus that day's fills.
+    """
+    overrides = {}
+    if os.path.exists(SESSIONS_FILE):
+        with open(SESSIONS_FILE, encoding='utf-8') as f:
+            overrides = json.load(f)
+
+    decisions = {}
+    if decisions_dir and parse_decisions and os.path.isdir(decisions_dir):
+        for name in sorted(os.listdir(decisions_dir)):
+            m = DECISION_FILE_PATTERN.match(name)
+            if not m:
+                continue
+            with open(os.path.join(decisions_dir, name), encoding='utf-8') as f:
+                blocks = parse_decisions(f.read())
+            decisions.setdefault('-'.join(m.groups()), []).extend(
+                f"{d['ticker']}: {d['action']}" for d in blocks if d.get('ticker'))
+
+    sessions = []
+    for name in os.listdir(site_dir):
+        m = DAY_PAGE_PATTERN.match(name)
+        if not m:
+            continue
+        date = '-'.join(m.groups())
+        with open(os.path.join(site_dir, name), encoding='utf-8') as f:
+            title, summary = page_lead(f.read())
+        extra = overrides.get(date, {})
+        badges = list(extra.get('badges') or decisions.get(date, []))
+        for fill in (fills_by_date or {}).get(date, []):
+            label = f"{fill}: FILLED"
+            if label not in badges:
+                badges.append(label)
+        sessions.append({
+            'date': date,
+            'file': name,
+            'title': extra.get('title', title),
+            'summary': extra.get('summary', summary),
+            'badges': badges,
+        })
+    sessions.sort(key=lambda s: s['date'], reverse=True)
+    return sessions
+
+
+def page_lead(page_html):
+    """3.3 - (title, summary) from the paragraph after a day page's <h1>"""
+    m = re.search(r'<h1>.*?</h1>\s*<p class="text-muted">(.*?)</p>', page_html, re.S)
+    if not m:
+        return "Roundtable", ""
+    lead = " ".join(m.group(1).split())
+    strong = re.match(r'<strong>(.*?):?</strong>:?\s*(.*)', lead, re.S)
+    if strong:
+        return strong.group(1).rstrip(':'), strong.group(2)
+    first, _, rest = lead.partition('. ')
+    return first.rstrip('.'), rest
+
+
+def published_date(site_dir):
+    """
+    3.5 - Newest "Last updated" date on the stamped pages in site_dir
+
+    None when no page carries one (nothing published yet).
+    """
+    dates = []
+    for name in STAMPED_PAGES:
+        path = os.path.join(site_dir, name)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                dates += UPDATED_PATTERN.findall(f.read())
+    return max(dates) if dates else None
+
+
+def fundamentals_data(packs, tickers, watchlist, packs_date=None):
+    """
+    3.4 - One data-sheet row per watchlist ticker with a data pack
+
+    Rows keep the watchlist order and carry only the pack metrics the
+    page shows, so a warehouse refresh that changes nothing else leaves
+    the page alone.
+    """
+    shown = ('revenue_ttm', 'revenue_growth', 'revenue_growth_quarter', 'gross_margin',
+             'operating_margin', 'fcf_margin', 'fcf_ttm', 'net_debt', 'net_debt_ebitda',
+             'pe', 'p_fcf', 'ev_ebitda', 'fcf_yield')
+    rows = []
+    for ticker in tickers:
+        pack = (packs or {}).get(ticker)
+        if not pack:
+            continue
+        row = {name: pack['metrics'].get(name) for name in shown}
+        row.update({
+            'ticker': ticker,
+            'name': watchlist.get(ticker, {}).get('name', ticker),
+            'as_of': pack['as_of'],
+            'quarters_stored': pack['quarters_stored'],
+        })
+        rows.append(row)
+    return {'date': packs_date or "", 'rows': rows, 'ticker_count': len(tickers)}
+
+
+# =============================================================================
+# BLOCK 4: CHART FEED
+# =============================================================================
+
+def chart_chunks(benchmark):
+    """
+    4.1 - Benchmark series split by year, as columnar JSON bytes
+
+    {year: b'{"date":[...],"voo":[...],"portfolio":[...]}'}; returns in %
+    rounded to 2 decimals, same as the old inline chartData.
+    """
+    columns = {}
+    for row in benchmark:
+        chunk = columns.setdefault(row['date'][:4], {'date': [], 'voo': [], 'portfolio': []})
+        chunk['date'].append(row['date'])
+        chunk['voo'].append(row['voo'])
+        chunk['portfolio'].append(row['portfolio'])
+    return {year: json.dumps(chunk, separators=(',', ':')).encode('utf-8')
+            for year, chunk in sorted(columns.items())}
+
+
+def write_chart_feed(benchmark, site_dir, verbose=True):
+    """
+    4.2 - Write hash-named chunks (+ .gz) and drop superseded ones
+
+    Returns the feed index embedded in scoreboard.html: one entry per year
+    with both chunk URLs and its first/last date. A chunk whose name
+    already exists is identical by construction and is not rewritten.
+    """
+    chart_dir = os.path.join(site_dir, CHART_DIR)
+    os.makedirs(chart_dir, exist_ok=True)
+
+    feed = []
+    keep = set()
+    for year, data in chart_chunks(benchmark).items():
+        name = f"chart_{year}.{sha256_bytes(data)[:12]}.json"
+        for file_name, content in ((name, data),
+                                   (name + ".gz", gzip.compress(data, 9, mtime=0))):
+            keep.add(file_name)
+            path = os.path.join(chart_dir, file_name)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(content)
+                if verbose:
+                    print(f"    Chart chunk: {CHART_DIR}/{file_name}")
+        dates = json.loads(data)['date']
+        feed.append({'year': int(year), 'first': dates[0], 'last': dates[-1],
+                     'json': f"{CHART_DIR}/{name}", 'gz': f"{CHART_DIR}/{name}.gz"})
+
+    for file_name in os.listdir(chart_dir):
+        if CHART_CHUNK_PATTERN.match(file_name) and file_name not in keep:
+            os.remove(os.path.join(chart_dir, file_name))
+    return feed
+
+
+# =============================================================================
+# BLOCK 5: RENDERING
+# =============================================================================
+
+def render_page(title, body, head="", scripts=""):
+    """5.1 - Wrap a page body in the shared header/nav/footer"""
+    return Template(load_template("base.html")).substitute(
+        title=title, head=head, body=body, scripts=scripts)
+
+
+def _summary_fields(data):
+    """5.2 - Summary-card values shared by scoreboard and index"""
+    last = data['benchmark'][-1] if data['benchmark'] else {'voo': 0, 'portfolio': 0,
+                                                          'value': 0, 'date': ''}
+    alpha = (last['portfolio'] - last['voo']) / 100
+    return {
+        'portfolio_value': _money(last['value'], 0),
+        'voo_return': _signed_pct(last['voo'] / 100),
+        'portfolio_return': _signed_pct(last['portfolio'] / 100),
+        'alpha': _signed_pct(alpha),
+        'alpha_class': _sign_class(alpha),
+        'updated': last['date'],
+        'positions_held': len(data['positions']),
+        'ticker_count': data['ticker_count'],
+    }
+
+
+def render_scoreboard(data):
+    """5.3 - scoreboard.html"""
+    fields = _summary_fields(data)
+    positions = data['positions']
+    benchmark = data['benchmark']
+
+    position_rows = "".join(
+        "            <tr>\n"
+        f"                <td class=\"ticker\">{html.escape(p['ticker'])}</td>\n"
+        f"                <td>{p['shares']}</td>\n"
+        f"                <td>${p['avg_cost']:.2f}</td>\n"
+        f"                <td>${p['price']:.2f}</td>\n"
+        f"                <td>{_money(p['value'])}</td>\n"
+        f"                <td class=\"{_sign_class(p['pnl_pct'])}\">{_signed_pct(p['pnl_pct'])}</td>\n"
+        "            </tr>\n"
+        for p in positions)
+
+    order_rows = "".join(
+        "            <tr>\n"
+        f"                <td class=\"ticker\">{html.escape(o['ticker'])}</td>\n"
+        f"                <td>{_money(o['limit'])}</td>\n"
+        f"                <td>{o['shares']}</td>\n"
+        "                <td>GTC</td>\n"
+        "            </tr>\n"
+        for o in data['orders'] if o['track'] == '3')
+
+    watch = sorted(data['watchlist'], key=lambda w: (w['distance_pct'] is None,
+                                                     abs(w['distance_pct'] or 0)))
+    watchlist_rows = "".join(_watchlist_row(w) for w in watch)
+
+    invested = sum(p['shares'] * p['avg_cost'] for p in positions)
+    market_value = sum(p['value'] for p in positions)
+
+    body = Template(load_template("scoreboard.html")).substitute(
+        fields,
+        start_date=_long_date(benchmark[0]['date']) if benchmark else "",
+        starting_capital=_money(benchmark[0]['value'], 0) if benchmark else "",
+        cash=_money(data['cash']),
+        invested=_money(invested),
+        market_value=_money(market_value),
+        pending_count=len(data['orders']),
+        position_rows=position_rows,
+        order_rows=order_rows,
+        watchlist_rows=watchlist_rows,
+    )
+    scripts = Template(load_template("scoreboard_chart.js")).substitute(
+        chart_feed=json.dumps(data['chart_feed']))
+    return render_page("Scoreboard - Tantrums &amp; Targets", body, scripts=scripts)
+
+
+def _watchlist_row(w):
+    """5.4 - One watchlist table row"""
+    distance = w['distance_pct']
+    if distance is None:
+        shade, cls, shown = "", "", "N/A"
+    else:
+        near = abs(distance)
+        shade = (' style="background-color: #f0fff4;"' if near <= NEAR_TARGET_PCT else
+                 ' style="background-color: #fffff0;"' if near <= APPROACHING_TARGET_PCT else "")
+        cls = 'positive' if -NEAR_TARGET_PCT <= distance < 0 else ''
+        shown = f"{distance:+.1f}%"
+
+    status = []
+    if w['owned']:
+        status.append(BADGE.format(color="#38a169", label="OWNED"))
+    if w['gtc']:
+        status.append(BADGE.format(color="#ed8936", label="GTC"))
+    if w['target'] and w['price'] and w['price'] < w['target']:
+        status.append(BADGE.format(color="#e53e3e", label="BELOW TARGET"))
+    status_html = " ".join(status) or '<span class="text-muted">Watching</span>'
+
+    return (f"            <tr{shade}>\n"
+            f"                <td class=\"ticker\">{html.escape(w['ticker'])}</td>\n"
+            f"                <td>{html.escape(w['name'])}</td>\n"
+            f"                <td>{_money(w['price'])}</td>\n"
+            f"                <td>{_money(w['target'], 0)}</td>\n"
+            f"                <td>{_money(w['add_target'], 0)}</td>\n"
+            f"                <td class=\"{cls}\">{shown}</td>\n"
+            f"                <td>{status_html}</td>\n"
+            "            </tr>\n")
+
+
+def render_index(data):
+    """5.5 - index.html"""
+    fields = _summary_fields(data)
+    items = "".join(
+        f"            <li><strong>{html.escape(p['ticker'])}</strong>  -  {p['shares']} shares "
+        f"@ ${p['avg_cost']:.2f} (<span class=\"{_sign_class(p['pnl_pct'])}\">"
+        f"{_signed_pct(p['pnl_pct'])}</span>)</li>\n"
+        for p in data['positions'])
+    gtcs = ", ".join(f"{html.escape(o['ticker'])} @ ${o['limit']:,.0f}"
+                     for o in data['orders'] if o['track'] == '3') or "None"
+    body = Template(load_template("index.html")).substitute(
+        fields, position_items=items, gtcs_working=gtcs)
+    return render_page("Tantrums &amp; Targets - A Transparent Investing Experiment", body)
+
+
+def render_roundtable(sessions):
+    """5.6 - roundtable.html (archive listing, newest first)"""
+    blocks = []
+    for s in sessions:
+        badges = " ".join(
+            f'<span class="decision-badge '
+            f'{"none" if label.split(":")[-1].strip() in PASSIVE_ACTIONS else "buy"}">'
+            f'{html.escape(label)}</span>'
+            for label in s['badges'])
+        blocks.append(
+            "\n        <div class=\"roundtable-preview\">\n"
+            f"            <div class=\"date\">{_long_date(s['date'])}</div>\n"
+            f"            <h3><a href=\"{s['file']}\">{s['title']}</a></h3>\n"
+            f"            <p>{s['summary']}</p>\n"
+            + (f"            <p>{badges}</p>\n" if badges else "")
+            + "        </div>\n")
+    body = Template(load_template("roundtable.html")).substitute(
+        session_count=len(sessions), sessions="".join(blocks))
+    return render_page("Roundtable - Tantrums &amp; Targets", body)
+
+
+def render_fundamentals_data(data):
+    """5.7 - fundamentals_data.html (TTM data sheet, watchlist order)"""
+    def pct(value, signed=False):
+        if value is None:
+            return "N/A"
+        return f"{value * 100:+.1f}%" if signed else f"{value * 100:.1f}%"
+
+    def multiple(value):
+        return "N/A" if value is None or value <= 0 else f"{value:.1f}x"
+
+    rows = []
+    for r in data['rows']:
+        if r['revenue_growth'] is not None:
+            growth = pct(r['revenue_growth'], signed=True)
+            growth_class = _sign_class(r['revenue_growth'])
+        else:
+            growth = pct(r['revenue_growth_quarter'], signed=True)
+            growth_class = _sign_class(r['revenue_growth_quarter'] or 0)
+            if r['revenue_growth_quarter'] is not None:
+                growth += " (Q)"
+        if r['net_debt'] is not None and r['net_debt'] <= 0:
+            leverage = "Net cash"
+        else:
+            leverage = multiple(r['net_debt_ebitda'])
+        rows.append(
+            "            <tr>\n"
+            f"                <td class=\"ticker\">{html.escape(r['ticker'])}</td>\n"
+            f"                <td>{html.escape(r['name'])}</td>\n"
+            f"                <td>{r['as_of']}</td>\n"
+            f"                <td>{_compact_money(r['revenue_ttm'])}</td>\n"
+            f"                <td class=\"{growth_class}\">{growth}</td>\n"
+            f"                <td>{pct(r['gross_margin'])}</td>\n"
+            f"                <td>{pct(r['operating_margin'])}</td>\n"
+            f"                <td>{pct(r['fcf_margin'])}</td>\n"
+            f"                <td>{_compact_money(r['fcf_ttm'])}</td>\n"
+            f"                <td>{leverage}</td>\n"
+            f"                <td>{multiple(r['pe'])}</td>\n"
+            f"                <td>{multiple(r['p_fcf'])}</td>\n"
+            f"                <td>{multiple(r['ev_ebitda'])}</td>\n"
+            f"                <td>{pct(r['fcf_yield'])}</td>\n"
+            "            </tr>\n")
+    body = Template(load_template("fundamentals_data.html")).substitute(
+        updated=data['date'] or "N/A", pack_count=len(data['rows']),
+        ticker_count=data['ticker_count'], fundamentals_rows="".join(rows))
+    return render_page("Fundamentals Data - Tantrums &amp; Targets", body)
+
+
+# =============================================================================
+# BLOCK 6: INCREMENTAL BUILD
+# =============================================================================
+
+# 6.1 - Generated pages: name -> (renderer, templates it reads, data key)
+PAGES = {
+    'scoreboard.html': (render_scoreboard, ['base.html', 'scoreboard.html',
+                                            'scoreboard_chart.js'], 'portfolio'),
+    'index.html': (render_index, ['base.html', 'index.html'], 'portfolio'),
+    'roundtable.html': (render_roundtable, ['base.html', 'roundtable.html'], 'sessions'),
+    'fundamentals_data.html': (render_fundamentals_data,
+                               ['base.html', 'fundamentals_data.html'], 'fundamentals'),
+}
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """6.2 - Previous build manifest ({} if none)"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def input_hash(data, templates):
+    """6.3 - Hash of a page's data, templates and generator version"""
+    h = hashlib.sha256()
+    h.update(str(GENERATOR_VERSION).encode())
+    h.update(json.dumps(data, sort_keys=True, default=str).encode())
+    for name in templates:
+        h.update(load_template(name).encode())
+    return h.hexdigest()
+
+
+def build_site(ledger, tickers, watchlist, targets, site_dir=SITE_DIR,
+               manifest_path=MANIFEST_FILE, decisions_dir=None, parse_decisions=None,
+               packs=None, packs_date=None, force=False, verbose=True):
+    """
+    6.4 - Render changed pages and write the deploy manifest
+
+    packs are the warehouse data packs ({ticker: pack}, see
+    mr_market_warehouse) for fundamentals_data.html; packs_date is the
+    trade date their prices are from.
+
+    Returns the manifest dict; manifest['changed'] lists every file (site
+    relative) whose content differs from the previous build, which is all
+    a deploy needs to upload.
+
+    A tracker whose last Benchmark date is older than the published
+    scoreboard/index would replace newer live numbers, so every page
+    built from the tracker and the chart feed are left as they are
+    (manifest['skipped']) until the tracker has caught up, force or not.
+    """
+    previous = load_manifest(manifest_path)
+    fills_by_date = {}
+    for row in ledger.action_log:
+        if row.get('Action') == 'BUY' and row.get('Date') and row.get('Ticker'):
+            fills_by_date.setdefault(str(row['Date'])[:10], []).append(row['Ticker'])
+
+    portfolio = portfolio_data(ledger, tickers, watchlist, targets)
+    tracker_date = portfolio['benchmark'][-1]['date'] if portfolio['benchmark'] else ""
+    published = published_date(site_dir)
+    skipped = []
+    if published and tracker_date < published:
+        skipped = [name for name, page in PAGES.items() if page[2] in TRACKER_DATA]
+        if verbose:
+            print(f"    SKIPPED: {', '.join(skipped)} - the tracker ends "
+                  f"{tracker_date or '(empty)'}, the published pages {published}; "
+                  f"update the tracker first")
+    else:
+        portfolio['chart_feed'] = write_chart_feed(portfolio['benchmark'], site_dir, verbose)
+    inputs = {
+        'portfolio': portfolio,
+        'sessions': session_data(site_dir, decisions_dir, parse_decisions, fills_by_date),
+        'fundamentals': fundamentals_data(packs, tickers, watchlist, packs_date),
+    }
+
+    page_hashes = {}
+    for name, (render, templates, key) in PAGES.items():
+        if name in skipped:
+            if name in previous.get('pages', {}):
+                page_hashes[name] = previous['pages'][name]
+            continue
+        page_hashes[name] = input_hash(inputs[key], templates)
+        path = os.path.join(site_dir, name)
+        if (not force and previous.get('pages', {}).get(name) == page_hashes[name]
+                and os.path.exists(path)):
+            continue
+        content = render(inputs[key]).encode('utf-8')
+        if os.path.exists(path) and sha256_file(path) == sha256_bytes(content):
+            continue
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        if verbose:
+            print(f"    Rendered: {name}")
+
+    # 6.4.1 - Content hashes of everything that gets deployed
+    files = {}
+    for path in sorted(glob.glob(os.path.join(site_dir, "**", "*"), recursive=True)):
+        if os.path.isfile(path) and not path.endswith(".tmp"):
+            files[os.path.relpath(path, site_dir).replace(os.sep, "/")] = sha256_file(path)
+    old_files = previous.get('files', {})
+    changed = [f for f, digest in files.items() if old_files.get(f) != digest]
+    removed = [f for f in old_files if f not in files]
+
+    manifest = {
+        'built': datetime.now().isoformat(timespec='seconds'),
+        'generator_version': GENERATOR_VERSION,
+        'pages': page_hashes,
+        'files': files,
+        'changed': changed,
+        'removed': removed,
+        'skipped': skipped,
+    }
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    if verbose:
+        print(f"    Changed files: {len(changed)} of {len(files)}"
+              + (f", removed: {len(removed)}" if removed else ""))
+    return manifest
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET SWEEP - Parallel parameter sweep over the replay engine
+===============================================================================
+Purpose: Replace hand-picked Block 1.7/1.8 thresholds with evidence by
+replaying every combination of a parameter grid over stored history:
+    1. Grid         - drop %, near-target %, regime threshold/window (and
+                      the MA gap / near-low %, if a grid names them)
+    2. Shared panel - price and indicator arrays are placed in shared memory
+                      once; workers map them zero-copy instead of receiving
+                      a pickled copy per task
+    3. Pool         - one run_replay() per parameter set on a process pool
+    4. Ranking      - alpha, hit rate and max drawdown per parameter set
+
+Indicators that do not depend on the parameters (MA, 52-week range, change
+%, target distance) are computed once in the parent; each task only redoes
+the threshold masks, the regime count and the day loop.
+
+Usage:
+    python mr_market_roundtable.py --sweep 2016-01-01 --sweep-out sweep.csv
+===============================================================================
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import csv
+import itertools
+import os
+
+import numpy as np
+
+from mr_market_backtest import run_replay
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Default grid (brackets the current Block 1.7/1.8 constants).
+# near_low / below_ma only annotate the prompt and never place an order in
+# the replay, so they stay fixed at base_params unless a grid names them.
+DEFAULT_GRID = {
+    'drop_threshold': [3.0, 4.0, 5.0, 6.0, 7.0],
+    'target_threshold': [5.0, 10.0, 15.0],
+    'regime_threshold': [3, 5, 8],
+    'regime_window_days': [5, 10, 20],
+}
+
+# 1.2 - Worker processes (None = one per core)
+SWEEP_MAX_WORKERS = None
+
+# 1.3 - Result columns, in ranked-table order
+RESULT_COLUMNS = ['alpha', 'hit_rate', 'max_drawdown', 'trades', 'portfolio_return',
+                  'drop_threshold', 'target_threshold', 'near_low_threshold',
+                  'below_ma_threshold', 'regime_threshold', 'regime_window_days']
+
+
+# =============================================================================
+# BLOCK 2: SHARED MEMORY
+# =============================================================================
+
+def share_arrays(arrays):
+    """
+    2.1 - Copy NumPy arrays into shared memory blocks
+
+    Returns (spec, handles): spec is {key: (block name, shape, dtype)} and
+    is all a worker needs to map the arrays; handles keep the blocks alive
+    in the parent and must be passed to release_arrays() when done.
+    """
+    spec = {}
+    handles = []
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        spec[key] = (shm.name, array.shape, array.dtype.str)
+        handles.append(shm)
+    return spec, handles
+
+
+def attach_arrays(spec):
+    """2.2 - Map shared blocks back into read-only arrays (no copy)"""
+    arrays = {}
+    handles = []
+    for key, (name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        array.flags.writeable = False
+        arrays[key] = array
+        handles.append(shm)
+    return arrays, handles
+
+
+def release_arrays(handles):
+    """2.3 - Close and unlink blocks created by share_arrays()"""
+    for shm in handles:
+        shm.close()
+        shm.unlink()
+
+
+def _split(mapping):
+    """2.4 - Separate a panel/indicator dict into (arrays, everything else)"""
+    arrays = {k: v for k, v in mapping.items() if isinstance(v, np.ndarray)}
+    rest = {k: v for k, v in mapping.items() if k not in arrays}
+    return arrays, rest
+
+
+# =============================================================================
+# BLOCK 3: SWEEP
+# =============================================================================
+
+def expand_grid(grid, base_params=None):
+    """3.1 - Every combination of a {param: [values]} grid as params dicts"""
+    keys = list(grid)
+    return [{**(base_params or {}), **dict(zip(keys, values))}
+            for values in itertools.product(*grid.values())]
+
+
+# 3.2 - Per-worker state, set once by _init_worker
+_WORKER = {}
+
+
+def _init_worker(panel_spec, panel_rest, ind_spec, ind_rest):
+    """3.2.1 - Attach the shared panel and indicators in a worker process"""
+    panel_arrays, panel_handles = attach_arrays(panel_spec)
+    ind_arrays, ind_handles = attach_arrays(ind_spec)
+    _WORKER['panel'] = {**panel_rest, **panel_arrays}
+    _WORKER['ind'] = {**ind_rest, **ind_arrays}
+    _WORKER['handles'] = panel_handles + ind_handles
+
+
+def _run_one(params):
+    """3.2.2 - Replay one parameter set against the shared arrays"""
+    result = run_replay(_WORKER['panel'], _WORKER['ind'], params)
+    return {**result['stats'], **params}
+
+
+def run_sweep(panel, ind, base_params, grid=None, max_workers=SWEEP_MAX_WORKERS,
+              verbose=True):
+    """
+    3.3 - Replay every parameter set in the grid on a process pool
+
+    base_params (see mr_market_backtest.default_params) supplies every
+    parameter the grid does not vary. Returns result dicts (stats +
+    params) ranked by alpha, best first; ties go to the shallower drawdown.
+    """
+    combos = expand_grid(grid or DEFAULT_GRID, base_params)
+    panel_arrays, panel_rest = _split(panel)
+    ind_arrays, ind_rest = _split(ind)
+    panel_spec, panel_handles = share_arrays(panel_arrays)
+    ind_spec, ind_handles = share_arrays(ind_arrays)
+
+    workers = max_workers or os.cpu_count() or 1
+    if verbose:
+        print(f"    {len(combos)} parameter sets on {workers} worker(s)...")
+
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(panel_spec, panel_rest, ind_spec, ind_rest)) as pool:
+            chunksize = max(1, len(combos) // (workers * 4))
+            for i, row in enumerate(pool.map(_run_one, combos, chunksize=chunksize), 1):
+                results.append(row)
+                if verbose and i % 50 == 0:
+                    print(f"    ...{i}/{len(combos)}")
+    finally:
+        release_arrays(panel_handles + ind_handles)
+
+    results.sort(key=lambda r: (-r['alpha'], r['max_drawdown']))
+    return results
+
+
+# =============================================================================
+# BLOCK 4: OUTPUT
+# =============================================================================
+
+def format_results(results, top=10):
+    """4.1 - Ranked table of the best `top` parameter sets"""
+    lines = [f"    {'#':>3} {'alpha':>7} {'hit':>5} {'maxDD':>6} {'buys':>5}  "
+             f"{'drop':>5} {'tgt':>5} {'low':>5} {'ma':>4} {'regime':>8}"]
+    for rank, r in enumerate(results[:top], 1):
+        regime = f"{r['regime_threshold']}/{r['regime_window_days']}d"
+        lines.append(
+            f"    {rank:>3} {r['alpha']:>+7.1%} {r['hit_rate']:>5.0%} {r['max_drawdown']:>6.1%} "
+            f"{r['trades']:>5}  {r['drop_threshold']:>5.1f} {r['target_threshold']:>5.1f} "
+            f"{r['near_low_threshold']:>5.1f} {r['below_ma_threshold']:>4.1f} "
+            f"{regime:>8}"
+        )
+    return "\n".join(lines)
+
+
+def write_results_csv(results, path):
+    """4.2 - Full ranked results"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(results)
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET WAREHOUSE - Quarterly statements, derived fundamentals, data packs
+===============================================================================
+Purpose: Replace copying numbers out of 10-Qs by hand for every fundamental
+page with a local warehouse of quarterly statements:
+    1. Store    - income, cash-flow and balance-sheet lines, one row per
+                  (ticker, quarter end), kept column by column in one
+                  compressed numpy archive (statements.npz). Yahoo only
+                  serves the last five or six quarters, so a refresh merges
+                  quarters in and never drops old ones: the local history
+                  grows past what the feed returns
+    2. Refresh  - a ticker's statements are requested again once its
+                  STATEMENT_TTL_SECONDS has passed, on a bounded thread
+                  pool; every other ticker is read from the archive
+    3. Metrics  - TTM margins, growth, free cash flow, leverage and
+                  valuation multiples for every ticker in one vectorized
+                  pass over the whole archive
+    4. Packs    - one JSON-able data pack per ticker (headline metrics and
+                  the last PACK_QUARTERS quarters), saved as packs.json for
+                  the prompt builder and the site generator
+
+Usage:
+    warehouse = Warehouse(FUNDAMENTALS_DIR)
+    errors = warehouse.refresh(TICKERS, provider)
+    packs = data_packs(warehouse.table, prices)
+    save_packs(FUNDAMENTALS_DIR, packs, trade_date)
+    line = pack_summary(packs['FICO'])                # one line for the prompt
+===============================================================================
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+import json
+import os
+import time
+
+import numpy as np
+
+from mr_market_fetch import HISTORY_TIMEOUT_SECONDS, INFO_MAX_WORKERS, MAX_RETRIES, call_with_retries
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Files under the warehouse directory
+STATEMENTS_FILE = "statements.npz"
+PACKS_FILE = "packs.json"
+
+# 1.2 - Statement lines kept: column -> (statement, Yahoo line items, first found wins)
+LINE_ITEMS = {
+    'revenue': ('income', ('TotalRevenue',)),
+    'gross_profit': ('income', ('GrossProfit',)),
+    'operating_income': ('income', ('OperatingIncome',)),
+    'net_income': ('income', ('NetIncomeCommonStockholders', 'NetIncome')),
+    'ebitda': ('income', ('EBITDA', 'NormalizedEBITDA')),
+    'eps': ('income', ('DilutedEPS',)),
+    'shares': ('income', ('DilutedAverageShares',)),
+    'operating_cash_flow': ('cashflow', ('OperatingCashFlow',)),
+    'capex': ('cashflow', ('CapitalExpenditure',)),           # Negative (cash out)
+    'buybacks': ('cashflow', ('RepurchaseOfCapitalStock',)),  # Negative (cash out)
+    'dividends': ('cashflow', ('CashDividendsPaid',)),        # Negative (cash out)
+    'total_debt': ('balance', ('TotalDebt',)),
+    'cash': ('balance', ('CashCashEquivalentsAndShortTermInvestments',
+                         'CashAndCashEquivalents')),
+    'equity': ('balance', ('StockholdersEquity',)),
+}
+COLUMNS = list(LINE_ITEMS)
+
+# 1.3 - Lines summed over four quarters for TTM (the rest are point in time)
+FLOW_ITEMS = ['revenue', 'gross_profit', 'operating_income', 'net_income', 'ebitda', 'eps',
+              'operating_cash_flow', 'capex', 'buybacks', 'dividends']
+
+# 1.4 - Refresh
+STATEMENT_TTL_SECONDS = 7 * 86400    # Statements change once a quarter
+STATEMENT_TIMEOUT_SECONDS = HISTORY_TIMEOUT_SECONDS
+REFRESH_WORKERS = INFO_MAX_WORKERS
+
+# 1.5 - Quarter spacing checks (days): four quarters in a row span ~273 days
+# between the first and last quarter end, one year back is ~365
+TTM_MAX_SPAN_DAYS = 300
+YOY_SPAN_DAYS = (350, 380)
+
+# 1.6 - Quarters listed in a data pack (newest first)
+PACK_QUARTERS = 8
+
+# 1.7 - Metrics in a data pack, in display order
+METRICS = ['revenue_ttm', 'revenue_growth', 'revenue_growth_quarter', 'gross_margin',
+           'operating_margin', 'net_margin', 'fcf_ttm', 'fcf_margin', 'eps_ttm',
+           'buybacks_ttm', 'dividends_ttm', 'share_change', 'net_debt', 'net_debt_ebitda',
+           'equity', 'market_cap', 'pe', 'p_fcf', 'ev_ebitda', 'fcf_yield']
+
+
+def _number(value):
+    """1.8 - A statement cell as float (NaN for missing or text)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+# =============================================================================
+# BLOCK 2: STATEMENT ROWS
+# =============================================================================
+
+def statement_rows(statements):
+    """
+    2.1 - {quarter end 'YYYY-MM-DD': {column: value}} from one statements() response
+
+    Quarters where every kept line is missing (Yahoo pads old columns
+    with NaN) are left out.
+    """
+    import pandas as pd
+
+    quarters = {}
+    for column, (statement, names) in LINE_ITEMS.items():
+        frame = (statements or {}).get(statement)
+        if frame is None or frame.empty:
+            continue
+        name = next((n for n in names if n in frame.index), None)
+        if name is None:
+            continue
+        for period, value in frame.loc[name].items():
+            value = _number(value)
+            if value == value:
+                quarters.setdefault(pd.Timestamp(period).strftime("%Y-%m-%d"), {})[column] = value
+    return quarters
+
+
+# =============================================================================
+# BLOCK 3: WAREHOUSE
+# =============================================================================
+
+class Warehouse:
+    """
+    3.1 - Quarterly statements of every ticker, one columnar archive on disk
+
+    table is a DataFrame indexed by (ticker, period_end), one float column
+    per LINE_ITEMS entry; refreshed is {ticker: Unix time of the last
+    successful statements request}, which also covers tickers that have
+    no statements (ETFs), so they are not asked again every run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = os.path.join(path, STATEMENTS_FILE)
+        self.table, self.refreshed = self._load()
+
+    @staticmethod
+    def _empty():
+        import pandas as pd
+
+        index = pd.MultiIndex.from_arrays([[], pd.DatetimeIndex([])],
+                                          names=['ticker', 'period_end'])
+        return pd.DataFrame({c: pd.Series(dtype=float) for c in COLUMNS}, index=index)
+
+    def _load(self):
+        """3.1.1 - (table, refreshed) from statements.npz, empty when absent"""
+        import pandas as pd
+
+        if not os.path.exists(self.file):
+            return self._empty(), {}
+        with np.load(self.file) as archive:
+            index = pd.MultiIndex.from_arrays(
+                [archive['ticker'].tolist(), pd.DatetimeIndex(archive['period_end'])],
+                names=['ticker', 'period_end'])
+            table = pd.DataFrame({c: archive[c] if c in archive.files
+                                  else np.full(len(index), np.nan) for c in COLUMNS},
+                                 index=index)
+            refreshed = dict(zip(archive['refreshed_ticker'].tolist(),
+                                 archive['refreshed_at'].tolist()))
+        return table, refreshed
+
+    def save(self):
+        """3.1.2 - Write the archive (temp file + rename)"""
+        os.makedirs(self.path, exist_ok=True)
+        table = self.table.sort_index()
+        tickers = sorted(self.refreshed)
+        columns = {
+            'ticker': table.index.get_level_values('ticker').to_numpy(dtype=str),
+            'period_end': table.index.get_level_values('period_end').to_numpy(
+                dtype='datetime64[D]'),
+            'refreshed_ticker': np.array(tickers, dtype=str),
+            'refreshed_at': np.array([self.refreshed[t] for t in tickers], dtype=float),
+        }
+        columns.update({c: table[c].to_numpy(dtype=float) for c in COLUMNS})
+        tmp_path = self.file + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp_path, self.file)
+
+    def merge(self, rows):
+        """
+        3.1.3 - Merge {ticker: statement_rows()} into the table
+
+        A newly reported value replaces the stored one (restatements);
+        lines and quarters the new response lacks keep their stored values.
+        """
+        import pandas as pd
+
+        records = [(ticker, pd.Timestamp(period), values)
+                   for ticker, quarters in rows.items() for period, values in quarters.items()]
+        if not records:
+            return 0
+        index = pd.MultiIndex.from_tuples([(t, p) for t, p, _ in records],
+                                          names=['ticker', 'period_end'])
+        new = pd.DataFrame([values for _, _, values in records], index=index,
+                           columns=COLUMNS, dtype=float)
+        self.table = new.combine_first(self.table)[COLUMNS].sort_index()
+        return len(records)
+
+    def stale(self, tickers, ttl=STATEMENT_TTL_SECONDS, now=None):
+        """3.1.4 - Tickers whose statements were not requested within ttl"""
+        now = now or time.time()
+        return [t for t in tickers if now - self.refreshed.get(t, 0) >= ttl]
+
+    def refresh(self, tickers, provider, force=False, ttl=STATEMENT_TTL_SECONDS,
+                max_workers=REFRESH_WORKERS, timeout=STATEMENT_TIMEOUT_SECONDS,
+                retries=MAX_RETRIES, verbose=True):
+        """
+        3.1.5 - Request the statements of stale tickers (all with force); {ticker: error}
+
+        Requests run on a bounded pool, each with its own timeout; a
+        failed ticker keeps its stored quarters and is asked again on the
+        next run.
+        """
+        tickers = list(tickers)
+        due = tickers if force else self.stale(tickers, ttl)
+        errors = {}
+        if due:
+            results = {}
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                started = time.monotonic()
+                futures = {t: pool.submit(call_with_retries, provider.statements, t,
+                                          retries=retries) for t in due}
+                for ticker, future in futures.items():
+                    remaining = max(0.0, timeout - (time.monotonic() - started))
+                    try:
+                        results[ticker] = future.result(timeout=remaining)
+                    except FutureTimeout:
+                        future.cancel()
+                        errors[ticker] = f"timeout after {timeout:.0f}s"
+                    except Exception as e:
+                        errors[ticker] = str(e) or type(e).__name__
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+            now = time.time()
+            self.merge({t: statement_rows(r) for t, r in results.items()})
+            self.refreshed.update({t: now for t in results})
+            self.save()
+
+        if verbose:
+            for ticker, error in errors.items():
+                print(f"    {ticker}: statements unavailable ({error})")
+            print(f"    Statements: {len(due) - len(errors)} requested, "
+                  f"{len(tickers) - len(due)} from the warehouse"
+                  + (f", {len(errors)} failed" if errors else "")
+                  + f" ({len(self.table)} quarters stored)")
+        return errors
+
+
+# =============================================================================
+# BLOCK 4: METRICS AND DATA PACKS
+# =============================================================================
+
+def compute_metrics(table, prices=None):
+    """
+    4.1 - Latest-quarter metrics for every ticker in one vectorized pass
+
+    Returns a DataFrame indexed by ticker with 'period_end', 'quarters'
+    and the METRICS columns. TTM sums need four consecutive quarters
+    (TTM_MAX_SPAN_DAYS); growth compares with the quarter one year back
+    (YOY_SPAN_DAYS); anything without enough quarters is NaN. prices
+    ({ticker: close}) adds the valuation multiples.
+    """
+    import pandas as pd
+
+    table = table.sort_index()
+    tickers = table.index.get_level_values('ticker')
+    periods = pd.Series(table.index.get_level_values('period_end'), index=table.index)
+    grouped = table.groupby(level='ticker', sort=False)
+
+    def shifted(frame, n):
+        return frame.groupby(level='ticker', sort=False).shift(n)
+
+    # 4.1.1 - TTM sums over four consecutive quarters
+    span_3q = (periods - shifted(periods, 3)).dt.days
+    ttm = grouped[FLOW_ITEMS].rolling(4, min_periods=4).sum().droplevel(0).reindex(table.index)
+    ttm = ttm.where(span_3q <= TTM_MAX_SPAN_DAYS, axis=0)
+
+    # 4.1.2 - Year-ago values (same quarter last year)
+    span_4q = (periods - shifted(periods, 4)).dt.days
+    one_year = (span_4q >= YOY_SPAN_DAYS[0]) & (span_4q <= YOY_SPAN_DAYS[1])
+    year_ago = shifted(table, 4).where(one_year, axis=0)
+    ttm_year_ago = shifted(ttm, 4).where(one_year, axis=0)
+
+    def ratio(numerator, denominator, positive=True):
+        denominator = denominator.where(denominator > 0) if positive else denominator
+        return numerator / denominator
+
+    fcf_ttm = ttm['operating_cash_flow'] + ttm['capex']
+    net_debt = table['total_debt'].fillna(0) - table['cash'].fillna(0)
+    net_debt = net_debt.where(table['total_debt'].notna() | table['cash'].notna())
+    metrics = pd.DataFrame({
+        'revenue_ttm': ttm['revenue'],
+        'revenue_growth': ratio(ttm['revenue'], ttm_year_ago['revenue']) - 1,
+        'revenue_growth_quarter': ratio(table['revenue'], year_ago['revenue']) - 1,
+        'gross_margin': ratio(ttm['gross_profit'], ttm['revenue']),
+        'operating_margin': ratio(ttm['operating_income'], ttm['revenue']),
+        'net_margin': ratio(ttm['net_income'], ttm['revenue']),
+        'fcf_ttm': fcf_ttm,
+        'fcf_margin': ratio(fcf_ttm, ttm['revenue']),
+        'eps_ttm': ttm['eps'],
+        'buybacks_ttm': -ttm['buybacks'],
+        'dividends_ttm': -ttm['dividends'],
+        'share_change': ratio(table['shares'], year_ago['shares']) - 1,
+        'net_debt': net_debt,
+        'net_debt_ebitda': ratio(net_debt, ttm['ebitda']),
+        'equity': table['equity'],
+        'shares': table['shares'],
+        'ebitda_ttm': ttm['ebitda'],
+    }, index=table.index)
+    metrics['quarters'] = grouped.cumcount() + 1
+
+    # 4.1.3 - Latest quarter per ticker
+    latest = metrics[~tickers.duplicated(keep='last')]
+    latest = latest.assign(period_end=latest.index.get_level_values('period_end')
+                           .strftime("%Y-%m-%d")).droplevel('period_end')
+
+    # 4.1.4 - Valuation multiples at today's price
+    price = pd.Series(prices or {}, dtype=float).reindex(latest.index)
+    market_cap = price * latest['shares']
+    enterprise_value = market_cap + latest['net_debt']
+    latest = latest.assign(
+        price=price,
+        market_cap=market_cap,
+        pe=ratio(price, latest['eps_ttm']),
+        p_fcf=ratio(market_cap, latest['fcf_ttm']),
+        ev_ebitda=ratio(enterprise_value, latest['ebitda_ttm']),
+        fcf_yield=market_cap.rdiv(latest['fcf_ttm']).where(market_cap > 0),
+    )
+    return latest[['period_end', 'quarters', 'price'] + METRICS]
+
+
+def _value(value):
+    """4.2 - NaN -> None, numpy -> float (JSON-able)"""
+    return None if value is None or value != value else float(value)
+
+
+def data_packs(table, prices=None, tickers=None, quarters=PACK_QUARTERS):
+    """
+    4.3 - {ticker: data pack} for every ticker with stored statements
+
+    A pack is {'ticker', 'as_of' (latest quarter end), 'quarters_stored',
+    'price', 'metrics': {METRICS name: value or None}, 'quarters': [the
+    last `quarters` quarters, newest first, as {'period_end', revenue,
+    operating_income, net_income, fcf, eps}]}.
+    """
+    metrics = compute_metrics(table, prices)
+    wanted = list(metrics.index) if tickers is None else [t for t in tickers
+                                                         if t in metrics.index]
+    recent = table.groupby(level='ticker', sort=False).tail(quarters)
+    fcf = recent['operating_cash_flow'] + recent['capex']
+    history = {}
+    for (ticker, period), row in recent.iterrows():
+        history.setdefault(ticker, []).append({
+            'period_end': period.strftime("%Y-%m-%d"),
+            'revenue': _value(row['revenue']),
+            'operating_income': _value(row['operating_income']),
+            'net_income': _value(row['net_income']),
+            'fcf': _value(fcf[(ticker, period)]),
+            'eps': _value(row['eps']),
+        })
+
+    packs = {}
+    for ticker in wanted:
+        row = metrics.loc[ticker]
+        packs[ticker] = {
+            'ticker': ticker,
+            'as_of': row['period_end'],
+            'quarters_stored': int(row['quarters']),
+            'price': _value(row['price']),
+            'metrics': {name: _value(row[name]) for name in METRICS},
+            'quarters': history.get(ticker, [])[::-1],
+        }
+    return packs
+
+
+def save_packs(path, packs, trade_date=None):
+    """4.4 - Write packs.json (temp file + rename)"""
+    os.makedirs(path, exist_ok=True)
+    file = os.path.join(path, PACKS_FILE)
+    document = {'built': datetime.now().isoformat(timespec='seconds'),
+                'trade_date': trade_date, 'packs': packs}
+    with open(file + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=1)
+    os.replace(file + ".tmp", file)
+    return file
+
+
+def load_packs(path):
+    """4.5 - (trade_date, {ticker: pack}) from packs.json; (None, {}) when absent"""
+    try:
+        with open(os.path.join(path, PACKS_FILE), encoding='utf-8') as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    return document.get('trade_date'), document.get('packs', {})
+
+
+# =============================================================================
+# BLOCK 5: FORMATTING
+# =============================================================================
+
+def compact_money(value):
+    """5.1 - 1.99e9 -> '$1.99B', -7.4e8 -> '-$740M'"""
+    if value is None:
+        return "N/A"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for scale, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= scale:
+            shown = value / scale
+            return f"{sign}${shown:.{2 if shown < 10 else 1 if shown < 100 else 0}f}{suffix}"
+    return f"{sign}${value:.0f}"
+
+
+def _pct(value):
+    return "N/A" if value is None else f"{value * 100:.1f}%"
+
+
+def _multiple(value):
+    return "N/A" if value is None else f"{value:.1f}x"
+
+
+def pack_summary(pack):
+    """
+    5.2 - One line of a data pack for the prompt
+
+    'TTM to 2025-09-30: Rev $1.99B (+15.9% YoY) | GM 82.9% / OM 47.5% /
+    FCF 37.1% | FCF $739M | Net debt 3.1x EBITDA | P/FCF 41.0x, EV/EBITDA
+    30.2x'. Parts without data are left out; None when nothing is known.
+    """
+    m = pack['metrics']
+    parts = []
+    if m['revenue_ttm'] is not None:
+        growth = ""
+        if m['revenue_growth'] is not None:
+            growth = f" ({m['revenue_growth'] * 100:+.1f}% YoY)"
+        elif m['revenue_growth_quarter'] is not None:
+            growth = f" (last quarter {m['revenue_growth_quarter'] * 100:+.1f}% YoY)"
+        parts.append(f"Rev {compact_money(m['revenue_ttm'])}{growth}")
+    margins = [f"{label} {_pct(m[name])}" for label, name in
+               (('GM', 'gross_margin'), ('OM', 'operating_margin'), ('FCF', 'fcf_margin'))
+               if m[name] is not None]
+    if margins:
+        parts.append(" / ".join(margins))
+    if m['fcf_ttm'] is not None:
+        parts.append(f"FCF {compact_money(m['fcf_ttm'])}")
+    if m['net_debt'] is not None:
+        if m['net_debt'] <= 0:
+            parts.append(f"Net cash {compact_money(-m['net_debt'])}")
+        elif m['net_debt_ebitda'] is not None:
+            parts.append(f"Net debt {_multiple(m['net_debt_ebitda'])} EBITDA")
+        else:
+            parts.append(f"Net debt {compact_money(m['net_debt'])}")
+    multiples = [f"{label} {_multiple(m[name])}" for label, name in
+                 (('P/FCF', 'p_fcf'), ('EV/EBITDA', 'ev_ebitda')) if m[name] is not None]
+    if multiples:
+        parts.append(", ".join(multiples))
+    if not parts:
+        return None
+    return f"TTM to {pack['as_of']}: " + " | ".join(parts)
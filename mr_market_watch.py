@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET WATCH - Intraday monitor for Track 2 drops and Track 3 targets
+===============================================================================
+Purpose: Track 2 entries are DAY orders at the prior close, so an alert after
+the close is a day late. --watch keeps one asyncio loop running through the
+session and raises an alert the moment a condition trips:
+    1. Baseline - prior close, 50-day MA, 52-week range and TARGETS are
+                  cached once from the end-of-day market_data
+    2. Feed     - a polling feed (provider.quotes() at a fixed cadence) or a
+                  replay feed of recorded ticks for offline runs and tests
+    3. Evaluate - each batch of quotes updates one price array and re-runs
+                  the same alert_masks() as detect_alerts; only conditions
+                  that were not already tripped (today, or at the prior
+                  close for Track 3) are emitted
+    4. Record   - every batch can be appended to a ticks CSV, which the
+                  replay feed plays back
+
+The watch only reports. Track 2 history and the tracker are still updated
+by the after-close run, so the regime count is not double-counted.
+
+Ticks CSV format (one row per ticker per batch):
+    Timestamp,Ticker,Price
+    2026-02-03T10:31:00,MSFT,402.15
+
+Usage:
+    python mr_market_roundtable.py --watch
+    python mr_market_roundtable.py --watch --watch-replay ticks/2026_02_03.csv
+===============================================================================
+"""
+
+from datetime import datetime, time as dtime
+import asyncio
+import csv
+import os
+
+import numpy as np
+
+from mr_market_indicators import alert_masks, target_levels
+
+# =============================================================================
+# BLOCK 1: CONFIGURATION
+# =============================================================================
+
+# 1.1 - Polling cadence for the live feed (seconds between quote batches)
+WATCH_INTERVAL_SECONDS = 60.0
+
+# 1.2 - Regular session (exchange time)
+MARKET_TZ = "America/New_York"
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+# 1.3 - Ticks CSV columns
+TICK_COLUMNS = ['Timestamp', 'Ticker', 'Price']
+
+
+def market_now():
+    """1.4 - Current time on the exchange clock"""
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo(MARKET_TZ))
+
+
+# =============================================================================
+# BLOCK 2: WATCH STATE
+# =============================================================================
+
+class WatchState:
+    """
+    2.1 - Cached baseline plus today's tripped conditions
+
+    All per-ticker values are arrays aligned with self.tickers, so a batch
+    of quotes is evaluated in one vectorized pass however many tickers it
+    covers.
+    """
+
+    def __init__(self, tickers, prev_close, ma_50, week_52_low, week_52_high,
+                 target, add_target, thresholds):
+        self.tickers = list(tickers)
+        self.position = {t: i for i, t in enumerate(self.tickers)}
+        self.prev_close = np.asarray(prev_close, dtype=float)
+        self.ma_50 = np.asarray(ma_50, dtype=float)
+        self.week_52_low = np.asarray(week_52_low, dtype=float)
+        self.week_52_high = np.asarray(week_52_high, dtype=float)
+        self.target = np.asarray(target, dtype=float)
+        self.add_target = np.asarray(add_target, dtype=float)
+        self.thresholds = thresholds
+        self.price = np.full(len(self.tickers), np.nan)
+        self.fired = {'track2': np.zeros(len(self.tickers), dtype=bool),
+                      'track3': np.zeros(len(self.tickers), dtype=bool)}
+
+        # 2.1.0 - Targets already within range at the prior close were in
+        # last night's prompt; only a fresh crossing is news.
+        self.price[:] = self.prev_close
+        self.fired['track3'] = self._masks(self.metrics())['track3']
+        self.price[:] = np.nan
+
+    @classmethod
+    def from_market_data(cls, market_data, targets, thresholds, today=None):
+        """
+        2.1.1 - Baseline from an end-of-day market_data dict
+
+        If market_data already contains today's (partial) bar, its
+        prev_close is the reference; otherwise the last close is.
+        """
+        today = today or market_now().strftime("%Y-%m-%d")
+        tickers = [t for t in market_data if not t.startswith('_')]
+        same_day = market_data.get('_trade_date') == today
+        column = lambda key: [market_data[t][key] for t in tickers]
+        target, add_target = target_levels(targets, tickers)
+        return cls(
+            tickers,
+            column('prev_close' if same_day else 'close'),
+            column('ma_50'),
+            column('week_52_low'),
+            column('week_52_high'),
+            target,
+            add_target,
+            thresholds,
+        )
+
+    def set_levels(self, target, add_target):
+        """
+        2.1.5 - New Track 3 levels (watchlist reload) for self.tickers
+
+        Conditions that already fired stay fired; a ticker the new
+        target puts in range fires on the next batch.
+        """
+        self.target = np.asarray(target, dtype=float)
+        self.add_target = np.asarray(add_target, dtype=float)
+
+    def metrics(self):
+        """2.1.2 - alert_metrics()-shaped distances at the latest prices"""
+        price = self.price
+        week_52_low = np.fmin(self.week_52_low, price)      # a new low today counts
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {
+                'tickers': self.tickers,
+                'change_pct': (price - self.prev_close) / self.prev_close * 100,
+                'target_distance_pct': np.where(
+                    self.target > 0, (price - self.target) / self.target * 100, np.nan),
+                'distance_from_low_pct': (price - week_52_low) / week_52_low * 100,
+                'pct_below_ma': (self.ma_50 - price) / self.ma_50 * 100,
+            }
+
+    def _masks(self, metrics):
+        """2.1.4 - detect_alerts conditions at this state's thresholds"""
+        return alert_masks(
+            metrics,
+            self.thresholds['drop_threshold'],
+            self.thresholds['target_threshold'],
+            self.thresholds['near_low_threshold'],
+            self.thresholds['below_ma_threshold'],
+        )
+
+    def update(self, timestamp, quotes):
+        """
+        2.1.3 - Apply one batch of {ticker: price}; return new alerts
+
+        A condition fires at most once per ticker per session.
+        Tickers without a quote yet have NaN prices and never trip.
+        """
+        for ticker, price in quotes.items():
+            i = self.position.get(ticker)
+            if i is not None and price is not None:
+                self.price[i] = price
+
+        metrics = self.metrics()
+        masks = self._masks(metrics)
+        new2 = masks['track2'] & ~self.fired['track2']
+        new3 = masks['track3'] & ~self.fired['track3']
+        self.fired['track2'] |= new2
+        self.fired['track3'] |= new3
+
+        alerts = []
+        for i in (new2 | new3).nonzero()[0]:
+            signals = []
+            if new2[i]:
+                signals.append(f"INTRADAY DROP: {metrics['change_pct'][i]:.1f}% "
+                               f"vs prior close ${self.prev_close[i]:.2f}")
+            if new3[i]:
+                signals.append(f"NEAR TARGET: {metrics['target_distance_pct'][i]:+.1f}% "
+                               f"from ${self.target[i]:g}")
+            if masks['near_low'][i]:
+                signals.append(f"NEAR 52-WEEK LOW: {metrics['distance_from_low_pct'][i]:.1f}% above")
+            if masks['below_ma'][i]:
+                signals.append(f"BELOW 50-DAY MA: {metrics['pct_below_ma'][i]:.1f}% below")
+            alerts.append({
+                'time': timestamp,
+                'ticker': self.tickers[i],
+                'price': float(self.price[i]),
+                'prev_close': float(self.prev_close[i]),
+                'change_pct': float(metrics['change_pct'][i]),
+                'is_track2': bool(new2[i]),
+                'is_track3': bool(new3[i]),
+                'signals': signals,
+            })
+        return alerts
+
+
+# =============================================================================
+# BLOCK 3: FEEDS
+# =============================================================================
+
+class PollingFeed:
+    """
+    3.1 - Live quotes from provider.quotes() every `interval` seconds
+
+    Waits for the open and stops at the close (exchange time). Weekends
+    are skipped by the clock; exchange holidays by is_trading_day(date),
+    asked once after the open (the main script checks the VOO calendar
+    in the history store). The blocking provider calls run in a worker
+    thread so the loop stays responsive.
+    """
+
+    def __init__(self, provider, tickers, interval=WATCH_INTERVAL_SECONDS, clock=market_now,
+                 is_trading_day=None):
+        self.provider = provider
+        self.tickers = list(tickers)
+        self.interval = interval
+        self.clock = clock
+        self.is_trading_day = is_trading_day
+        self._polled = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        now = self.clock()
+        if now.time() >= MARKET_CLOSE or now.weekday() >= 5:
+            raise StopAsyncIteration
+        if now.time() < MARKET_OPEN:
+            opens = datetime.combine(now.date(), MARKET_OPEN, tzinfo=now.tzinfo)
+            await asyncio.sleep((opens - now).total_seconds())
+        elif self._polled:
+            await asyncio.sleep(self.interval)
+        if not self._polled and self.is_trading_day is not None:
+            today = self.clock().strftime("%Y-%m-%d")
+            if not await asyncio.to_thread(self.is_trading_day, today):
+                print(f"    No session on {today} (exchange holiday)")
+                raise StopAsyncIteration
+        self._polled = True
+        quotes = await asyncio.to_thread(self.provider.quotes, self.tickers)
+        return self.clock().strftime("%Y-%m-%dT%H:%M:%S"), quotes
+
+
+class ReplayFeed:
+    """
+    3.2 - Recorded ticks played back in timestamp order
+
+    speed=0 replays as fast as possible (tests); speed=60 plays one
+    recorded minute per second.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.batches = load_ticks(path)
+        self.speed = speed
+        self._next = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._next >= len(self.batches):
+            raise StopAsyncIteration
+        timestamp, quotes = self.batches[self._next]
+        if self.speed and self._next > 0:
+            previous = datetime.fromisoformat(self.batches[self._next - 1][0])
+            gap = (datetime.fromisoformat(timestamp) - previous).total_seconds()
+            await asyncio.sleep(max(gap, 0) / self.speed)
+        self._next += 1
+        return timestamp, quotes
+
+
+def load_ticks(path):
+    """3.3 - Read a ticks CSV into [(timestamp, {ticker: price}), ...]"""
+    batches = {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            batches.setdefault(row['Timestamp'], {})[row['Ticker']] = float(row['Price'])
+    return sorted(batches.items())
+
+
+class TickRecorder:
+    """3.4 - Append every quote batch to a ticks CSV"""
+
+    def __init__(self, path):
+        new_file = not os.path.exists(path)
+        self.file = open(path, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(TICK_COLUMNS)
+
+    def record(self, timestamp, quotes):
+        for ticker, price in quotes.items():
+            self.writer.writerow([timestamp, ticker, price])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# =============================================================================
+# BLOCK 4: WATCH LOOP
+# =============================================================================
+
+def print_alert(alert):
+    """4.1 - Default alert sink"""
+    track = '/'.join(label for label, on in (('T2', alert['is_track2']),
+                                             ('T3', alert['is_track3'])) if on)
+    print(f"    {alert['time']}  {alert['ticker']}: [{track}] {', '.join(alert['signals'])}")
+
+
+async def watch(feed, state, on_alert=print_alert, recorder=None, on_batch=None):
+    """
+    4.2 - Consume a feed until it ends; returns every alert emitted
+
+    A failed poll is reported and skipped rather than ending the watch.
+    on_batch(state), when given, runs before each batch is applied (the
+    main script uses it to hot-reload the watchlist).
+    """
+    alerts = []
+    while True:
+        try:
+            timestamp, quotes = await feed.__anext__()
+        except StopAsyncIteration:
+            break
+        except Exception as e:
+            print(f"    Quote poll failed: {e}")
+            continue
+        if recorder is not None:
+            recorder.record(timestamp, quotes)
+        if on_batch is not None:
+            on_batch(state)
+        for alert in state.update(timestamp, quotes):
+            on_alert(alert)
+            alerts.append(alert)
+    return alerts
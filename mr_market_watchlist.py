@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+===============================================================================
+MR. MARKET WATCHLIST - Validated, hot-reloadable watchlist config
+===============================================================================
+Purpose: Keep the tickers, company names, strategy tags, Tri-Anchor targets
+and exit criteria in one data file (watchlist.json) instead of four
+parallel dicts in the main script:
+    1. Validate - every entry is checked against the schema (required
+                  fields, types, uppercase unique tickers, positive
+                  targets, add target not above the start target); all
+                  problems are reported together with their entry
+    2. Compile  - the entries become a ticker -> row index for O(1)
+                  lookups and one numpy record array (ticker, strategy,
+                  tier, target, add_target) for vectorized alerting,
+                  built on first use so loading needs no numpy
+    3. Views    - TICKERS / WATCHLIST / TARGETS / EXIT_CRITERIA-shaped
+                  list and dicts for the rest of the code; they are
+                  updated in place on reload, so every holder of a view
+                  sees the new values
+    4. Reload   - reload_if_changed() re-reads the file when its mtime
+                  changes; an invalid edit is reported and the last good
+                  config stays in effect
+
+Scaling the watchlist is a data change: add an entry to watchlist.json.
+
+Usage:
+    watchlist = Watchlist(WATCHLIST_FILE)
+    TICKERS, TARGETS = watchlist.tickers, watchlist.targets
+    target, add_target = watchlist.levels(tickers)
+    if watchlist.reload_if_changed(): ...
+===============================================================================
+"""
+
+import json
+import os
+import re
+
+# =============================================================================
+# BLOCK 1: SCHEMA
+# =============================================================================
+
+# 1.1 - Supported file version
+VERSION = 1
+
+# 1.2 - Entry fields: name -> accepted types (all required, no others)
+TEXT = (str,)
+NUMBER = (int, float)
+FIELDS = {
+    'ticker': TEXT,
+    'name': TEXT,
+    'strategy': TEXT,
+    'tier': TEXT,
+    'target': NUMBER,
+    'add_target': NUMBER,
+    'exit_criteria': TEXT,
+}
+
+# 1.3 - Allowed values
+STRATEGIES = ('CORE', 'HUNT', 'DCA')
+TICKER_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9.\-^=]{0,9}$")
+
+# 1.4 - Compiled record layout (one row per ticker, file order)
+RECORD_DTYPE = [
+    ('ticker', 'U10'),
+    ('strategy', 'U8'),
+    ('tier', 'U4'),
+    ('target', 'f8'),
+    ('add_target', 'f8'),
+]
+
+
+class WatchlistError(ValueError):
+    """1.5 - The watchlist file is missing, unreadable or fails validation"""
+
+
+# =============================================================================
+# BLOCK 2: VALIDATION
+# =============================================================================
+
+def _entry_errors(k, entry, seen):
+    """2.1 - Problems with one entry (list of messages)"""
+    if not isinstance(entry, dict):
+        return [f"tickers[{k}]: must be an object"]
+    where = f"tickers[{k}] ({entry.get('ticker', '?')})"
+    errors = []
+    for key in sorted(set(entry) - set(FIELDS)):
+        errors.append(f"{where}: unknown field {key!r}")
+    for key, types in FIELDS.items():
+        value = entry.get(key)
+        if key not in entry:
+            errors.append(f"{where}: missing {key!r}")
+        elif isinstance(value, bool) or not isinstance(value, types):
+            kind = 'a string' if types is TEXT else 'a number'
+            errors.append(f"{where}: {key!r} must be {kind} (got {value!r})")
+        elif types is TEXT and not value.strip():
+            errors.append(f"{where}: {key!r} is empty")
+    if errors:
+        return errors
+
+    ticker = entry['ticker']
+    if not TICKER_PATTERN.match(ticker):
+        errors.append(f"{where}: ticker must be 1-10 uppercase characters (A-Z, 0-9, . - ^ =)")
+    if ticker in seen:
+        errors.append(f"{where}: duplicate ticker (first at tickers[{seen[ticker]}])")
+    seen.setdefault(ticker, k)
+    if entry['strategy'] not in STRATEGIES:
+        errors.append(f"{where}: strategy must be one of {', '.join(STRATEGIES)}")
+    if entry['target'] < 0 or entry['add_target'] < 0:
+        errors.append(f"{where}: targets must be >= 0 (0 = no target)")
+    elif entry['add_target'] > entry['target'] > 0:
+        errors.append(f"{where}: add_target {entry['add_target']} is above target {entry['target']}")
+    return errors
+
+
+def validate(data):
+    """
+    2.2 - Every problem in a parsed watchlist file (empty list = valid)
+
+    The file is {"version": 1, "tickers": [entry, ...]}.
+    """
+    if not isinstance(data, dict):
+        return ["top level must be an object"]
+    errors = []
+    if data.get('version') != VERSION:
+        errors.append(f"version must be {VERSION} (got {data.get('version')!r})")
+    entries = data.get('tickers')
+    if not isinstance(entries, list) or not entries:
+        return errors + ["'tickers' must be a non-empty list"]
+    seen = {}
+    for k, entry in enumerate(entries):
+        errors.extend(_entry_errors(k, entry, seen))
+    return errors
+
+
+def load_entries(path):
+    """2.3 - Validated entries from a watchlist file; raises WatchlistError"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except OSError as e:
+        raise WatchlistError(f"{path}: cannot read watchlist ({e.strerror})")
+    except ValueError as e:
+        raise WatchlistError(f"{path}: not valid JSON ({e})")
+    errors = validate(data)
+    if errors:
+        raise WatchlistError(f"{path}: {len(errors)} problem(s)\n    " + "\n    ".join(errors))
+    return data['tickers']
+
+
+# =============================================================================
+# BLOCK 3: WATCHLIST
+# =============================================================================
+
+class Watchlist:
+    """
+    3.1 - Compiled watchlist with in-place views and mtime-based reload
+
+    records is the RECORD_DTYPE array; index maps ticker -> row. The
+    views (tickers, info, targets, exit_criteria) keep their identity
+    across reloads. With load=False nothing is read until load() is
+    called (loaded tells whether it has been).
+    """
+
+    def __init__(self, path, load=True):
+        self.path = path
+        self._rows = []
+        self._records = None
+        self.index = {}
+        self.tickers = []
+        self.info = {}
+        self.targets = {}
+        self.exit_criteria = {}
+        self.mtime = None
+        self.loaded = False
+        if load:
+            self.load()
+
+    def load(self):
+        """3.1.1 - Read, validate and compile the file; raises WatchlistError"""
+        mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+        self.compile(load_entries(self.path))
+        self.mtime = mtime
+
+    def compile(self, entries):
+        """3.1.2 - Rebuild the record rows, index and views from entries"""
+        self._rows = [(e['ticker'], e['strategy'], e['tier'], e['target'], e['add_target'])
+                      for e in entries]
+        self._records = None
+        self.index = {e['ticker']: i for i, e in enumerate(entries)}
+
+        # 3.1.2.1 - Views keep the file's values (570, not 570.0) for display
+        self.tickers[:] = [e['ticker'] for e in entries]
+        for view, build in ((self.info, lambda e: {'name': e['name'], 'strategy': e['strategy'],
+                                                   'tier': e['tier']}),
+                            (self.targets, lambda e: {'target': e['target'],
+                                                      'add_target': e['add_target']}),
+                            (self.exit_criteria, lambda e: e['exit_criteria'])):
+            view.clear()
+            view.update((e['ticker'], build(e)) for e in entries)
+        self.loaded = True
+
+    def changed(self):
+        """3.1.3 - Has the file been modified since the last load?"""
+        try:
+            return os.stat(self.path).st_mtime_ns != self.mtime
+        except OSError:
+            return False
+
+    def reload_if_changed(self):
+        """
+        3.1.4 - Reload after an edit; True when new values took effect
+
+        An edit that fails validation is reported and skipped (the file
+        is retried after its next change); the last good config stays.
+        """
+        if not self.changed():
+            return False
+        mtime = os.stat(self.path).st_mtime_ns
+        try:
+            self.load()
+        except WatchlistError as e:
+            self.mtime = mtime
+            print(f"    Watchlist reload skipped: {e}")
+            return False
+        return True
+
+    @property
+    def records(self):
+        """3.1.5 - The RECORD_DTYPE array, compiled on first use after a load"""
+        if self._records is None:
+            import numpy as np
+            self._records = np.array(self._rows, dtype=RECORD_DTYPE)
+        return self._records
+
+    def levels(self, tickers):
+        """3.1.6 - (target, add_target) float arrays for tickers (0 = not listed)"""
+        import numpy as np
+        rows = np.array([self.index.get(t, -1) for t in tickers], dtype=int)
+        listed = rows >= 0
+        return (np.where(listed, self.records['target'][rows], 0.0),
+                np.where(listed, self.records['add_target'][rows], 0.0))
+
+    def __contains__(self, ticker):
+        return ticker in self.index
+
+    def __len__(self):
+        return len(self.index)
@@ -0,0 +1,105 @@
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script>
+        // One columnar chunk per year: {date: [...], voo: [...], portfolio: [...]}.
+        // File names carry a content hash, so chunks are cached forever and
+        // only the chunks for the selected range are fetched.
+        const chartFeed = $chart_feed;
+        const chunkCache = {};
+
+        function decodeChunk(buffer) {
+            const bytes = new Uint8Array(buffer);
+            if (bytes[0] !== 0x1f || bytes[1] !== 0x8b) {
+                // Host already decoded the .gz (Content-Encoding: gzip)
+                return Promise.resolve(JSON.parse(new TextDecoder().decode(bytes)));
+            }
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            return new Response(stream).json();
+        }
+
+        function loadChunk(entry) {
+            if (!chunkCache[entry.year]) {
+                chunkCache[entry.year] = typeof DecompressionStream === 'undefined'
+                    ? fetch(entry.json).then(r => r.json())
+                    : fetch(entry.gz).then(r => r.arrayBuffer()).then(decodeChunk);
+            }
+            return chunkCache[entry.year];
+        }
+
+        function loadRange(days) {
+            let entries = chartFeed;
+            let since = '';
+            if (days && chartFeed.length) {
+                const last = new Date(chartFeed[chartFeed.length - 1].last);
+                last.setDate(last.getDate() - days);
+                since = last.toISOString().slice(0, 10);
+                entries = chartFeed.filter(e => e.last >= since);
+            }
+            return Promise.all(entries.map(loadChunk)).then(chunks => {
+                const rows = {date: [], voo: [], portfolio: []};
+                chunks.forEach(chunk => chunk.date.forEach((date, i) => {
+                    if (date >= since) {
+                        rows.date.push(date);
+                        rows.voo.push(chunk.voo[i]);
+                        rows.portfolio.push(chunk.portfolio[i]);
+                    }
+                }));
+                return rows;
+            });
+        }
+
+        const ctx = document.getElementById('performanceChart').getContext('2d');
+        const chart = new Chart(ctx, {
+            type: 'line',
+            data: {
+                labels: [],
+                datasets: [
+                    {
+                        label: 'Portfolio',
+                        data: [],
+                        borderColor: '#38a169',
+                        backgroundColor: 'rgba(56, 161, 105, 0.1)',
+                        fill: true,
+                        tension: 0.3
+                    },
+                    {
+                        label: 'VOO (S&P 500)',
+                        data: [],
+                        borderColor: '#718096',
+                        backgroundColor: 'transparent',
+                        borderDash: [5, 5],
+                        tension: 0.3
+                    }
+                ]
+            },
+            options: {
+                responsive: true,
+                plugins: {
+                    legend: {
+                        position: 'top',
+                    }
+                },
+                scales: {
+                    y: {
+                        ticks: {
+                            callback: function(value) {
+                                return value + '%';
+                            }
+                        }
+                    }
+                }
+            }
+        });
+
+        function showRange(days) {
+            loadRange(days).then(rows => {
+                chart.data.labels = rows.date;
+                chart.data.datasets[0].data = rows.portfolio;
+                chart.data.datasets[1].data = rows.voo;
+                chart.update();
+            });
+        }
+
+        const rangeSelect = document.getElementById('chartRange');
+        rangeSelect.addEventListener('change', () => showRange(Number(rangeSelect.value)));
+        showRange(Number(rangeSelect.value));
+    </script>
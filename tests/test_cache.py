@@ -0,0 +1,100 @@
+"""Record/replay market-data cache: TTLs, stale fallback, offline replay, dedupe"""
+
+import threading
+
+import pytest
+
+from mr_market_cache import CacheMiss, CachedProvider, MarketCache
+from mr_market_fetch import FakeProvider
+
+
+def cached(tmp_path, live=None, **kwargs):
+    """A CachedProvider over tmp_path/cache (a new one = a new run)"""
+    return CachedProvider(MarketCache(str(tmp_path / "cache")),
+                          live=live and (lambda: live), **kwargs)
+
+
+def test_fresh_recording_is_served_without_going_live(tmp_path):
+    live = FakeProvider(end_date="2026-02-03")
+    first = cached(tmp_path, live).history('MSFT', start="2026-01-02")
+
+    again = FakeProvider(end_date="2026-02-03")
+    provider = cached(tmp_path, again)
+    assert provider.history('MSFT', start="2026-01-02").equals(first)
+    assert again.calls['history'] == 0
+    assert provider.counts == {'hits': 1}
+
+
+def test_expired_recording_goes_live_and_is_recorded_again(tmp_path):
+    cached(tmp_path, FakeProvider(end_date="2026-01-30")).history('MSFT', start="2026-01-02")
+
+    live = FakeProvider(end_date="2026-02-03")
+    provider = cached(tmp_path, live, ttls={'history': 0})
+    frame = provider.history('MSFT', start="2026-01-02")
+    assert live.calls['history'] == 1 and provider.counts == {'recorded': 1}
+    assert frame.index[-1].strftime("%Y-%m-%d") == "2026-02-03"
+
+    # the new recording is what the next run is served
+    replay = cached(tmp_path, offline=True).history('MSFT', start="2026-01-02")
+    assert replay.equals(frame)
+
+
+def test_failed_live_request_falls_back_to_the_stale_recording(tmp_path):
+    recorded = cached(tmp_path, FakeProvider(end_date="2026-01-30")).history('MSFT')
+
+    failing = FakeProvider(end_date="2026-02-03", fail_tickers=['MSFT', 'ROP'])
+    provider = cached(tmp_path, failing, ttls={'history': 0})
+    assert provider.history('MSFT').equals(recorded)
+    assert provider.counts == {'stale': 1}
+    with pytest.raises(RuntimeError):
+        provider.history('ROP')              # nothing recorded to fall back on
+
+
+def test_offline_cuts_unrecorded_windows_from_recorded_bars(tmp_path):
+    live = FakeProvider(end_date="2026-02-03")
+    cached(tmp_path, live).download_history(['MSFT', 'ROP'], start="2025-06-02")
+
+    provider = cached(tmp_path, offline=True)
+    frames = provider.download_history(['ROP', 'MSFT', 'GEV'], start="2026-01-26")
+    assert sorted(frames) == ['MSFT', 'ROP']
+    expected = live.history('MSFT', start="2026-01-26")
+    assert frames['MSFT'].equals(expected)
+    period = provider.history('ROP', period="10d")
+    assert [d.strftime("%Y-%m-%d") for d in period.index[[0, -1]]] == ["2026-01-26", "2026-02-03"]
+    assert provider.counts == {'replayed': 2}
+
+
+def test_offline_misses_raise(tmp_path):
+    cached(tmp_path, FakeProvider(end_date="2026-02-03")).history('MSFT')
+    provider = cached(tmp_path, offline=True)
+    with pytest.raises(CacheMiss):
+        provider.history('GEV')
+    with pytest.raises(CacheMiss):
+        provider.info('MSFT')
+    with pytest.raises(AttributeError):
+        provider.not_an_endpoint
+
+
+def test_identical_requests_in_flight_are_fetched_once(tmp_path):
+    live = FakeProvider(latency=0.2, end_date="2026-02-03")
+    provider = cached(tmp_path, live)
+    start = threading.Barrier(6)
+    frames = []
+
+    def request():
+        start.wait()
+        frames.append(provider.history('MSFT', period="30d"))
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert live.calls['history'] == 1
+    assert provider.counts == {'recorded': 1, 'deduped': 5}
+    assert all(frame.equals(frames[0]) for frame in frames)
+    # history('MSFT') and history('MSFT', period='400d') are one request
+    provider.history('MSFT')
+    provider.history('MSFT', period="400d")
+    assert live.calls['history'] == 2 and provider.counts['deduped'] == 6
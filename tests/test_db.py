@@ -0,0 +1,134 @@
+"""SQLite tracker backend: transactions, concurrent saves and the workbook export"""
+
+import os
+import shutil
+import threading
+
+import pytest
+from openpyxl import load_workbook
+
+from mr_market_db import SqliteLedger, import_workbook
+
+TRACKER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "mr_market_tracker.xlsx")
+
+
+def imported(tmp_path):
+    """(xlsx_path, db_path) of a copy of the tracker imported into SQLite"""
+    xlsx_path = str(tmp_path / "tracker.xlsx")
+    db_path = str(tmp_path / "tracker.db")
+    shutil.copy(TRACKER, xlsx_path)
+    import_workbook(xlsx_path, db_path)
+    return xlsx_path, db_path
+
+
+def log_row(ticker):
+    return {'Date': "2026-02-03", 'Ticker': ticker, 'Track': '3',
+            'Action': "BUY", 'Shares': 1, 'Price': 100.0}
+
+
+def test_concurrent_saves_export_every_commit(tmp_path):
+    xlsx_path, db_path = imported(tmp_path)
+    logged = len(SqliteLedger.load(db_path).action_log.rows)
+
+    runs = 4
+    start = threading.Barrier(runs)
+    errors = []
+
+    def save(i):
+        ledger = SqliteLedger.load(db_path)
+        try:
+            start.wait()
+            with ledger.transaction():
+                ledger.action_log.append(log_row(f"T{i}"))
+            ledger.export(xlsx_path)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            ledger.close()
+
+    threads = [threading.Thread(target=save, args=(i,)) for i in range(runs)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert [p for p in os.listdir(tmp_path) if p.endswith(".tmp")] == []
+    ws = load_workbook(xlsx_path, read_only=True)['Action_Log']
+    tickers = [row[1] for row in ws.iter_rows(min_row=2, values_only=True)]
+    assert len(tickers) == logged + runs
+    assert sorted(tickers[-runs:]) == [f"T{i}" for i in range(runs)]
+
+
+def test_exception_in_transaction_rolls_back(tmp_path):
+    _, db_path = imported(tmp_path)
+    ledger = SqliteLedger.load(db_path)
+    logged = len(ledger.action_log)
+    price = ledger.positions.find('MSFT')['Current_Price']
+
+    with pytest.raises(RuntimeError):
+        with ledger.transaction():
+            ledger.action_log.append(log_row("ROLLBACK"))
+            ledger.positions.set(ledger.positions.find('MSFT'), 'Current_Price', 1.0)
+            raise RuntimeError("failed mid-update")
+
+    # the in-memory tables are re-read, and nothing reached the database
+    assert len(ledger.action_log) == logged
+    assert ledger.positions.find('MSFT')['Current_Price'] == price
+    ledger.close()
+    fresh = SqliteLedger.load(db_path)
+    assert len(fresh.action_log) == logged
+    assert fresh.positions.find('MSFT')['Current_Price'] == price
+    fresh.close()
+
+
+def test_import_export_round_trip_keeps_formulas(tmp_path):
+    xlsx_path, db_path = imported(tmp_path)
+    ledger = SqliteLedger.load(db_path)
+    msft = ledger.positions.find('MSFT')
+    assert msft['Total_Invested'] is None and msft['Market_Value'] is None
+    with ledger.transaction():
+        ledger.positions.set(ledger.positions.find('MSFT'), 'Current_Price', 480.0)
+    ledger.export(xlsx_path)
+    ledger.close()
+
+    original = load_workbook(TRACKER)['Positions']
+    exported = load_workbook(xlsx_path)['Positions']
+    header = [c.value for c in exported[1]]
+    row = next(c.row for c in exported['A'] if c.value == 'MSFT')
+    for column in ('Total_Invested', 'Market_Value', 'Unrealized_PnL', 'Days_Held'):
+        col = header.index(column) + 1
+        assert exported.cell(row=row, column=col).value == original.cell(row=row, column=col).value
+        assert str(exported.cell(row=row, column=col).value).startswith('=')
+    assert exported.cell(row=row, column=header.index('Current_Price') + 1).value == 480.0
+    assert exported.cell(row=row, column=header.index('Shares') + 1).value == 10
+
+
+def test_second_writer_waits_and_sees_the_first_commit(tmp_path):
+    _, db_path = imported(tmp_path)
+    first = SqliteLedger.load(db_path)
+    logged = len(first.action_log)
+    inside = threading.Event()
+    seen = []
+
+    def write_second():
+        second = SqliteLedger.load(db_path)
+        with second.transaction():
+            inside.set()
+            seen.append([row['Ticker'] for row in second.action_log])
+            second.action_log.append(log_row("SECOND"))
+        second.close()
+
+    with first.transaction():
+        first.action_log.append(log_row("FIRST"))
+        writer = threading.Thread(target=write_second)
+        writer.start()
+        assert not inside.wait(0.3)          # blocked on the write lock
+    writer.join(10)
+
+    assert seen and seen[0][-1] == "FIRST" and len(seen[0]) == logged + 1
+    first.close()
+    fresh = SqliteLedger.load(db_path)
+    assert [row['Ticker'] for row in fresh.action_log][-2:] == ["FIRST", "SECOND"]
+    fresh.close()
@@ -0,0 +1,46 @@
+"""DECISION-block parser: layouts the Arbiter actually writes"""
+
+import io
+
+from mr_market_decisions import parse_decision_text, scan_decisions
+
+BLOCK = "DECISION:\nAction: BUY\nTicker: ROP\nLimit: 400\nShares: 10\n"
+EXPECTED = {'action': 'BUY', 'ticker': 'ROP', 'limit': 400.0, 'shares': 10}
+
+
+def scan(text):
+    return list(scan_decisions(io.StringIO(text, newline=None)))
+
+
+def test_blank_line_between_fields():
+    text = "DECISION:\nAction: BUY\nTicker: ROP\n\nLimit: 400\nShares: 10\n"
+    assert scan(text) == [(1, EXPECTED, [])]
+
+
+def test_blank_line_after_header():
+    text = "DECISION:\n\nAction: BUY\nTicker: ROP\nLimit: 400\nShares: 10\n"
+    assert scan(text) == [(1, EXPECTED, [])]
+
+
+def test_prose_and_next_header_end_the_block():
+    text = (BLOCK + "\nThe panel agreed.\nLimit: 1\n"
+            + "DECISION 2:\n\nAction: NONE\nTicker: MSFT\n")
+    assert parse_decision_text(text) == [EXPECTED, {'action': 'NONE', 'ticker': 'MSFT'}]
+
+
+def test_crlf_line_endings():
+    text = "DECISION:\r\nAction: BUY\r\nTicker: ROP\r\n\r\nLimit: 400\r\nShares: 10\r\n"
+    assert parse_decision_text(text) == [EXPECTED]
+    assert list(scan_decisions(text.splitlines(keepends=True))) == [(1, EXPECTED, [])]
+
+
+def test_not_applicable_limit_on_none_block():
+    text = "DECISION:\nAction: NONE\nTicker: FICO\nLimit: N/A\nShares: n/a (no order)\n"
+    assert scan(text) == [(1, {'action': 'NONE', 'ticker': 'FICO'}, [])]
+
+
+def test_malformed_number_is_reported():
+    text = "DECISION:\nAction: BUY\nTicker: ROP\nLimit: about 400\n"
+    line_no, decision, errors = scan(text)[0]
+    assert decision == {'action': 'BUY', 'ticker': 'ROP'}
+    assert errors == [(4, "Limit is not a number: 'about 400'")]
@@ -0,0 +1,83 @@
+"""Intraday fill simulation over minute bars, and the minute-bar store"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from mr_market_fetch import FakeProvider
+from mr_market_fills import simulate_fills
+from mr_market_history import MinuteBarStore
+
+TIMES = ["09:30", "09:31", "09:32", "09:33"]
+
+
+def make_panel(bars):
+    """{ticker: [(open, low, volume), ...]} as a load_panel()-shaped dict"""
+    names = list(bars)
+    panel = {'tickers': names, 'times': TIMES}
+    for field, col in [('Open', 0), ('Low', 1), ('Volume', 2)]:
+        panel[field] = np.array([[bar[col] for bar in bars[t]] for t in names], dtype=float)
+    panel['High'] = panel['Open'] + 1
+    panel['Close'] = panel['Open']
+    return panel
+
+
+def test_fills_at_the_limit_once_enough_volume_traded():
+    panel = make_panel({'MSFT': [(101, 100.5, 500), (100.5, 99.8, 400),
+                                 (100.2, 99.9, 700), (100.0, 99.5, 900)]})
+    [fill] = simulate_fills(panel, [{'ticker': 'MSFT', 'limit': 100.0, 'shares': 100}])
+    # 1000 shares needed at/below 100: 400 at 09:31, 1100 by 09:32
+    assert fill == {'filled': True, 'time': "09:32", 'price': 100.0, 'slippage_pct': 0.0}
+
+
+def test_gap_through_the_limit_fills_at_the_open():
+    panel = make_panel({'MSFT': [(98.0, 97.5, 5000), (98.5, 98.0, 100),
+                                 (99.0, 98.5, 100), (99.5, 99.0, 100)]})
+    [fill] = simulate_fills(panel, [{'ticker': 'MSFT', 'limit': 100.0, 'shares': 100}])
+    assert fill['filled'] and fill['time'] == "09:30"
+    assert fill['price'] == 98.0
+    assert round(fill['slippage_pct'], 6) == -2.0
+
+
+def test_not_enough_volume_is_not_filled():
+    panel = make_panel({'MSFT': [(101, 99.5, 200), (100, 99.5, 200),
+                                 (100, 99.5, 200), (100, 99.5, 200)]})
+    [fill] = simulate_fills(panel, [{'ticker': 'MSFT', 'limit': 100.0, 'shares': 100}])
+    assert fill == {'filled': False, 'time': None, 'price': None, 'slippage_pct': None}
+
+
+def test_ticker_without_minute_bars_returns_none():
+    panel = make_panel({'MSFT': [(101, 99.5, 5000)] * 4})
+    orders = [{'ticker': 'AAPL', 'limit': 200.0, 'shares': 10},
+              {'ticker': 'MSFT', 'limit': 100.0, 'shares': 100}]
+    none, fill = simulate_fills(panel, orders)
+    assert none is None
+    assert fill['filled'] and fill['time'] == "09:30"
+
+
+def test_missing_volume_does_not_block_later_fills():
+    panel = make_panel({'MSFT': [(100, 99.5, np.nan), (100, 99.5, 600),
+                                 (100, 99.5, 600), (100, 99.5, 600)]})
+    [fill] = simulate_fills(panel, [{'ticker': 'MSFT', 'limit': 100.0, 'shares': 100}])
+    assert fill['filled'] and fill['time'] == "09:32"
+
+
+def test_open_session_is_not_stored(tmp_path):
+    store = MinuteBarStore(str(tmp_path / "history.db"))
+    provider = FakeProvider(end_date="2026-02-03")
+    tz = pd.Timestamp("2026-02-03 12:00", tz="America/New_York").tzinfo
+    try:
+        during = store.ensure(['MSFT'], "2026-02-03", provider, verbose=False,
+                              clock=lambda: datetime(2026, 2, 3, 12, 0, tzinfo=tz))
+        assert set(during) == {'MSFT'}
+        assert provider.calls['minute_bars'] == 0
+        assert store.stored_tickers("2026-02-03") == set()
+
+        after = store.ensure(['MSFT'], "2026-02-03", provider, verbose=False,
+                             clock=lambda: datetime(2026, 2, 3, 16, 5, tzinfo=tz))
+        assert after == {}
+        assert store.stored_tickers("2026-02-03") == {'MSFT'}
+        assert store.load_panel(['MSFT'], "2026-02-03")['times'][-1] == "15:59"
+    finally:
+        store.close()
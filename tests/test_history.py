@@ -0,0 +1,95 @@
+"""Daily-bar history store: incremental updates, re-adjustments and gap repair"""
+
+import pandas as pd
+
+from mr_market_fetch import FakeProvider
+from mr_market_history import HistoryStore
+
+TICKERS = ['VOO', 'MSFT', 'ROP']
+
+
+class AdjustedProvider(FakeProvider):
+    """FakeProvider whose tickers in `adjusted` had a dividend adjustment on `on`"""
+
+    def __init__(self, adjusted, on, factor=0.98, **kwargs):
+        super().__init__(**kwargs)
+        self.adjusted = set(adjusted)
+        self.on = pd.Timestamp(on)
+        self.factor = factor
+
+    def _frame(self, ticker):
+        frame = super()._frame(ticker)
+        if ticker not in self.adjusted:
+            return frame
+        frame = frame.copy()
+        frame.loc[frame.index < self.on, ['Open', 'High', 'Low', 'Close']] *= self.factor
+        return frame
+
+
+def closes(store, ticker):
+    return store.closes_since(ticker, "2000-01-01")
+
+
+def test_update_fetches_only_new_bars(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.update(TICKERS, FakeProvider(end_date="2026-01-30"), verbose=False) == {}
+    assert set(store.last_dates().values()) == {"2026-01-30"}
+    before = closes(store, 'MSFT')
+
+    provider = FakeProvider(end_date="2026-02-03")
+    assert store.update(TICKERS, provider, verbose=False) == {}
+    # one batch for the three tickers sharing a last date, nothing refetched
+    assert provider.calls['download_history'] == 1
+    assert provider.calls['history'] == 0
+    after = closes(store, 'MSFT')
+    assert sorted(set(after) - set(before)) == ["2026-02-02", "2026-02-03"]
+    assert all(after[d] == close for d, close in before.items())
+    store.close()
+
+
+def test_readjusted_history_is_downloaded_again(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.update(TICKERS, FakeProvider(end_date="2026-01-30"), verbose=False)
+    first = min(closes(store, 'MSFT'))
+    old_close = closes(store, 'MSFT')[first]
+
+    provider = AdjustedProvider(['MSFT'], "2026-02-02", end_date="2026-02-03")
+    assert store.is_readjusted('MSFT', provider.history('MSFT', start="2026-01-23"))
+    assert not store.is_readjusted('ROP', provider.history('ROP', start="2026-01-23"))
+    assert store.update(TICKERS, provider, verbose=False) == {}
+
+    msft = closes(store, 'MSFT')
+    assert min(msft) == first
+    assert abs(msft[first] - old_close * 0.98) < 1e-9
+    assert max(msft) == "2026-02-03"
+    assert closes(store, 'ROP')[first] == FakeProvider(end_date="2026-01-30")._frame('ROP') \
+        .loc[first, 'Close']
+    store.close()
+
+
+def test_gaps_against_the_calendar_ticker_are_repaired(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    provider = FakeProvider(end_date="2026-02-03")
+    store.update(TICKERS, provider, verbose=False)
+    # a recent listing: its span starts late, which is not a gap
+    store.upsert('GEV', provider.history('GEV', start="2026-01-20"))
+    with store.conn:
+        store.conn.execute("DELETE FROM bars WHERE ticker = 'MSFT' "
+                           "AND date IN ('2025-12-01', '2026-01-15')")
+
+    assert store.find_gaps(TICKERS + ['GEV']) == {'MSFT': ["2025-12-01", "2026-01-15"]}
+    assert store.trades_on("2026-01-15") and not store.trades_on("2026-01-17")
+
+    repaired, errors = store.repair(TICKERS + ['GEV'], provider, verbose=False)
+    assert repaired == ['MSFT'] and errors == {}
+    assert store.find_gaps(TICKERS + ['GEV']) == {}
+    store.close()
+
+
+def test_no_calendar_means_no_gaps(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.update(['MSFT'], FakeProvider(end_date="2026-02-03"), verbose=False)
+    with store.conn:
+        store.conn.execute("DELETE FROM bars WHERE ticker = 'MSFT' AND date = '2026-01-15'")
+    assert store.find_gaps(['MSFT']) == {}
+    store.close()
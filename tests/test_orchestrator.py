@@ -0,0 +1,83 @@
+"""Roundtable orchestration end to end with the offline StubClient"""
+
+import pytest
+
+from mr_market_decisions import scan_decision_file
+from mr_market_orchestrator import (ANALYSTS, ARBITER, ResponseCache, orchestrate,
+                                    parse_models, stub_clients)
+
+PROMPT = """MR. MARKET AI ROUNDTABLE - 2026-02-03
+{role}
+
+CANDIDATE 1: MSFT (TRACK 3 - START TARGET HIT)
+    Price: $398.10 | Target: $400.00
+
+CANDIDATE 2: ROP (TRACK 2 - 5-DAY DROP)
+    Price: $440.00 | Target: $450.00
+"""
+
+
+def variants(extra=""):
+    return {role: PROMPT.format(role=role.upper()) + extra for role in ANALYSTS + (ARBITER,)}
+
+
+def run(tmp_path, prompts, clients):
+    return orchestrate(prompts, clients, "2026-02-03", str(tmp_path / "prompts"),
+                       str(tmp_path / "decisions"), cache=ResponseCache(str(tmp_path / "cache")),
+                       verbose=False)
+
+
+def test_roundtable_writes_an_ingestible_decision_file(tmp_path):
+    (tmp_path / "prompts").mkdir()
+    clients = stub_clients()
+    path = run(tmp_path, variants(), clients)
+
+    assert path.endswith("2026_02_03_decision_roundtable.txt")
+    blocks = [fields for _, fields, errors in scan_decision_file(path) if not errors]
+    assert [(b['action'], b['ticker']) for b in blocks] == [('BUY', 'MSFT'), ('NONE', 'ROP')]
+    assert blocks[0]['limit'] == 400.0 and blocks[0]['shares'] == 5
+    for role in ANALYSTS:
+        analysis = (tmp_path / "prompts" / f"2026_02_03_{role}_response.txt").read_text()
+        assert f"MSFT: {role.upper()} VERDICT" in analysis
+    assert {role: c.calls for role, c in clients.items()} == {r: 1 for r in clients}
+
+
+def test_rerun_is_served_from_the_cache(tmp_path):
+    (tmp_path / "prompts").mkdir()
+    first = run(tmp_path, variants(), stub_clients())
+    text = open(first).read()
+
+    clients = stub_clients()
+    second = run(tmp_path, variants(), clients)
+    assert open(second).read() == text
+    assert all(c.calls == 0 for c in clients.values())
+
+
+def test_changed_prompt_misses_the_cache(tmp_path):
+    (tmp_path / "prompts").mkdir()
+    run(tmp_path, variants(), stub_clients())
+
+    clients = stub_clients()
+    prompts = variants()
+    prompts['auditor'] += "\nCANDIDATE 3: KO (TRACK 3 - START TARGET HIT)\n    Target: $60.00\n"
+    run(tmp_path, prompts, clients)
+    # the Narrator is unchanged; a new analysis also gives the Arbiter a new key
+    assert {role: c.calls for role, c in clients.items()} == \
+        {'auditor': 1, 'narrator': 0, 'arbiter': 1}
+
+
+def test_cache_key_covers_client_role_and_prompt():
+    key = ResponseCache.key("stub:auditor", "auditor", "prompt")
+    assert key == ResponseCache.key("stub:auditor", "auditor", "prompt")
+    assert key != ResponseCache.key("stub:narrator", "auditor", "prompt")
+    assert key != ResponseCache.key("stub:auditor", "narrator", "prompt")
+    assert key != ResponseCache.key("stub:auditor", "auditor", "prompt ")
+
+
+def test_parse_models():
+    assert parse_models("auditor=gpt-5, Arbiter = claude-opus-4-1") == \
+        {'auditor': "gpt-5", 'arbiter': "claude-opus-4-1"}
+    with pytest.raises(ValueError):
+        parse_models("critic=gpt-5")
+    with pytest.raises(ValueError):
+        parse_models("auditor=")
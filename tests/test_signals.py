@@ -0,0 +1,82 @@
+"""Alert-signal rules: RSI, volume spike, gap down and drawdown from the high"""
+
+import pytest
+
+from mr_market_signals import SIGNALS, evaluate_signals, signal_labels
+
+PARAMS = {'drop_threshold': 5.0, 'target_threshold': 10.0, 'near_low_threshold': 15.0,
+          'below_ma_threshold': 3.0, 'rsi_threshold': 30.0, 'volume_spike_ratio': 2.0,
+          'gap_threshold': 3.0, 'drawdown_threshold': 30.0}
+NEW_RULES = ['rsi_oversold', 'volume_spike', 'gap_down', 'drawdown_from_high']
+
+
+def quote(**fields):
+    """A quiet market_data entry (no rule fires) with fields overridden"""
+    data = {'close': 100.0, 'open': 100.0, 'prev_close': 100.0, 'change_pct': 0.0,
+            'ma_50': 100.0, 'week_52_low': 60.0, 'week_52_high': 110.0,
+            'rsi_14': 50.0, 'volume': 1_000_000.0, 'volume_avg': 1_000_000.0}
+    data.update(fields)
+    return data
+
+
+def fired(market_data, names=NEW_RULES):
+    result = evaluate_signals(market_data, {}, PARAMS, names)
+    return {rule: [t for t, hit in zip(result['tickers'], mask) if hit]
+            for rule, mask in result['masks'].items()}
+
+
+def test_new_rules_are_registered_watch_only():
+    for name in NEW_RULES:
+        assert SIGNALS[name]['track'] is None
+
+
+def test_rsi_oversold_at_and_under_the_threshold():
+    market_data = {'AT': quote(rsi_14=30.0), 'UNDER': quote(rsi_14=22.5),
+                   'OVER': quote(rsi_14=30.1), 'NONE': quote(rsi_14=None)}
+    assert fired(market_data)['rsi_oversold'] == ['AT', 'UNDER']
+
+
+def test_volume_spike_needs_a_down_day():
+    market_data = {
+        'SPIKE': quote(volume=2_500_000.0, change_pct=-1.2),
+        'UP_DAY': quote(volume=2_500_000.0, change_pct=1.2),
+        'LIGHT': quote(volume=1_900_000.0, change_pct=-1.2),
+        'NO_AVG': quote(volume=2_500_000.0, volume_avg=None, change_pct=-1.2),
+    }
+    assert fired(market_data)['volume_spike'] == ['SPIKE']
+
+
+def test_gap_down_from_the_previous_close():
+    market_data = {'GAP': quote(open=96.5, prev_close=100.0),
+                   'SMALL': quote(open=97.5, prev_close=100.0),
+                   'GAP_UP': quote(open=104.0, prev_close=100.0),
+                   'NO_OPEN': quote(open=None)}
+    result = evaluate_signals(market_data, {}, PARAMS, ['gap_down'])
+    assert result['inputs']['gap_pct'][0] == pytest.approx(-3.5)
+    assert fired(market_data)['gap_down'] == ['GAP']
+
+
+def test_drawdown_from_the_52_week_high():
+    market_data = {'DEEP': quote(close=70.0, week_52_high=100.0),
+                   'EDGE': quote(close=70.0, week_52_high=99.9),
+                   'NO_HIGH': quote(week_52_high=None)}
+    assert fired(market_data)['drawdown_from_high'] == ['DEEP']
+
+
+def test_new_rules_do_not_touch_the_tracks():
+    market_data = {'ALL': quote(rsi_14=20.0, volume=3_000_000.0, change_pct=-2.0,
+                                open=95.0, close=60.0, week_52_high=100.0, ma_50=60.0,
+                                week_52_low=30.0)}
+    result = evaluate_signals(market_data, {}, PARAMS, NEW_RULES)
+    assert all(result['masks'][name][0] for name in NEW_RULES)
+    assert result['any'][0] and not result['track2'][0] and not result['track3'][0]
+    labels = signal_labels(result, 0, market_data['ALL'], 0)
+    assert labels == ["RSI OVERSOLD: RSI(14) 20",
+                      "VOLUME SPIKE: 3.0x 20-day average on a -2.0% day",
+                      "GAP DOWN: opened -5.0% vs $100.00 close",
+                      "DRAWDOWN FROM HIGH: 40.0% below $100.00"]
+
+
+def test_unknown_rule_is_rejected():
+    with pytest.raises(ValueError):
+        evaluate_signals({'MSFT': quote()}, {}, PARAMS, ['rsi_overbought'])
@@ -0,0 +1,98 @@
+"""Data packs from a fixture statements table, and the daily-run fallback"""
+
+import pandas as pd
+import pytest
+
+import mr_market_roundtable as mr
+from mr_market_fetch import FakeProvider
+from mr_market_warehouse import COLUMNS, data_packs, load_packs, save_packs
+
+QUARTERS = ["2024-03-31", "2024-06-30", "2024-09-30", "2024-12-31",
+            "2025-03-31", "2025-06-30", "2025-09-30", "2025-12-31"]
+
+
+def quarter(revenue):
+    return {'revenue': revenue, 'gross_profit': 0.8 * revenue, 'operating_income': 0.3 * revenue,
+            'net_income': 0.2 * revenue, 'ebitda': 40.0, 'eps': 1.0, 'shares': 100.0,
+            'operating_cash_flow': 50.0, 'capex': -10.0, 'buybacks': -5.0, 'dividends': -2.0,
+            'total_debt': 200.0, 'cash': 50.0, 'equity': 1000.0}
+
+
+def make_table(rows):
+    """[(ticker, period_end, values)] as a Warehouse.table"""
+    index = pd.MultiIndex.from_arrays([[t for t, _, _ in rows],
+                                       pd.DatetimeIndex([p for _, p, _ in rows])],
+                                      names=['ticker', 'period_end'])
+    return pd.DataFrame([v for _, _, v in rows], index=index, columns=COLUMNS, dtype=float)
+
+
+@pytest.fixture
+def table():
+    rows = [('FICO', p, quarter(100.0 if p < "2025" else 110.0)) for p in QUARTERS]
+    rows += [('NEW', p, quarter(50.0)) for p in QUARTERS[-3:]]
+    return make_table(rows)
+
+
+def test_ttm_margins_growth_and_fcf(table):
+    m = data_packs(table, {'FICO': 100.0})['FICO']['metrics']
+    assert m['revenue_ttm'] == 440.0
+    assert m['revenue_growth'] == pytest.approx(0.1)
+    assert m['revenue_growth_quarter'] == pytest.approx(0.1)
+    assert m['gross_margin'] == pytest.approx(0.8)
+    assert m['operating_margin'] == pytest.approx(0.3)
+    assert m['fcf_ttm'] == 160.0
+    assert m['fcf_margin'] == pytest.approx(160 / 440)
+    assert m['buybacks_ttm'] == 20.0 and m['dividends_ttm'] == 8.0
+    assert m['share_change'] == 0.0
+
+
+def test_multiples_at_the_given_price(table):
+    m = data_packs(table, {'FICO': 100.0})['FICO']['metrics']
+    assert m['market_cap'] == 10000.0
+    assert m['pe'] == 25.0
+    assert m['p_fcf'] == 62.5
+    assert m['net_debt'] == 150.0
+    assert m['net_debt_ebitda'] == pytest.approx(150 / 160)
+    assert m['ev_ebitda'] == pytest.approx(10150 / 160)
+    assert m['fcf_yield'] == pytest.approx(160 / 10000)
+
+
+def test_short_history_and_missing_price_are_none(table):
+    pack = data_packs(table, {'FICO': 100.0})['NEW']
+    assert pack['quarters_stored'] == 3
+    assert pack['metrics']['revenue_ttm'] is None
+    assert pack['metrics']['revenue_growth'] is None
+    assert pack['price'] is None and pack['metrics']['pe'] is None
+
+
+def test_pack_quarters_newest_first(table):
+    packs = data_packs(table, tickers=['FICO', 'MISSING'], quarters=4)
+    assert list(packs) == ['FICO']
+    quarters = packs['FICO']['quarters']
+    assert [q['period_end'] for q in quarters] == QUARTERS[:3:-1]
+    assert quarters[0] == {'period_end': "2025-12-31", 'revenue': 110.0,
+                           'operating_income': pytest.approx(33.0),
+                           'net_income': pytest.approx(22.0), 'fcf': 40.0, 'eps': 1.0}
+
+
+def test_gap_in_quarters_breaks_the_ttm():
+    periods = QUARTERS[:2] + QUARTERS[3:5]
+    table = make_table([('GAP', p, quarter(100.0)) for p in periods])
+    assert data_packs(table)['GAP']['metrics']['revenue_ttm'] is None
+
+
+def test_daily_run_falls_back_to_archived_packs(tmp_path, monkeypatch, table):
+    archived = data_packs(table, {'FICO': 100.0})
+    save_packs(str(tmp_path), archived, "2026-01-30")
+    (tmp_path / "statements.npz").write_bytes(b"not an archive")
+    monkeypatch.setattr(mr, 'FUNDAMENTALS_DIR', str(tmp_path))
+    monkeypatch.setattr(mr, 'TICKERS', ['FICO', 'NEW'])
+    market_data = {'_trade_date': "2026-02-03", 'FICO': {'close': 120.0}}
+
+    with pytest.raises(ValueError):
+        mr.refresh_warehouse(FakeProvider(), dict(market_data))
+    packs = mr.refresh_warehouse(FakeProvider(), market_data, fallback=True)
+
+    assert packs == archived
+    assert market_data['FICO']['fundamentals'].startswith("TTM to 2025-12-31")
+    assert load_packs(str(tmp_path)) == ("2026-01-30", archived)